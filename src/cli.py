@@ -1,8 +1,52 @@
 # src/cli.py
 import argparse
+import asyncio
+import sys
+from typing import Dict, List
+import pandas as pd
+from src.config import load_config
+from src.core.async_engine import AsyncTradingEngine
+from src.core.benchmark import GROUPS, BenchmarkSuite, compare, format_comparison, load_results, save_results
 from src.core.bot import CryptoBot
+from src.core.recorder import session_files
+from src.core.session_replay import SessionReplay
 from src.data.backtester import Backtester
-from src.strategies import MovingAverageCrossover
+from src.data.columnar import ColumnarStore
+from src.data.replay import ReplayBacktester, import_trades_csv, open_trades
+from src.data.storage import DatabaseClient
+from src.data.sweep import ParameterSweep
+from src.execution.paper_exchange import PaperExchange
+from src.strategies.strategy_factory import StrategyFactory
+
+def _parse_value(raw: str):
+    for cast in (int, float):
+        try:
+            return cast(raw)
+        except ValueError:
+            pass
+    return raw
+
+def parse_grid(specs: List[str]) -> Dict[str, List]:
+    """
+    Parse ['short_window=10,20', 'long_window=50:200:50', 'std_dev=1.5:3:0.5']
+    into a parameter grid. Ranges include their stop; integer ranges stay ints.
+    """
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if not values:
+            raise ValueError(f"Invalid grid spec: {spec} (expected name=v1,v2 or name=start:stop:step)")
+        if ":" in values:
+            start, stop, step = (_parse_value(v) for v in values.split(":"))
+            if all(isinstance(v, int) for v in (start, stop, step)):
+                grid[name] = list(range(start, stop + 1, step))
+            else:
+                # Count the steps with a tolerance so 1.5:3:0.5 still reaches 3.0
+                count = int((stop - start) / step + 1e-9) + 1
+                grid[name] = [round(start + i * step, 10) for i in range(count)]
+        else:
+            grid[name] = [_parse_value(v) for v in values.split(",")]
+    return grid
 
 def main():
     parser = argparse.ArgumentParser(description="Crypto Trading Bot CLI")
@@ -11,23 +55,143 @@ def main():
     # Start the bot
     start_parser = subparsers.add_parser("start", help="Start the trading bot")
     start_parser.add_argument("--config", default="config/config.yaml", help="Path to config file")
+    start_parser.add_argument("--engine", choices=["sync", "async"], default="sync",
+                              help="async trades every trading_pairs symbol from one process")
 
     # Run a backtest
     backtest_parser = subparsers.add_parser("backtest", help="Run a backtest")
     backtest_parser.add_argument("--strategy", required=True, help="Strategy to test (e.g., moving_average)")
-    backtest_parser.add_argument("--data", required=True, help="Path to historical data CSV")
+    source = backtest_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--data", help="Path to historical data CSV")
+    source.add_argument("--store", help="Columnar history directory (memory-mapped)")
+    backtest_parser.add_argument("--symbol", default="BTC/USDT", help="Symbol to load from --store")
+    backtest_parser.add_argument("--timeframe", default="1m", help="Timeframe to load from --store")
+
+    # Convert history to the columnar format
+    convert_parser = subparsers.add_parser("convert", help="Convert history to the columnar format")
+    convert_source = convert_parser.add_mutually_exclusive_group(required=True)
+    convert_source.add_argument("--csv", help="CSV with timestamp/open/high/low/close/volume columns")
+    convert_source.add_argument("--db", help="SQLite database written by DatabaseClient")
+    convert_parser.add_argument("--store", default="data/columnar", help="Columnar history directory")
+    convert_parser.add_argument("--symbol", help="Symbol (required with --csv; filters --db)")
+    convert_parser.add_argument("--timeframe", help="Timeframe (required with --csv; filters --db)")
+
+    # Sweep a parameter grid
+    sweep_parser = subparsers.add_parser("sweep", help="Backtest a parameter grid in parallel")
+    sweep_parser.add_argument("--strategy", required=True, choices=StrategyFactory.strategy_types())
+    sweep_parser.add_argument("--data", required=True, help="Path to historical data CSV")
+    sweep_parser.add_argument("--grid", action="append", required=True,
+                              help="Parameter values, e.g. short_window=10,20,50 or long_window=50:200:50")
+    sweep_parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: all cores)")
+    sweep_parser.add_argument("--rank-by", default="return_pct", help="Report column to rank by")
+    sweep_parser.add_argument("--top", type=int, default=20, help="Rows to show in the ranked table")
+
+    # Replay recorded trades tick by tick
+    replay_parser = subparsers.add_parser("replay", help="Backtest by replaying recorded trades")
+    replay_parser.add_argument("--strategy", required=True, choices=StrategyFactory.strategy_types())
+    replay_parser.add_argument("--trades", required=True, help="Trades .npy file (written by --csv if given)")
+    replay_parser.add_argument("--csv", help="Import this trades CSV into --trades first")
+    replay_parser.add_argument("--symbol", default="BTC/USDT", help="Symbol of the recorded trades")
+    replay_parser.add_argument("--timeframe", default="1m", help="Bar timeframe the strategy runs on")
+    replay_parser.add_argument("--maker-fee", type=float, default=0.001, help="Maker fee rate")
+    replay_parser.add_argument("--taker-fee", type=float, default=0.001, help="Taker fee rate")
+    replay_parser.add_argument("--slippage-bps", type=float, default=0.0, help="Taker slippage in basis points")
+
+    # Replay a recorded live session
+    session_parser = subparsers.add_parser("replay-session", help="Re-run a recorded live session offline")
+    session_parser.add_argument("--path", default="data/sessions", help="Directory the recorder wrote to")
+    session_parser.add_argument("--session", help="Session id (default: the latest)")
+    session_parser.add_argument("--config", help="Config file to replay with instead of the recorded one")
+
+    # Benchmark hot paths
+    bench_parser = subparsers.add_parser("benchmark", help="Time hot paths on seeded synthetic data")
+    bench_parser.add_argument("--groups", nargs="+", choices=GROUPS, help="Benchmark groups (default: all)")
+    bench_parser.add_argument("--sizes", default="10000,100000,1000000", help="Bar counts for Backtester.run")
+    bench_parser.add_argument("--repeat", type=int, default=5, help="Samples per benchmark")
+    bench_parser.add_argument("--seed", type=int, default=0, help="Synthetic data seed")
+    bench_parser.add_argument("--save", help="Write results to this JSON baseline")
+    bench_parser.add_argument("--compare", help="Baseline JSON to compare against")
+    bench_parser.add_argument("--threshold", type=float, default=0.2,
+                              help="Slowdown tolerated before flagging a regression (0.2 = 20%%)")
 
     # Parse arguments
     args = parser.parse_args()
 
     if args.command == "start":
-        bot = CryptoBot(config_path=args.config)
-        bot.run()
+        config = load_config(args.config)
+        if args.engine == "async":
+            asyncio.run(AsyncTradingEngine(config).run())
+        else:
+            CryptoBot(config).run()
     elif args.command == "backtest":
-        backtester = Backtester(strategy=MovingAverageCrossover())
+        backtester = Backtester(strategy=StrategyFactory.create_strategy({"type": args.strategy}))
+        if args.store:
+            data = ColumnarStore(args.store).load(args.symbol, args.timeframe)
+        else:
+            data = pd.read_csv(args.data)
+        report = backtester.run(data, {})
+        print(report)
+    elif args.command == "sweep":
         data = pd.read_csv(args.data)
-        report = backtester.run(data)
+        sweep = ParameterSweep(args.strategy, processes=args.processes)
+        results = []
+        for result in sweep.iter_results(data, parse_grid(args.grid)):
+            results.append(result)
+            fields = ", ".join(
+                f"{key}={value:.4f}" if isinstance(value, float) else f"{key}={value}"
+                for key, value in result.items()
+            )
+            print(f"[{len(results)}] {fields}", flush=True)
+        print(sweep.rank(results, args.rank_by).head(args.top).to_string())
+    elif args.command == "replay":
+        if args.csv:
+            import_trades_csv(args.csv, args.trades)
+        quote = args.symbol.split("/")[1]
+        exchange = PaperExchange({quote: 10000.0}, maker_fee=args.maker_fee, taker_fee=args.taker_fee,
+                                 slippage_bps=args.slippage_bps)
+        replay = ReplayBacktester(StrategyFactory.create_strategy({"type": args.strategy}), {},
+                                  symbol=args.symbol, timeframe=args.timeframe, exchange=exchange)
+        report = replay.run(open_trades(args.trades))
         print(report)
+        print(f"Replayed {report['events']:,} trades in {report['seconds']:.2f}s "
+              f"({report['events_per_sec']:,.0f} events/sec)")
+    elif args.command == "replay-session":
+        files = session_files(args.path, args.session)
+        if not files:
+            parser.error(f"No recorded session in {args.path}")
+        report = SessionReplay(files, load_config(args.config) if args.config else None).run()
+        for mismatch in report["mismatches"]:
+            print(f"[{mismatch['seq']}] {mismatch['entry']}: recorded {mismatch['recorded']}, "
+                  f"replayed {mismatch['replayed']}")
+        print(f"Replayed {report['steps']} steps ({report['decisions']} decisions): "
+              f"{len(report['mismatches'])} mismatches, {report['unrecorded']} unrecorded inputs")
+        if report["mismatches"]:
+            sys.exit(1)
+    elif args.command == "benchmark":
+        suite = BenchmarkSuite(sizes=[int(size) for size in args.sizes.split(",")], seed=args.seed,
+                               repeat=args.repeat)
+        report = suite.run(args.groups)
+        baseline = load_results(args.compare) if args.compare else {"results": {}}
+        rows = compare(report, baseline, args.threshold)
+        print(format_comparison(rows))
+        if args.save:
+            save_results(report, args.save)
+            print(f"Saved baseline to {args.save}")
+        regressions = [row["name"] for row in rows if row["status"] == "regression"]
+        if regressions:
+            print(f"{len(regressions)} regressions beyond {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+    elif args.command == "convert":
+        store = ColumnarStore(args.store)
+        if args.csv:
+            if not (args.symbol and args.timeframe):
+                parser.error("--csv requires --symbol and --timeframe")
+            written = store.import_csv(args.csv, args.symbol, args.timeframe)
+        else:
+            written = store.import_sqlite(DatabaseClient(args.db), args.symbol, args.timeframe)
+        print(f"Wrote {written} bars to {args.store}")
+    else:
+        parser.print_help()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
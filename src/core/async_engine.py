@@ -0,0 +1,201 @@
+# src/core/async_engine.py
+import asyncio
+from typing import Dict, List, Optional
+import pandas as pd
+from src.core.utils import timeframe_to_seconds
+from src.data.fetcher import DataFetcher
+from src.execution.async_exchange import AsyncExchange
+from src.execution.portfolio_risk import PortfolioRisk
+from src.execution.risk_manager import RiskManager
+from src.monitoring.logger import logger
+from src.strategies.strategy_factory import StrategyFactory
+from src.strategies.streaming_indicators import StreamingSignalEngine
+
+class SymbolState:
+    def __init__(self, symbol: str, risk_params: Dict, portfolio: Optional[PortfolioRisk] = None):
+        """Risk and position state owned by one symbol's trading loop"""
+        self.symbol = symbol
+        self.quote_currency = symbol.split('/')[1]
+        self.risk_manager = RiskManager(risk_params, portfolio=portfolio)
+        self.active_positions: Dict[str, Dict] = {}
+        self.cycles = 0
+
+class AsyncTradingEngine:
+    def __init__(self, config: Dict, exchange: Optional[AsyncExchange] = None,
+                 interval: Optional[float] = None, fetch_timeout: Optional[float] = None):
+        """
+        Trade many symbols concurrently from one process
+
+        Every symbol runs its own coroutine with its own RiskManager, sharing
+        one exchange session and rate limiter. A slow or failing symbol only
+        delays itself. With risk_params.portfolio set, all RiskManagers also
+        share one PortfolioRisk, so exposure and VaR limits span the book.
+        Signals trade as in CryptoBot: 'buy' opens a long and 'sell' a short,
+        each closed by its own stop loss or take profit.
+
+        Args:
+            config (dict): Bot configuration; trading_pairs (or trading_pair)
+                lists the symbols to trade
+            exchange: Async exchange wrapper (built from config['exchange'] if omitted)
+            interval: Seconds between cycles (defaults to scheduler.interval)
+            fetch_timeout: Seconds a symbol waits for market data before
+                skipping its cycle (defaults to the interval)
+        """
+        self.config = config
+        self.symbols: List[str] = config.get('trading_pairs') or [config['trading_pair']]
+        self.timeframe = config.get('interval', '1m')
+        self.interval = interval if interval is not None else timeframe_to_seconds(config['scheduler']['interval'])
+        self.fetch_timeout = fetch_timeout or self.interval
+
+        self.strategy = StrategyFactory.create_strategy(config['strategy'])
+        self.params = config['strategy'].get('params', {})
+        try:
+            self.strategy.stream(self.params)
+            self.signal_engine = StreamingSignalEngine(self.strategy, self.params)
+        except NotImplementedError:
+            self.signal_engine = None
+
+        if exchange is None:
+            exchange_config = config['exchange']
+            exchange = AsyncExchange(
+                exchange_id=exchange_config['id'],
+                api_key=exchange_config['api_key'],
+                api_secret=exchange_config['api_secret']
+            )
+        self.exchange = exchange
+        portfolio_config = config['risk_params'].get('portfolio')
+        self.portfolio = PortfolioRisk(self.symbols, **portfolio_config) if portfolio_config else None
+        self.states = {
+            symbol: SymbolState(symbol, config['risk_params'], self.portfolio) for symbol in self.symbols
+        }
+        self._stop: Optional[asyncio.Event] = None
+
+    async def run(self, cycles: Optional[int] = None) -> None:
+        """
+        Run every symbol's loop until stop() (or for a fixed number of cycles)
+
+        Args:
+            cycles: Stop each symbol after this many cycles (None runs forever)
+        """
+        self._stop = asyncio.Event()
+        logger.info(f"Starting async engine for {len(self.symbols)} symbols")
+        bars = asyncio.create_task(self._close_portfolio_bars()) if self.portfolio is not None else None
+        try:
+            await self.exchange.load_markets()
+            await asyncio.gather(*(self._run_symbol(self.states[s], cycles) for s in self.symbols))
+        finally:
+            if bars is not None:
+                bars.cancel()
+            await self.exchange.close()
+            logger.info("Async engine stopped")
+
+    def stop(self) -> None:
+        if self._stop is not None:
+            self._stop.set()
+
+    async def _close_portfolio_bars(self) -> None:
+        """Symbols mark prices as their cycles run; one return row per interval feeds the covariance"""
+        while True:
+            await asyncio.sleep(self.interval)
+            self.portfolio.close_bar()
+
+    async def _run_symbol(self, state: SymbolState, cycles: Optional[int]) -> None:
+        loop = asyncio.get_running_loop()
+        while not self._stop.is_set() and (cycles is None or state.cycles < cycles):
+            started = loop.time()
+            try:
+                await self.execute_cycle(state)
+            except asyncio.TimeoutError:
+                logger.warning(f"{state.symbol}: no market data within {self.fetch_timeout}s, skipping cycle")
+            except Exception as e:
+                logger.error(f"{state.symbol}: strategy execution failed: {e}")
+                state.risk_manager.update_risk_state(pnl=0.0, success=False)
+            state.cycles += 1
+
+            remaining = self.interval - (loop.time() - started)
+            if remaining > 0:
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def execute_cycle(self, state: SymbolState) -> Optional[Dict]:
+        """One fetch/signal/risk/order pass for a symbol; returns the placed order"""
+        rows = await asyncio.wait_for(
+            self.exchange.fetch_ohlcv(state.symbol, timeframe=self.timeframe, limit=100),
+            timeout=self.fetch_timeout,
+        )
+        data = DataFetcher.to_frame(rows or [], state.symbol, self.timeframe)
+        if data.empty:
+            logger.warning(f"{state.symbol}: no data received, skipping cycle")
+            return None
+
+        current_price = float(data['close'].iloc[-1])
+        if self.portfolio is not None:
+            self.portfolio.mark(state.symbol, current_price)
+        await self._monitor_positions(state, current_price)
+
+        signal = self._signal(state.symbol, data)
+        if signal not in ('buy', 'sell'):
+            return None
+
+        risk = state.risk_manager
+        stop_loss, take_profit = risk.generate_risk_orders(current_price, signal)
+        position_size = risk.calculate_position_size(
+            entry_price=current_price,
+            stop_loss_price=stop_loss,
+            balance=await self.exchange.get_balance(state.quote_currency),
+        )
+        if not position_size or not risk.validate_order(state.symbol, signal, position_size, current_price):
+            logger.warning(f"{state.symbol}: order blocked by risk manager")
+            return None
+
+        order = await self.exchange.place_order(state.symbol, signal, position_size, 'limit', current_price)
+        if order:
+            risk.update_risk_state(pnl=0.0, success=True)
+            risk.record_fill(state.symbol, signal, position_size, current_price)
+            state.active_positions[order['id']] = {
+                'side': signal,
+                'entry_price': current_price,
+                'amount': position_size,
+                'stop_loss': stop_loss,
+                'take_profit': take_profit,
+            }
+            logger.info(f"{state.symbol}: order executed: {order['id']}")
+        return order
+
+    def _signal(self, symbol: str, data: pd.DataFrame) -> Optional[str]:
+        if self.signal_engine is not None:
+            return self.signal_engine.on_bars(symbol, data)
+        return self.strategy.generate_signal(data, self.params)
+
+    async def _monitor_positions(self, state: SymbolState, price: float) -> None:
+        for order_id, position in list(state.active_positions.items()):
+            # A short's stop sits above its entry and its take profit below
+            direction = 1 if position['side'] == 'buy' else -1
+            if direction * price <= direction * position['stop_loss']:
+                await self._close_position(state, order_id, price, 'stop_loss')
+            elif direction * price >= direction * position['take_profit']:
+                await self._close_position(state, order_id, price, 'take_profit')
+
+    async def _close_position(self, state: SymbolState, order_id: str, price: float, reason: str) -> None:
+        position = state.active_positions[order_id]
+        exit_side = 'sell' if position['side'] == 'buy' else 'buy'
+        order = await self.exchange.place_order(state.symbol, exit_side, position['amount'], 'market')
+        if not order:
+            return
+        del state.active_positions[order_id]
+        state.risk_manager.record_fill(state.symbol, exit_side, position['amount'], price)
+        pnl = (price - position['entry_price']) / position['entry_price'] * 100
+        if exit_side == 'buy':
+            pnl = -pnl  # a short gains as the price falls
+        state.risk_manager.update_risk_state(pnl=pnl, success=pnl >= 0)
+        logger.info(f"{state.symbol}: closed {order_id} on {reason} ({pnl:+.2f}%)")
+
+if __name__ == "__main__":
+    from src.config import load_config
+    engine = AsyncTradingEngine(load_config())
+    try:
+        asyncio.run(engine.run())
+    except KeyboardInterrupt:
+        logger.info("Shutting down gracefully...")
@@ -0,0 +1,427 @@
+# src/core/benchmark.py
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from src.data.backtester import Backtester
+from src.data.order_book import ConsolidatedBook, L2OrderBook
+from src.data.storage import DatabaseClient
+from src.data.streamer import dumps, loads
+from src.data.synthetic import generate_ohlcv
+from src.execution.exchange import Exchange
+from src.execution.paper_exchange import PaperExchange
+from src.execution.portfolio_risk import PortfolioRisk
+from src.execution.risk_manager import RiskManager
+from src.execution.router import OrderRouter
+from src.monitoring.logger import logger
+from src.strategies.base_strategy import BaseStrategy
+from src.strategies.strategy_factory import StrategyFactory
+
+# Strategy configs to time; composites get sub-strategies so they do real work
+BENCHMARK_STRATEGIES: Dict[str, Dict[str, Any]] = {
+    name: {"type": name} for name in StrategyFactory.strategy_types() if name not in ("combined", "weighted")
+}
+BENCHMARK_STRATEGIES["combined"] = {
+    "type": "combined",
+    "strategies": [{"type": "moving_average"}, {"type": "rsi"}, {"type": "macd"}],
+}
+BENCHMARK_STRATEGIES["weighted"] = {
+    "type": "weighted",
+    "strategies": [{"type": "moving_average"}, {"type": "rsi"}, {"type": "macd"}],
+    "weights": [0.5, 0.3, 0.2],
+}
+
+GROUPS = ("strategies", "backtester", "risk_manager", "storage", "order_book", "startup")
+
+# Run in a fresh interpreter: a bot on binance with its markets cached on disk and the
+# client's data, balance and order calls answered locally (nothing reaches the network),
+# timed until the first evaluation is done; errors logged on the way are reported back
+_STARTUP_SCRIPT = """
+import json, sys, time
+markets_cache, bars_path = sys.argv[1:3]
+with open(bars_path) as f:
+    bars = json.load(f)
+started = time.perf_counter()
+from src.core.bot import CryptoBot
+imported = time.perf_counter()
+bot = CryptoBot({
+    "trading_pair": "BTC/USDT", "quote_currency": "USDT",
+    "exchange": {"id": "binance", "markets_cache": markets_cache},
+    "strategy": {"type": "moving_average", "params": {}},
+    "risk_params": {}, "scheduler": {"interval": "1m"}, "journal": {"path": ":memory:"},
+})
+initialized = time.perf_counter()
+from src.monitoring.logger import logger
+errors = []
+logger.add(lambda message: errors.append(message.record["message"]), level="ERROR")
+client = bot.exchange.exchange
+client.fetch_ohlcv = lambda *args, **kwargs: bars
+client.fetch_balance = lambda *args, **kwargs: {"total": {"USDT": 10000.0}, "free": {"USDT": 10000.0}}
+client.create_order = lambda symbol, type, side, amount, price=None, params=None: {
+    "id": "1", "symbol": symbol, "type": type, "side": side, "amount": amount, "price": price,
+    "filled": 0.0, "status": "open"}
+bot.execute_strategy()
+evaluated = time.perf_counter()
+bot.order_manager.journal.close()
+print(json.dumps({"import": imported - started, "bot_init": initialized - started,
+                  "first_evaluation": evaluated - started, "errors": errors}))
+"""
+_STARTUP_MARKETS = {
+    "BTC/USDT": {"id": "BTCUSDT", "symbol": "BTC/USDT", "base": "BTC", "quote": "USDT", "baseId": "BTC",
+                 "quoteId": "USDT", "active": True, "type": "spot", "spot": True,
+                 "precision": {"amount": 1e-05, "price": 0.01}, "limits": {"amount": {"min": 1e-05}}},
+}
+
+def time_call(fn: Callable, repeat: int = 5, number: int = 1, setup: Optional[Callable[[], tuple]] = None,
+              items: int = 1) -> Dict[str, float]:
+    """
+    Time fn over `repeat` samples of `number` calls each.
+
+    Args:
+        fn (Callable): Function under test.
+        repeat (int): Samples to take.
+        number (int): Calls per sample; raise it for sub-millisecond functions.
+        setup (Optional[Callable]): Called untimed before each sample; returns fn's arguments.
+        items (int): Units of work per call (bars, rows), for the throughput figure.
+
+    Returns:
+        Dict[str, float]: Per-call median_s, min_s and max_s, plus runs and items_per_sec.
+    """
+    samples = []
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        started = time.perf_counter()
+        for _ in range(number):
+            fn(*args)
+        samples.append((time.perf_counter() - started) / number)
+    return summarize(samples, runs=repeat * number, items=items)
+
+def summarize(samples: Sequence[float], runs: Optional[int] = None, items: int = 1) -> Dict[str, float]:
+    """time_call's figures for samples timed elsewhere (seconds per call)."""
+    median = statistics.median(samples)
+    return {
+        "median_s": median,
+        "min_s": min(samples),
+        "max_s": max(samples),
+        "runs": len(samples) if runs is None else runs,
+        "items_per_sec": items / median if median else float("inf"),
+    }
+
+def _uncached(strategy: BaseStrategy) -> BaseStrategy:
+    """Detach a factory-built strategy (and its children) from the shared indicator cache."""
+    strategy.indicator_cache = None
+    for child in getattr(strategy, "strategies", []):
+        _uncached(child)
+    return strategy
+
+class BenchmarkSuite:
+    def __init__(self, sizes: Sequence[int] = (10_000, 100_000, 1_000_000), seed: int = 0, repeat: int = 5,
+                 window: int = 500, storage_bars: int = 100_000, backtest_strategy: str = "moving_average"):
+        """
+        Time the hot paths on seeded synthetic data.
+
+        Every run with the same arguments sees identical bars, so results
+        from different commits are comparable on the same machine.
+
+        Args:
+            sizes (Sequence[int]): Bar counts for Backtester.run.
+            seed (int): Synthetic data seed.
+            repeat (int): Samples per benchmark.
+            window (int): Bars passed to each generate_signal call (a live cycle's history).
+            storage_bars (int): Bars written and read back by the storage benchmarks.
+            backtest_strategy (str): Strategy type for Backtester.run.
+        """
+        self.sizes = sorted(sizes)
+        self.seed = seed
+        self.repeat = repeat
+        self.window = window
+        self.storage_bars = min(storage_bars, self.sizes[-1])
+        self.backtest_strategy = backtest_strategy
+        self.data = generate_ohlcv(self.sizes[-1], seed=seed)
+
+    def bench_strategies(self) -> Dict[str, Dict]:
+        data = self.data.iloc[:self.window]
+        results = {}
+        for name, config in BENCHMARK_STRATEGIES.items():
+            strategy = _uncached(StrategyFactory.create_strategy(config))
+            results[f"strategy.generate_signal[{name}]"] = time_call(
+                lambda: strategy.generate_signal(data, {}), repeat=self.repeat, number=20
+            )
+        return results
+
+    def bench_backtester(self) -> Dict[str, Dict]:
+        results = {}
+        for size in self.sizes:
+            data = self.data.iloc[:size]
+
+            def setup():
+                return (Backtester(_uncached(StrategyFactory.create_strategy({"type": self.backtest_strategy}))),)
+
+            results[f"backtester.run[{self.backtest_strategy},{size}]"] = time_call(
+                lambda backtester: backtester.run(data, {}), repeat=self.repeat, setup=setup, items=size
+            )
+        return results
+
+    def bench_risk_manager(self) -> Dict[str, Dict]:
+        risk_manager = RiskManager({"max_position_size": 0.1})
+
+        # A 100-symbol book with every portfolio limit on and a full covariance window
+        symbols = [f"SYM{i}/USDT" for i in range(100)]
+        portfolio = PortfolioRisk(symbols, window=500, max_var_pct=100.0, max_gross_exposure=100.0,
+                                  max_net_exposure=100.0, max_concentration=100.0)
+        rng = np.random.default_rng(self.seed)
+        prices = np.full(len(symbols), 100.0)
+        for returns in rng.normal(0.0, 0.001, size=(500, len(symbols))):
+            prices *= 1 + returns
+            portfolio.close_bar(dict(zip(symbols, prices)))
+        for symbol, price in zip(symbols, prices):
+            portfolio.apply_fill(symbol, "buy", 1.0, price)
+        book = RiskManager({"max_position_size": 0.1}, portfolio=portfolio)
+        return {
+            "risk_manager.validate_order": time_call(
+                lambda: risk_manager.validate_order("BTC/USDT", "buy", 0.01, 30000.0),
+                repeat=self.repeat, number=10_000
+            ),
+            "risk_manager.validate_order[portfolio,100]": time_call(
+                lambda: book.validate_order("SYM7/USDT", "buy", 0.01, prices[7]),
+                repeat=self.repeat, number=10_000
+            ),
+            "portfolio_risk.close_bar[100]": time_call(
+                lambda: portfolio.close_bar(), repeat=self.repeat, number=100
+            ),
+        }
+
+    def bench_storage(self) -> Dict[str, Dict]:
+        data = self.data.iloc[:self.storage_bars]
+        results = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = iter(range(self.repeat + 1))
+
+            def fresh_db():
+                return (DatabaseClient(str(Path(tmp) / f"write_{next(paths)}.db")),)
+
+            def write(db):
+                db.save_ohlcv("BTC/USDT", data)
+                db.close()
+
+            # A fresh file per sample times inserts, not conflict updates
+            results[f"storage.save_ohlcv[{len(data)}]"] = time_call(
+                write, repeat=self.repeat, setup=fresh_db, items=len(data)
+            )
+
+            db = DatabaseClient(str(Path(tmp) / "read.db"))
+            db.save_ohlcv("BTC/USDT", data)
+            results[f"storage.load_range[{len(data)}]"] = time_call(
+                lambda: db.load_range("BTC/USDT"), repeat=self.repeat, items=len(data)
+            )
+            results["storage.load_ohlcv[1000]"] = time_call(
+                lambda: db.load_ohlcv("BTC/USDT", limit=1000), repeat=self.repeat, number=20, items=1000
+            )
+            db.close()
+        return results
+
+    def bench_order_book(self) -> Dict[str, Dict]:
+        # Three venues with 500 levels a side around 100.00, then a stream of diffs
+        # near the top of the books, a fifth of them removing a level
+        venues = ("a", "b", "c")
+        rng = np.random.default_rng(self.seed)
+        levels = np.round(100.0 + np.arange(1, 501) * 0.01, 2)
+        n = 10_000
+        offsets = np.round(rng.integers(1, 100, n) * 0.01, 2)
+        sizes = np.where(rng.random(n) < 0.2, 0.0, np.round(rng.random(n) * 5, 3)).tolist()
+        sides = rng.random(n) < 0.5
+        updates = [
+            (venues[v], [], [[100.0 + offset, size]]) if ask else (venues[v], [[100.0 - offset, size]], [])
+            for v, offset, size, ask in zip(rng.integers(0, len(venues), n).tolist(), offsets.tolist(), sizes, sides)
+        ]
+
+        def fresh_book():
+            book = ConsolidatedBook("BTC/USDT", dict(zip(venues, (0.001, 0.0005, 0.002))))
+            for venue in venues:
+                book.apply_snapshot(venue, [[200.0 - price, 1.0] for price in levels], [[price, 1.0] for price in levels])
+            return (book,)
+
+        def apply(book):
+            for venue, bids, asks in updates:
+                book.apply_update(venue, bids, asks)
+
+        book, = fresh_book()
+        router = OrderRouter({venue: Exchange(venue, "", "", client=PaperExchange()) for venue in venues},
+                             dict(zip(venues, (0.001, 0.0005, 0.002))))
+        router.books["BTC/USDT"] = book
+        results = {
+            f"order_book.apply_update[{len(venues)} venues]": time_call(
+                apply, repeat=self.repeat, setup=fresh_book, items=n
+            ),
+            "order_book.best_ask[net]": time_call(
+                lambda: book.best_ask(net_of_fees=True), repeat=self.repeat, number=10_000
+            ),
+            "router.plan[150]": time_call(
+                lambda: router.plan("BTC/USDT", "buy", 150.0), repeat=self.repeat, number=100
+            ),
+        }
+        router.close()
+
+        # One symbol's depth stream: Binance diff messages parsed and applied in sequence
+        messages = [
+            dumps({"e": "depthUpdate", "E": i, "s": "BTCUSDT", "U": i + 1, "u": i + 1,
+                   "b": [[f"{price:.2f}", f"{size:g}"] for price, size in bids],
+                   "a": [[f"{price:.2f}", f"{size:g}"] for price, size in asks]})
+            for i, (_, bids, asks) in enumerate(updates)
+        ]
+
+        def fresh_l2():
+            l2 = L2OrderBook("BTC/USDT")
+            l2.on_snapshot({"lastUpdateId": 0, "bids": [[200.0 - price, 1.0] for price in levels],
+                            "asks": [[price, 1.0] for price in levels]})
+            return (l2,)
+
+        def stream(l2):
+            for message in messages:
+                l2.on_diff(loads(message))
+
+        l2, = fresh_l2()
+        stream(l2)
+        results.update({
+            "order_book.l2_diff[parsed]": time_call(stream, repeat=self.repeat, setup=fresh_l2, items=n),
+            "order_book.vwap[25]": time_call(lambda: l2.vwap("buy", 25.0), repeat=self.repeat, number=1000),
+            "order_book.imbalance[20]": time_call(lambda: l2.imbalance(20), repeat=self.repeat, number=10_000),
+        })
+        return results
+
+    def bench_startup(self) -> Dict[str, Dict]:
+        """
+        Cold start of a bot process, each sample a fresh interpreter: seconds
+        from the script's start to the bot module imported, the bot built and
+        its first strategy evaluation done, plus the whole process's wall time.
+
+        Raises:
+            RuntimeError: The evaluation logged an error, so its timing is not a real cycle.
+        """
+        phases: Dict[str, List[float]] = {"import": [], "bot_init": [], "first_evaluation": [], "process": []}
+        root = Path(__file__).resolve().parents[2]
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(Path(tmp) / "binance.json", "w") as f:
+                json.dump({"fetched_at": time.time(), "markets": _STARTUP_MARKETS}, f)
+            bars_path = Path(tmp) / "bars.json"
+            with open(bars_path, "w") as f:
+                json.dump(self.data.iloc[:self.window].to_numpy().tolist(), f)
+
+            for _ in range(self.repeat):
+                started = time.perf_counter()
+                output = subprocess.run([sys.executable, "-c", _STARTUP_SCRIPT, tmp, str(bars_path)], cwd=root,
+                                        capture_output=True, text=True, check=True).stdout
+                phases["process"].append(time.perf_counter() - started)
+                timings = json.loads(output.splitlines()[-1])
+                errors = timings.pop("errors")
+                if errors:
+                    raise RuntimeError(f"Startup benchmark logged errors: {errors}")
+                for phase, seconds in timings.items():
+                    phases[phase].append(seconds)
+        return {f"startup.{phase}": summarize(samples) for phase, samples in phases.items()}
+
+    def run(self, groups: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Run the selected benchmark groups (all of GROUPS by default).
+
+        Returns:
+            Dict[str, Any]: {'meta': environment and settings, 'results': name -> timings}.
+        """
+        groups = list(groups or GROUPS)
+        unknown = set(groups) - set(GROUPS)
+        if unknown:
+            raise ValueError(f"Unknown benchmark groups: {', '.join(sorted(unknown))}")
+
+        results = {}
+        for group in groups:
+            started = time.perf_counter()
+            results.update(getattr(self, f"bench_{group}")())
+            logger.info(f"Benchmarked {group} in {time.perf_counter() - started:.1f}s")
+        return {"meta": self.meta(), "results": results}
+
+    def meta(self) -> Dict[str, Any]:
+        return {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "seed": self.seed,
+            "sizes": self.sizes,
+            "repeat": self.repeat,
+        }
+
+def save_results(report: Dict[str, Any], path: str) -> None:
+    """Write a run() report as a JSON baseline."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.2,
+            metric: str = "median_s") -> List[Dict[str, Any]]:
+    """
+    Compare two run() reports benchmark by benchmark.
+
+    Args:
+        current (Dict): Report under test.
+        baseline (Dict): Reference report.
+        threshold (float): Relative slowdown tolerated before a regression (0.2 = 20%).
+        metric (str): Timing to compare ('median_s' or 'min_s').
+
+    Returns:
+        List[Dict]: One row per benchmark with baseline, current and ratio
+            (current / baseline), and status 'regression', 'improvement',
+            'ok', 'new' (no baseline) or 'missing' (not run).
+    """
+    current, baseline = current["results"], baseline["results"]
+    rows = []
+    for name in sorted(set(current) | set(baseline)):
+        if name not in baseline:
+            rows.append({"name": name, "baseline": None, "current": current[name][metric], "ratio": None,
+                         "status": "new"})
+            continue
+        if name not in current:
+            rows.append({"name": name, "baseline": baseline[name][metric], "current": None, "ratio": None,
+                         "status": "missing"})
+            continue
+        before, after = baseline[name][metric], current[name][metric]
+        ratio = after / before if before else float("inf")
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({"name": name, "baseline": before, "current": after, "ratio": ratio, "status": status})
+    return rows
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    """Render compare() rows as a text table."""
+    def seconds(value):
+        if value is None:
+            return "-"
+        for unit, scale in (("s", 1), ("ms", 1e3), ("us", 1e6)):
+            if value * scale >= 1:
+                return f"{value * scale:.2f} {unit}"
+        return f"{value * 1e9:.0f} ns"
+
+    width = max([len(row["name"]) for row in rows] + [9])
+    lines = [f"{'benchmark':<{width}}  {'baseline':>10}  {'current':>10}  {'ratio':>6}  status"]
+    for row in rows:
+        ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "-"
+        lines.append(f"{row['name']:<{width}}  {seconds(row['baseline']):>10}  {seconds(row['current']):>10}  "
+                     f"{ratio:>6}  {row['status']}")
+    return "\n".join(lines)
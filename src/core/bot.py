@@ -1,32 +1,66 @@
 # src/core/bot.py
+import queue
 import time
-from typing import Dict
+from collections import deque
+from typing import TYPE_CHECKING, Dict, Optional
+from src.core.recorder import RecordingExchange, RecordingFetcher, SessionRecorder
+from src.core.utils import timeframe_to_seconds
 from src.strategies.strategy_factory import StrategyFactory
 from src.monitoring.logger import logger
+from src.monitoring.metrics import STAGE_SECONDS, MetricsServer
 from src.execution.risk_manager import RiskManager
 from src.execution.exchange import Exchange
+from src.execution.order_journal import OrderJournal
+from src.execution.order_manager import OrderManager
+from src.execution.paper_exchange import PaperExchange
+from src.execution.trigger_index import TriggerBook
 from src.data.fetcher import DataFetcher
+from src.data.streamer import LiveBarFeed, WebSocketStreamer
+from src.strategies.streaming_indicators import Bar, StreamingSignalEngine
+
+if TYPE_CHECKING:
+    from src.monitoring.alerts import AlertDispatcher
+
+def _exit_side(position: Dict) -> str:
+    """Side of the order that closes (or reverses) a position"""
+    return 'sell' if position.get('side', 'buy') == 'buy' else 'buy'
 
 class CryptoBot:
-    def __init__(self, config: Dict):
+    def __init__(self, config: Dict, exchange: Optional[Exchange] = None):
         """
         Professional trading bot with integrated risk management
         
         Args:
             config (dict): Configuration dictionary from YAML
+            exchange: Pre-built exchange wrapper (built from config['exchange'] if omitted)
         """
         self.config = config
         self._validate_config()
         
         # Initialize core components
         self.strategy = StrategyFactory.create_strategy(config['strategy'])
-        self.exchange = self._init_exchange()
-        self.data_fetcher = DataFetcher(self.exchange)
+        self.signal_engine = self._init_signal_engine()
+        self.recorder = self._init_recorder()
+        self.exchange = self._recorded(exchange or self._init_exchange(), RecordingExchange)
+        self.data_fetcher = self._recorded(DataFetcher(self.exchange, feed=self._init_bar_feed()), RecordingFetcher)
         self.risk_manager = RiskManager(config['risk_params'])
+        self.order_manager = OrderManager(
+            self.exchange,
+            journal=OrderJournal(config.get('journal', {}).get('path', 'data/orders.db')),
+            alert=self._alert
+        )
         
-        # State tracking
-        self.active_positions = {}
+        # State tracking (positions survive restarts through the order journal)
+        self.active_positions: Dict[str, Dict] = {}
+        self.triggers = TriggerBook()  # exit levels of active_positions, by price
+        self.pending_exits: Dict[str, str] = {}  # triggered positions whose exit order failed
+        self.restore_positions(self._recover_positions())
         self.trade_history = []
+        self.order_latencies = deque(maxlen=1000)  # signal-to-order, ms
+        self.metrics_server = self._init_metrics_server()
+        self.alerts = self._init_alerts()
+        self._record('session', config=self._session_config(),
+                     positions={order_id: dict(position) for order_id, position in self.active_positions.items()})
         
         logger.info(f"Bot initialized with strategy: {self.strategy.name}")
 
@@ -43,10 +77,18 @@ class CryptoBot:
     def _init_exchange(self) -> Exchange:
         """Initialize and verify exchange connection"""
         exchange_config = self.config['exchange']
+        client = None
+        if exchange_config.get('paper'):
+            # Simulated fills against the exchange's live market data
+            client = PaperExchange.for_market(exchange_config['id'], **exchange_config.get('paper_params', {}))
+            logger.info(f"Paper trading against {exchange_config['id']} market data")
         exchange = Exchange(
             exchange_id=exchange_config['id'],
-            api_key=exchange_config['api_key'],
-            api_secret=exchange_config['api_secret']
+            api_key=exchange_config.get('api_key', ''),
+            api_secret=exchange_config.get('api_secret', ''),
+            client=client,
+            markets_cache=exchange_config.get('markets_cache', 'data/markets'),
+            markets_ttl=exchange_config.get('markets_ttl', 86400)
         )
         
         # Verify connectivity
@@ -58,126 +100,443 @@ class CryptoBot:
             logger.error(f"Exchange connection failed: {e}")
             raise
 
+    def _init_bar_feed(self) -> Optional[LiveBarFeed]:
+        """Build live bars from the trade stream when a stream URL is configured"""
+        stream_config = self.config.get('stream')
+        if not stream_config:
+            return None
+        feed = LiveBarFeed(
+            WebSocketStreamer(
+                stream_config['url'],
+                queue_size=stream_config.get('queue_size', 10000)
+            ),
+            symbols=[self.config['trading_pair']],
+            timeframe=self.config['scheduler']['interval'],
+            timeframes=stream_config.get('timeframes', ())
+        )
+        feed.start()
+        logger.info(f"Streaming {self.config['trading_pair']} bars from {stream_config['url']}")
+        return feed
+
+    def _init_metrics_server(self) -> Optional[MetricsServer]:
+        """Expose stage timings and REST counters for Prometheus when a metrics port is configured"""
+        metrics_config = self.config.get('metrics')
+        if not metrics_config:
+            return None
+        return MetricsServer(
+            port=metrics_config.get('port', 9100),
+            host=metrics_config.get('host', '127.0.0.1')
+        ).start()
+
+    def _init_recorder(self) -> Optional[SessionRecorder]:
+        """Journal inputs and decisions for replay when a recorder is configured"""
+        recorder_config = self.config.get('recorder')
+        if not recorder_config:
+            return None
+        recorder = SessionRecorder.from_config(recorder_config)
+        logger.info(f"Recording session {recorder.session} to {recorder.directory}")
+        return recorder
+
+    def _recorded(self, source, wrapper):
+        return source if self.recorder is None else wrapper(source, self.recorder)
+
+    def _record(self, kind: str, **data) -> None:
+        if self.recorder is not None:
+            self.recorder.record(kind, **data)
+
+    def _session_config(self) -> Dict:
+        """The configuration a replay needs (no credentials)"""
+        config = {
+            key: self.config[key]
+            for key in ('trading_pair', 'quote_currency', 'strategy', 'risk_params', 'scheduler')
+            if key in self.config
+        }
+        config['exchange'] = {'id': self.config['exchange'].get('id')}
+        return config
+
+    def _init_alerts(self) -> Optional['AlertDispatcher']:
+        """Deliver alerts from a background thread when alert channels are configured"""
+        monitoring_config = self.config.get('monitoring', {})
+        if not monitoring_config.get('alerts', {}).get('channels'):
+            return None
+        from src.monitoring.alerts import AlertDispatcher  # pulls in requests; only needed with alerts
+        return AlertDispatcher.from_config(monitoring_config)
+
+    def _alert(self, subject: str, message: str) -> None:
+        if self.alerts is not None:
+            self.alerts.alert(subject, message)
+
+    def _recover_positions(self) -> Dict[str, Dict]:
+        """Reload open positions from the journal after catching up on missed order updates"""
+        changed = self.order_manager.sync_orders()
+        positions = self.order_manager.journal.open_positions()
+        if positions or changed:
+            logger.info(f"Recovered {len(positions)} open positions from the order journal "
+                        f"({changed} orders updated while offline)")
+        return positions
+
+    def restore_positions(self, positions: Dict[str, Dict]) -> None:
+        """Take over open positions (recovered from the journal or a recorded session)"""
+        for order_id, position in positions.items():
+            self.active_positions[order_id] = position
+            self._index_position(order_id, position)
+            self.risk_manager.record_fill(
+                position.get('symbol', self.config['trading_pair']), position.get('side', 'buy'),
+                position['amount'], position['entry_price']
+            )
+
+    def _init_signal_engine(self) -> Optional[StreamingSignalEngine]:
+        """Use incremental indicators when every part of the strategy supports them"""
+        params = self.config['strategy'].get('params', {})
+        try:
+            self.strategy.stream(params)
+        except NotImplementedError:
+            logger.info(f"{self.strategy.name} has no streaming path, recomputing indicators each cycle")
+            return None
+        return StreamingSignalEngine(self.strategy, params)
+
     def execute_strategy(self) -> None:
         """Full trade execution workflow with risk checks"""
+        self._record('entry', name='execute_strategy')
+        with STAGE_SECONDS.labels('execute_strategy').time():
+            self._execute_strategy()
+
+    def _execute_strategy(self) -> None:
         try:
             # 1. Fetch market data
-            data = self.data_fetcher.fetch_data(
-                symbol=self.config['trading_pair'],
-                timeframe=self.config['scheduler']['interval'],
-                limit=100
-            )
+            with STAGE_SECONDS.labels('fetch_data').time():
+                data = self.data_fetcher.fetch_data(
+                    symbol=self.config['trading_pair'],
+                    timeframe=self.config['scheduler']['interval'],
+                    limit=100
+                )
             
             if data.empty:
                 logger.warning("No data received, skipping cycle")
                 return
+            self.risk_manager.on_bar({self.config['trading_pair']: data['close'].iloc[-1]})
 
-            # 2. Generate trading signal
-            signal = self.strategy.generate_signal(
-                data=data,
-                params=self.config['strategy']['params']
-            )
+            # 2. Generate trading signal (incrementally, on newly closed bars only)
+            with STAGE_SECONDS.labels('signal').time():
+                if self.signal_engine is not None:
+                    signal = self.signal_engine.on_bars(self.config['trading_pair'], data)
+                else:
+                    signal = self.strategy.generate_signal(
+                        data=data,
+                        params=self.config['strategy']['params']
+                    )
             
             if not signal:
                 logger.debug("No signal generated")
                 return
 
-            # 3. Calculate risk parameters
-            current_price = data['close'].iloc[-1]
-            stop_loss, take_profit = self.risk_manager.generate_risk_orders(current_price)
-            
+            self._execute_signal(signal, data['close'].iloc[-1])
+
+        except Exception as e:
+            logger.error(f"Strategy execution failed: {e}")
+            self._alert("Strategy execution failed", str(e))
+            self.risk_manager.update_risk_state(pnl=0.0, success=False)
+
+    def _execute_signal(self, signal: str, current_price: float) -> Optional[Dict]:
+        """Size, validate and place the order for a signal, timing signal-to-order latency"""
+        signal_time = time.perf_counter()
+
+        # 3. Calculate risk parameters
+        with STAGE_SECONDS.labels('balance').time():
+            balance = self.exchange.get_balance(self.config['quote_currency'])
+
+        with STAGE_SECONDS.labels('risk_checks').time():
+            stop_loss, take_profit = self.risk_manager.generate_risk_orders(current_price, signal)
+
             position_size = self.risk_manager.calculate_position_size(
-                balance=self.exchange.get_balance(self.config['quote_currency']),
+                balance=balance,
                 entry_price=current_price,
                 stop_loss_price=stop_loss
             )
-            
+
             # 4. Validate trade against risk rules
-            if not self.risk_manager.validate_order(
+            allowed = self.risk_manager.validate_order(
                 symbol=self.config['trading_pair'],
                 side=signal,
                 amount=position_size,
                 price=current_price
-            ):
-                logger.warning("Order blocked by risk manager")
-                return
+            )
+        self._record('decision', signal=signal, price=current_price, balance=balance, amount=position_size,
+                     stop_loss=stop_loss, take_profit=take_profit, allowed=allowed)
+        if not allowed:
+            logger.warning("Order blocked by risk manager")
+            return None
 
-            # 5. Execute trade
-            order = self.exchange.place_order(
+        # 5. Execute trade
+        with STAGE_SECONDS.labels('place_order').time():
+            order = self.order_manager.place_order(
                 symbol=self.config['trading_pair'],
                 side=signal,
                 amount=position_size,
                 order_type='limit',
-                price=current_price,
-                stop_loss=stop_loss,
-                take_profit=take_profit
+                price=current_price
             )
-            
-            if order:
-                # 6. Update risk state
-                self.risk_manager.update_risk_state(
-                    pnl=0.0,  # Will update when position closes
-                    success=True
-                )
-                self.active_positions[order['id']] = {
-                    'entry_price': current_price,
-                    'stop_loss': stop_loss,
-                    'take_profit': take_profit
-                }
-                logger.info(f"Order executed: {order['id']}")
+        
+        if order:
+            latency = time.perf_counter() - signal_time
+            latency_ms = latency * 1000
+            self.order_latencies.append(latency_ms)
+            STAGE_SECONDS.labels('signal_to_order').observe(latency)
 
-        except Exception as e:
-            logger.error(f"Strategy execution failed: {e}")
-            self.risk_manager.update_risk_state(pnl=0.0, success=False)
+            # 6. Update risk state
+            self.risk_manager.update_risk_state(
+                pnl=0.0,  # Will update when position closes
+                success=True
+            )
+            # The entry is a limit at the current price, so placement is booked as the fill;
+            # a cancel before it fills reverses it (_close_all_positions)
+            self.risk_manager.record_fill(self.config['trading_pair'], signal, position_size, current_price)
+            self.active_positions[order['id']] = {
+                'symbol': self.config['trading_pair'],
+                'side': signal,
+                'amount': position_size,
+                'entry_price': current_price,
+                'stop_loss': stop_loss,
+                'take_profit': take_profit
+            }
+            self.order_manager.journal.open_position(order['id'], self.active_positions[order['id']])
+            self._index_position(order['id'], self.active_positions[order['id']])
+            logger.info(f"Order executed: {order['id']} (signal-to-order {latency_ms:.1f} ms)")
+        return order
+
+    def latency_stats(self) -> Dict[str, float]:
+        """p50/p99/max signal-to-order latency in ms over recent orders"""
+        if not self.order_latencies:
+            return {}
+        samples = sorted(self.order_latencies)
+        return {
+            'count': len(samples),
+            'p50_ms': samples[len(samples) // 2],
+            'p99_ms': samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+            'max_ms': samples[-1],
+        }
 
     def run(self) -> None:
         """Main trading loop with graceful shutdown handling"""
-        logger.info("Starting trading bot")
-        interval = self.config['scheduler'].get('interval', 60)
+        mode = self.config['scheduler'].get('mode', 'poll')
+        logger.info(f"Starting trading bot ({mode} mode)")
         
         try:
-            while True:
-                start_time = time.time()
-                
-                self.execute_strategy()
-                self._monitor_positions()
-                
-                # Precise sleep timing
-                elapsed = time.time() - start_time
-                sleep_time = max(interval - elapsed, 1)
-                time.sleep(sleep_time)
+            if mode == 'event':
+                self._run_event_driven()
+            else:
+                self._run_polling()
                 
         except KeyboardInterrupt:
             logger.info("Shutting down gracefully...")
             self._close_all_positions()
         finally:
+            if self.data_fetcher.feed is not None:
+                self.data_fetcher.feed.stop()
+            if self.order_latencies:
+                logger.info(f"Signal-to-order latency: {self.latency_stats()}")
+            self.order_manager.journal.close()
+            if self.metrics_server is not None:
+                self.metrics_server.stop()
+            if self.alerts is not None:
+                self.alerts.close()
+            if self.recorder is not None:
+                self.recorder.close()
             logger.info("Trading bot stopped")
 
-    def _monitor_positions(self) -> None:
-        """Check open positions and manage risk"""
-        for order_id, position in list(self.active_positions.items()):
+    def _run_polling(self) -> None:
+        """Evaluate every interval, regardless of candle boundaries"""
+        interval = timeframe_to_seconds(self.config['scheduler'].get('interval', 60))
+        while True:
+            start_time = time.time()
+            
+            self.execute_strategy()
+            self._monitor_positions()
+            
+            # Precise sleep timing
+            elapsed = time.time() - start_time
+            sleep_time = max(interval - elapsed, 1)
+            time.sleep(sleep_time)
+
+    def _run_event_driven(self) -> None:
+        """Evaluate on candle close; check stops on every price update"""
+        # Warm the indicators from history so the first closed candle already has a signal
+        self.execute_strategy()
+        if self.data_fetcher.feed is not None:
+            self._run_on_stream(self.data_fetcher.feed)
+        else:
+            self._run_on_timer()
+
+    def _run_on_stream(self, feed: LiveBarFeed) -> None:
+        """Consume closed candles and trade prices pushed by the live feed"""
+        events = queue.Queue()
+        feed.on_bar = lambda symbol, bar: events.put(('bar', symbol, bar))
+        feed.on_price = lambda symbol, price: events.put(('price', symbol, price))
+
+        while True:
+            batch = [events.get()]
+            while True:
+                try:
+                    batch.append(events.get_nowait())
+                except queue.Empty:
+                    break
+
+            # A burst of trades collapses to the latest price per symbol
+            prices = {}
+            for kind, symbol, value in batch:
+                if kind == 'price':
+                    prices[symbol] = value
+                    continue
+                if prices:
+                    self._monitor_positions(prices)
+                    prices = {}
+                self._on_candle_close(symbol, value)
+            if prices:
+                self._monitor_positions(prices)
+
+    def _on_candle_close(self, symbol: str, bar: Bar) -> None:
+        """Evaluate the strategy on a just-closed candle"""
+        self._record('entry', name='candle_close', symbol=symbol, bar=list(bar))
+        period_ms = timeframe_to_seconds(self.config['scheduler']['interval']) * 1000
+        delay_ms = time.time() * 1000 - (bar.timestamp + period_ms)
+        logger.debug(f"{symbol} candle {bar.timestamp} closed, evaluated {delay_ms:.0f} ms after boundary")
+        try:
+            self.risk_manager.on_bar({symbol: bar.close})
+            if self.signal_engine is not None:
+                signal = self.signal_engine.on_bar(symbol, bar)
+            else:
+                signal = self.strategy.generate_signal(
+                    data=self.data_fetcher.closed_frame(symbol),
+                    params=self.config['strategy']['params']
+                )
+            if signal:
+                self._execute_signal(signal, bar.close)
+        except Exception as e:
+            logger.error(f"Strategy execution failed: {e}")
+            self._alert("Strategy execution failed", str(e))
+            self.risk_manager.update_risk_state(pnl=0.0, success=False)
+
+    def _run_on_timer(self) -> None:
+        """Without a stream, wake at each candle boundary and poll prices in between"""
+        scheduler = self.config['scheduler']
+        period = timeframe_to_seconds(scheduler['interval'])
+        monitor_interval = scheduler.get('monitor_interval', 5)
+        # Exchanges publish the closed candle a moment after the boundary
+        close_delay = scheduler.get('close_delay', 1.0)
+
+        next_close = (time.time() // period + 1) * period
+        while True:
+            now = time.time()
+            if now >= next_close + close_delay:
+                self.execute_strategy()
+                while next_close + close_delay <= time.time():
+                    next_close += period
+                continue
+            time.sleep(min(monitor_interval, next_close + close_delay - now))
+            self._monitor_positions()
+
+    def _index_position(self, order_id: str, position: Dict) -> None:
+        """Register a position's exit levels with the trigger index"""
+        # A recovered position's trail restarts from its entry; the pre-restart high is not journaled
+        self.triggers.add(
+            position.get('symbol', self.config['trading_pair']),
+            order_id,
+            stop_loss=position['stop_loss'],
+            take_profit=position['take_profit'],
+            trailing_pct=self.risk_manager.trailing_stop_pct,
+            peak=position['entry_price'],
+            side=position.get('side', 'buy')
+        )
+
+    def _monitor_positions(self, prices: Optional[Dict[str, float]] = None) -> None:
+        """Close open positions whose stop loss, trailing stop or take profit was crossed
+
+        Args:
+            prices: Latest price per symbol from a stream; fetched when omitted
+        """
+        if not self.active_positions:
+            return
+        self._record('entry', name='monitor', prices=dict(prices) if prices is not None else None)
+        with STAGE_SECONDS.labels('monitor_positions').time():
+            self._check_exits(prices)
+
+    def _check_exits(self, prices: Optional[Dict[str, float]]) -> None:
+        if prices is None:
             try:
-                current_price = self.data_fetcher.get_last_price(
-                    self.config['trading_pair']
+                # One batched ticker request covers every symbol with open positions
+                prices = self.exchange.get_last_prices(
+                    set(self.triggers.symbols()) | {
+                        self.active_positions[order_id].get('symbol', self.config['trading_pair'])
+                        for order_id in self.pending_exits
+                    }
                 )
-                
-                # Check stop loss/take profit
-                if current_price <= position['stop_loss']:
-                    self.exchange.close_position(order_id, 'stop_loss')
-                elif current_price >= position['take_profit']:
-                    self.exchange.close_position(order_id, 'take_profit')
-                    
             except Exception as e:
                 logger.error(f"Position monitoring failed: {e}")
+                self._alert("Position monitoring failed", str(e))
+                return
+
+        # Only the positions whose levels the prices crossed come back
+        exits = list(self.pending_exits.items()) + self.triggers.on_prices(prices)
+        for order_id, reason in exits:
+            position = self.active_positions.get(order_id)
+            current_price = position and prices.get(position.get('symbol', self.config['trading_pair']))
+            if current_price is None:
+                continue
+            try:
+                self._close_position(order_id, current_price, reason)
+            except Exception as e:
+                logger.error(f"Position monitoring failed: {e}")
+                self._alert("Position monitoring failed", str(e))
+            if order_id in self.active_positions:
+                self.pending_exits[order_id] = reason  # Retry on the next price
+            else:
+                self.pending_exits.pop(order_id, None)
+
+    def _close_position(self, order_id: str, price: float, reason: str) -> None:
+        """Exit a position at market and book its PnL"""
+        position = self.active_positions[order_id]
+        exit_side = _exit_side(position)
+        order = self.order_manager.place_order(
+            symbol=position.get('symbol', self.config['trading_pair']),
+            side=exit_side,
+            amount=position['amount'],
+            order_type='market',
+            position_id=order_id
+        )
+        if not order:
+            return
+        del self.active_positions[order_id]
+        self.risk_manager.record_fill(
+            position.get('symbol', self.config['trading_pair']), exit_side, position['amount'], price
+        )
+        pnl = (price - position['entry_price']) / position['entry_price'] * 100
+        if exit_side == 'buy':
+            pnl = -pnl  # a short gains as the price falls
+        self.order_manager.journal.close_position(order_id, price, pnl, reason)
+        self.risk_manager.update_risk_state(pnl=pnl, success=pnl >= 0)
+        self.trade_history.append({'id': order_id, 'exit_price': price, 'pnl': pnl, 'reason': reason})
+        self._record('exit', order_id=order_id, reason=reason, price=price, pnl=pnl)
+        logger.info(f"Closed {order_id} on {reason} ({pnl:+.2f}%)")
+        self._alert(f"Closed {position.get('symbol', self.config['trading_pair'])} on {reason}",
+                    f"{order_id}: exit {price:.8g}, PnL {pnl:+.2f}%")
 
     def _close_all_positions(self) -> None:
         """Close all open positions on shutdown"""
+        self._record('entry', name='close_all')
         logger.info("Closing all open positions")
-        for order_id in list(self.active_positions.keys()):
-            try:
-                self.exchange.cancel_order(order_id)
-            except Exception as e:
-                logger.error(f"Failed to close position {order_id}: {e}")
+        for order_id, position in list(self.active_positions.items()):
+            # Unfilled entries are cancelled; filled positions stay journaled for the next start
+            if order_id not in self.order_manager.journal.orders:
+                continue
+            if self.order_manager.cancel_order(order_id, position.get('symbol')):
+                del self.active_positions[order_id]
+                self.risk_manager.record_fill(
+                    position.get('symbol', self.config['trading_pair']), _exit_side(position),
+                    position['amount'], position['entry_price']
+                )
+                self.triggers.remove(order_id)
+                self.pending_exits.pop(order_id, None)
+                self.order_manager.journal.close_position(order_id, position['entry_price'], 0.0, 'canceled')
 
 if __name__ == "__main__":
     from src.config import load_config
@@ -7,6 +7,7 @@ class ExchangeConfig(BaseModel):
     api_key: str
     api_secret: str
     enabled: bool = True
+    taker_fee: float = 0.001  # Used by OrderRouter to compare venues after fees
 
 class StrategyConfig(BaseModel):
     name: str
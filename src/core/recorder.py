@@ -0,0 +1,254 @@
+# src/core/recorder.py
+import json
+import queue
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from src.monitoring.logger import logger
+
+# Exchange calls whose results feed the bot's decisions (market data comes through the fetcher)
+RECORDED_CALLS = ("get_balance", "get_last_prices", "place_order", "cancel_order", "fetch_order")
+
+def json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return repr(value)  # recorded for reading, not replayed
+
+class SessionRecorder:
+    def __init__(self, directory: str = "data/sessions", max_bytes: int = 64 << 20,
+                 flush_interval: float = 0.2, batch_size: int = 1000, max_queue: int = 100000):
+        """
+        Append-only JSONL journal of everything a live session saw and decided.
+
+        record() only timestamps and enqueues the event; a background thread
+        serializes, writes and rotates, so the trading path pays for a queue
+        put. Frames are delta-encoded against the previous frame of the same
+        call, so a cycle that moved by one bar writes about one row. Files
+        rotate at max_bytes and are numbered; a session is replayed from all
+        of its parts in order (see read_session). If the writer falls
+        max_queue events behind, new events are dropped and counted in
+        dropped rather than blocking the trading path or growing without bound.
+
+        Args:
+            directory (str): Where session files are written.
+            max_bytes (int): Size at which a new part is started.
+            flush_interval (float): Longest an event waits before its batch is written, seconds.
+            batch_size (int): Most events per write.
+            max_queue (int): Events held for the writer before new ones are dropped.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.session = time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.dropped = 0
+
+        # Writer-only state
+        self._part = 0
+        self._file = None
+        self._size = 0
+        self._seq = 0
+        self._frames: Dict[Tuple[str, str, str], List[Tuple]] = {}
+
+        self._queue: queue.Queue = queue.Queue(max_queue)
+        self._writer = threading.Thread(target=self._write_loop, name="session-recorder", daemon=True)
+        self._writer.start()
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "SessionRecorder":
+        return cls(
+            directory=config.get("path", "data/sessions"),
+            max_bytes=int(config.get("max_mb", 64) * (1 << 20)),
+            max_queue=config.get("max_queue", 100000),
+        )
+
+    def record(self, kind: str, **data) -> None:
+        """
+        Queue one event. Values are serialized later on the writer thread,
+        so callers must not mutate them afterwards.
+        """
+        self._enqueue((time.time(), kind, data))
+
+    def record_frame(self, method: str, symbol: str, timeframe: str, frame: pd.DataFrame) -> None:
+        self._enqueue((time.time(), "frame", {"method": method, "symbol": symbol, "timeframe": timeframe,
+                                              "frame": frame}))
+
+    def _enqueue(self, event: Tuple[float, str, Dict]):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(f"Session recorder is behind, {self.dropped} events dropped; "
+                               f"session {self.session} will not replay exactly")
+
+    @property
+    def files(self) -> List[Path]:
+        """This session's parts, oldest first."""
+        return sorted(self.directory.glob(f"session-{self.session}-*.jsonl"))
+
+    # -- background writer -----------------------------------------------
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            stop = any(event is None for event in batch)
+            try:
+                self._write([event for event in batch if event is not None])
+            except Exception as e:  # a dead writer would stop recording and hang flush()
+                logger.error(f"Session recorder write failed ({len(batch)} events): {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                if self._file is not None:
+                    self._file.close()
+                return
+
+    def _write(self, events: List[Tuple[float, str, Dict]]):
+        lines = []
+        for timestamp, kind, data in events:
+            if kind == "frame":
+                data = self._encode_frame(data)
+            lines.append(json.dumps(dict(data, seq=self._seq, time=timestamp, kind=kind),
+                                    default=json_default, separators=(",", ":")))
+            self._seq += 1
+        if not lines:
+            return
+        if self._file is None or self._size >= self.max_bytes:
+            self._rotate()
+        text = "\n".join(lines) + "\n"
+        self._file.write(text)
+        self._file.flush()
+        self._size += len(text)
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+        path = self.directory / f"session-{self.session}-{self._part:04d}.jsonl"
+        self._part += 1
+        self._file = open(path, "w")
+        self._size = 0
+
+    def _encode_frame(self, data: Dict) -> Dict:
+        """Replace the frame by the rows that differ from the previous one for this call."""
+        frame = data.pop("frame")
+        key = (data["method"], data["symbol"], data["timeframe"])
+        rows = list(frame.itertuples(index=False, name=None))
+        previous = self._frames.get(key, [])
+        start = same = 0
+        if rows and previous:
+            start = bisect_left([row[0] for row in previous], rows[0][0])
+            while same < len(rows) and start + same < len(previous) and previous[start + same] == rows[same]:
+                same += 1
+        self._frames[key] = rows
+        return dict(data, columns=list(frame.columns), start=start, same=same,
+                    rows=[list(row) for row in rows[same:]])
+
+    # -- lifecycle -------------------------------------------------------
+
+    def flush(self):
+        """Block until every queued event is written."""
+        self._queue.join()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+def session_files(directory: str, session: Optional[str] = None) -> List[Path]:
+    """Parts of a recorded session (the latest in directory by default), oldest first."""
+    files = sorted(Path(directory).glob("session-*.jsonl"))
+    if session is None and files:
+        session = files[-1].name[len("session-"):-len("-0000.jsonl")]
+    return [path for path in files if path.name.startswith(f"session-{session}-")]
+
+def read_session(files: Sequence) -> Iterator[Dict]:
+    """
+    Events of a recorded session in order, with frame events decoded back
+    into event['frame'] DataFrames.
+    """
+    frames: Dict[Tuple[str, str, str], List[List]] = {}
+    for path in files:
+        with open(path) as f:
+            for line in f:
+                event = json.loads(line)
+                if event["kind"] == "frame":
+                    key = (event["method"], event["symbol"], event["timeframe"])
+                    start, same = event.pop("start"), event.pop("same")
+                    rows = frames.get(key, [])[start:start + same] + event.pop("rows")
+                    frames[key] = rows
+                    frame = pd.DataFrame(rows, columns=event["columns"])
+                    frame.attrs.update(symbol=event["symbol"], timeframe=event["timeframe"])
+                    event["frame"] = frame
+                yield event
+
+class RecordingExchange:
+    def __init__(self, exchange, recorder: SessionRecorder):
+        """Exchange wrapper journaling the result (or error) of each RECORDED_CALLS call."""
+        self._exchange = exchange
+        self._recorder = recorder
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._exchange, name)
+        if name not in RECORDED_CALLS:
+            return attr
+
+        def call(*args, **kwargs):
+            try:
+                result = attr(*args, **kwargs)
+            except Exception as e:
+                self._recorder.record("call", method=name, error=[type(e).__name__, str(e)])
+                raise
+            self._recorder.record("call", method=name, result=result)
+            return result
+
+        setattr(self, name, call)  # later lookups skip __getattr__
+        return call
+
+class RecordingFetcher:
+    def __init__(self, fetcher, recorder: SessionRecorder):
+        """DataFetcher wrapper journaling each frame it hands to the strategy."""
+        self._fetcher = fetcher
+        self._recorder = recorder
+
+    def __getattr__(self, name: str):
+        return getattr(self._fetcher, name)
+
+    @property
+    def feed(self):
+        return self._fetcher.feed
+
+    @feed.setter
+    def feed(self, feed):
+        self._fetcher.feed = feed
+
+    def fetch_data(self, symbol: str, timeframe: str = '1m', limit: int = 100) -> pd.DataFrame:
+        frame = self._fetcher.fetch_data(symbol, timeframe, limit)
+        self._recorder.record_frame("fetch_data", symbol, timeframe, frame)
+        return frame
+
+    def fetch_frames(self, symbol: str, timeframes: Sequence[str], limit: int = 100) -> Dict[str, pd.DataFrame]:
+        return {timeframe: self.fetch_data(symbol, timeframe, limit) for timeframe in timeframes}
+
+    def closed_frame(self, symbol: str) -> pd.DataFrame:
+        frame = self._fetcher.closed_frame(symbol)
+        self._recorder.record_frame("closed_frame", symbol, self._fetcher.feed.timeframe, frame)
+        return frame
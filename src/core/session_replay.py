@@ -0,0 +1,191 @@
+# src/core/session_replay.py
+import builtins
+import json
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence
+import pandas as pd
+from src.core.bot import CryptoBot
+from src.core.recorder import RECORDED_CALLS, json_default, read_session
+from src.core.utils import lazy_import
+from src.monitoring.logger import logger
+from src.strategies.streaming_indicators import Bar
+
+ccxt = lazy_import("ccxt")
+
+# Events the bot records about what it decided; compared between recording and replay
+DECISIONS = ("decision", "exit")
+
+class ReplayDivergence(Exception):
+    """The replayed bot asked for an input the recording does not have."""
+
+def _error(name: str, message: str) -> Exception:
+    """Rebuild a recorded exception, as its ccxt or builtin class where that exists."""
+    cls = getattr(ccxt, name, None) or getattr(builtins, name, None)
+    if not (isinstance(cls, type) and issubclass(cls, Exception)):
+        cls = RuntimeError
+    return cls(message)
+
+class _Inputs:
+    """Recorded results of one step, served to the replayed bot in call order."""
+
+    def __init__(self):
+        self.queues: Dict[str, Deque[Dict]] = {}
+        self.unrecorded: List[str] = []
+
+    def load(self, events: List[Dict]):
+        self.queues = {}
+        for event in events:
+            self.queues.setdefault(event["method"], deque()).append(event)
+
+    def next(self, method: str) -> Dict:
+        pending = self.queues.get(method)
+        if not pending:
+            self.unrecorded.append(method)
+            raise ReplayDivergence(f"No recorded {method} result left in this step")
+        return pending.popleft()
+
+    def unused(self) -> int:
+        return sum(len(pending) for pending in self.queues.values())
+
+class ReplayExchange:
+    def __init__(self, inputs: _Inputs):
+        """Exchange stand-in answering RECORDED_CALLS from the recording; nothing reaches the network."""
+        self._inputs = inputs
+
+    def __getattr__(self, name: str):
+        if name not in RECORDED_CALLS:
+            raise ReplayDivergence(f"{name} was not recorded")
+
+        def call(*args, **kwargs):
+            event = self._inputs.next(name)
+            if "error" in event:
+                raise _error(*event["error"])
+            return event["result"]
+
+        setattr(self, name, call)
+        return call
+
+class ReplayFetcher:
+    def __init__(self, inputs: _Inputs):
+        """DataFetcher stand-in serving the recorded frames."""
+        self._inputs = inputs
+        self.feed = None
+
+    def fetch_data(self, symbol: str, timeframe: str = '1m', limit: int = 100) -> pd.DataFrame:
+        return self._inputs.next("fetch_data")["frame"]
+
+    def fetch_frames(self, symbol: str, timeframes: Sequence[str], limit: int = 100) -> Dict[str, pd.DataFrame]:
+        return {timeframe: self.fetch_data(symbol, timeframe, limit) for timeframe in timeframes}
+
+    def closed_frame(self, symbol: str) -> pd.DataFrame:
+        return self._inputs.next("closed_frame")["frame"]
+
+class _DecisionLog:
+    """Recorder stand-in keeping the replayed bot's decisions, normalized as the journal stores them."""
+
+    def __init__(self):
+        self.events: List[Dict] = []
+
+    def record(self, kind: str, **data):
+        if kind in DECISIONS:
+            self.events.append(dict(json.loads(json.dumps(data, default=json_default)), kind=kind))
+
+    def close(self):
+        pass
+
+def _decision(event: Dict) -> Dict:
+    return {key: value for key, value in event.items() if key not in ("seq", "time")}
+
+class SessionReplay:
+    def __init__(self, files: Sequence, config: Optional[Dict] = None):
+        """
+        Re-run a recorded session through the same CryptoBot, strategy and
+        RiskManager code, offline.
+
+        The session is cut into steps at each recorded entry point (a cycle,
+        a closed candle, a position check). Before a step runs, its recorded
+        frames and exchange results are loaded; the replayed bot consumes
+        them in call order, and its decisions are compared with the recorded
+        ones. With an unchanged configuration and code, every step matches.
+
+        Args:
+            files (Sequence): Session parts, oldest first (see session_files).
+            config (Optional[Dict]): Replaces the recorded configuration, e.g. to
+                see how a changed parameter would have decided on the same inputs.
+        """
+        self.files = list(files)
+        self.config = config
+
+    def _bot(self, header: Dict, inputs: _Inputs) -> CryptoBot:
+        config = dict(self.config or header["config"], journal={'path': ':memory:'})
+        for section in ('stream', 'metrics', 'monitoring', 'recorder'):
+            config.pop(section, None)
+        bot = CryptoBot(config, exchange=ReplayExchange(inputs))
+        bot.data_fetcher = ReplayFetcher(inputs)
+        bot.recorder = _DecisionLog()
+        bot.restore_positions(header["positions"])
+        return bot
+
+    def _run_entry(self, bot: CryptoBot, entry: Dict):
+        name = entry["name"]
+        if name == "execute_strategy":
+            bot.execute_strategy()
+        elif name == "candle_close":
+            bot._on_candle_close(entry["symbol"], Bar(*entry["bar"]))
+        elif name == "monitor":
+            bot._monitor_positions(entry["prices"])
+        elif name == "close_all":
+            bot._close_all_positions()
+        else:
+            raise ValueError(f"Unknown recorded entry: {name}")
+
+    def steps(self) -> List[Dict]:
+        """The session header, then one {'entry', 'inputs', 'decisions'} per recorded entry point."""
+        steps: List[Dict] = []
+        header = None
+        for event in read_session(self.files):
+            kind = event["kind"]
+            if kind == "session":
+                header = event
+            elif header is None:
+                continue  # startup calls made before the header (journal recovery)
+            elif kind == "entry":
+                steps.append({"entry": event, "inputs": [], "decisions": []})
+            elif steps and kind in ("call", "frame"):
+                steps[-1]["inputs"].append(event)
+            elif steps and kind in DECISIONS:
+                steps[-1]["decisions"].append(_decision(event))
+        if header is None:
+            raise ValueError("No session header in the recording")
+        return [header] + steps
+
+    def run(self) -> Dict:
+        """
+        Replay every step.
+
+        Returns:
+            Dict: steps and decisions replayed, mismatches (per step: entry seq,
+                recorded and replayed decisions), unrecorded (inputs the replay
+                asked for that were not recorded) and unused recorded inputs.
+        """
+        header, *steps = self.steps()
+        inputs = _Inputs()
+        bot = self._bot(header, inputs)
+        mismatches, unused, decisions = [], 0, 0
+        try:
+            for step in steps:
+                inputs.load(step["inputs"])
+                bot.recorder.events = []
+                self._run_entry(bot, step["entry"])
+                replayed = bot.recorder.events
+                decisions += len(replayed)
+                if replayed != step["decisions"]:
+                    mismatches.append({"seq": step["entry"]["seq"], "entry": step["entry"]["name"],
+                                       "recorded": step["decisions"], "replayed": replayed})
+                unused += inputs.unused()
+        finally:
+            bot.order_manager.journal.close()
+        if mismatches:
+            logger.warning(f"Replay diverged from the recording at {len(mismatches)} of {len(steps)} steps")
+        return {"steps": len(steps), "decisions": decisions, "mismatches": mismatches,
+                "unrecorded": len(inputs.unrecorded), "unused": unused}
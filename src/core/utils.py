@@ -1,9 +1,51 @@
 # src/core/utils.py
+import importlib.util
+import sys
+from types import ModuleType
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
+_TIMEFRAME_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Import a module on first attribute access instead of now.
+
+    Module-level `ccxt = lazy_import("ccxt")` keeps the name usable in
+    except clauses and calls, while processes that never touch it (backtests,
+    replays, the CLI's offline commands) skip loading every exchange class.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+ccxt = lazy_import("ccxt")
+
 def retry_on_failure(func):
     return retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
         retry=retry_if_exception_type((ccxt.NetworkError, ccxt.ExchangeError)),
-    )(func)
\ No newline at end of file
+    )(func)
+
+def timeframe_to_seconds(timeframe) -> int:
+    """
+    Convert a ccxt timeframe ('1m', '5m', '4h', '1d') to seconds.
+
+    Plain numbers are taken as seconds already, matching scheduler configs
+    that give the interval as an integer.
+    """
+    if isinstance(timeframe, (int, float)):
+        return int(timeframe)
+    amount, unit = timeframe[:-1], timeframe[-1]
+    if unit not in _TIMEFRAME_UNITS or not amount.isdigit():
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return int(amount) * _TIMEFRAME_UNITS[unit]
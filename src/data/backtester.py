@@ -1,4 +1,5 @@
 # src/data/backtester.py
+import numpy as np
 import pandas as pd
 from typing import Dict
 from src.strategies.base_strategy import BaseStrategy
@@ -20,17 +21,29 @@ class Backtester:
         self.position = 0.0
         self.trades = []
 
-    def run(self, data: pd.DataFrame, params: Dict) -> Dict:
+    def run(self, data: pd.DataFrame, params: Dict, vectorized: bool = True) -> Dict:
         """
         Run the backtest and return performance metrics.
 
         Args:
             data (pd.DataFrame): Historical OHLCV data.
             params (Dict): Strategy parameters.
+            vectorized (bool): Use the strategy's whole-series signal path when
+                it has one. Strategies that only implement generate_signal are
+                replayed bar by bar.
 
         Returns:
             Dict: Performance report.
         """
+        if vectorized:
+            try:
+                signals = self.strategy.generate_signals(data, params)
+            except NotImplementedError:
+                logger.debug(f"{self.strategy.name} has no vectorized path, replaying bar by bar")
+            else:
+                self._run_vectorized(data, signals)
+                return self.generate_report(data)
+
         for i in range(1, len(data)):
             current_data = data.iloc[:i]
             signal = self.strategy.generate_signal(current_data, params)
@@ -42,6 +55,34 @@ class Backtester:
 
         return self.generate_report(data)
 
+    def _run_vectorized(self, data: pd.DataFrame, signals: pd.Series):
+        """
+        Turn a whole-series signal into trades.
+
+        The per-bar loop evaluates the signal on data.iloc[:i] and fills at the
+        close of bar i - 1 for i in 1..n-1, so the last bar's signal is never
+        traded. The account is all-in or flat, which makes the held position
+        the last buy/sell signal carried forward.
+        """
+        closes = data["close"].to_numpy(dtype=float)[:-1]
+        signals = signals.to_numpy()[:-1]
+
+        target = np.full(len(closes), np.nan)
+        target[signals == "buy"] = 1.0
+        target[signals == "sell"] = 0.0
+
+        # Forward-fill the last explicit signal, starting from the current state
+        start = 1.0 if self.position > 0 else 0.0
+        last_set = np.where(np.isnan(target), -1, np.arange(len(target)))
+        np.maximum.accumulate(last_set, out=last_set)
+        held = np.where(last_set >= 0, target[np.maximum(last_set, 0)], start)
+        if start == 0.0 and self.balance <= 0:
+            return  # Nothing to buy with
+
+        changes = np.flatnonzero(np.diff(held, prepend=start))
+        for idx in changes:
+            self._execute_trade("buy" if held[idx] == 1.0 else "sell", closes[idx])
+
     def _execute_trade(self, side: str, price: float):
         """Simulate a trade execution."""
         if side == "buy":
@@ -0,0 +1,256 @@
+# src/data/columnar.py
+import math
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from src.core.utils import timeframe_to_seconds
+from src.monitoring.logger import logger
+
+MAGIC = b"OHLCVCOL"
+VERSION = 1
+PRICE_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+# 64-byte file header; columns follow as timestamp int64[capacity], then float64[capacity] each
+HEADER = np.dtype([
+    ("magic", "S8"),
+    ("version", "<i8"),
+    ("capacity", "<i8"),
+    ("length", "<i8"),
+    ("timeframe_ms", "<i8"),
+    ("month_start", "<i8"),
+    ("reserved", "<i8", (2,)),
+])
+
+def _month_bounds(timestamp_ms: int) -> Tuple[int, int]:
+    """[start, end) of the UTC calendar month containing timestamp_ms, in ms."""
+    dt = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
+    start = datetime(dt.year, dt.month, 1, tzinfo=timezone.utc)
+    end = datetime(dt.year + dt.month // 12, dt.month % 12 + 1, 1, tzinfo=timezone.utc)
+    return int(start.timestamp() * 1000), int(end.timestamp() * 1000)
+
+class Partition:
+    def __init__(self, path: Path, writable: bool = False):
+        """
+        One symbol/timeframe/month file mapped into memory.
+
+        timestamp, column() and columns() return zero-copy views of the first
+        `length` rows.
+        """
+        self.path = path
+        mode = "r+" if writable else "r"
+        self.header = np.memmap(path, dtype=HEADER, mode=mode, shape=(1,))
+        if self.header["magic"][0] != MAGIC:
+            raise ValueError(f"Not a columnar OHLCV file: {path}")
+        capacity = int(self.header["capacity"][0])
+        self._timestamps = np.memmap(path, dtype="<i8", mode=mode, offset=HEADER.itemsize, shape=(capacity,))
+        self._prices = np.memmap(
+            path, dtype="<f8", mode=mode, offset=HEADER.itemsize + capacity * 8,
+            shape=(len(PRICE_COLUMNS), capacity),
+        )
+
+    @property
+    def capacity(self) -> int:
+        return int(self.header["capacity"][0])
+
+    @property
+    def length(self) -> int:
+        return int(self.header["length"][0])
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        return self._timestamps[:self.length]
+
+    def column(self, name: str) -> np.ndarray:
+        if name == "timestamp":
+            return self.timestamp
+        return self._prices[PRICE_COLUMNS.index(name), :self.length]
+
+    def columns(self, lo: int = 0, hi: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Zero-copy views of rows [lo, hi)."""
+        hi = self.length if hi is None else hi
+        columns = {"timestamp": self._timestamps[lo:hi]}
+        columns.update(zip(PRICE_COLUMNS, self._prices[:, lo:hi]))
+        return columns
+
+    def append(self, timestamps: np.ndarray, prices: np.ndarray):
+        """Write rows after the current end, then publish them by bumping length."""
+        start, count = self.length, len(timestamps)
+        self._timestamps[start:start + count] = timestamps
+        self._prices[:, start:start + count] = prices
+        self._timestamps.flush()
+        self._prices.flush()
+        # Length is written last, so a crash mid-append never exposes partial rows
+        self.header["length"][0] = start + count
+        self.header.flush()
+
+    @staticmethod
+    def create(path: Path, capacity: int, timeframe_ms: int, month_start: int):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        header = np.zeros(1, dtype=HEADER)
+        header["magic"] = MAGIC
+        header["version"] = VERSION
+        header["capacity"] = capacity
+        header["timeframe_ms"] = timeframe_ms
+        header["month_start"] = month_start
+        with open(path, "wb") as f:
+            f.write(header.tobytes())
+            f.truncate(HEADER.itemsize + capacity * 8 * (1 + len(PRICE_COLUMNS)))
+
+class ColumnarStore:
+    def __init__(self, root: str = "data/columnar"):
+        """
+        Partitioned, memory-mapped OHLCV history.
+
+        Layout: {root}/{symbol}/{timeframe}/{YYYY-MM}.ohlcv, one file per month
+        holding contiguous int64 timestamps and float64 OHLCV columns. Each file
+        is preallocated for every bar the month can hold, so appends write in
+        place without rewriting earlier data.
+
+        Args:
+            root (str): Directory holding the partitions.
+        """
+        self.root = Path(root)
+
+    def _series_dir(self, symbol: str, timeframe: str) -> Path:
+        return self.root / symbol.replace("/", "-") / timeframe
+
+    def partitions(self, symbol: str, timeframe: str) -> List[Path]:
+        """Partition files for a series, oldest first."""
+        series_dir = self._series_dir(symbol, timeframe)
+        if not series_dir.is_dir():
+            return []
+        return sorted(series_dir.glob("*.ohlcv"))
+
+    def _partition_path(self, symbol: str, timeframe: str, month_start: int) -> Path:
+        month = datetime.fromtimestamp(month_start / 1000, tz=timezone.utc).strftime("%Y-%m")
+        return self._series_dir(symbol, timeframe) / f"{month}.ohlcv"
+
+    def append(self, symbol: str, timeframe: str, data: pd.DataFrame) -> int:
+        """
+        Append bars newer than the stored history.
+
+        Rows at or before the last stored timestamp are skipped, so re-appending
+        an overlapping fetch is idempotent.
+
+        Returns:
+            int: Number of bars written.
+        """
+        if data.empty:
+            return 0
+        timeframe_ms = timeframe_to_seconds(timeframe) * 1000
+        timestamps = data["timestamp"].to_numpy(dtype=np.int64)
+        prices = data[PRICE_COLUMNS].to_numpy(dtype=np.float64).T
+
+        order = np.argsort(timestamps, kind="stable")
+        timestamps, prices = timestamps[order], prices[:, order]
+        last = self.last_timestamp(symbol, timeframe)
+        if last is not None:
+            keep = timestamps > last
+            timestamps, prices = timestamps[keep], prices[:, keep]
+        if len(timestamps):
+            keep = np.concatenate(([True], np.diff(timestamps) > 0))  # drop duplicates
+            timestamps, prices = timestamps[keep], prices[:, keep]
+
+        written, i = 0, 0
+        while i < len(timestamps):
+            month_start, month_end = _month_bounds(int(timestamps[i]))
+            j = int(np.searchsorted(timestamps, month_end, side="left"))
+            path = self._partition_path(symbol, timeframe, month_start)
+            if not path.exists():
+                capacity = max(1, math.ceil((month_end - month_start) / timeframe_ms))
+                Partition.create(path, capacity, timeframe_ms, month_start)
+            partition = Partition(path, writable=True)
+            if partition.length + (j - i) > partition.capacity:
+                partition = self._grow(path, partition, partition.length + (j - i))
+            partition.append(timestamps[i:j], prices[:, i:j])
+            written += j - i
+            i = j
+
+        logger.debug(f"Appended {written} {timeframe} bars for {symbol} to columnar store")
+        return written
+
+    def _grow(self, path: Path, partition: Partition, needed: int) -> Partition:
+        """Rewrite a partition with more room (only for irregular, off-grid timestamps)."""
+        header = partition.header[0]
+        existing = partition.columns()
+        tmp = path.with_suffix(".tmp")
+        Partition.create(tmp, max(needed, partition.capacity * 2), int(header["timeframe_ms"]), int(header["month_start"]))
+        grown = Partition(tmp, writable=True)
+        grown.append(existing["timestamp"], np.array([existing[c] for c in PRICE_COLUMNS]))
+        del partition, existing, grown
+        os.replace(tmp, path)
+        return Partition(path, writable=True)
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        for path in reversed(self.partitions(symbol, timeframe)):
+            partition = Partition(path)
+            if partition.length:
+                return int(partition.timestamp[-1])
+        return None
+
+    def iter_partitions(self, symbol: str, timeframe: str, start: Optional[int] = None,
+                        end: Optional[int] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """Yield zero-copy column views of each partition clipped to [start, end)."""
+        for path in self.partitions(symbol, timeframe):
+            partition = Partition(path)
+            timestamps = partition.timestamp
+            if not len(timestamps):
+                continue
+            if (end is not None and timestamps[0] >= end) or (start is not None and timestamps[-1] < start):
+                continue
+            lo = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+            hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side="left"))
+            if hi > lo:
+                yield partition.columns(lo, hi)
+
+    def load(self, symbol: str, timeframe: str, start: Optional[int] = None,
+             end: Optional[int] = None) -> pd.DataFrame:
+        """
+        Load bars in [start, end) as a DataFrame.
+
+        A range inside one month is backed directly by the memory map (no
+        copy); longer ranges concatenate the numeric columns once.
+        """
+        chunks = list(self.iter_partitions(symbol, timeframe, start, end))
+        if not chunks:
+            columns = {"timestamp": np.empty(0, dtype=np.int64)}
+            columns.update((c, np.empty(0)) for c in PRICE_COLUMNS)
+        elif len(chunks) == 1:
+            columns = chunks[0]
+        else:
+            columns = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+        df = pd.DataFrame(columns, copy=False)
+        df.attrs.update(symbol=symbol, timeframe=timeframe)
+        return df
+
+    def import_csv(self, path: str, symbol: str, timeframe: str, chunksize: int = 1_000_000) -> int:
+        """Convert a CSV with OHLCV columns, streaming it in chunks."""
+        written = 0
+        for chunk in pd.read_csv(path, usecols=["timestamp"] + PRICE_COLUMNS, chunksize=chunksize):
+            written += self.append(symbol, timeframe, chunk)
+        return written
+
+    def import_sqlite(self, db, symbol: Optional[str] = None, timeframe: Optional[str] = None) -> int:
+        """
+        Convert series from a DatabaseClient's ohlcv table, one month at a time.
+
+        Args:
+            db (DatabaseClient): Source store.
+            symbol (Optional[str]): Only this symbol (default: all).
+            timeframe (Optional[str]): Only this timeframe (default: all).
+        """
+        written = 0
+        for series_symbol, series_timeframe in db.list_series():
+            if (symbol and series_symbol != symbol) or (timeframe and series_timeframe != timeframe):
+                continue
+            since = self.last_timestamp(series_symbol, series_timeframe)
+            cursor = db.first_timestamp(series_symbol, series_timeframe, None if since is None else since + 1)
+            while cursor is not None:
+                _, month_end = _month_bounds(cursor)
+                written += self.append(series_symbol, series_timeframe,
+                                       db.load_range(series_symbol, series_timeframe, cursor, month_end))
+                cursor = db.first_timestamp(series_symbol, series_timeframe, month_end)
+        return written
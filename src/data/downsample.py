@@ -0,0 +1,101 @@
+# src/data/downsample.py
+import numpy as np
+
+def minmax_indices(y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Indices keeping each bucket's minimum and maximum, in order.
+
+    Splits y into points // 2 equal buckets. Spikes survive at any zoom
+    level, which makes this the right choice for price charts; it is fully
+    vectorized, so millions of points take milliseconds.
+
+    Args:
+        y (np.ndarray): Values to downsample.
+        points (int): Point budget (at least 2).
+
+    Returns:
+        np.ndarray: Sorted unique indices into y, at most points + 2 long
+            (the first and last points are always kept).
+    """
+    n = len(y)
+    if n <= points:
+        return np.arange(n)
+    buckets = max(points // 2, 1)
+    size = -(-n // buckets)
+    rows = -(-n // size)
+    padded = np.full(rows * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(rows, size)
+    offsets = np.arange(rows) * size
+    # nanargmin/nanargmax: the last row's padding never wins
+    lows = offsets + np.nanargmin(padded, axis=1)
+    highs = offsets + np.nanargmax(padded, axis=1)
+    return np.unique(np.concatenate(([0], lows, highs, [n - 1])))
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the point of each bucket that forms the largest triangle with the
+    previously kept point and the next bucket's average, preserving the
+    curve's visual shape with one point per bucket. Suited to smooth series
+    like equity curves.
+
+    Args:
+        x (np.ndarray): Ascending x values (e.g. timestamps).
+        y (np.ndarray): Values.
+        points (int): Number of points to keep (at least 3).
+
+    Returns:
+        np.ndarray: Sorted indices into x/y.
+    """
+    n = len(y)
+    if n <= points or points < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # Bucket edges over the interior points; first and last are always kept
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    # Per-bucket averages from prefix sums, for the "next bucket" vertex
+    x_sums = np.concatenate(([0.0], np.cumsum(x)))
+    y_sums = np.concatenate(([0.0], np.cumsum(y)))
+    counts = np.maximum(edges[1:] - edges[:-1], 1)
+    x_avg = (x_sums[edges[1:]] - x_sums[edges[:-1]]) / counts
+    y_avg = (y_sums[edges[1:]] - y_sums[edges[:-1]]) / counts
+
+    selected = np.empty(points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+        if i + 1 < points - 2:
+            next_x, next_y = x_avg[i + 1], y_avg[i + 1]
+        else:
+            next_x, next_y = x[-1], y[-1]
+        ax, ay = x[a], y[a]
+        areas = np.abs((ax - next_x) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (next_y - ay))
+        a = lo + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+def downsample(x: np.ndarray, y: np.ndarray, points: int, method: str = "minmax"):
+    """
+    Reduce a series to about `points` points.
+
+    Args:
+        x (np.ndarray): Ascending x values.
+        y (np.ndarray): Values.
+        points (int): Point budget.
+        method (str): 'minmax' (keeps extremes) or 'lttb' (keeps shape).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Downsampled x and y.
+    """
+    if method == "minmax":
+        indices = minmax_indices(y, points)
+    elif method == "lttb":
+        indices = lttb_indices(x, y, points)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    return x[indices], y[indices]
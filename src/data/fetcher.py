@@ -1,15 +1,90 @@
 # Add this at the top of the file
+import time
+from typing import Dict, Sequence
 import pandas as pd
+from src.data.processor import period_start
+from src.monitoring.logger import logger
+from src.monitoring.metrics import STAGE_SECONDS
 
 class DataFetcher:
-    def __init__(self, exchange):
+    def __init__(self, exchange, feed=None):
+        """
+        Args:
+            exchange: Exchange wrapper used for REST OHLCV
+            feed (LiveBarFeed): Optional stream-built bars; REST then only seeds history
+        """
         self.exchange = exchange
+        self.feed = feed
 
-    def fetch_data(self, symbol: str) -> pd.DataFrame:
+    def fetch_data(self, symbol: str, timeframe: str = '1m', limit: int = 100) -> pd.DataFrame:
         """Fetch OHLCV data and return as DataFrame"""
+        feed = self.feed
+        if feed is not None and timeframe in feed.timeframes and symbol in feed.symbols:
+            if not feed.ready(symbol):
+                seed = self._fetch_seed(symbol, limit)
+                if seed.empty:
+                    return seed
+                feed.seed(symbol, seed)
+            if not feed.ready(symbol, timeframe):
+                # One call for the closed bars older than the stream; the stream keeps them current
+                history = self._fetch_rest(symbol, timeframe, limit)
+                if not history.empty:
+                    feed.prime(symbol, timeframe, history)
+            return feed.frame(symbol, timeframe=timeframe).tail(limit).reset_index(drop=True)
+        return self._fetch_rest(symbol, timeframe, limit)
+
+    def fetch_frames(self, symbol: str, timeframes: Sequence[str], limit: int = 100) -> Dict[str, pd.DataFrame]:
+        """Several timeframes at once; with a resampling feed this costs no exchange calls after warm-up"""
+        return {timeframe: self.fetch_data(symbol, timeframe, limit) for timeframe in timeframes}
+
+    def closed_frame(self, symbol: str) -> pd.DataFrame:
+        """The feed's closed bars at its own timeframe, as evaluated on candle close"""
+        return self.feed.frame(symbol, include_partial=False)
+
+    def _fetch_seed(self, symbol: str, limit: int) -> pd.DataFrame:
+        """Base bars to seed the feed with, reaching back to the start of every resampled forming bar"""
+        resampler = self.feed.resampler
+        if resampler is None:
+            return self._fetch_rest(symbol, self.feed.timeframe, limit)
+        now = int(time.time() * 1000)
+        base_ms = resampler.base_ms
+        since = min(
+            [period_start(now, period_ms) for period_ms in resampler.periods.values()]
+            + [period_start(now, base_ms) - (limit - 1) * base_ms]
+        )
+        return self._fetch_rest_since(symbol, self.feed.timeframe, since)
+
+    def _fetch_rest_since(self, symbol: str, timeframe: str, since: int, page: int = 1000) -> pd.DataFrame:
+        rows = []
         try:
-            data = self.exchange.fetch_ohlcv(symbol, timeframe='1m', limit=100)
-            return pd.DataFrame(data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+            while True:
+                with STAGE_SECONDS.labels("fetch_ohlcv").time():
+                    data = self.exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=page, since=since)
+                if not data:
+                    break
+                rows.extend(data)
+                if len(data) < page:
+                    break
+                since = data[-1][0] + 1
         except Exception as e:
-            print(f"Data fetch error: {e}")
-            return pd.DataFrame()  # Return empty DF instead of None
\ No newline at end of file
+            logger.error(f"Data fetch error ({symbol} {timeframe} since {since}): {e}")
+            return pd.DataFrame()
+        return self.to_frame(rows, symbol, timeframe)
+
+    def _fetch_rest(self, symbol: str, timeframe: str, limit: int) -> pd.DataFrame:
+        try:
+            with STAGE_SECONDS.labels("fetch_ohlcv").time():
+                data = self.exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
+            with STAGE_SECONDS.labels("build_frame").time():
+                return self.to_frame(data, symbol, timeframe)
+        except Exception as e:
+            logger.error(f"Data fetch error ({symbol} {timeframe}): {e}")
+            return pd.DataFrame()  # Return empty DF instead of None
+
+    @staticmethod
+    def to_frame(data, symbol: str, timeframe: str) -> pd.DataFrame:
+        """Wrap raw ccxt OHLCV rows in a DataFrame"""
+        df = pd.DataFrame(data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        # Lets the shared indicator cache tell symbols apart
+        df.attrs.update(symbol=symbol, timeframe=timeframe)
+        return df
\ No newline at end of file
@@ -0,0 +1,374 @@
+# src/data/order_book.py
+import heapq
+import threading
+from bisect import bisect_left, insort
+from collections import deque
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from src.monitoring.logger import logger
+
+Level = Tuple[float, float]  # (price, size)
+
+class PriceLevels:
+    def __init__(self, descending: bool = False):
+        """
+        One side of a book: price -> size, kept in price order.
+
+        Sizes live in a dict and prices in an ascending list searched with
+        bisect, so a size change at an existing level is one dict write, a new
+        or emptied level a bisect plus a list insert or delete, and the best
+        level is read off an end of the list in O(1).
+
+        Args:
+            descending (bool): True for bids (best = highest price), False for asks.
+        """
+        self.descending = descending
+        self.prices: List[float] = []
+        self.sizes: Dict[float, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def __iter__(self) -> Iterator[Level]:
+        """Levels, best first."""
+        sizes = self.sizes
+        for price in (reversed(self.prices) if self.descending else self.prices):
+            yield price, sizes[price]
+
+    def set(self, price: float, size: float) -> None:
+        """Set the size at price; a size of 0 removes the level."""
+        if size > 0:
+            if price not in self.sizes:
+                insort(self.prices, price)
+            self.sizes[price] = size
+        elif self.sizes.pop(price, None) is not None:
+            del self.prices[bisect_left(self.prices, price)]
+
+    def update(self, levels: Iterable[Sequence[float]]) -> None:
+        """Apply [price, size, ...] changes (ccxt / exchange diff format)."""
+        for level in levels:
+            self.set(float(level[0]), float(level[1]))
+
+    def replace(self, levels: Iterable[Sequence[float]]) -> None:
+        """Replace every level (a snapshot)."""
+        self.sizes = {float(level[0]): float(level[1]) for level in levels if float(level[1]) > 0}
+        self.prices = sorted(self.sizes)
+
+    def best(self) -> Optional[Level]:
+        if not self.prices:
+            return None
+        price = self.prices[-1] if self.descending else self.prices[0]
+        return price, self.sizes[price]
+
+    def top(self, depth: Optional[int] = None) -> List[Level]:
+        """The best `depth` levels (all of them by default), best first."""
+        prices = self.prices
+        if depth is not None:
+            prices = prices[-depth:] if self.descending else prices[:depth]
+        if self.descending:
+            prices = prices[::-1]
+        return [(price, self.sizes[price]) for price in prices]
+
+    def volume(self, depth: int) -> float:
+        """Total size of the best `depth` levels."""
+        prices = self.prices[-depth:] if self.descending else self.prices[:depth]
+        return sum(map(self.sizes.__getitem__, prices))
+
+    def clear(self) -> None:
+        self.prices = []
+        self.sizes = {}
+
+def sweep(levels: Iterable[Level], amount: float) -> Tuple[float, float, Optional[float]]:
+    """
+    Take `amount` from levels, best first.
+
+    Returns:
+        Tuple[float, float, Optional[float]]: Amount filled (less than amount
+            when the levels run out), its cost and the worst price reached.
+    """
+    filled = cost = 0.0
+    worst = None
+    for price, size in levels:
+        if filled >= amount:
+            break
+        take = min(size, amount - filled)
+        filled += take
+        cost += take * price
+        worst = price
+    return filled, cost, worst
+
+class OrderBook:
+    def __init__(self, symbol: str):
+        """
+        Aggregated (L2) book of one symbol on one venue.
+
+        Args:
+            symbol (str): Trading pair.
+        """
+        self.symbol = symbol
+        self.bids = PriceLevels(descending=True)
+        self.asks = PriceLevels()
+        self.timestamp: Optional[int] = None
+        self.updates = 0
+
+    def apply_snapshot(self, bids: Iterable[Sequence[float]], asks: Iterable[Sequence[float]],
+                       timestamp: Optional[int] = None) -> None:
+        self.bids.replace(bids)
+        self.asks.replace(asks)
+        self.timestamp = timestamp
+        self.updates += 1
+
+    def apply_update(self, bids: Iterable[Sequence[float]], asks: Iterable[Sequence[float]],
+                     timestamp: Optional[int] = None) -> None:
+        """Apply changed levels; a size of 0 removes a level."""
+        self.bids.update(bids)
+        self.asks.update(asks)
+        if timestamp is not None:
+            self.timestamp = timestamp
+        self.updates += 1
+
+    def best_bid(self) -> Optional[Level]:
+        return self.bids.best()
+
+    def best_ask(self) -> Optional[Level]:
+        return self.asks.best()
+
+    def mid(self) -> Optional[float]:
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return (bid[0] + ask[0]) / 2
+
+    def spread(self) -> Optional[float]:
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return ask[0] - bid[0]
+
+    def side(self, side: str) -> PriceLevels:
+        """Levels an order of `side` ('buy' or 'sell') takes from."""
+        if side == "buy":
+            return self.asks
+        if side == "sell":
+            return self.bids
+        raise ValueError(f"Unknown order side: {side}")
+
+    def cost_to_fill(self, side: str, amount: float) -> Tuple[float, float]:
+        """(amount fillable, its cost) for a taker order of `side` walking this book."""
+        filled, cost, _ = sweep(self.side(side), amount)
+        return filled, cost
+
+    def vwap(self, side: str, amount: float) -> Optional[float]:
+        """Average price of a taker order of `side` for `amount`; None if the book cannot fill it."""
+        filled, cost, _ = sweep(self.side(side), amount)
+        if filled < amount * (1 - 1e-9):
+            return None
+        return cost / filled
+
+    def slippage_bps(self, side: str, amount: float) -> Optional[float]:
+        """How much worse than the mid a taker order of `side` for `amount` fills, in bps."""
+        mid, average = self.mid(), self.vwap(side, amount)
+        if mid is None or average is None:
+            return None
+        return (average - mid if side == "buy" else mid - average) / mid * 10_000
+
+    def imbalance(self, depth: int = 10) -> Optional[float]:
+        """(bid size - ask size) / (bid size + ask size) over the best `depth` levels a side, in [-1, 1]."""
+        bids, asks = self.bids.volume(depth), self.asks.volume(depth)
+        if not bids + asks:
+            return None
+        return (bids - asks) / (bids + asks)
+
+    def to_dict(self, depth: Optional[int] = None) -> Dict:
+        """ccxt-style order book."""
+        return {"symbol": self.symbol, "timestamp": self.timestamp,
+                "bids": [list(level) for level in self.bids.top(depth)],
+                "asks": [list(level) for level in self.asks.top(depth)]}
+
+class L2OrderBook(OrderBook):
+    def __init__(self, symbol: str, buffer: int = 10_000):
+        """
+        Order book kept live from an exchange's snapshot + diff stream.
+
+        Follows Binance's depth stream rules: each diff carries the first (U)
+        and last (u) update ids it covers. Diffs arriving before a snapshot
+        are buffered; once one arrives, those already in it (u <= the
+        snapshot's lastUpdateId) are dropped and the rest replayed. A diff
+        starting past the next expected id means updates were lost: the book
+        is cleared and needs_snapshot is set until on_snapshot resyncs it.
+
+        Args:
+            symbol (str): Trading pair.
+            buffer (int): Diffs held while waiting for a snapshot (older ones are
+                dropped, which the replay then detects as a gap).
+        """
+        super().__init__(symbol)
+        self.last_update_id: Optional[int] = None
+        self.gaps = 0
+        self.snapshots = 0
+        self._pending: Deque[Dict] = deque(maxlen=buffer)
+
+    @property
+    def needs_snapshot(self) -> bool:
+        return self.last_update_id is None
+
+    def on_snapshot(self, snapshot: Dict) -> None:
+        """
+        Reset from a REST snapshot (Binance's lastUpdateId, or ccxt's nonce)
+        and replay the diffs buffered since.
+        """
+        update_id = snapshot.get("lastUpdateId", snapshot.get("nonce"))
+        if update_id is None:
+            raise ValueError(f"Snapshot of {self.symbol} has no update id")
+        self.apply_snapshot(snapshot["bids"], snapshot["asks"], snapshot.get("timestamp"))
+        self.last_update_id = int(update_id)
+        self.snapshots += 1
+        pending, self._pending = self._pending, deque(maxlen=self._pending.maxlen)
+        for event in pending:
+            self.on_diff(event)
+
+    def on_diff(self, event: Dict) -> bool:
+        """
+        Apply one depth diff ({'U', 'u', 'b', 'a'} and optionally 'E', ms).
+
+        Returns:
+            bool: Whether it changed the book (False when buffered or already applied).
+        """
+        try:
+            first, last, bids, asks = event["U"], event["u"], event["b"], event["a"]
+            if self.last_update_id is None:
+                self._pending.append(event)
+                return False
+            if last <= self.last_update_id:
+                return False
+            if first > self.last_update_id + 1:
+                logger.warning(f"{self.symbol} depth gap: expected update {self.last_update_id + 1}, got {first}")
+                self.invalidate()
+                self._pending.append(event)
+                return False
+            self.apply_update(bids, asks, event.get("E"))
+        except (KeyError, TypeError, ValueError) as e:
+            # Possibly half applied: resync rather than trust the book
+            logger.warning(f"{self.symbol} malformed depth diff dropped: {e!r}")
+            if self.last_update_id is not None:
+                self.invalidate()
+            return False
+        self.last_update_id = last
+        return True
+
+    def invalidate(self) -> None:
+        """Drop the book until the next snapshot (counted as a gap)."""
+        self.gaps += 1
+        self.bids.clear()
+        self.asks.clear()
+        self.last_update_id = None
+
+class ConsolidatedBook:
+    def __init__(self, symbol: str, fees: Optional[Dict[str, float]] = None):
+        """
+        One symbol's books from several venues, merged for queries.
+
+        Updates touch only their venue's book; queries merge the venues at
+        read time (top of book in O(venues), depth with a k-way merge that
+        stops at the size asked for), so an update costs the same however
+        many venues are merged. Prices can be read net of each venue's taker
+        fee, which is what the router compares.
+
+        Args:
+            symbol (str): Trading pair.
+            fees (Optional[Dict[str, float]]): Venue -> taker fee rate.
+        """
+        self.symbol = symbol
+        self.fees = dict(fees or {})
+        self.books: Dict[str, OrderBook] = {}
+        self._lock = threading.Lock()
+
+    def book(self, venue: str) -> OrderBook:
+        book = self.books.get(venue)
+        if book is None:
+            book = self.books[venue] = OrderBook(self.symbol)
+        return book
+
+    def apply_snapshot(self, venue: str, bids: Iterable[Sequence[float]], asks: Iterable[Sequence[float]],
+                       timestamp: Optional[int] = None) -> None:
+        with self._lock:
+            self.book(venue).apply_snapshot(bids, asks, timestamp)
+
+    def apply_update(self, venue: str, bids: Iterable[Sequence[float]], asks: Iterable[Sequence[float]],
+                     timestamp: Optional[int] = None) -> None:
+        with self._lock:
+            self.book(venue).apply_update(bids, asks, timestamp)
+
+    def remove(self, venue: str) -> None:
+        """Drop a venue's book (e.g. while its feed is down)."""
+        with self._lock:
+            self.books.pop(venue, None)
+
+    def _net(self, venue: str, side: str, price: float) -> float:
+        fee = self.fees.get(venue, 0.0)
+        return price * (1 + fee) if side == "buy" else price * (1 - fee)
+
+    def best(self, side: str, net_of_fees: bool = False) -> Optional[Tuple[float, float, str]]:
+        """
+        Best level across venues for a taker order of `side`.
+
+        Returns:
+            Optional[Tuple[float, float, str]]: (price, size, venue); the price
+                net of the venue's fee when net_of_fees.
+        """
+        found = None
+        with self._lock:
+            for venue, book in self.books.items():
+                level = book.side(side).best()
+                if level is None:
+                    continue
+                price = self._net(venue, side, level[0]) if net_of_fees else level[0]
+                if found is None or (price < found[0] if side == "buy" else price > found[0]):
+                    found = (price, level[1], venue)
+        return found
+
+    def best_bid(self, net_of_fees: bool = False) -> Optional[Tuple[float, float, str]]:
+        return self.best("sell", net_of_fees)
+
+    def best_ask(self, net_of_fees: bool = False) -> Optional[Tuple[float, float, str]]:
+        return self.best("buy", net_of_fees)
+
+    def _merged(self, side: str, net_of_fees: bool,
+                venues: Optional[Iterable[str]]) -> Iterator[Tuple[float, float, float, str]]:
+        """(rank price, price, size, venue) across venues, best first. Call with the lock held."""
+        def levels(venue: str, book: OrderBook):
+            fee = self.fees.get(venue, 0.0) if net_of_fees else 0.0
+            factor = 1 + fee if side == "buy" else 1 - fee
+            for price, size in book.side(side):
+                yield price * factor, price, size, venue
+
+        chosen = self.books if venues is None else {v: self.books[v] for v in venues if v in self.books}
+        return heapq.merge(*(levels(venue, book) for venue, book in chosen.items()),
+                           key=lambda level: level[0], reverse=side == "sell")
+
+    def depth(self, side: str, amount: float, net_of_fees: bool = True,
+              venues: Optional[Iterable[str]] = None) -> List[Tuple[float, float, str]]:
+        """
+        Consolidated levels a taker order of `side` for `amount` would take,
+        best first, each as (price, size taken, venue).
+
+        Args:
+            side (str): 'buy' or 'sell'.
+            amount (float): Base amount.
+            net_of_fees (bool): Rank levels by their price after each venue's fee.
+            venues (Optional[Iterable[str]]): Only these venues (all by default).
+        """
+        taken = []
+        left = amount
+        with self._lock:
+            for _, price, size, venue in self._merged(side, net_of_fees, venues):
+                if left <= 0:
+                    break
+                take = min(size, left)
+                taken.append((price, take, venue))
+                left -= take
+        return taken
+
+    def cost_to_fill(self, side: str, amount: float) -> Tuple[float, float]:
+        """(amount fillable, its cost before fees) taking the best net-of-fee levels across venues."""
+        levels = self.depth(side, amount)
+        return sum(size for _, size, _ in levels), sum(price * size for price, size, _ in levels)
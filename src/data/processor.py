@@ -0,0 +1,299 @@
+# src/data/processor.py
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from src.core.utils import timeframe_to_seconds
+from src.data.storage import OHLCV_COLUMNS
+from src.strategies.streaming_indicators import Bar
+
+# Epoch day 0 was a Thursday; exchanges start weeks on Monday
+_WEEK_ORIGIN_MS = 4 * 86_400_000
+
+def _origin(period_ms: int) -> int:
+    return _WEEK_ORIGIN_MS if period_ms % (7 * 86_400_000) == 0 else 0
+
+def period_start(timestamp: int, period_ms: int) -> int:
+    """Start (ms, UTC-aligned) of the period of length period_ms containing timestamp."""
+    origin = _origin(period_ms)
+    return timestamp - (timestamp - origin) % period_ms
+
+def resample_ohlcv(data: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """
+    Aggregate OHLCV bars into a longer, UTC-aligned timeframe in one vectorized pass.
+
+    Equivalent to pandas' resample().agg() for sorted input, without building a
+    DatetimeIndex; periods with no input bars are skipped rather than NaN.
+
+    Args:
+        data (pd.DataFrame): OHLCV_COLUMNS bars, sorted by timestamp.
+        timeframe (str): Target timeframe (e.g. '1h').
+
+    Returns:
+        pd.DataFrame: One row per period, stamped with the period start.
+    """
+    timestamps = data["timestamp"].to_numpy(dtype=np.int64)
+    if not len(timestamps):
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+    period_ms = timeframe_to_seconds(timeframe) * 1000
+    starts = timestamps - (timestamps - _origin(period_ms)) % period_ms
+    first = np.concatenate(([0], np.flatnonzero(np.diff(starts)) + 1))
+    last = np.concatenate((first[1:] - 1, [len(starts) - 1]))
+    return pd.DataFrame({
+        "timestamp": starts[first],
+        "open": data["open"].to_numpy(dtype=float)[first],
+        "high": np.maximum.reduceat(data["high"].to_numpy(dtype=float), first),
+        "low": np.minimum.reduceat(data["low"].to_numpy(dtype=float), first),
+        "close": data["close"].to_numpy(dtype=float)[last],
+        "volume": np.add.reduceat(data["volume"].to_numpy(dtype=float), first),
+    })
+
+def _row_bar(row) -> Bar:
+    return Bar(int(row[0]), *map(float, row[1:6]))
+
+def _merge(current: List, bar: Bar) -> None:
+    if bar.high > current[2]:
+        current[2] = bar.high
+    if bar.low < current[3]:
+        current[3] = bar.low
+    current[4] = bar.close
+    current[5] += bar.volume
+
+class MultiTimeframeResampler:
+    def __init__(self, base_timeframe: str = "1m", timeframes: Sequence[str] = ("5m", "15m", "1h", "4h", "1d"),
+                 history: int = 1000):
+        """
+        Derive higher-timeframe bars from a stream of base bars.
+
+        Each closed base bar is folded into the forming bar of every target
+        timeframe in O(1); a higher bar closes as soon as the base bar ending
+        its period arrives (or a later one does, across gaps), so no cycle
+        ever resamples the full history. The forming base bar can be passed
+        in as well: it shows up in partial bars but is never committed, so its
+        later revisions and final version are not double counted.
+
+        Args:
+            base_timeframe (str): Timeframe of the bars fed in.
+            timeframes (Sequence[str]): Target timeframes; each a multiple of the base.
+            history (int): Closed bars kept per symbol and timeframe.
+        """
+        self.base_timeframe = base_timeframe
+        self.base_ms = timeframe_to_seconds(base_timeframe) * 1000
+        self.periods: Dict[str, int] = {}
+        for timeframe in timeframes:
+            period_ms = timeframe_to_seconds(timeframe) * 1000
+            if period_ms <= self.base_ms or period_ms % self.base_ms:
+                raise ValueError(f"Cannot build {timeframe} bars from {base_timeframe} bars")
+            self.periods[timeframe] = period_ms
+        self.history = history
+        self._forming: Dict[str, Dict[str, List]] = {}
+        self._closed: Dict[str, Dict[str, Deque[Bar]]] = {}
+        self._pending: Dict[str, Bar] = {}
+        self._last: Dict[str, int] = {}
+        self._versions: Dict[Tuple[str, str], int] = {}
+        self._frames: Dict[Tuple[str, str, bool], Tuple[int, pd.DataFrame]] = {}
+        self.late_bars = 0
+
+    @property
+    def timeframes(self) -> List[str]:
+        return list(self.periods)
+
+    def _check(self, timeframe: str) -> int:
+        period_ms = self.periods.get(timeframe)
+        if period_ms is None:
+            raise ValueError(f"{timeframe} is not resampled (have {', '.join(self.periods)})")
+        return period_ms
+
+    def _touch(self, symbol: str, timeframes=None) -> None:
+        for timeframe in timeframes if timeframes is not None else self.periods:
+            key = (symbol, timeframe)
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+    def _closed_bars(self, symbol: str, timeframe: str) -> Deque[Bar]:
+        closed = self._closed.setdefault(symbol, {})
+        bars = closed.get(timeframe)
+        if bars is None:
+            bars = closed[timeframe] = deque(maxlen=self.history)
+        return bars
+
+    def _close_before(self, symbol: str, timestamp: int) -> Dict[str, List[Bar]]:
+        """Close forming bars whose period ended at or before timestamp."""
+        emitted = {}
+        forming = self._forming.get(symbol, {})
+        for timeframe, period_ms in self.periods.items():
+            current = forming.get(timeframe)
+            if current is not None and current[0] + period_ms <= timestamp:
+                bar = Bar(*current)
+                del forming[timeframe]
+                self._closed_bars(symbol, timeframe).append(bar)
+                emitted[timeframe] = [bar]
+        return emitted
+
+    def update(self, symbol: str, bar: Bar, closed: bool = True) -> Dict[str, List[Bar]]:
+        """
+        Fold one base bar into every timeframe.
+
+        Args:
+            symbol (str): Trading pair.
+            bar (Bar): Base-timeframe bar.
+            closed (bool): False for the still-forming base bar, which is only
+                shown in partial bars until its closed version arrives.
+
+        Returns:
+            Dict[str, List[Bar]]: Higher-timeframe bars this closed, per timeframe.
+        """
+        last = self._last.get(symbol)
+        if last is not None and bar.timestamp <= last:
+            self.late_bars += 1  # already folded in
+            return {}
+
+        if not closed:
+            if self._pending.get(symbol) == bar:
+                return {}  # unchanged since the last look; keep cached frames
+            self._pending[symbol] = bar
+            # A forming base bar in a later period means the earlier periods are over
+            emitted = self._close_before(symbol, bar.timestamp)
+            self._touch(symbol)
+            return emitted
+
+        pending = self._pending.get(symbol)
+        if pending is not None and pending.timestamp <= bar.timestamp:
+            del self._pending[symbol]
+        self._last[symbol] = bar.timestamp
+
+        emitted = {}
+        forming = self._forming.setdefault(symbol, {})
+        end = bar.timestamp + self.base_ms
+        for timeframe, period_ms in self.periods.items():
+            start = period_start(bar.timestamp, period_ms)
+            current = forming.get(timeframe)
+            bars = []
+            if current is not None and current[0] != start:
+                bars.append(Bar(*current))  # a gap skipped this period's last base bars
+                current = None
+            if current is None:
+                current = forming[timeframe] = [start, bar.open, bar.high, bar.low, bar.close, bar.volume]
+            else:
+                _merge(current, bar)
+            if end >= start + period_ms:
+                bars.append(Bar(*current))
+                del forming[timeframe]
+            if bars:
+                self._closed_bars(symbol, timeframe).extend(bars)
+                emitted[timeframe] = bars
+        self._touch(symbol)
+        return emitted
+
+    def seed(self, symbol: str, data: pd.DataFrame, forming_last: bool = False) -> None:
+        """
+        Rebuild a symbol's bars from base-timeframe history (stored or REST), vectorized.
+
+        Args:
+            symbol (str): Trading pair.
+            data (pd.DataFrame): Base OHLCV_COLUMNS bars.
+            forming_last (bool): The last row is the still-forming bar (REST
+                responses), so it is not committed.
+        """
+        data = data[OHLCV_COLUMNS].sort_values("timestamp").drop_duplicates("timestamp", keep="last")
+        self._forming[symbol] = {}
+        self._closed[symbol] = {}
+        self._pending.pop(symbol, None)
+        self._last.pop(symbol, None)
+        if forming_last and len(data):
+            self._pending[symbol] = _row_bar(data.iloc[-1].tolist())
+            data = data.iloc[:-1]
+
+        if len(data):
+            last = int(data["timestamp"].iloc[-1])
+            self._last[symbol] = last
+            for timeframe, period_ms in self.periods.items():
+                bars = [Bar(*row) for row in resample_ohlcv(data, timeframe).itertuples(index=False, name=None)]
+                if last + self.base_ms < bars[-1].timestamp + period_ms:
+                    self._forming[symbol][timeframe] = list(bars.pop())
+                self._closed_bars(symbol, timeframe).extend(bars)
+        self._touch(symbol)
+
+    def extend_history(self, symbol: str, timeframe: str, data: pd.DataFrame) -> int:
+        """
+        Merge bars fetched at `timeframe` itself (e.g. one REST call) into the closed history.
+
+        Base history rarely reaches back far enough for long timeframes, and
+        its oldest bar may start mid-period. Exchange bars of finished periods
+        are authoritative, so they replace built bars with the same timestamp;
+        rows from the forming period onwards are ignored, since only base bars
+        can update it without double counting.
+
+        Returns:
+            int: Rows merged.
+        """
+        period_ms = self._check(timeframe)
+        current = self._forming.get(symbol, {}).get(timeframe)
+        pending = self._pending.get(symbol)
+        if current is not None:
+            cutoff = current[0]
+        elif pending is not None:
+            cutoff = period_start(pending.timestamp, period_ms)
+        elif symbol in self._last:
+            cutoff = period_start(self._last[symbol], period_ms) + period_ms
+        else:
+            # Nothing built yet: take the newest row as forming, as REST returns it
+            cutoff = int(data["timestamp"].max()) if len(data) else 0
+
+        rows = data[data["timestamp"] < cutoff][OHLCV_COLUMNS]
+        merged = {bar.timestamp: bar for bar in self._closed_bars(symbol, timeframe)}
+        for row in rows.itertuples(index=False, name=None):
+            bar = _row_bar(row)
+            merged[bar.timestamp] = bar
+        self._closed[symbol][timeframe] = deque(
+            (merged[timestamp] for timestamp in sorted(merged)), maxlen=self.history
+        )
+        self._touch(symbol, [timeframe])
+        return len(rows)
+
+    def partial(self, symbol: str, timeframe: str) -> Optional[Bar]:
+        """The forming bar of timeframe, including the forming base bar; None between periods."""
+        period_ms = self._check(timeframe)
+        current = self._forming.get(symbol, {}).get(timeframe)
+        pending = self._pending.get(symbol)
+        if current is None:
+            # The forming base bar opens a new period (update() closed any earlier one)
+            return pending._replace(timestamp=period_start(pending.timestamp, period_ms)) if pending else None
+        partial = list(current)
+        if pending is not None:
+            _merge(partial, pending)
+        return Bar(*partial)
+
+    def ready(self, symbol: str) -> bool:
+        return symbol in self._last or symbol in self._pending
+
+    def frame(self, symbol: str, timeframe: str, include_partial: bool = True) -> pd.DataFrame:
+        """
+        Closed bars (plus the forming one) of a timeframe as an OHLCV DataFrame.
+
+        Frames are cached until the symbol's next update, so every strategy
+        asking within one cycle shares a single build; treat them as read-only.
+        """
+        self._check(timeframe)
+        version = self._versions.get((symbol, timeframe), 0)
+        key = (symbol, timeframe, include_partial)
+        cached = self._frames.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        rows = list(self._closed.get(symbol, {}).get(timeframe, ()))
+        if include_partial:
+            partial = self.partial(symbol, timeframe)
+            if partial is not None:
+                rows.append(partial)
+        df = pd.DataFrame(rows, columns=OHLCV_COLUMNS)
+        df.attrs.update(symbol=symbol, timeframe=timeframe)
+        self._frames[key] = (version, df)
+        return df
+
+    def frames(self, symbol: str, timeframes: Optional[Sequence[str]] = None,
+               include_partial: bool = True) -> Dict[str, pd.DataFrame]:
+        """frame() for several timeframes at once (all of them by default)."""
+        return {
+            timeframe: self.frame(symbol, timeframe, include_partial)
+            for timeframe in (timeframes or self.periods)
+        }
@@ -0,0 +1,269 @@
+# src/data/replay.py
+import time
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from src.core.utils import timeframe_to_seconds
+from src.execution.paper_exchange import PaperExchange
+from src.execution.risk_manager import RiskManager
+from src.monitoring.logger import logger
+from src.strategies.base_strategy import BaseStrategy
+from src.strategies.streaming_indicators import Bar, StreamingSignalEngine
+
+# One trade in 21 packed bytes; side is 1 (buyer aggressor), -1 (seller) or 0 (unknown)
+TRADE_DTYPE = np.dtype([("timestamp", "<i8"), ("price", "<f8"), ("amount", "<f4"), ("side", "i1")])
+
+def write_trades(path: str, timestamps, prices, amounts, sides=None) -> int:
+    """Save trades as a memory-mappable .npy file of TRADE_DTYPE records."""
+    trades = np.empty(len(timestamps), dtype=TRADE_DTYPE)
+    trades["timestamp"] = timestamps
+    trades["price"] = prices
+    trades["amount"] = amounts
+    trades["side"] = 0 if sides is None else sides
+    np.save(path, trades)
+    return len(trades)
+
+def import_trades_csv(csv_path: str, out_path: str, timestamp: str = "timestamp", price: str = "price",
+                      amount: str = "amount", buyer_maker: Optional[str] = None,
+                      chunksize: int = 1_000_000) -> int:
+    """
+    Convert a trades CSV into a TRADE_DTYPE .npy file, streaming it in chunks.
+
+    Args:
+        csv_path (str): Source CSV with a header row.
+        out_path (str): Destination .npy file.
+        timestamp, price, amount (str): Source column names.
+        buyer_maker (Optional[str]): Boolean column (Binance's is_buyer_maker)
+            used to derive the aggressor side.
+
+    Returns:
+        int: Number of trades written.
+    """
+    with open(csv_path) as f:
+        rows = sum(1 for _ in f) - 1
+    trades = np.lib.format.open_memmap(out_path, mode="w+", dtype=TRADE_DTYPE, shape=(rows,))
+    usecols = [timestamp, price, amount] + ([buyer_maker] if buyer_maker else [])
+    written = 0
+    for chunk in pd.read_csv(csv_path, usecols=usecols, chunksize=chunksize):
+        view = trades[written:written + len(chunk)]
+        view["timestamp"] = chunk[timestamp].to_numpy(dtype=np.int64)
+        view["price"] = chunk[price].to_numpy(dtype=np.float64)
+        view["amount"] = chunk[amount].to_numpy(dtype=np.float32)
+        if buyer_maker:
+            view["side"] = np.where(chunk[buyer_maker].astype(str).str.lower() == "true", -1, 1)
+        written += len(chunk)
+    trades.flush()
+    logger.info(f"Imported {written} trades into {out_path}")
+    return written
+
+def open_trades(path: str) -> np.ndarray:
+    """Memory-map a trades file without reading it."""
+    return np.load(path, mmap_mode="r")
+
+def iter_batches(trades: np.ndarray, batch_size: int = 1 << 20) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Decode packed records into contiguous (timestamps, prices, amounts) columns, one batch at a time."""
+    for start in range(0, len(trades), batch_size):
+        batch = trades[start:start + batch_size]
+        yield (np.ascontiguousarray(batch["timestamp"]), np.ascontiguousarray(batch["price"]),
+               batch["amount"].astype(np.float64))
+
+class ReplayBacktester:
+    def __init__(self, strategy: BaseStrategy, params: Dict, symbol: str = "BTC/USDT", timeframe: str = "1m",
+                 risk_params: Optional[Dict] = None, initial_balance: float = 10000.0,
+                 exchange: Optional[PaperExchange] = None, batch_size: int = 1 << 20, history: int = 500):
+        """
+        Replay recorded trades through strategy, risk manager and PaperExchange.
+
+        Trades are fed to the simulated exchange in timestamp order, so stop
+        losses and take profits from RiskManager.generate_risk_orders fill at
+        the trade that crosses them, not at the next bar close. The strategy
+        sees a bar each time a timeframe period ends.
+
+        Args:
+            strategy (BaseStrategy): Strategy to test.
+            params (Dict): Strategy parameters.
+            symbol (str): Trading pair of the recorded trades.
+            timeframe (str): Bar timeframe the strategy runs on.
+            risk_params (Optional[Dict]): RiskManager configuration.
+            initial_balance (float): Starting quote balance.
+            exchange (Optional[PaperExchange]): Simulated venue (fees/slippage);
+                a default one is created with initial_balance.
+            batch_size (int): Trades decoded per batch.
+            history (int): Bars kept for strategies without a streaming path.
+        """
+        self.strategy = strategy
+        self.params = params
+        self.symbol = symbol
+        self.base, self.quote = symbol.split("/")
+        self.timeframe = timeframe
+        self.period_ms = timeframe_to_seconds(timeframe) * 1000
+        self.initial_balance = initial_balance
+        self.exchange = exchange or PaperExchange({self.quote: initial_balance})
+        self.risk_manager = RiskManager(dict(risk_params or {}, initial_balance=initial_balance))
+        self.batch_size = batch_size
+
+        try:
+            strategy.stream(params)
+            self.signal_engine = StreamingSignalEngine(strategy, params)
+        except NotImplementedError:
+            self.signal_engine = None
+        self.bars: deque = deque(maxlen=history)
+
+        self.position: Optional[Dict] = None
+        self.trades: List[Dict] = []
+        self.equity: List[Tuple[int, float]] = []
+        self._bar: Optional[List[float]] = None  # forming bar carried across batches
+        self._day: Optional[int] = None
+
+    # -- account ---------------------------------------------------------
+
+    def _equity(self, price: float) -> float:
+        total = self.exchange.fetch_balance()["total"]
+        return total.get(self.quote, 0.0) + total.get(self.base, 0.0) * price
+
+    def _enter(self, price: float) -> None:
+        risk = self.risk_manager
+        stop_loss, take_profit = risk.generate_risk_orders(price)
+        # Size and validate against the simulated account, fees included
+        equity = risk.current_balance = self._equity(price)
+        amount = risk.calculate_position_size(price, stop_loss)
+        if not amount or not risk.validate_order(self.symbol, "buy", amount, price):
+            return
+        try:
+            order = self.exchange.create_order(self.symbol, "market", "buy", amount)
+        except Exception as e:
+            logger.debug(f"Replay entry rejected: {e}")
+            return
+        filled = order["filled"]
+        self.trades.append({"timestamp": self.exchange.books[self.symbol].timestamp, "side": "buy",
+                            "price": order["average"], "amount": filled, "reason": "signal"})
+        self.position = {
+            "equity": equity,
+            "amount": filled,
+            "stop": self.exchange.create_order(self.symbol, "market", "sell", filled,
+                                               params={"stopLossPrice": stop_loss})["id"],
+            "take": self.exchange.create_order(self.symbol, "market", "sell", filled,
+                                               params={"takeProfitPrice": take_profit})["id"],
+        }
+
+    def _close(self, order: Dict, reason: str) -> None:
+        position, self.position = self.position, None
+        for order_id in (position["stop"], position["take"]):
+            if self.exchange.orders[order_id]["status"] == "open":
+                self.exchange.cancel_order(order_id)
+        self.trades.append({"timestamp": order["lastTradeTimestamp"], "side": "sell",
+                            "price": order["average"], "amount": order["filled"], "reason": reason})
+        equity = self._equity(order["average"])
+        pnl = (equity - position["equity"]) / position["equity"] * 100
+        self.risk_manager.update_risk_state(pnl=pnl, success=pnl >= 0)
+
+    def _check_exits(self) -> None:
+        """Book a stop loss or take profit the exchange filled intrabar."""
+        if self.position is None:
+            return
+        for key, reason in (("stop", "stop_loss"), ("take", "take_profit")):
+            order = self.exchange.orders[self.position[key]]
+            if order["status"] == "closed":
+                self._close(order, reason)
+                return
+
+    def _exit(self) -> None:
+        order = self.exchange.create_order(self.symbol, "market", "sell", self.position["amount"])
+        self._close(order, "signal")
+
+    # -- bars ------------------------------------------------------------
+
+    def _on_bar(self, bar: Bar) -> None:
+        day = bar.timestamp // 86_400_000
+        if day != self._day:
+            # Circuit breakers re-arm each simulated UTC day, as a daily restart would
+            self._day = day
+            self.risk_manager.daily_pnl = 0.0
+            self.risk_manager.consecutive_losses = 0
+
+        if self.signal_engine is not None:
+            signal = self.signal_engine.on_bar(self.symbol, bar)
+        else:
+            self.bars.append(bar)
+            signal = self.strategy.generate_signal(pd.DataFrame(list(self.bars), columns=list(Bar._fields)),
+                                                   self.params)
+
+        if signal == "buy" and self.position is None:
+            self._enter(bar.close)
+        elif signal == "sell" and self.position is not None:
+            self._exit()
+        self.equity.append((bar.timestamp, self._equity(bar.close)))
+
+    def _close_bar(self, next_start: Optional[int]) -> None:
+        """Emit the forming bar, plus flat bars for empty periods before next_start."""
+        bar = Bar(*self._bar)
+        self._on_bar(bar)
+        if next_start is not None:
+            for start in range(bar.timestamp + self.period_ms, next_start, self.period_ms):
+                self._on_bar(Bar(start, bar.close, bar.close, bar.close, bar.close, 0.0))
+        self._bar = None
+
+    def _replay_batch(self, timestamps: np.ndarray, prices: np.ndarray, amounts: np.ndarray) -> None:
+        buckets = timestamps - timestamps % self.period_ms
+        starts = np.concatenate(([0], np.flatnonzero(buckets[1:] != buckets[:-1]) + 1))
+        ends = np.append(starts[1:], len(prices))
+        opens, closes = prices[starts], prices[ends - 1]
+        highs = np.maximum.reduceat(prices, starts)
+        lows = np.minimum.reduceat(prices, starts)
+        volumes = np.add.reduceat(amounts, starts)
+
+        for k in range(len(starts)):
+            lo, hi, bucket = starts[k], ends[k], int(buckets[starts[k]])
+            if self._bar is not None and self._bar[0] != bucket:
+                self._close_bar(bucket)
+            self.exchange.process_trades(self.symbol, timestamps[lo:hi], prices[lo:hi], amounts[lo:hi])
+            self._check_exits()
+            if self._bar is None:
+                self._bar = [bucket, opens[k], highs[k], lows[k], closes[k], volumes[k]]
+            else:
+                bar = self._bar
+                bar[2], bar[3] = max(bar[2], highs[k]), min(bar[3], lows[k])
+                bar[4], bar[5] = closes[k], bar[5] + volumes[k]
+
+    def run(self, trades: np.ndarray) -> Dict:
+        """
+        Replay TRADE_DTYPE records (see open_trades) and report performance.
+
+        Returns:
+            Dict: Backtester-style report plus max_drawdown_pct and throughput
+                (events, seconds, events_per_sec).
+        """
+        started = time.perf_counter()
+        for batch in iter_batches(trades, self.batch_size):
+            self._replay_batch(*batch)
+        if self._bar is not None:
+            self._close_bar(None)
+        seconds = time.perf_counter() - started
+        return self.generate_report(trades, seconds)
+
+    def generate_report(self, trades: np.ndarray, seconds: float) -> Dict:
+        """Generate performance and throughput metrics."""
+        if not len(trades):
+            return {"initial_balance": self.initial_balance, "final_balance": self.initial_balance,
+                    "return_pct": 0.0, "num_trades": 0, "events": 0, "seconds": seconds,
+                    "events_per_sec": 0.0}
+        initial_price, final_price = float(trades["price"][0]), float(trades["price"][-1])
+        final_balance = self._equity(final_price)
+        equity = np.array([value for _, value in self.equity]) if self.equity else np.array([final_balance])
+        peaks = np.maximum.accumulate(equity)
+        exits = [t["reason"] for t in self.trades if t["side"] == "sell"]
+        return {
+            "initial_balance": self.initial_balance,
+            "final_balance": final_balance,
+            "return_pct": (final_balance - self.initial_balance) / self.initial_balance * 100,
+            "num_trades": len(self.trades),
+            "buy_and_hold_return": (final_price - initial_price) / initial_price * 100,
+            "max_drawdown_pct": float(((peaks - equity) / peaks).max() * 100),
+            "stop_loss_exits": exits.count("stop_loss"),
+            "take_profit_exits": exits.count("take_profit"),
+            "bars": len(self.equity),
+            "events": len(trades),
+            "seconds": seconds,
+            "events_per_sec": len(trades) / seconds if seconds else float("inf"),
+        }
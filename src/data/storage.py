@@ -1,38 +1,211 @@
 # src/data/storage.py
 import sqlite3
+from pathlib import Path
+from typing import List, Optional, Tuple
 import pandas as pd
 from src.monitoring.logger import logger
 
+OHLCV_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
 class DatabaseClient:
     def __init__(self, db_path: str = "data/crypto_data.db"):
+        """
+        SQLite OHLCV store keyed by (symbol, timeframe, timestamp).
+
+        Args:
+            db_path (str): Path to the SQLite database (':memory:' for tests).
+        """
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
         self.conn = sqlite3.connect(db_path)
+        self._configure()
         self._create_tables()
 
+    def _configure(self):
+        """WAL lets readers (dashboard, backtests) run while the bot writes."""
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+
     def _create_tables(self):
-        self.conn.execute("""
-            CREATE TABLE IF NOT EXISTS ohlcv (
-                timestamp INTEGER PRIMARY KEY,
-                symbol TEXT,
-                open REAL,
-                high REAL,
-                low REAL,
-                close REAL,
-                volume REAL
-            )
-        """)
-
-    def save_ohlcv(self, symbol: str, data: pd.DataFrame):
-        """Cache OHLCV data to SQLite."""
-        data["symbol"] = symbol
-        data.to_sql("ohlcv", self.conn, if_exists="append", index=False)
-        logger.debug(f"Cached {len(data)} bars for {symbol}")
-
-    def load_ohlcv(self, symbol: str, limit: int = 1000) -> pd.DataFrame:
-        """Load cached OHLCV data."""
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(ohlcv)")]
+        legacy = bool(columns) and "timeframe" not in columns
+
+        with self.conn:
+            if legacy:
+                self.conn.execute("ALTER TABLE ohlcv RENAME TO ohlcv_legacy")
+            # The composite primary key doubles as the (symbol, timeframe, time) range index
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS ohlcv (
+                    symbol TEXT NOT NULL,
+                    timeframe TEXT NOT NULL,
+                    timestamp INTEGER NOT NULL,
+                    open REAL,
+                    high REAL,
+                    low REAL,
+                    close REAL,
+                    volume REAL,
+                    PRIMARY KEY (symbol, timeframe, timestamp)
+                ) WITHOUT ROWID
+            """)
+            if legacy:
+                # The old schema had no timeframe; DataFetcher only ever stored 1m bars
+                self.conn.execute("""
+                    INSERT OR REPLACE INTO ohlcv
+                    SELECT symbol, '1m', timestamp, open, high, low, close, volume
+                    FROM ohlcv_legacy WHERE symbol IS NOT NULL
+                """)
+                self.conn.execute("DROP TABLE ohlcv_legacy")
+                logger.info("Migrated legacy ohlcv table to (symbol, timeframe, timestamp) keys")
+
+    def save_ohlcv(self, symbol: str, data: pd.DataFrame, timeframe: str = "1m") -> int:
+        """
+        Upsert a batch of OHLCV bars in a single transaction.
+
+        Existing bars with the same (symbol, timeframe, timestamp) are replaced,
+        so re-saving an overlapping fetch is safe.
+
+        Args:
+            symbol (str): Trading pair (e.g., 'BTC/USDT').
+            data (pd.DataFrame): Bars with OHLCV_COLUMNS.
+            timeframe (str): Bar timeframe (e.g., '1m').
+
+        Returns:
+            int: Number of bars written.
+        """
+        if data.empty:
+            return 0
+
+        timestamps = data["timestamp"].to_numpy(dtype="int64").tolist()
+        prices = [data[column].to_numpy(dtype="float64").tolist() for column in OHLCV_COLUMNS[1:]]
+        rows = zip([symbol] * len(data), [timeframe] * len(data), timestamps, *prices)
+
+        query = """
+            INSERT INTO ohlcv (symbol, timeframe, timestamp, open, high, low, close, volume)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (symbol, timeframe, timestamp) DO UPDATE SET
+                open = excluded.open,
+                high = excluded.high,
+                low = excluded.low,
+                close = excluded.close,
+                volume = excluded.volume
+        """
+        # One executemany in one transaction: a single fsync for the whole batch
+        with self.conn:
+            self.conn.executemany(query, rows)
+
+        logger.debug(f"Cached {len(data)} {timeframe} bars for {symbol}")
+        return len(data)
+
+    def load_ohlcv(self, symbol: str, limit: Optional[int] = 1000, timeframe: str = "1m",
+                   start: Optional[int] = None, end: Optional[int] = None) -> pd.DataFrame:
+        """
+        Load the most recent bars, optionally restricted to [start, end).
+
+        Args:
+            symbol (str): Trading pair.
+            limit (Optional[int]): Maximum bars, counted back from the newest; None for all.
+            timeframe (str): Bar timeframe.
+            start (Optional[int]): Inclusive lower bound, ms since epoch.
+            end (Optional[int]): Exclusive upper bound, ms since epoch.
+
+        Returns:
+            pd.DataFrame: Bars in ascending timestamp order.
+        """
+        where, args = self._range_clause(symbol, timeframe, start, end)
+        query = f"SELECT {', '.join(OHLCV_COLUMNS)} FROM ohlcv WHERE {where} ORDER BY timestamp DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            args.append(int(limit))
+        rows = self.conn.execute(query, args).fetchall()
+        rows.reverse()
+        return self._frame(rows, symbol, timeframe)
+
+    def load_range(self, symbol: str, timeframe: str = "1m", start: Optional[int] = None,
+                   end: Optional[int] = None) -> pd.DataFrame:
+        """Load every bar in [start, end), ascending, via the primary-key index."""
+        where, args = self._range_clause(symbol, timeframe, start, end)
+        query = f"SELECT {', '.join(OHLCV_COLUMNS)} FROM ohlcv WHERE {where} ORDER BY timestamp"
+        return self._frame(self.conn.execute(query, args).fetchall(), symbol, timeframe)
+
+    def span(self, symbol: str, timeframe: str = "1m", start: Optional[int] = None,
+             end: Optional[int] = None) -> Optional[Tuple[int, int]]:
+        """First and last bar timestamps in [start, end), or None if the range is empty."""
+        where, args = self._range_clause(symbol, timeframe, start, end)
+        # Separate MIN and MAX queries: each is a single index seek, together they would scan
+        first = self.conn.execute(f"SELECT MIN(timestamp) FROM ohlcv WHERE {where}", args).fetchone()[0]
+        if first is None:
+            return None
+        last = self.conn.execute(f"SELECT MAX(timestamp) FROM ohlcv WHERE {where}", args).fetchone()[0]
+        return first, last
+
+    def load_minmax(self, symbol: str, timeframe: str = "1m", start: Optional[int] = None,
+                    end: Optional[int] = None, buckets: int = 1000, column: str = "close") -> pd.DataFrame:
+        """
+        Min and max of a column per time bucket over [start, end), aggregated inside SQLite.
+
+        Only `buckets` rows cross into Python however many bars the range
+        holds. Each bucket is its own primary-key range query, which avoids
+        the temporary B-tree a GROUP BY on a computed bucket would build.
+
+        Returns:
+            pd.DataFrame: One row per non-empty bucket with first/last (the
+                bucket's first and last bar timestamps) and min/max.
+        """
+        if column not in OHLCV_COLUMNS[1:]:
+            raise ValueError(f"Unknown OHLCV column: {column}")
+        columns = ["first", "last", "min", "max"]
+        bounds = self.span(symbol, timeframe, start, end)
+        if bounds is None:
+            return pd.DataFrame(columns=columns)
+        low, high = bounds
+        width = (high - low) // max(buckets, 1) + 1
         query = f"""
-            SELECT * FROM ohlcv
-            WHERE symbol = '{symbol}'
-            ORDER BY timestamp DESC
-            LIMIT {limit}
+            SELECT MIN(timestamp), MAX(timestamp), MIN({column}), MAX({column})
+            FROM ohlcv WHERE symbol = ? AND timeframe = ? AND timestamp >= ? AND timestamp < ?
         """
-        return pd.read_sql(query, self.conn)
\ No newline at end of file
+        rows = []
+        for edge in range(low, high + 1, width):
+            row = self.conn.execute(query, (symbol, timeframe, edge, edge + width)).fetchone()
+            if row[0] is not None:
+                rows.append(row)
+        return pd.DataFrame.from_records(rows, columns=columns)
+
+    def last_timestamp(self, symbol: str, timeframe: str = "1m") -> Optional[int]:
+        """Timestamp of the newest stored bar, or None."""
+        row = self.conn.execute(
+            "SELECT MAX(timestamp) FROM ohlcv WHERE symbol = ? AND timeframe = ?", (symbol, timeframe)
+        ).fetchone()
+        return row[0]
+
+    def first_timestamp(self, symbol: str, timeframe: str = "1m", start: Optional[int] = None) -> Optional[int]:
+        """Timestamp of the oldest stored bar at or after start, or None."""
+        where, args = self._range_clause(symbol, timeframe, start, None)
+        return self.conn.execute(f"SELECT MIN(timestamp) FROM ohlcv WHERE {where}", args).fetchone()[0]
+
+    def list_series(self) -> List[Tuple[str, str]]:
+        """All stored (symbol, timeframe) pairs."""
+        return self.conn.execute("SELECT DISTINCT symbol, timeframe FROM ohlcv ORDER BY symbol, timeframe").fetchall()
+
+    @staticmethod
+    def _range_clause(symbol: str, timeframe: str, start: Optional[int], end: Optional[int]):
+        clauses = ["symbol = ?", "timeframe = ?"]
+        args = [symbol, timeframe]
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            args.append(int(start))
+        if end is not None:
+            clauses.append("timestamp < ?")
+            args.append(int(end))
+        return " AND ".join(clauses), args
+
+    @staticmethod
+    def _frame(rows, symbol: str, timeframe: str) -> pd.DataFrame:
+        df = pd.DataFrame.from_records(rows, columns=OHLCV_COLUMNS)
+        df.attrs.update(symbol=symbol, timeframe=timeframe)
+        return df
+
+    def close(self):
+        self.conn.close()
+
@@ -1,34 +1,616 @@
 # src/data/streamer.py
-import websockets
+import asyncio
 import json
+import random
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+import pandas as pd
+import websockets
+from src.core.utils import timeframe_to_seconds
+from src.data.order_book import L2OrderBook
+from src.data.processor import MultiTimeframeResampler
 from src.monitoring.logger import logger
+from src.strategies.streaming_indicators import Bar
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+if orjson is not None:
+    loads = orjson.loads
+
+    def dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+else:  # pragma: no cover
+    loads, dumps = json.loads, json.dumps
+
+DROP_POLICIES = ("drop_oldest", "drop_newest", "block")
+OHLCV_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+# Raw-stream event types whose stream name differs from the event name
+_EVENT_CHANNELS = {"24hrTicker": "ticker", "depthUpdate": "depth"}
+
+def stream_name(symbol: str, channel: str = "ticker") -> str:
+    """Binance-style stream name, e.g. ('BTC/USDT', 'trade') -> 'btcusdt@trade'."""
+    return f"{symbol.replace('/', '').lower()}@{channel}"
+
+class StreamQueue:
+    def __init__(self, maxsize: int = 10000, policy: str = "drop_oldest"):
+        """
+        Bounded per-subscription buffer between the socket reader and a consumer.
+
+        Args:
+            maxsize (int): Messages held before the drop policy applies.
+            policy (str): 'drop_oldest' keeps the freshest data (tickers, books),
+                'drop_newest' keeps what is already queued, and 'block' pushes
+                back on the socket reader (for trades, where every message counts).
+        """
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {policy}")
+        self.policy = policy
+        self.dropped = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+
+    async def put(self, item) -> None:
+        if self.policy == "block":
+            await self._queue.put(item)
+            return
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.policy == "drop_newest":
+                return
+            self._queue.get_nowait()
+            self._queue.put_nowait(item)
+
+    async def get(self):
+        return await self._queue.get()
+
+    def get_nowait(self):
+        return self._queue.get_nowait()
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
 
 class WebSocketStreamer:
-    def __init__(self, exchange_url: str):
+    SUBSCRIBE_BATCH = 200  # streams per SUBSCRIBE frame
+
+    def __init__(self, exchange_url: str, queue_size: int = 10000, drop_policy: str = "drop_oldest",
+                 min_backoff: float = 1.0, max_backoff: float = 60.0, connect=None):
+        """
+        Multiplexed market data stream over one WebSocket connection.
+
+        Every subscription gets its own bounded queue, so a slow consumer only
+        backs up (or drops) its own stream. Lost connections are retried with
+        exponential backoff and full jitter, and all subscriptions are
+        re-sent on every reconnect.
+
+        Args:
+            exchange_url (str): WebSocket endpoint (e.g., 'wss://stream.binance.com:9443/ws').
+            queue_size (int): Default per-subscription queue bound.
+            drop_policy (str): Default policy when a queue is full (see StreamQueue).
+            min_backoff (float): First reconnect delay ceiling, seconds.
+            max_backoff (float): Largest reconnect delay ceiling, seconds.
+            connect: Coroutine factory opening the socket (defaults to websockets.connect).
+        """
         self.exchange_url = exchange_url
         self.websocket = None
+        self.queue_size = queue_size
+        self.drop_policy = drop_policy
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.queues: Dict[str, StreamQueue] = {}
+        self.reconnects = 0
+        self.parse_errors = 0
+        self._connect = connect or websockets.connect
+        self._request_id = 0
+        self._running = False
 
     async def connect(self):
-        """Connect to WebSocket and subscribe to data."""
-        self.websocket = await websockets.connect(self.exchange_url)
+        """Connect and (re)subscribe to every registered stream."""
+        self.websocket = await self._connect(self.exchange_url)
         logger.info(f"Connected to {self.exchange_url}")
+        await self._send("SUBSCRIBE", list(self.queues))
+
+    async def _send(self, method: str, streams: List[str]):
+        for i in range(0, len(streams), self.SUBSCRIBE_BATCH):
+            self._request_id += 1
+            await self.websocket.send(dumps({
+                "method": method,
+                "params": streams[i:i + self.SUBSCRIBE_BATCH],
+                "id": self._request_id
+            }))
+
+    async def subscribe(self, symbol: str, channel: str = "ticker", maxsize: Optional[int] = None,
+                        policy: Optional[str] = None) -> StreamQueue:
+        """
+        Subscribe to a data channel.
+
+        Returns:
+            StreamQueue: Queue receiving the channel's message payloads.
+        """
+        name = stream_name(symbol, channel)
+        if name not in self.queues:
+            self.queues[name] = StreamQueue(maxsize or self.queue_size, policy or self.drop_policy)
+            if self.websocket is not None:
+                await self._send("SUBSCRIBE", [name])
+            logger.info(f"Subscribed to {name}")
+        return self.queues[name]
+
+    async def unsubscribe(self, symbol: str, channel: str = "ticker"):
+        name = stream_name(symbol, channel)
+        if self.queues.pop(name, None) is not None and self.websocket is not None:
+            await self._send("UNSUBSCRIBE", [name])
+
+    def _route(self, message) -> Optional[tuple]:
+        """(stream name, payload) for a message, or None for acks and unknown streams."""
+        if not isinstance(message, dict):
+            return None
+        if "stream" in message:  # combined-stream envelope
+            name = message["stream"]
+            return (name, message["data"]) if name in self.queues else None
+
+        event, symbol = message.get("e"), message.get("s")
+        if event is None or symbol is None:
+            return None
+        if event == "kline":
+            channel = f"kline_{message['k']['i']}"
+        else:
+            channel = _EVENT_CHANNELS.get(event, event)
+        prefix = f"{symbol.lower()}@{channel}"
+        for name in self.queues:
+            if name.startswith(prefix):
+                return name, message
+        return None
+
+    async def _dispatch(self, raw) -> None:
+        try:
+            message = loads(raw)
+        except ValueError:
+            self.parse_errors += 1
+            logger.debug(f"Unparseable message dropped: {raw[:100]!r}")
+            return
+        for item in message if isinstance(message, list) else (message,):
+            routed = self._route(item)
+            if routed is not None:
+                name, payload = routed
+                await self.queues[name].put(payload)
+
+    async def run(self):
+        """Read until close(), reconnecting with jittered exponential backoff."""
+        self._running = True
+        backoff = self.min_backoff
+        while self._running:
+            try:
+                await self.connect()
+                async for raw in self.websocket:
+                    backoff = self.min_backoff  # the connection is healthy again
+                    await self._dispatch(raw)
+                if self._running:
+                    logger.warning("WebSocket closed by server")
+            except (websockets.ConnectionClosed, OSError, asyncio.TimeoutError) as e:
+                logger.warning(f"WebSocket disconnected: {e}")
+            except Exception as e:  # e.g. a rejected handshake: back off and retry all the same
+                logger.error(f"WebSocket failed: {e!r}")
+            if not self._running:
+                break
+            self.websocket = None
+            self.reconnects += 1
+            delay = random.uniform(0, backoff)
+            logger.info(f"Reconnecting in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    async def _consume(self, queue: StreamQueue, callback: Callable[[Dict], Awaitable[None]]):
+        while True:
+            payload = await queue.get()
+            try:
+                await callback(payload)
+            except Exception as e:
+                logger.error(f"Stream callback failed: {e}")
+
+    async def stream_data(self, callback: Callable[[Dict], Awaitable[None]]):
+        """Stream real-time data and pass each subscription's payloads to callback."""
+        consumers = [asyncio.create_task(self._consume(q, callback)) for q in self.queues.values()]
+        try:
+            await self.run()
+        finally:
+            for consumer in consumers:
+                consumer.cancel()
+
+    async def close(self):
+        self._running = False
+        if self.websocket is not None:
+            await self.websocket.close()
+
+class CandleAggregator:
+    def __init__(self, timeframe: str = "1m", history: int = 1000, fill_gaps: bool = True):
+        """
+        Build OHLCV bars from individual trades.
+
+        A bar closes when a trade lands in a later period, or when flush() is
+        called after the period ends (so quiet symbols still close on time).
+        Periods with no trades become flat zero-volume bars at the last close,
+        matching exchange klines.
+
+        Args:
+            timeframe (str): Bar timeframe (e.g., '1m').
+            history (int): Closed bars kept per symbol.
+            fill_gaps (bool): Emit flat bars for periods without trades.
+        """
+        self.timeframe = timeframe
+        self.period_ms = timeframe_to_seconds(timeframe) * 1000
+        self.history = history
+        self.fill_gaps = fill_gaps
+        self._current: Dict[str, List[float]] = {}
+        self._closed: Dict[str, Deque[Bar]] = {}
+        self.late_trades = 0
+
+    def _record(self, symbol: str, bars: List[Bar]) -> None:
+        closed = self._closed.setdefault(symbol, deque(maxlen=self.history))
+        closed.extend(bars)
+
+    def _close_until(self, symbol: str, start: int) -> List[Bar]:
+        """Close every period of symbol that ends at or before start."""
+        bars = []
+        current = self._current.get(symbol)
+        if current is not None:
+            if current[0] >= start:
+                return bars
+            bars.append(Bar(*current))
+            del self._current[symbol]
+
+        closed = self._closed.get(symbol)
+        last = bars[-1] if bars else (closed[-1] if closed else None)
+        if self.fill_gaps and last is not None:
+            t = last.timestamp + self.period_ms
+            while t < start:
+                bars.append(Bar(t, last.close, last.close, last.close, last.close, 0.0))
+                t += self.period_ms
+        self._record(symbol, bars)
+        return bars
+
+    def add_trade(self, symbol: str, timestamp: int, price: float, amount: float) -> List[Bar]:
+        """
+        Fold one trade into its bar.
+
+        Returns:
+            List[Bar]: Bars closed by this trade (usually empty).
+        """
+        start = int(timestamp) - int(timestamp) % self.period_ms
+        closed = self._closed.get(symbol)
+        if closed and start <= closed[-1].timestamp:
+            self.late_trades += 1  # belongs to a bar already handed out
+            return []
+
+        bars = self._close_until(symbol, start)
+        current = self._current.get(symbol)
+        if current is None:
+            self._current[symbol] = [start, price, price, price, price, amount]
+        else:
+            if price > current[2]:
+                current[2] = price
+            if price < current[3]:
+                current[3] = price
+            current[4] = price
+            current[5] += amount
+        return bars
+
+    def flush(self, now_ms: int) -> Dict[str, List[Bar]]:
+        """Close bars whose period ended by now_ms; returns them per symbol."""
+        start = int(now_ms) - int(now_ms) % self.period_ms
+        flushed = {}
+        for symbol in list(self._current) + [s for s in self._closed if s not in self._current]:
+            bars = self._close_until(symbol, start)
+            if bars:
+                flushed[symbol] = bars
+        return flushed
+
+    def seed(self, symbol: str, data: pd.DataFrame) -> None:
+        """Start from REST history; the last row is taken as the forming bar."""
+        rows = [Bar(*row) for row in data[OHLCV_COLUMNS].itertuples(index=False, name=None)]
+        if not rows:
+            return
+        self._closed[symbol] = deque(rows[:-1], maxlen=self.history)
+        forming = list(rows[-1])
+        current = self._current.get(symbol)
+        if current is not None and current[0] == forming[0]:
+            # Trades already streamed into this period extend the REST bar
+            forming[2] = max(forming[2], current[2])
+            forming[3] = min(forming[3], current[3])
+            forming[4] = current[4]
+        self._current[symbol] = forming
 
-    async def subscribe(self, symbol: str, channel: str = "ticker"):
-        """Subscribe to a data channel."""
-        msg = json.dumps({
-            "method": "SUBSCRIBE",
-            "params": [f"{symbol}@{channel}"],
-            "id": 1
-        })
-        await self.websocket.send(msg)
-        logger.info(f"Subscribed to {symbol}@{channel}")
-
-    async def stream_data(self, callback):
-        """Stream real-time data and pass to callback."""
+    def forming(self, symbol: str) -> Optional[Bar]:
+        """The bar still collecting trades, if any."""
+        current = self._current.get(symbol)
+        return Bar(*current) if current is not None else None
+
+    def frame(self, symbol: str, include_partial: bool = True) -> pd.DataFrame:
+        """Closed bars (plus the forming one) as an OHLCV DataFrame."""
+        rows = list(self._closed.get(symbol, ()))
+        if include_partial and symbol in self._current:
+            rows.append(Bar(*self._current[symbol]))
+        df = pd.DataFrame(rows, columns=OHLCV_COLUMNS)
+        df.attrs.update(symbol=symbol, timeframe=self.timeframe)
+        return df
+
+class LiveBarFeed:
+    def __init__(self, streamer: WebSocketStreamer, symbols: List[str], timeframe: str = "1m",
+                 history: int = 1000, flush_interval: float = 1.0, timeframes: Sequence[str] = ()):
+        """
+        Live OHLCV bars built from the trade stream.
+
+        Runs the streamer on a background event loop and aggregates trades into
+        candles, so DataFetcher can serve bars without polling REST.
+
+        Args:
+            streamer (WebSocketStreamer): Stream to subscribe trades on.
+            symbols (List[str]): Trading pairs to build bars for.
+            timeframe (str): Bar timeframe.
+            history (int): Closed bars kept per symbol.
+            flush_interval (float): Seconds between checks for ended periods.
+            timeframes (Sequence[str]): Higher timeframes derived from the streamed
+                bars, served by frame() without any REST polling.
+        """
+        self.streamer = streamer
+        self.symbols = list(symbols)
+        self.timeframe = timeframe
+        self.flush_interval = flush_interval
+        self.aggregator = CandleAggregator(timeframe, history)
+        self.resampler = MultiTimeframeResampler(timeframe, timeframes, history) if timeframes else None
+        self.on_bar: Optional[Callable[[str, Bar], None]] = None
+        self.on_price: Optional[Callable[[str, float], None]] = None
+        self._seeded = set()
+        self._primed = set()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def timeframes(self) -> List[str]:
+        """Every timeframe frame() serves: the streamed one, then the resampled ones."""
+        return [self.timeframe] + (self.resampler.timeframes if self.resampler is not None else [])
+
+    def _resample(self, symbol: str, bars: List[Bar]) -> None:
+        # Called with the lock held, so frame() never sees half-folded bars
+        if self.resampler is not None and symbol in self._seeded:
+            for bar in bars:
+                self.resampler.update(symbol, bar)
+
+    def _emit(self, symbol: str, bars: List[Bar]) -> None:
+        if self.on_bar is not None:
+            for bar in bars:
+                self.on_bar(symbol, bar)
+
+    def on_trade(self, symbol: str, trade: Dict) -> None:
+        """Fold a Binance trade payload into the symbol's candles."""
+        price = float(trade["p"])
+        with self._lock:
+            bars = self.aggregator.add_trade(symbol, trade["T"], price, float(trade["q"]))
+            self._resample(symbol, bars)
+        self._emit(symbol, bars)
+        if self.on_price is not None:
+            self.on_price(symbol, price)
+
+    async def _consume(self, symbol: str, queue: StreamQueue):
+        # The trade queue blocks the socket reader when full, so this loop must never die
+        while True:
+            trade = await queue.get()
+            try:
+                self.on_trade(symbol, trade)
+            except Exception as e:
+                logger.error(f"{symbol} trade dropped: {e!r}")
+
+    async def _flush(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            with self._lock:
+                flushed = self.aggregator.flush(int(time.time() * 1000))
+                for symbol, bars in flushed.items():
+                    self._resample(symbol, bars)
+            for symbol, bars in flushed.items():
+                self._emit(symbol, bars)
+
+    async def run(self):
+        # Dropping trades would corrupt candles, so trade queues push back instead
+        tasks = [
+            asyncio.create_task(self._consume(symbol, await self.streamer.subscribe(symbol, "trade", policy="block")))
+            for symbol in self.symbols
+        ]
+        tasks.append(asyncio.create_task(self._flush()))
+        try:
+            await self.streamer.run()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def start(self) -> None:
+        """Run the feed on a daemon thread with its own event loop."""
+        def target():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self.run())
+            finally:
+                self._loop.close()
+
+        self._thread = threading.Thread(target=target, name="live-bar-feed", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._loop is not None and self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.streamer.close(), self._loop)
+
+    def ready(self, symbol: str, timeframe: Optional[str] = None) -> bool:
+        """Whether symbol is seeded (and, for a resampled timeframe, its history primed)."""
+        if timeframe is None or timeframe == self.timeframe:
+            return symbol in self._seeded
+        return (symbol, timeframe) in self._primed
+
+    def seed(self, symbol: str, data: pd.DataFrame) -> None:
+        with self._lock:
+            self.aggregator.seed(symbol, data)
+            if self.resampler is not None:
+                self.resampler.seed(symbol, data, forming_last=True)
+                self._primed.difference_update({(symbol, timeframe) for timeframe in self.resampler.timeframes})
+            self._seeded.add(symbol)
+
+    def prime(self, symbol: str, timeframe: str, data: pd.DataFrame) -> None:
+        """Fill a resampled timeframe's older history from bars fetched at that timeframe."""
+        with self._lock:
+            self.resampler.extend_history(symbol, timeframe, data)
+            self._primed.add((symbol, timeframe))
+
+    def frame(self, symbol: str, include_partial: bool = True, timeframe: Optional[str] = None) -> pd.DataFrame:
+        with self._lock:
+            if timeframe is None or timeframe == self.timeframe:
+                return self.aggregator.frame(symbol, include_partial)
+            if self.resampler is None:
+                raise ValueError(f"{timeframe} bars are not built by this feed")
+            forming = self.aggregator.forming(symbol)
+            if include_partial and forming is not None:
+                self.resampler.update(symbol, forming, closed=False)
+            return self.resampler.frame(symbol, timeframe, include_partial)
+
+class OrderBookFeed:
+    def __init__(self, streamer: WebSocketStreamer, symbols: List[str], fetch_snapshot: Callable[[str], Dict],
+                 speed: Optional[str] = "100ms", buffer: int = 10_000, retry_delay: float = 1.0):
+        """
+        Live L2 books from the depth diff stream.
+
+        Diffs are applied on the streamer's event loop as they arrive, a
+        drained batch at a time under one lock. A book without a snapshot (at
+        start, or after a sequence gap) buffers diffs while fetch_snapshot
+        runs in a worker thread, then replays them (see L2OrderBook).
+
+        Args:
+            streamer (WebSocketStreamer): Stream to subscribe depth on.
+            symbols (List[str]): Trading pairs to keep books for.
+            fetch_snapshot (Callable[[str], Dict]): Blocking REST snapshot of a symbol's
+                book, e.g. lambda s: exchange.fetch_order_book(s, 1000).
+            speed (Optional[str]): Depth stream update speed ('100ms'; None for the default).
+            buffer (int): Diffs buffered per symbol while waiting for a snapshot.
+            retry_delay (float): Seconds before a failed snapshot is retried.
+        """
+        self.streamer = streamer
+        self.symbols = list(symbols)
+        self.fetch_snapshot = fetch_snapshot
+        self.channel = f"depth@{speed}" if speed else "depth"
+        self.retry_delay = retry_delay
+        self.books: Dict[str, L2OrderBook] = {symbol: L2OrderBook(symbol, buffer) for symbol in self.symbols}
+        self.on_book: Optional[Callable[[str, L2OrderBook], None]] = None
+        self._resyncing: Dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def on_depth(self, symbol: str, events: List[Dict]) -> int:
+        """Apply depth diff payloads to symbol's book; returns how many changed it."""
+        book = self.books[symbol]
+        with self._lock:
+            applied = sum(book.on_diff(event) for event in events)
+        if applied:
+            self._notify(symbol, book)
+        return applied
+
+    def _notify(self, symbol: str, book: L2OrderBook) -> None:
+        if self.on_book is not None:
+            try:
+                self.on_book(symbol, book)
+            except Exception as e:
+                logger.error(f"Order book callback failed for {symbol}: {e!r}")
+
+    async def _resync(self, symbol: str):
+        book = self.books[symbol]
+        loop = asyncio.get_running_loop()
+        try:
+            # A snapshot older than the buffered diffs leaves a gap; fetch again until one lines up
+            while book.needs_snapshot:
+                try:
+                    snapshot = await loop.run_in_executor(None, self.fetch_snapshot, symbol)
+                    with self._lock:
+                        book.on_snapshot(snapshot)
+                except Exception as e:
+                    logger.warning(f"{symbol} order book snapshot failed: {e!r}")
+                    await asyncio.sleep(self.retry_delay)
+        finally:
+            del self._resyncing[symbol]
+        logger.info(f"{symbol} order book synced at update {book.last_update_id}")
+        self._notify(symbol, book)
+
+    def _check_sync(self, symbol: str) -> None:
+        if self.books[symbol].needs_snapshot and symbol not in self._resyncing:
+            self._resyncing[symbol] = asyncio.create_task(self._resync(symbol))
+
+    async def _consume(self, symbol: str, queue: StreamQueue):
+        # The depth queue blocks the socket reader when full, so this loop must never die
         while True:
+            events = [await queue.get()]
+            while queue.qsize():
+                events.append(queue.get_nowait())
             try:
-                data = await self.websocket.recv()
-                await callback(json.loads(data))
-            except websockets.ConnectionClosed:
-                logger.warning("WebSocket disconnected. Reconnecting...")
-                await self.connect()
\ No newline at end of file
+                self.on_depth(symbol, events)
+            except Exception as e:
+                logger.error(f"{symbol} depth batch dropped: {e!r}")
+                with self._lock:
+                    self.books[symbol].invalidate()  # resync rather than trust the book
+            self._check_sync(symbol)
+
+    async def run(self):
+        # A dropped diff is a sequence gap and costs a snapshot, so depth queues push back
+        tasks = []
+        for symbol in self.symbols:
+            queue = await self.streamer.subscribe(symbol, self.channel, policy="block")
+            tasks.append(asyncio.create_task(self._consume(symbol, queue)))
+            self._check_sync(symbol)
+        try:
+            await self.streamer.run()
+        finally:
+            for task in tasks + list(self._resyncing.values()):
+                task.cancel()
+
+    def start(self) -> None:
+        """Run the feed on a daemon thread with its own event loop."""
+        def target():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self.run())
+            finally:
+                self._loop.close()
+
+        self._thread = threading.Thread(target=target, name="order-book-feed", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._loop is not None and self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.streamer.close(), self._loop)
+
+    def ready(self, symbol: str) -> bool:
+        return not self.books[symbol].needs_snapshot
+
+    def best(self, symbol: str) -> Tuple[Optional[Tuple[float, float]], Optional[Tuple[float, float]]]:
+        """(best bid, best ask) as (price, size), None where a side is empty."""
+        with self._lock:
+            book = self.books[symbol]
+            return book.best_bid(), book.best_ask()
+
+    def vwap(self, symbol: str, side: str, amount: float) -> Optional[float]:
+        with self._lock:
+            return self.books[symbol].vwap(side, amount)
+
+    def slippage_bps(self, symbol: str, side: str, amount: float) -> Optional[float]:
+        with self._lock:
+            return self.books[symbol].slippage_bps(side, amount)
+
+    def imbalance(self, symbol: str, depth: int = 10) -> Optional[float]:
+        with self._lock:
+            return self.books[symbol].imbalance(depth)
+
+    def snapshot(self, symbol: str, depth: Optional[int] = None) -> Dict:
+        """Copy of symbol's book in ccxt format."""
+        with self._lock:
+            return self.books[symbol].to_dict(depth)
@@ -0,0 +1,162 @@
+# src/data/sweep.py
+import itertools
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+from src.data.backtester import Backtester
+from src.strategies.strategy_factory import StrategyFactory
+from src.monitoring.logger import logger
+
+PRICE_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+class SharedOHLCV:
+    def __init__(self, data: pd.DataFrame):
+        """
+        Copy OHLCV columns once into a shared memory block.
+
+        Layout: n int64 timestamps followed by five contiguous float64 columns.
+        Workers attach by name and wrap the block without copying it.
+
+        Args:
+            data (pd.DataFrame): Frame with timestamp and OHLCV columns.
+        """
+        self.length = len(data)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(self.length * 8 * 6, 1))
+        timestamps, prices = self._views(self.shm.buf, self.length)
+        timestamps[:] = data["timestamp"].to_numpy(dtype=np.int64)
+        prices[:] = data[PRICE_COLUMNS].to_numpy(dtype=np.float64).T
+
+    @staticmethod
+    def _views(buf, length: int) -> Tuple[np.ndarray, np.ndarray]:
+        timestamps = np.ndarray((length,), dtype=np.int64, buffer=buf)
+        prices = np.ndarray((len(PRICE_COLUMNS), length), dtype=np.float64, buffer=buf, offset=length * 8)
+        return timestamps, prices
+
+    @property
+    def spec(self) -> Tuple[str, int]:
+        """Picklable handle passed to workers instead of the data."""
+        return self.shm.name, self.length
+
+    @classmethod
+    def attach(cls, spec: Tuple[str, int]) -> Tuple[shared_memory.SharedMemory, pd.DataFrame]:
+        """Open a block created by another process and wrap it as a read-only frame."""
+        name, length = spec
+        # Pool workers share the creator's resource tracker, so the block is
+        # unlinked exactly once, by SharedOHLCV.close in the creating process
+        shm = shared_memory.SharedMemory(name=name)
+        timestamps, prices = cls._views(shm.buf, length)
+        timestamps.flags.writeable = False
+        prices.flags.writeable = False
+        columns = {"timestamp": timestamps}
+        columns.update(zip(PRICE_COLUMNS, prices))
+        return shm, pd.DataFrame(columns, copy=False)
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self) -> "SharedOHLCV":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Per-process state, set once by _init_worker
+_worker: Dict[str, Any] = {}
+
+def _init_worker(spec: Tuple[str, int], strategy_config: Dict, initial_balance: float):
+    shm, data = SharedOHLCV.attach(spec)
+    _worker.update(shm=shm, data=data, strategy_config=strategy_config, initial_balance=initial_balance)
+
+def _run_one(params: Dict) -> Dict:
+    strategy = StrategyFactory.create_strategy(_worker["strategy_config"])
+    backtester = Backtester(strategy, initial_balance=_worker["initial_balance"])
+    report = backtester.run(_worker["data"], params)
+    return {**params, **report}
+
+class ParameterSweep:
+    def __init__(self, strategy: Union[str, Dict], initial_balance: float = 10000.0,
+                 processes: Optional[int] = None, batched: bool = True):
+        """
+        Backtest a grid of parameters for a registered strategy in parallel.
+
+        Args:
+            strategy (Union[str, Dict]): Registered strategy type or full strategy config.
+            initial_balance (float): Starting balance for every backtest.
+            processes (Optional[int]): Worker processes (default: CPU count). 1 runs in-process.
+            batched (bool): Let strategies with a batched grid path (evaluate_grid)
+                score the whole grid at once instead of one backtest per set.
+        """
+        self.strategy_config = {"type": strategy} if isinstance(strategy, str) else strategy
+        if self.strategy_config["type"] not in StrategyFactory.strategy_types():
+            raise ValueError(f"Unknown strategy type: {self.strategy_config['type']}")
+        self.initial_balance = initial_balance
+        self.processes = processes or mp.cpu_count()
+        self.batched = batched
+
+    @staticmethod
+    def expand_grid(grid: Dict[str, List], base_params: Optional[Dict] = None) -> List[Dict]:
+        """Cartesian product of the grid, each merged over base_params."""
+        keys = list(grid)
+        return [
+            {**(base_params or {}), **dict(zip(keys, values))}
+            for values in itertools.product(*(grid[key] for key in keys))
+        ]
+
+    def _evaluate_batch(self, data: pd.DataFrame, combos: List[Dict]) -> Optional[List[Dict]]:
+        """All reports from the strategy's evaluate_grid, or None if it has no batched path."""
+        strategy = StrategyFactory.create_strategy(self.strategy_config)
+        try:
+            return strategy.evaluate_grid(data, combos, self.initial_balance)
+        except NotImplementedError:
+            return None
+
+    def iter_results(self, data: pd.DataFrame, grid: Dict[str, List],
+                     base_params: Optional[Dict] = None) -> Iterator[Dict]:
+        """
+        Yield one report per parameter combination as soon as it completes.
+
+        Each report holds the combination's parameters plus Backtester metrics.
+        """
+        combos = self.expand_grid(grid, base_params)
+        if not combos:
+            return
+
+        reports = self._evaluate_batch(data, combos) if self.batched else None
+        if reports is not None:
+            logger.info(f"Evaluated {len(combos)} parameter sets over {len(data)} bars in one batch")
+            for params, report in zip(combos, reports):
+                yield {**params, **report}
+            return
+
+        logger.info(f"Sweeping {len(combos)} parameter sets over {len(data)} bars with {self.processes} processes")
+
+        if self.processes == 1:
+            _worker.update(data=data, strategy_config=self.strategy_config, initial_balance=self.initial_balance)
+            try:
+                yield from map(_run_one, combos)
+            finally:
+                _worker.clear()
+            return
+
+        with SharedOHLCV(data) as shared:
+            initargs = (shared.spec, self.strategy_config, self.initial_balance)
+            # Small chunks keep results streaming while amortizing IPC
+            chunksize = max(1, len(combos) // (self.processes * 8))
+            with mp.Pool(self.processes, initializer=_init_worker, initargs=initargs) as pool:
+                yield from pool.imap_unordered(_run_one, combos, chunksize=chunksize)
+
+    def run(self, data: pd.DataFrame, grid: Dict[str, List], base_params: Optional[Dict] = None,
+            rank_by: str = "return_pct") -> pd.DataFrame:
+        """Run the full sweep and return results ranked best-first by `rank_by`."""
+        results = list(self.iter_results(data, grid, base_params))
+        return self.rank(results, rank_by)
+
+    @staticmethod
+    def rank(results: List[Dict], rank_by: str = "return_pct") -> pd.DataFrame:
+        table = pd.DataFrame(results)
+        if table.empty:
+            return table
+        return table.sort_values(rank_by, ascending=False, kind="mergesort").reset_index(drop=True)
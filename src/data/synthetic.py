@@ -0,0 +1,85 @@
+# src/data/synthetic.py
+from typing import Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from src.core.utils import timeframe_to_seconds
+from src.data.storage import OHLCV_COLUMNS
+
+# Per-bar (drift, volatility) of each regime, as log returns
+REGIMES: Dict[str, Tuple[float, float]] = {
+    "bull": (0.00003, 0.001),
+    "bear": (-0.00003, 0.0012),
+    "range": (0.0, 0.0006),
+    "volatile": (0.0, 0.0025),
+}
+
+def generate_ohlcv(bars: int, timeframe: str = "1m", seed: int = 0, start_price: float = 30000.0,
+                   start: int = 1_609_459_200_000, mean_regime_bars: int = 2000,
+                   gap_prob: float = 0.0005, gap_size: float = 0.02, missing_prob: float = 0.0,
+                   regimes: Optional[Dict[str, Tuple[float, float]]] = None,
+                   with_regime: bool = False) -> pd.DataFrame:
+    """
+    Generate reproducible OHLCV bars from a regime-switching random walk.
+
+    Closes follow a geometric random walk whose drift and volatility switch
+    between regimes after geometrically distributed runs. Gaps come in two
+    kinds: price gaps, where a bar opens away from the previous close, and
+    missing bars, dropped from the output as an exchange outage would.
+
+    Args:
+        bars (int): Number of bars to simulate (before missing bars are dropped).
+        timeframe (str): Bar timeframe, which spaces the timestamps.
+        seed (int): Random seed; the same arguments always give the same frame.
+        start_price (float): Open of the first bar.
+        start (int): Timestamp of the first bar, ms since epoch.
+        mean_regime_bars (int): Average bars a regime lasts.
+        gap_prob (float): Chance a bar opens with a price gap.
+        gap_size (float): Standard deviation of a price gap, as a log return.
+        missing_prob (float): Chance a bar is missing.
+        regimes (Optional[Dict]): Regime name -> (drift, volatility); defaults to REGIMES.
+        with_regime (bool): Add a 'regime' column naming each bar's regime.
+
+    Returns:
+        pd.DataFrame: OHLCV_COLUMNS (plus 'regime' if requested).
+    """
+    rng = np.random.default_rng(seed)
+    regimes = regimes or REGIMES
+    names = list(regimes)
+    drift = np.array([regimes[name][0] for name in names])
+    volatility = np.array([regimes[name][1] for name in names])
+
+    # Regime runs: geometric lengths, each switching to a different regime
+    runs = rng.geometric(1 / mean_regime_bars, size=bars // mean_regime_bars * 2 + 2)
+    while runs.sum() < bars:
+        runs = np.append(runs, rng.geometric(1 / mean_regime_bars, size=len(runs)))
+    steps = rng.integers(1, len(names), size=len(runs))
+    labels = np.cumsum(np.concatenate(([rng.integers(len(names))], steps[1:]))) % len(names)
+    regime = np.repeat(labels, runs)[:bars]
+
+    # Log return from the previous close to this open (gap), then open to close
+    gaps = np.where(rng.random(bars) < gap_prob, rng.normal(0.0, gap_size, bars), 0.0)
+    gaps[0] = 0.0
+    moves = rng.normal(drift[regime], volatility[regime])
+    log_close = np.log(start_price) + np.cumsum(gaps + moves)
+    closes = np.exp(log_close)
+    opens = np.exp(log_close - moves)
+
+    # Wicks extend past the body by a fraction of the regime's volatility
+    wick = volatility[regime]
+    highs = np.maximum(opens, closes) * np.exp(np.abs(rng.normal(0.0, wick)) * 0.5)
+    lows = np.minimum(opens, closes) * np.exp(-np.abs(rng.normal(0.0, wick)) * 0.5)
+    # Volume rises with the size of the move
+    volumes = rng.gamma(2.0, 50.0, bars) * (1 + np.abs(moves) / volatility[regime])
+
+    period_ms = timeframe_to_seconds(timeframe) * 1000
+    timestamps = start + np.arange(bars, dtype=np.int64) * period_ms
+
+    frame = pd.DataFrame(dict(zip(OHLCV_COLUMNS, (timestamps, opens, highs, lows, closes, volumes))))
+    if with_regime:
+        frame["regime"] = np.array(names, dtype=object)[regime]
+    if missing_prob:
+        keep = rng.random(bars) >= missing_prob
+        keep[0] = True
+        frame = frame[keep].reset_index(drop=True)
+    frame.attrs.update(timeframe=timeframe)
+    return frame
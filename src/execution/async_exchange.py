@@ -0,0 +1,97 @@
+# src/execution/async_exchange.py
+import asyncio
+import ccxt
+import ccxt.async_support as ccxt_async
+from typing import Dict, List, Optional
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+from src.monitoring.logger import logger
+from src.monitoring.metrics import record_retry
+
+class AsyncExchange:
+    def __init__(self, exchange_id: str, api_key: str, api_secret: str, max_concurrency: int = 10):
+        """
+        Asyncio exchange wrapper sharing one session and rate limiter.
+
+        A single ccxt async client holds the HTTP session and ccxt's request
+        throttle, so every symbol coroutine goes through the same rate limit.
+        A semaphore additionally bounds requests in flight.
+
+        Args:
+            exchange_id (str): Exchange ID (e.g., 'binance').
+            api_key (str): API key.
+            api_secret (str): API secret.
+            max_concurrency (int): Maximum concurrent REST requests.
+        """
+        self.exchange = getattr(ccxt_async, exchange_id)({
+            "apiKey": api_key,
+            "secret": api_secret,
+            "enableRateLimit": True,  # Built-in rate limiting, shared by all callers
+        })
+        self.max_concurrency = max_concurrency
+        # Created on first use: before 3.10 a Semaphore binds to the loop current
+        # at construction, and the engine builds its exchange before asyncio.run
+        self._slots: Optional[asyncio.Semaphore] = None
+        logger.info(f"Initialized async exchange: {exchange_id}")
+
+    async def _call(self, method: str, *args, **kwargs):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        async with self._slots:
+            return await getattr(self.exchange, method)(*args, **kwargs)
+
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10),
+           retry=retry_if_exception_type(ccxt.NetworkError), before_sleep=record_retry)
+    async def load_markets(self) -> Dict:
+        return await self._call("load_markets")
+
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10),
+           retry=retry_if_exception_type(ccxt.NetworkError), before_sleep=record_retry)
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = "1m", limit: int = 100) -> Optional[List[List]]:
+        """
+        Fetch OHLCV data with retries on network errors.
+
+        Returns:
+            Optional[List[List]]: OHLCV data, or None on exchange errors.
+        """
+        try:
+            data = await self._call("fetch_ohlcv", symbol, timeframe=timeframe, limit=limit)
+            logger.debug(f"Fetched {len(data)} OHLCV bars for {symbol}")
+            return data
+        except ccxt.NetworkError as e:
+            logger.warning(f"Network error fetching OHLCV: {e}")
+            raise
+        except ccxt.ExchangeError as e:
+            logger.error(f"Exchange error: {e}")
+            return None
+
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10),
+           retry=retry_if_exception_type(ccxt.NetworkError), before_sleep=record_retry)
+    async def place_order(self, symbol: str, side: str, amount: float, order_type: str = "market",
+                          price: Optional[float] = None) -> Optional[Dict]:
+        """
+        Place an order with retries on network errors.
+
+        Returns:
+            Optional[Dict]: Order details, or None if rejected.
+        """
+        try:
+            order = await self._call("create_order", symbol, order_type, side, amount, price)
+            logger.info(f"Order placed: {order['id']} ({side} {amount} {symbol})")
+            return order
+        except ccxt.InsufficientFunds as e:
+            logger.error(f"Insufficient funds: {e}")
+            return None
+        except ccxt.NetworkError as e:
+            logger.warning(f"Network error placing order: {e}")
+            raise
+        except ccxt.ExchangeError as e:
+            logger.error(f"Exchange error: {e}")
+            return None
+
+    async def get_balance(self, currency: str) -> float:
+        balance = await self._call("fetch_balance")
+        return balance["total"].get(currency, 0.0)
+
+    async def close(self):
+        """Close the shared HTTP session."""
+        await self.exchange.close()
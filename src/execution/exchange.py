@@ -1,29 +1,188 @@
 # src/execution/exchange.py
-import ccxt
+import json
+import os
+import threading
 import time
-from typing import Dict, List, Optional
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
 from tenacity import retry, stop_after_attempt, wait_exponential
+from src.core.utils import lazy_import
+from src.execution.throttling import RequestCoalescer, TokenBucket, TTLCache
 from src.monitoring.logger import logger
+from src.monitoring.metrics import METRICS, record_retry
+
+ccxt = lazy_import("ccxt")
+
+# Request-weight budgets per exchange: weight units per minute, plus the weight
+# of each ccxt call (unlisted calls cost 1). Binance publishes its weights;
+# other venues get a conservative flat budget.
+EXCHANGE_WEIGHT_LIMITS = {
+    "binance": {
+        "per_minute": 6000,
+        "weights": {
+            "load_markets": 20,
+            "fetch_balance": 20,
+            "fetch_ticker": 2,
+            "fetch_tickers": 80,
+            "fetch_ohlcv": 2,
+            "fetch_order_book": 5,
+            "create_order": 1,
+            "cancel_order": 1,
+            "fetch_order": 4,
+        },
+    },
+}
+DEFAULT_WEIGHT_LIMIT = {"per_minute": 600, "weights": {}}
+
+REST_CALLS = METRICS.counter("exchange_requests_total", "REST calls sent to the exchange", ("exchange", "method"))
+REST_SECONDS = METRICS.histogram("exchange_request_seconds", "REST call latency, rate-limit wait included",
+                                 ("exchange", "method"))
 
 class Exchange:
-    def __init__(self, exchange_id: str, api_key: str, api_secret: str):
+    # Markets rarely change; share them across every Exchange built in this process
+    _markets: Dict[str, Dict] = {}
+    _markets_lock = threading.Lock()
+    # One limiter per exchange id, since the budget belongs to the account/IP
+    _limiters: Dict[str, TokenBucket] = {}
+
+    def __init__(self, exchange_id: str, api_key: str, api_secret: str,
+                 balance_ttl: float = 5.0, ticker_ttl: float = 1.0, client=None,
+                 markets_cache: Optional[str] = None, markets_ttl: float = 86400.0):
         """
-        Advanced exchange wrapper with retries and rate limiting.
+        Advanced exchange wrapper with retries, rate limiting and request caching.
+
+        Balances and tickers are cached for a few seconds and invalidated after
+        orders, concurrent identical requests share one REST call, and every
+        call draws its weight from a per-exchange token bucket.
 
         Args:
             exchange_id (str): Exchange ID (e.g., 'binance').
             api_key (str): API key.
             api_secret (str): API secret.
+            balance_ttl (float): Seconds a fetched balance is reused.
+            ticker_ttl (float): Seconds a fetched ticker price is reused.
+            client: Pre-built ccxt-compatible client (skips ccxt construction).
+            markets_cache (Optional[str]): Directory keeping load_markets results across restarts.
+            markets_ttl (float): Seconds cached markets are used without a refresh.
         """
-        self.exchange = getattr(ccxt, exchange_id)({
+        self.exchange_id = exchange_id
+        self.exchange = client if client is not None else getattr(ccxt, exchange_id)({
             "apiKey": api_key,
             "secret": api_secret,
             "enableRateLimit": True,  # Built-in rate limiting
         })
+        limits = EXCHANGE_WEIGHT_LIMITS.get(exchange_id, DEFAULT_WEIGHT_LIMIT)
+        self.weights = limits["weights"]
+        if exchange_id not in Exchange._limiters:
+            Exchange._limiters[exchange_id] = TokenBucket(limits["per_minute"], limits["per_minute"] / 60.0)
+        self.limiter = Exchange._limiters[exchange_id]
+
+        self._coalescer = RequestCoalescer()
+        self._balances = TTLCache(balance_ttl)
+        self._tickers = TTLCache(ticker_ttl)
+        self.markets_path = Path(markets_cache) / f"{exchange_id}.json" if markets_cache else None
+        self.markets_ttl = markets_ttl
+        self.markets_refresh: Optional[threading.Thread] = None
         logger.info(f"Initialized exchange: {exchange_id}")
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
-    def fetch_ohlcv(self, symbol: str, timeframe: str = "1m", limit: int = 100) -> Optional[List[List]]:
+    def _request(self, method: str, *args, **kwargs):
+        """Rate-limited ccxt call; concurrent identical calls share one request."""
+        key = (method, repr(args), repr(sorted(kwargs.items())))
+
+        def call():
+            REST_CALLS.labels(self.exchange_id, method).inc()
+            with REST_SECONDS.labels(self.exchange_id, method).time():
+                self.limiter.acquire(self.weights.get(method, 1))
+                return getattr(self.exchange, method)(*args, **kwargs)
+
+        return self._coalescer.call(key, call)
+
+    def load_markets(self) -> Dict:
+        """
+        Load market metadata once per process and exchange id.
+
+        With a markets cache, a restart takes them from disk instead of the
+        network: as they are while younger than markets_ttl, and when older
+        still, while a background thread fetches a fresh copy.
+        """
+        with Exchange._markets_lock:
+            markets = Exchange._markets.get(self.exchange_id)
+            if markets is None:
+                markets, age = self._read_markets_cache()
+                if markets is None:
+                    markets = self._request("load_markets")
+                    self._write_markets_cache(markets)
+                    logger.debug(f"Loaded {len(markets)} markets for {self.exchange_id}")
+                else:
+                    self.exchange.set_markets(markets)
+                    logger.debug(f"Loaded {len(markets)} cached markets for {self.exchange_id} ({age:.0f}s old)")
+                    if age > self.markets_ttl:
+                        self.markets_refresh = threading.Thread(target=self._refresh_markets_quietly,
+                                                                name="markets-refresh", daemon=True)
+                        self.markets_refresh.start()
+                Exchange._markets[self.exchange_id] = markets
+            else:
+                self.exchange.set_markets(markets)
+        return markets
+
+    def refresh_markets(self) -> Dict:
+        """Fetch markets from the exchange, replacing the shared and on-disk copies."""
+        markets = self._request("load_markets", True)
+        self._store_markets(markets)
+        return markets
+
+    def _store_markets(self, markets: Dict):
+        with Exchange._markets_lock:
+            Exchange._markets[self.exchange_id] = markets
+        self._write_markets_cache(markets)
+        logger.info(f"Refreshed {len(markets)} markets for {self.exchange_id}")
+
+    def _refresh_markets_quietly(self):
+        """
+        Background refresh. load_markets rebuilds a ccxt client's market tables
+        in place, so it runs on a separate public client while the trading
+        thread keeps using this one; the result is swapped in with set_markets.
+        Clients that are not ccxt's (paper, tests) are refreshed in place.
+        """
+        try:
+            if isinstance(self.exchange, ccxt.Exchange):
+                client = type(self.exchange)({"enableRateLimit": True})
+                self.limiter.acquire(self.weights.get("load_markets", 1))
+                markets = client.load_markets(True)
+                self.exchange.set_markets(markets)
+                self._store_markets(markets)
+            else:
+                self.refresh_markets()
+        except Exception as e:
+            logger.warning(f"Background markets refresh failed, keeping cached markets: {e}")
+
+    def _read_markets_cache(self) -> Tuple[Optional[Dict], float]:
+        if self.markets_path is None or not self.markets_path.exists():
+            return None, 0.0
+        try:
+            with open(self.markets_path) as f:
+                cached = json.load(f)
+            return cached["markets"], time.time() - cached["fetched_at"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable markets cache {self.markets_path}: {e}")
+            return None, 0.0
+
+    def _write_markets_cache(self, markets: Dict):
+        if self.markets_path is None:
+            return
+        try:
+            self.markets_path.parent.mkdir(parents=True, exist_ok=True)
+            partial = self.markets_path.with_suffix(".tmp")
+            with open(partial, "w") as f:
+                json.dump({"fetched_at": time.time(), "markets": markets}, f)
+            os.replace(partial, self.markets_path)  # readers never see a half-written file
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not cache markets for {self.exchange_id}: {e}")
+
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10),
+           before_sleep=record_retry)
+    def fetch_ohlcv(self, symbol: str, timeframe: str = "1m", limit: int = 100,
+                    since: Optional[int] = None) -> Optional[List[List]]:
         """
         Fetch OHLCV data with retries for robustness.
 
@@ -31,12 +190,14 @@ class Exchange:
             symbol (str): Trading pair (e.g., 'BTC/USDT').
             timeframe (str): Timeframe (e.g., '1m').
             limit (int): Number of data points.
+            since (Optional[int]): First bar's timestamp (ms); the latest bars when omitted.
 
         Returns:
             Optional[List[List]]: OHLCV data or None.
         """
         try:
-            data = self.exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
+            params = {"since": since} if since is not None else {}
+            data = self._request("fetch_ohlcv", symbol, timeframe=timeframe, limit=limit, **params)
             logger.debug(f"Fetched {len(data)} OHLCV bars for {symbol}")
             return data
         except ccxt.NetworkError as e:
@@ -46,8 +207,10 @@ class Exchange:
             logger.error(f"Exchange error: {e}")
             return None
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
-    def place_order(self, symbol: str, side: str, amount: float, order_type: str = "market") -> Optional[Dict]:
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10),
+           before_sleep=record_retry)
+    def place_order(self, symbol: str, side: str, amount: float, order_type: str = "market",
+                    price: Optional[float] = None) -> Optional[Dict]:
         """
         Place an order with retries and error handling.
 
@@ -56,12 +219,15 @@ class Exchange:
             side (str): 'buy' or 'sell'.
             amount (float): Order amount.
             order_type (str): 'market' or 'limit'.
+            price (Optional[float]): Limit price (ignored for market orders).
 
         Returns:
             Optional[Dict]: Order details or None.
         """
         try:
-            order = self.exchange.create_order(symbol, order_type, side, amount)
+            # Orders are never coalesced: two identical orders are two orders
+            self.limiter.acquire(self.weights.get("create_order", 1))
+            order = self.exchange.create_order(symbol, order_type, side, amount, price)
             logger.info(f"Order placed: {order['id']} ({side} {amount} {symbol})")
             return order
         except ccxt.InsufficientFunds as e:
@@ -73,6 +239,34 @@ class Exchange:
         except ccxt.ExchangeError as e:
             logger.error(f"Exchange error: {e}")
             return None
+        finally:
+            # A fill (or a partial one before an error) moves balances and prices
+            self._balances.invalidate()
+            self._tickers.invalidate(symbol)
+
+    def cancel_order(self, order_id: str, symbol: Optional[str] = None) -> Optional[Dict]:
+        """Cancel an open order; returns the exchange response."""
+        self.limiter.acquire(self.weights.get("cancel_order", 1))
+        try:
+            return self.exchange.cancel_order(order_id, symbol)
+        finally:
+            self._balances.invalidate()
+
+    def fetch_order(self, order_id: str, symbol: Optional[str] = None) -> Dict:
+        """Current state of an order."""
+        return self._request("fetch_order", order_id, symbol)
+
+    def fetch_order_book(self, symbol: str, limit: Optional[int] = None) -> Dict:
+        """Current order book (ccxt format: bids and asks as [price, amount], best first)."""
+        return self._request("fetch_order_book", symbol, limit)
+
+    def fetch_balance(self) -> Dict:
+        """Full balance, reused for balance_ttl seconds."""
+        balance = self._balances.get("balance")
+        if balance is None:
+            balance = self._request("fetch_balance")
+            self._balances.set("balance", balance)
+        return balance
 
     def get_balance(self, currency: str) -> float:
         """
@@ -84,5 +278,52 @@ class Exchange:
         Returns:
             float: Balance amount.
         """
-        balance = self.exchange.fetch_balance()
-        return balance["total"].get(currency, 0.0)
\ No newline at end of file
+        return self.fetch_balance()["total"].get(currency, 0.0)
+
+    def get_last_price(self, symbol: str) -> float:
+        """Last traded price of one symbol (KeyError if the exchange has none)."""
+        return self.get_last_prices([symbol])[symbol]
+
+    def get_last_prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        """
+        Last traded prices for several symbols.
+
+        Fresh cached tickers are reused; the rest are fetched with a single
+        fetch_tickers call where the exchange supports it, and one by one
+        where that call left them out. A symbol the exchange has no last
+        price for (delisted, halted) is left out rather than failing the
+        others; network errors still raise.
+
+        Args:
+            symbols (Iterable[str]): Trading pairs.
+
+        Returns:
+            Dict[str, float]: Symbol -> last price.
+        """
+        prices, missing = {}, []
+        for symbol in dict.fromkeys(symbols):
+            price = self._tickers.get(symbol)
+            if price is None:
+                missing.append(symbol)
+            else:
+                prices[symbol] = price
+
+        tickers = {}
+        if len(missing) > 1 and self.exchange.has.get("fetchTickers"):
+            tickers = self._request("fetch_tickers", missing)
+
+        for symbol in missing:
+            ticker = tickers.get(symbol)
+            if ticker is None:
+                try:
+                    ticker = self._request("fetch_ticker", symbol)
+                except ccxt.ExchangeError as e:
+                    logger.warning(f"No ticker for {symbol}: {e}")
+                    continue
+            price = ticker.get("last")
+            if price is None:
+                logger.warning(f"No last price for {symbol}")
+                continue
+            self._tickers.set(symbol, price)
+            prices[symbol] = price
+        return prices
@@ -0,0 +1,266 @@
+# src/execution/order_journal.py
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from src.monitoring.logger import logger
+
+# Order lifecycle; filled, canceled, rejected and expired are terminal
+TRANSITIONS = {
+    "pending": {"open", "partially_filled", "filled", "canceled", "rejected"},
+    "open": {"partially_filled", "filled", "canceled", "expired"},
+    "partially_filled": {"partially_filled", "filled", "canceled", "expired"},
+    "filled": set(),
+    "canceled": set(),
+    "rejected": set(),
+    "expired": set(),
+}
+TERMINAL = {status for status, nxt in TRANSITIONS.items() if not nxt}
+
+_UPSERT_ORDER = """
+    INSERT INTO journal_orders (id, symbol, side, type, amount, price, filled, average, status, position_id,
+                                created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (id) DO UPDATE SET
+        filled = excluded.filled,
+        average = excluded.average,
+        status = excluded.status,
+        updated_at = excluded.updated_at
+"""
+_INSERT_EVENT = "INSERT INTO journal_events (order_id, status, filled, timestamp) VALUES (?, ?, ?, ?)"
+_OPEN_POSITION = """
+    INSERT OR REPLACE INTO journal_positions (id, symbol, side, amount, entry_price, stop_loss, take_profit,
+                                              status, opened_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, 'open', ?)
+"""
+_CLOSE_POSITION = """
+    UPDATE journal_positions SET status = 'closed', exit_price = ?, pnl = ?, reason = ?, closed_at = ?
+    WHERE id = ?
+"""
+
+def order_status(order: Dict) -> str:
+    """Map a ccxt order's status onto the journal's state machine."""
+    status = order.get("status")
+    if status == "closed":
+        return "filled"
+    if status in ("canceled", "rejected", "expired"):
+        return status
+    if status == "open":
+        return "partially_filled" if order.get("filled") else "open"
+    return "pending"
+
+class OrderJournal:
+    def __init__(self, db_path: str = "data/orders.db", flush_interval: float = 0.05, batch_size: int = 1000):
+        """
+        Write-behind journal of orders, their status transitions and positions.
+
+        Callers validate transitions against in-memory state and return
+        immediately; a background thread commits queued writes in grouped
+        transactions. Committed state survives a crash and is reloaded by
+        open_positions() on the next start.
+
+        Args:
+            db_path (str): SQLite file (':memory:' for tests).
+            flush_interval (float): Longest a write waits before its batch commits, seconds.
+            batch_size (int): Most writes per transaction.
+        """
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.orders: Dict[str, Dict] = {}
+        # Recently finished orders, so late or duplicate updates are still checked
+        self._finished: "OrderedDict[str, str]" = OrderedDict()
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=64)
+        self._db_lock = threading.Lock()
+        self._configure()
+        self._create_tables()
+        self._load_orders()
+
+        self._queue: queue.Queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="order-journal", daemon=True)
+        self._writer.start()
+
+    def _configure(self):
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL: a commit survives a process crash; only an OS crash can lose the last batches
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+    def _create_tables(self):
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS journal_orders (
+                    id TEXT PRIMARY KEY,
+                    symbol TEXT,
+                    side TEXT,
+                    type TEXT,
+                    amount REAL,
+                    price REAL,
+                    filled REAL,
+                    average REAL,
+                    status TEXT,
+                    position_id TEXT,
+                    created_at REAL,
+                    updated_at REAL
+                );
+                CREATE TABLE IF NOT EXISTS journal_events (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    order_id TEXT,
+                    status TEXT,
+                    filled REAL,
+                    timestamp REAL
+                );
+                CREATE TABLE IF NOT EXISTS journal_positions (
+                    id TEXT PRIMARY KEY,
+                    symbol TEXT,
+                    side TEXT DEFAULT 'buy',
+                    amount REAL,
+                    entry_price REAL,
+                    stop_loss REAL,
+                    take_profit REAL,
+                    status TEXT,
+                    exit_price REAL,
+                    pnl REAL,
+                    reason TEXT,
+                    opened_at REAL,
+                    closed_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS journal_orders_live ON journal_orders (status);
+                CREATE INDEX IF NOT EXISTS journal_positions_open ON journal_positions (status);
+            """)
+            # Journals from before positions had a side only ever held longs
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(journal_positions)")}
+            if "side" not in columns:
+                self.conn.execute("ALTER TABLE journal_positions ADD COLUMN side TEXT DEFAULT 'buy'")
+
+    def _load_orders(self):
+        """Keep non-terminal orders in memory so later transitions can be validated."""
+        placeholders = ", ".join("?" * len(TERMINAL))
+        rows = self.conn.execute(
+            f"SELECT id, symbol, side, status, filled FROM journal_orders WHERE status NOT IN ({placeholders})",
+            tuple(TERMINAL),
+        ).fetchall()
+        for order_id, symbol, side, status, filled in rows:
+            self.orders[order_id] = {"id": order_id, "symbol": symbol, "side": side, "status": status,
+                                     "filled": filled}
+
+    # -- background writer ---------------------------------------------
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            stop = any(op is None for op in batch)
+            ops = [op for op in batch if op is not None]
+            try:
+                with self._db_lock, self.conn:
+                    for sql, params in ops:
+                        self.conn.execute(sql, params)
+            except sqlite3.Error as e:
+                logger.error(f"Order journal write failed ({len(ops)} writes): {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _enqueue(self, sql: str, params: Tuple):
+        self._queue.put((sql, params))
+
+    # -- orders ----------------------------------------------------------
+
+    def record_order(self, order: Dict, position_id: Optional[str] = None) -> str:
+        """
+        Journal a new or updated ccxt order.
+
+        Returns:
+            str: The journal status.
+
+        Raises:
+            ValueError: The update is not a legal transition (e.g. out of a terminal state).
+        """
+        status = order_status(order)
+        finished = self._finished.get(order["id"])
+        if finished is not None:
+            if status != finished:
+                raise ValueError(f"Illegal order transition {finished} -> {status} for {order['id']}")
+            return status  # Duplicate update of a finished order
+        previous = self.orders.get(order["id"])
+        if previous is not None and previous["status"] != status and status not in TRANSITIONS[previous["status"]]:
+            raise ValueError(f"Illegal order transition {previous['status']} -> {status} for {order['id']}")
+        if previous is not None and previous["status"] == status and previous.get("filled") == order.get("filled"):
+            return status  # Nothing changed
+
+        now = time.time()
+        self._enqueue(_UPSERT_ORDER, (
+            order["id"], order.get("symbol"), order.get("side"), order.get("type"), order.get("amount"),
+            order.get("price"), order.get("filled") or 0.0, order.get("average"), status, position_id,
+            now, now,
+        ))
+        self._enqueue(_INSERT_EVENT, (order["id"], status, order.get("filled") or 0.0, now))
+
+        if status in TERMINAL:
+            self.orders.pop(order["id"], None)
+            self._finished[order["id"]] = status
+            if len(self._finished) > 10_000:
+                self._finished.popitem(last=False)
+        else:
+            self.orders[order["id"]] = {"id": order["id"], "symbol": order.get("symbol"), "side": order.get("side"),
+                                        "status": status, "filled": order.get("filled")}
+        return status
+
+    def live_orders(self) -> List[Dict]:
+        """Orders not yet in a terminal state."""
+        return list(self.orders.values())
+
+    # -- positions -------------------------------------------------------
+
+    def open_position(self, position_id: str, position: Dict):
+        """Journal a position opened by entry order position_id."""
+        self._enqueue(_OPEN_POSITION, (
+            position_id, position["symbol"], position.get("side", "buy"), position["amount"], position["entry_price"],
+            position["stop_loss"], position["take_profit"], time.time(),
+        ))
+
+    def close_position(self, position_id: str, exit_price: float, pnl: float, reason: str):
+        self._enqueue(_CLOSE_POSITION, (exit_price, pnl, reason, time.time(), position_id))
+
+    def open_positions(self) -> Dict[str, Dict]:
+        """Committed open positions, keyed by entry order id (CryptoBot.active_positions shape)."""
+        self.flush()
+        with self._db_lock:
+            rows = self.conn.execute("""
+                SELECT id, symbol, side, amount, entry_price, stop_loss, take_profit
+                FROM journal_positions WHERE status = 'open' ORDER BY opened_at
+            """).fetchall()
+        return {
+            row[0]: {"symbol": row[1], "side": row[2], "amount": row[3], "entry_price": row[4],
+                     "stop_loss": row[5], "take_profit": row[6]}
+            for row in rows
+        }
+
+    # -- lifecycle -------------------------------------------------------
+
+    def flush(self):
+        """Block until every queued write is committed."""
+        self._queue.join()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self.conn.close()
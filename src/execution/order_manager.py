@@ -1,72 +1,96 @@
 # src/execution/order_manager.py
-from typing import Dict, Optional
-import sqlite3
+from typing import Callable, Dict, Optional
 from src.execution.exchange import Exchange
+from src.execution.order_journal import OrderJournal
 from src.monitoring.logger import logger
 
 class OrderManager:
-    def __init__(self, exchange: Exchange, db_path: str = "orders.db"):
+    def __init__(self, exchange: Exchange, db_path: str = "data/orders.db", journal: Optional[OrderJournal] = None,
+                 alert: Optional[Callable[[str, str], None]] = None):
         """
-        Professional order manager with database tracking and slippage handling.
+        Professional order manager with journaled order tracking.
 
         Args:
             exchange (Exchange): Initialized exchange wrapper.
-            db_path (str): Path to SQLite database.
+            db_path (str): Path to the journal's SQLite database.
+            journal (Optional[OrderJournal]): Shared journal (opened at db_path if omitted).
+            alert (Optional[Callable[[str, str], None]]): Called with (subject, message)
+                when an order update from the exchange could not be journaled.
         """
         self.exchange = exchange
-        self.conn = sqlite3.connect(db_path)
-        self._create_order_table()
-        logger.info("Order manager initialized")
-
-    def _create_order_table(self):
-        """Create orders table if it doesn't exist."""
-        query = """
-        CREATE TABLE IF NOT EXISTS orders (
-            id TEXT PRIMARY KEY,
-            symbol TEXT,
-            side TEXT,
-            amount REAL,
-            price REAL,
-            status TEXT,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-        """
-        self.conn.execute(query)
+        self.journal = journal or OrderJournal(db_path)
+        self.alert = alert
+        logger.info(f"Order manager initialized ({len(self.journal.live_orders())} live orders in journal)")
 
     def place_order(
-        self, symbol: str, side: str, amount: float, order_type: str = "market", price: Optional[float] = None
+        self, symbol: str, side: str, amount: float, order_type: str = "market", price: Optional[float] = None,
+        position_id: Optional[str] = None
     ) -> Optional[Dict]:
         """
-        Place an order with slippage handling and database tracking.
+        Place an order and journal it.
 
         Args:
             price (Optional[float]): Required for limit orders.
+            position_id (Optional[str]): Entry order id of the position an exit order closes.
         """
         try:
             order = self.exchange.place_order(symbol, side, amount, order_type, price)
-            if order:
-                self._store_order(order)
-                logger.info(f"Order {order['id']} placed successfully")
-            return order
         except Exception as e:
             logger.error(f"Failed to place order: {e}")
             return None
+        if order:
+            # The venue accepted it: a journal failure must not hide a live order from the caller
+            self._journal(order, position_id)
+            logger.info(f"Order {order['id']} placed successfully")
+        return order
+
+    def _journal(self, order: Dict, position_id: Optional[str] = None) -> Optional[str]:
+        """
+        Journal an order the exchange reported, returning its journal status.
+
+        The exchange is past the point of no return, so a write error or an
+        update the journal rejects as an illegal transition (e.g. a venue
+        reporting a partially filled order as open again) is logged and
+        alerted, and the journal keeps its previous state. Returns None then.
+        """
+        try:
+            return self.journal.record_order(order, position_id)
+        except Exception as e:
+            logger.error(f"Order {order['id']} ({order.get('side')} {order.get('amount')} {order.get('symbol')}) "
+                         f"not journaled: {e}")
+            if self.alert is not None:
+                self.alert("Order not journaled", f"{order.get('side')} {order.get('amount')} "
+                                                  f"{order.get('symbol')} ({order['id']}): {e}")
+            return None
+
+    def cancel_order(self, order_id: str, symbol: Optional[str] = None) -> Optional[Dict]:
+        try:
+            order = self.exchange.cancel_order(order_id, symbol)
+        except Exception as e:
+            logger.error(f"Failed to cancel order {order_id}: {e}")
+            return None
+        if order and order.get("id"):
+            self._journal(order)
+        return order
+
+    def sync_orders(self) -> int:
+        """
+        Refresh every live journaled order from the exchange.
 
-    def _store_order(self, order: Dict):
-        """Store order details in the database."""
-        query = """
-        INSERT INTO orders (id, symbol, side, amount, price, status)
-        VALUES (?, ?, ?, ?, ?, ?)
+        Run at startup to catch fills and cancels that happened while the bot
+        was down. Orders the journal cannot take the exchange's state for are
+        skipped (see _journal). Returns the number of orders whose state changed.
         """
-        self.conn.execute(
-            query,
-            (
-                order["id"],
-                order["symbol"],
-                order["side"],
-                order["amount"],
-                order.get("price"),
-                order["status"],
-            ),
-        )
-        self.conn.commit()
\ No newline at end of file
+        changed = 0
+        for known in self.journal.live_orders():
+            try:
+                order = self.exchange.fetch_order(known["id"], known["symbol"])
+            except Exception as e:
+                logger.warning(f"Could not refresh order {known['id']}: {e}")
+                continue
+            before = (known["status"], known.get("filled"))
+            status = self._journal(order)
+            if status is None:
+                continue
+            changed += before != (status, order.get("filled"))
+        return changed
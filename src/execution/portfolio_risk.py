@@ -0,0 +1,221 @@
+# src/execution/portfolio_risk.py
+import math
+from statistics import NormalDist
+from typing import Dict, Optional, Sequence
+import numpy as np
+
+class PortfolioRisk:
+    def __init__(self, symbols: Sequence[str] = (), window: int = 500, confidence: float = 0.99,
+                 horizon_bars: int = 1, min_history: int = 30, max_var_pct: Optional[float] = None,
+                 max_gross_exposure: Optional[float] = None, max_net_exposure: Optional[float] = None,
+                 max_concentration: Optional[float] = None, resync_every: int = 10_000):
+        """
+        Portfolio-level limits across every symbol held.
+
+        Keeps a rolling covariance matrix of per-bar returns, updated in
+        O(k^2) per bar from running sums rather than recomputed over the
+        window. Exposures, their covariance products and the portfolio
+        variance are cached, so a pre-trade check is O(1): a trade changing
+        symbol i's exposure by d moves the variance by 2*d*(S e)_i + d^2*S_ii.
+        Orders that reduce a measure are always allowed, so limits never trap
+        a position.
+
+        Args:
+            symbols (Sequence[str]): Symbols known upfront (others are added on first sight).
+            window (int): Bars of returns in the covariance.
+            confidence (float): Parametric VaR confidence level.
+            horizon_bars (int): VaR horizon, in bars (square-root-of-time scaled).
+            min_history (int): Bars needed before VaR is enforced.
+            max_var_pct (Optional[float]): VaR limit, % of equity.
+            max_gross_exposure (Optional[float]): Sum of |exposure| limit, multiple of equity.
+            max_net_exposure (Optional[float]): |Sum of exposure| limit, multiple of equity.
+            max_concentration (Optional[float]): Single-symbol |exposure| limit, multiple of equity.
+            resync_every (int): Bars between exact recomputations of the running sums.
+        """
+        self.window = window
+        self.z = NormalDist().inv_cdf(confidence)
+        self.horizon_bars = horizon_bars
+        self.min_history = min_history
+        self.max_var_pct = max_var_pct
+        self.max_gross_exposure = max_gross_exposure
+        self.max_net_exposure = max_net_exposure
+        self.max_concentration = max_concentration
+        self.resync_every = max(resync_every, window)
+
+        self.index: Dict[str, int] = {}
+        self._capacity = 0
+        self.quantity = self.price = self.exposure = np.empty(0)
+        self._bar_price = np.empty(0)
+        self._returns = np.empty((window, 0))
+        self._sum = np.empty(0)
+        self._cross = np.empty((0, 0))
+        self._cov = np.empty((0, 0))
+        self._cov_exposure = np.empty(0)
+        self.variance = 0.0
+        self.gross = 0.0
+        self.net = 0.0
+        self.bars = 0
+        self._since_resync = 0
+        for symbol in symbols:
+            self.add_symbol(symbol)
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "PortfolioRisk":
+        return cls(**config)
+
+    def add_symbol(self, symbol: str) -> int:
+        """Index of symbol, adding it (with no return history) if new."""
+        i = self.index.get(symbol)
+        if i is not None:
+            return i
+        i = len(self.index)
+        if i == self._capacity:
+            self._grow(max(8, 2 * self._capacity))
+        self.index[symbol] = i
+        return i
+
+    def _grow(self, capacity: int) -> None:
+        def vector(old):
+            new = np.zeros(capacity)
+            new[:len(old)] = old
+            return new
+
+        def matrix(old):
+            new = np.zeros((capacity, capacity))
+            new[:old.shape[0], :old.shape[1]] = old
+            return new
+
+        self.quantity, self.price, self.exposure = vector(self.quantity), vector(self.price), vector(self.exposure)
+        self._bar_price, self._sum = vector(self._bar_price), vector(self._sum)
+        self._cov_exposure = vector(self._cov_exposure)
+        returns = np.zeros((self.window, capacity))
+        returns[:, :self._capacity] = self._returns
+        self._returns = returns
+        self._cross, self._cov = matrix(self._cross), matrix(self._cov)
+        self._capacity = capacity
+
+    # -- market data ---------------------------------------------------------
+
+    def _apply(self, i: int, delta: float) -> None:
+        """Move symbol i's exposure by delta, updating the cached aggregates in O(k)."""
+        k = len(self.index)
+        old = self.exposure[i]
+        self.variance += 2 * delta * self._cov_exposure[i] + delta * delta * self._cov[i, i]
+        self._cov_exposure[:k] += delta * self._cov[:k, i]
+        self.gross += abs(old + delta) - abs(old)
+        self.net += delta
+        self.exposure[i] = old + delta
+
+    def mark(self, symbol: str, price: float) -> None:
+        """Revalue a symbol's exposure at its latest price."""
+        i = self.add_symbol(symbol)
+        if self.quantity[i]:
+            self._apply(i, self.quantity[i] * (price - self.price[i]))
+        self.price[i] = price
+        if not self._bar_price[i]:
+            self._bar_price[i] = price
+
+    def close_bar(self, prices: Optional[Dict[str, float]] = None) -> None:
+        """
+        Close one bar: mark prices, then add every symbol's return since the
+        previous close_bar to the rolling covariance (0 for symbols without a
+        new price).
+        """
+        for symbol, price in (prices or {}).items():
+            self.mark(symbol, price)
+        k = len(self.index)
+        if not k:
+            return
+        returns = np.zeros(self._capacity)
+        priced = self._bar_price[:k] > 0
+        returns[:k][priced] = self.price[:k][priced] / self._bar_price[:k][priced] - 1
+        self._bar_price[:k] = self.price[:k]
+
+        row = self.bars % self.window
+        if self.bars >= self.window:
+            old = self._returns[row, :k]
+            self._sum[:k] -= old
+            self._cross[:k, :k] -= np.outer(old, old)
+        new = returns[:k]
+        self._returns[row, :k] = new
+        self._sum[:k] += new
+        self._cross[:k, :k] += np.outer(new, new)
+        self.bars += 1
+
+        self._since_resync += 1
+        if self._since_resync >= self.resync_every:
+            # Exact sums from the window, so float drift cannot accumulate
+            filled = self._returns[:min(self.bars, self.window), :k]
+            self._sum[:k] = filled.sum(axis=0)
+            self._cross[:k, :k] = filled.T @ filled
+            self._since_resync = 0
+        self._refresh()
+
+    def _refresh(self) -> None:
+        k = len(self.index)
+        n = min(self.bars, self.window)
+        cov = self._cov[:k, :k]
+        if n > 1:
+            np.subtract(self._cross[:k, :k], np.outer(self._sum[:k], self._sum[:k]) / n, out=cov)
+            cov /= n - 1
+        else:
+            cov[:] = 0.0
+        exposure = self.exposure[:k]
+        np.dot(cov, exposure, out=self._cov_exposure[:k])
+        self.variance = float(exposure @ self._cov_exposure[:k])
+        self.gross = float(np.abs(exposure).sum())
+        self.net = float(exposure.sum())
+
+    # -- positions -----------------------------------------------------------
+
+    def apply_fill(self, symbol: str, side: str, amount: float, price: float) -> None:
+        """Book a filled order into the cached exposures."""
+        i = self.add_symbol(symbol)
+        if not self.price[i]:
+            self.mark(symbol, price)
+        quantity = amount if side == "buy" else -amount
+        self.quantity[i] += quantity
+        self._apply(i, quantity * self.price[i])
+
+    # -- limits --------------------------------------------------------------
+
+    def value_at_risk(self, variance: Optional[float] = None) -> float:
+        """Parametric VaR over horizon_bars, in quote currency."""
+        variance = self.variance if variance is None else variance
+        return self.z * math.sqrt(max(variance, 0.0) * self.horizon_bars)
+
+    def check_order(self, symbol: str, side: str, amount: float, price: float, equity: float) -> Optional[str]:
+        """
+        Pre-trade check of an order against the portfolio limits, in O(1).
+
+        Returns:
+            Optional[str]: The breached limit, or None if the order is allowed.
+        """
+        delta = amount * price if side == "buy" else -amount * price
+        i = self.index.get(symbol)
+        current = self.exposure[i] if i is not None else 0.0
+        after = current + delta
+
+        if self.max_concentration is not None and abs(after) > max(self.max_concentration * equity, abs(current)):
+            return f"{symbol} exposure {after:.2f} over {self.max_concentration:g}x equity"
+        gross = self.gross - abs(current) + abs(after)
+        if self.max_gross_exposure is not None and gross > max(self.max_gross_exposure * equity, self.gross):
+            return f"gross exposure {gross:.2f} over {self.max_gross_exposure:g}x equity"
+        net = self.net + delta
+        if self.max_net_exposure is not None and abs(net) > max(self.max_net_exposure * equity, abs(self.net)):
+            return f"net exposure {net:.2f} over {self.max_net_exposure:g}x equity"
+
+        if self.max_var_pct is not None and i is not None and self.bars >= self.min_history:
+            variance = self.variance + 2 * delta * self._cov_exposure[i] + delta * delta * self._cov[i, i]
+            var = self.value_at_risk(variance)
+            if var > max(self.max_var_pct / 100 * equity, self.value_at_risk()):
+                return f"VaR {var:.2f} over {self.max_var_pct:g}% of equity"
+        return None
+
+    def covariance(self) -> np.ndarray:
+        """Current covariance matrix of bar returns, in index order (a copy)."""
+        k = len(self.index)
+        return self._cov[:k, :k].copy()
+
+    def summary(self) -> Dict[str, float]:
+        return {"gross": self.gross, "net": self.net, "var": self.value_at_risk(), "bars": self.bars}
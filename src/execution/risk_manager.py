@@ -3,16 +3,18 @@ import logging
 from typing import Dict, Optional, Tuple
 import pandas as pd
 from datetime import datetime, timedelta
+from src.execution.portfolio_risk import PortfolioRisk
 
 logger = logging.getLogger(__name__)
 
 class RiskManager:
-    def __init__(self, config: Dict):
+    def __init__(self, config: Dict, portfolio: Optional[PortfolioRisk] = None):
         """
         Advanced risk management system with multiple safety mechanisms
         
         Args:
             config (dict): Risk parameters from config.yaml
+            portfolio: Shared portfolio limits (built from config['portfolio'] if omitted)
         """
         # Position sizing parameters
         self.max_position_size = float(config.get("max_position_size", 0.1))  # Max % of portfolio per trade
@@ -21,6 +23,8 @@ class RiskManager:
         # Stop loss/take profit
         self.stop_loss_pct = float(config.get("stop_loss_pct", 2.0))  # 2% stop loss
         self.take_profit_pct = float(config.get("take_profit_pct", 3.0))  # 3% take profit
+        trailing = config.get("trailing_stop_pct")
+        self.trailing_stop_pct = float(trailing) if trailing else None  # Trail below the high since entry
         
         # Circuit breakers
         self.max_daily_drawdown = float(config.get("max_daily_drawdown", 5.0))  # 5% max daily loss
@@ -33,28 +37,36 @@ class RiskManager:
         self.initial_balance = float(config.get("initial_balance", 10000.0))
         self.current_balance = self.initial_balance
 
-    def calculate_position_size(self, entry_price: float, stop_loss_price: float) -> Optional[float]:
+        # Portfolio limits across symbols (exposure, concentration, VaR)
+        if portfolio is None and config.get("portfolio"):
+            portfolio = PortfolioRisk.from_config(config["portfolio"])
+        self.portfolio = portfolio
+
+    def calculate_position_size(self, entry_price: float, stop_loss_price: float,
+                                balance: Optional[float] = None) -> Optional[float]:
         """
         Calculate position size based on risk parameters
         
         Args:
             entry_price: Proposed entry price
             stop_loss_price: Stop loss price
+            balance: Account balance to size against (defaults to tracked balance)
             
         Returns:
             float: Position size in base currency
         """
         try:
-            if entry_price <= stop_loss_price:
-                logger.error("Stop loss price must be below entry price")
+            if entry_price == stop_loss_price:
+                logger.error("Stop loss price must differ from entry price")
                 return None
 
-            risk_per_unit = entry_price - stop_loss_price
-            dollar_risk = self.current_balance * self.risk_per_trade
+            balance = self.current_balance if balance is None else balance
+            risk_per_unit = abs(entry_price - stop_loss_price)  # a short's stop sits above its entry
+            dollar_risk = balance * self.risk_per_trade
             position_size = dollar_risk / risk_per_unit
             
             # Apply position size limits
-            max_size = (self.current_balance * self.max_position_size) / entry_price
+            max_size = (balance * self.max_position_size) / entry_price
             return min(position_size, max_size)
             
         except ZeroDivisionError:
@@ -95,8 +107,38 @@ class RiskManager:
             logger.warning(f"Order size {amount:.4f} exceeds max allowed {max_allowed:.4f}")
             return False
 
+        # Check portfolio limits
+        if self.portfolio is not None:
+            breach = self.portfolio.check_order(symbol, side, amount, price, self.current_balance)
+            if breach:
+                logger.warning(f"Order blocked by portfolio limits: {breach}")
+                return False
+
         return True
 
+    def record_fill(self, symbol: str, side: str, amount: float, price: float):
+        """
+        Book an executed order into the portfolio exposures
+        
+        Args:
+            symbol: Trading pair
+            side: buy/sell
+            amount: Filled amount
+            price: Fill price
+        """
+        if self.portfolio is not None:
+            self.portfolio.apply_fill(symbol, side, amount, price)
+
+    def on_bar(self, prices: Dict[str, float]):
+        """
+        Feed closing prices of a bar to the portfolio covariance
+        
+        Args:
+            prices: Close price per symbol
+        """
+        if self.portfolio is not None:
+            self.portfolio.close_bar(prices)
+
     def update_risk_state(self, pnl: float, success: bool):
         """
         Update risk parameters after completed trade
@@ -113,18 +155,20 @@ class RiskManager:
         else:
             self.consecutive_losses += 1
 
-    def generate_risk_orders(self, entry_price: float) -> Tuple[float, float]:
+    def generate_risk_orders(self, entry_price: float, side: str = 'buy') -> Tuple[float, float]:
         """
         Generate stop loss and take profit prices
         
         Args:
             entry_price: Trade entry price
+            side: Entry side; a short ('sell') has its stop above the entry and its target below
             
         Returns:
             tuple: (stop_loss_price, take_profit_price)
         """
-        stop_loss = entry_price * (1 - self.stop_loss_pct/100)
-        take_profit = entry_price * (1 + self.take_profit_pct/100)
+        direction = 1 if side == 'buy' else -1
+        stop_loss = entry_price * (1 - direction * self.stop_loss_pct/100)
+        take_profit = entry_price * (1 + direction * self.take_profit_pct/100)
         return (stop_loss, take_profit)
 
     def reset_daily_drawdown(self):
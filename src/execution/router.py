@@ -0,0 +1,170 @@
+# src/execution/router.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence
+from src.data.order_book import ConsolidatedBook
+from src.execution.exchange import Exchange
+from src.monitoring.logger import logger
+
+DEFAULT_TAKER_FEE = 0.001
+
+class OrderRouter:
+    def __init__(self, venues: Dict[str, Exchange], fees: Optional[Dict[str, float]] = None,
+                 symbols: Sequence[str] = (), depth: int = 100, poll_interval: float = 1.0):
+        """
+        Best-price routing across several exchanges.
+
+        Keeps a ConsolidatedBook per symbol, fed by snapshots polled from
+        every venue concurrently (refresh/start) or pushed by a stream
+        (on_snapshot/on_update). An order is split across venues by walking
+        the consolidated levels in order of price net of each venue's taker
+        fee, which for taker orders is the cheapest split there is, and sent
+        as one marketable limit order per venue, capped at the worst level
+        planned there.
+
+        Args:
+            venues (Dict[str, Exchange]): Name -> exchange wrapper.
+            fees (Optional[Dict[str, float]]): Name -> taker fee rate (DEFAULT_TAKER_FEE if missing).
+            symbols (Sequence[str]): Symbols whose books are polled.
+            depth (int): Levels per side requested in each snapshot.
+            poll_interval (float): Seconds between snapshots of a venue when started.
+        """
+        self.venues = dict(venues)
+        self.fees = {name: (fees or {}).get(name, DEFAULT_TAKER_FEE) for name in self.venues}
+        self.symbols = list(symbols)
+        self.depth = depth
+        self.poll_interval = poll_interval
+        self.books: Dict[str, ConsolidatedBook] = {}
+        self.errors = 0
+        self._errors_lock = threading.Lock()  # polled from the pool and one thread per venue
+        self._pool = ThreadPoolExecutor(max_workers=max(len(self.venues), 1), thread_name_prefix="router")
+        self._stop = threading.Event()
+        self._pollers: List[threading.Thread] = []
+
+    @classmethod
+    def from_config(cls, exchanges: Iterable[Dict], symbols: Sequence[str] = (), **params) -> "OrderRouter":
+        """
+        Build from exchange entries shaped like BotConfig.exchanges (id,
+        api_key, api_secret, enabled, taker_fee, markets_cache, markets_ttl);
+        disabled ones are skipped, and markets are cached on disk only where
+        an entry names a markets_cache directory.
+        """
+        venues, fees = {}, {}
+        for entry in exchanges:
+            if not entry.get("enabled", True):
+                continue
+            venues[entry["id"]] = Exchange(entry["id"], entry.get("api_key", ""), entry.get("api_secret", ""),
+                                           markets_cache=entry.get("markets_cache"),
+                                           markets_ttl=entry.get("markets_ttl", 86400.0))
+            fees[entry["id"]] = entry.get("taker_fee", DEFAULT_TAKER_FEE)
+        return cls(venues, fees, symbols, **params)
+
+    def book(self, symbol: str) -> ConsolidatedBook:
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = ConsolidatedBook(symbol, self.fees)
+        return book
+
+    # -- book feeds ------------------------------------------------------
+
+    def on_snapshot(self, venue: str, symbol: str, bids, asks, timestamp: Optional[int] = None) -> None:
+        self.book(symbol).apply_snapshot(venue, bids, asks, timestamp)
+
+    def on_update(self, venue: str, symbol: str, bids, asks, timestamp: Optional[int] = None) -> None:
+        self.book(symbol).apply_update(venue, bids, asks, timestamp)
+
+    def _poll(self, venue: str, symbol: str) -> bool:
+        try:
+            snapshot = self.venues[venue].fetch_order_book(symbol, self.depth)
+        except Exception as e:
+            with self._errors_lock:
+                self.errors += 1
+            logger.warning(f"Order book of {symbol} on {venue} unavailable: {e}")
+            self.book(symbol).remove(venue)  # stale prices would misroute orders
+            return False
+        self.on_snapshot(venue, symbol, snapshot["bids"], snapshot["asks"], snapshot.get("timestamp"))
+        return True
+
+    def refresh(self, symbols: Optional[Iterable[str]] = None) -> int:
+        """Snapshot every venue's book of each symbol, venues in parallel; returns the books refreshed."""
+        jobs = [self._pool.submit(self._poll, venue, symbol)
+                for symbol in (symbols or self.symbols) for venue in self.venues]
+        return sum(job.result() for job in jobs)
+
+    def _poll_loop(self, venue: str):
+        while not self._stop.is_set():
+            for symbol in self.symbols:
+                self._poll(venue, symbol)
+            self._stop.wait(self.poll_interval)
+
+    def start(self) -> None:
+        """Poll each venue on its own daemon thread until stop()."""
+        self._stop.clear()
+        self._pollers = [threading.Thread(target=self._poll_loop, args=(venue,), name=f"router-{venue}", daemon=True)
+                         for venue in self.venues]
+        for poller in self._pollers:
+            poller.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        for poller in self._pollers:
+            poller.join()
+        self._pollers = []
+
+    def close(self) -> None:
+        self.stop()
+        self._pool.shutdown()
+
+    # -- routing ---------------------------------------------------------
+
+    def plan(self, symbol: str, side: str, amount: float, venues: Optional[Iterable[str]] = None) -> List[Dict]:
+        """
+        Split a taker order across venues for the best price after fees.
+
+        Args:
+            symbol (str): Trading pair.
+            side (str): 'buy' or 'sell'.
+            amount (float): Base amount.
+            venues (Optional[Iterable[str]]): Only these venues (all by default).
+
+        Returns:
+            List[Dict]: One child order per venue used, most filled first:
+                venue, amount, price (worst level reached, the child's limit),
+                average, cost and fee. Their amounts sum to less than amount
+                when the books are too thin.
+        """
+        children: Dict[str, Dict] = {}
+        for price, size, venue in self.book(symbol).depth(side, amount, venues=venues):
+            child = children.get(venue)
+            if child is None:
+                child = children[venue] = {"venue": venue, "symbol": symbol, "side": side,
+                                           "amount": 0.0, "cost": 0.0, "price": price}
+            child["amount"] += size
+            child["cost"] += size * price
+            child["price"] = price
+        for child in children.values():
+            child["average"] = child["cost"] / child["amount"]
+            child["fee"] = child["cost"] * self.fees[child["venue"]]
+        planned = sum(child["amount"] for child in children.values())
+        if planned < amount:
+            logger.warning(f"Books cover {planned} of {amount} {symbol} to {side}")
+        return sorted(children.values(), key=lambda child: -child["amount"])
+
+    def route(self, symbol: str, side: str, amount: float, venues: Optional[Iterable[str]] = None) -> List[Dict]:
+        """
+        Plan an order and send its children to their venues concurrently.
+
+        Returns:
+            List[Dict]: The plan, each child with the venue's order (None if rejected) under 'order'.
+        """
+        children = self.plan(symbol, side, amount, venues)
+        orders = [self._pool.submit(self.venues[child["venue"]].place_order, symbol, side, child["amount"],
+                                    "limit", child["price"]) for child in children]
+        for child, order in zip(children, orders):
+            try:
+                child["order"] = order.result()
+            except Exception as e:
+                logger.error(f"Child order on {child['venue']} failed: {e}")
+                child["order"] = None
+        logger.info(f"Routed {side} {amount} {symbol} to {', '.join(c['venue'] for c in children) or 'no venue'}")
+        return children
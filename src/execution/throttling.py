@@ -0,0 +1,123 @@
+# src/execution/throttling.py
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+_MISSING = object()
+
+class TokenBucket:
+    def __init__(self, capacity: float, refill_per_second: float):
+        """
+        Thread-safe token bucket for weighted request budgets.
+
+        Callers reserve tokens up front and sleep off any deficit outside the
+        lock, so concurrent callers queue fairly instead of spinning.
+
+        Args:
+            capacity (float): Maximum burst, in weight units.
+            refill_per_second (float): Weight units restored per second.
+        """
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, weight: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_second)
+            self._updated = now
+            self._tokens -= weight
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.refill_per_second
+
+    def acquire(self, weight: float = 1.0) -> float:
+        """Block until `weight` tokens are available; returns seconds waited."""
+        wait = self._reserve(weight)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def try_acquire(self, weight: float = 1.0) -> bool:
+        """Take `weight` tokens if available right now, without blocking."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_second)
+            self._updated = now
+            if self._tokens < weight:
+                return False
+            self._tokens -= weight
+            return True
+
+class TTLCache:
+    def __init__(self, ttl: float):
+        """
+        Small thread-safe cache whose entries expire `ttl` seconds after being set.
+
+        Args:
+            ttl (float): Entry lifetime in seconds.
+        """
+        self.ttl = ttl
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if time.monotonic() >= expires:
+                del self._entries[key]
+                return default
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, key: Hashable = _MISSING):
+        """Drop one entry, or every entry when called without a key."""
+        with self._lock:
+            if key is _MISSING:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+class RequestCoalescer:
+    def __init__(self):
+        """Collapse concurrent identical requests into a single call."""
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def call(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn, or wait for an identical in-flight call and share its outcome.
+
+        Args:
+            key (Hashable): Identity of the request (method and arguments).
+            fn (Callable): Performs the request.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
@@ -0,0 +1,258 @@
+# src/execution/trigger_index.py
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+class _Bucket:
+    """Trailing positions that share a price peak."""
+    __slots__ = ("peak", "ids")
+
+    def __init__(self, peak: Optional[float], ids: Set[str]):
+        self.peak = peak
+        self.ids = ids
+
+class _TrailGroup:
+    def __init__(self, trail_pct: float, short: bool = False):
+        """
+        Trailing stops with one trail distance, bucketed by peak price.
+
+        Once the price makes a new high every position whose peak is below it
+        shares that peak, so their buckets merge and a rising market costs one
+        merge per tick instead of one update per position. A group of shorts
+        is fed negated prices: its peaks are the negated lows since entry, and
+        the trail sits that many percent above the low.
+        """
+        self.factor = 1 + trail_pct / 100 if short else 1 - trail_pct / 100
+        self.peaks: List[float] = []
+        self.buckets: List[_Bucket] = []
+
+    def add(self, position_id: str, peak: float) -> _Bucket:
+        i = bisect_left(self.peaks, peak)
+        if i < len(self.peaks) and self.peaks[i] == peak:
+            bucket = self.buckets[i]
+            bucket.ids.add(position_id)
+            return bucket
+        bucket = _Bucket(peak, {position_id})
+        self.peaks.insert(i, peak)
+        self.buckets.insert(i, bucket)
+        return bucket
+
+    def discard(self, bucket: _Bucket, position_id: str):
+        bucket.ids.discard(position_id)
+        if not bucket.ids and bucket.peak is not None:
+            i = bisect_left(self.peaks, bucket.peak)
+            while self.buckets[i] is not bucket:
+                i += 1
+            del self.peaks[i], self.buckets[i]
+
+    def raise_peaks(self, price: float, owner: Dict[str, _Bucket]):
+        """Move every bucket peaking below price up to price."""
+        j = bisect_left(self.peaks, price)
+        if not j:
+            return
+        merged = self.buckets[:j]
+        if j < len(self.peaks) and self.peaks[j] == price:
+            merged.append(self.buckets[j])
+            j += 1
+        survivor = max(merged, key=lambda bucket: len(bucket.ids))
+        survivor.peak = price
+        for bucket in merged:
+            if bucket is not survivor:
+                survivor.ids |= bucket.ids
+                for position_id in bucket.ids:
+                    owner[position_id] = survivor
+        self.peaks[:j] = [price]
+        self.buckets[:j] = [survivor]
+
+    def crossed(self, price: float) -> List[str]:
+        """Pop positions whose trailing stop (peak less the trail) is at or above price."""
+        fired = []
+        while self.peaks and self.peaks[-1] * self.factor >= price:
+            self.peaks.pop()
+            bucket = self.buckets.pop()
+            bucket.peak = None  # no longer in the group
+            fired.extend(bucket.ids)
+        return fired
+
+class TriggerIndex:
+    def __init__(self):
+        """
+        Price-sorted stop loss, take profit and trailing stop levels for one symbol.
+
+        Levels that fire when the price falls to them (a long's stop, a short's
+        take profit) sit in ascending order, so the ones a price crossed are
+        always a suffix; levels that fire when the price rises to them are
+        stored negated for the same reason. A tick therefore costs a bisect
+        plus the positions it triggers, regardless of how many stay open.
+        """
+        self._fall_levels: List[float] = []
+        self._fall_ids: List[Tuple[str, str]] = []  # (position_id, reason)
+        self._rise_levels: List[float] = []  # negated
+        self._rise_ids: List[Tuple[str, str]] = []
+        self._groups: Dict[Tuple[float, str], _TrailGroup] = {}
+        self._buckets: Dict[str, _Bucket] = {}
+        self._entries: Dict[str, Tuple[Optional[float], Optional[float], Optional[float], str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, position_id: str) -> bool:
+        return position_id in self._entries
+
+    @staticmethod
+    def _insert(levels: List[float], ids: List[Tuple[str, str]], level: float, key: Tuple[str, str]):
+        i = bisect_right(levels, level)
+        levels.insert(i, level)
+        ids.insert(i, key)
+
+    @staticmethod
+    def _remove(levels: List[float], ids: List[Tuple[str, str]], level: float, key: Tuple[str, str]):
+        i = bisect_left(levels, level)
+        while i < len(levels) and levels[i] == level:
+            if ids[i] == key:
+                del levels[i], ids[i]
+                return
+            i += 1
+
+    def _levels(self, position_id: str, stop_loss: Optional[float], take_profit: Optional[float],
+                side: str) -> List[Tuple[List[float], List[Tuple[str, str]], float, Tuple[str, str]]]:
+        """Where each of a position's fixed levels sits: (levels, ids, stored level, key)."""
+        placed = []
+        for level, reason in ((stop_loss, "stop_loss"), (take_profit, "take_profit")):
+            if level is None:
+                continue
+            falls = (reason == "stop_loss") == (side == "buy")
+            if falls:
+                placed.append((self._fall_levels, self._fall_ids, level, (position_id, reason)))
+            else:
+                placed.append((self._rise_levels, self._rise_ids, -level, (position_id, reason)))
+        return placed
+
+    def add(self, position_id: str, stop_loss: Optional[float] = None, take_profit: Optional[float] = None,
+            trailing_pct: Optional[float] = None, peak: Optional[float] = None, side: str = "buy"):
+        """
+        Index a position's exit levels, replacing any it already has.
+
+        Args:
+            position_id (str): Position key (entry order id).
+            stop_loss (Optional[float]): Exit when the price moves against the
+                position to it (falls to it for a long, rises to it for a short).
+            take_profit (Optional[float]): Exit when the price moves in the
+                position's favour to it.
+            trailing_pct (Optional[float]): Exit when the price moves this many
+                percent against the position from the best price seen since
+                peak was set (the high for a long, the low for a short).
+            peak (Optional[float]): Starting best price for the trailing stop,
+                usually the entry price.
+            side (str): Entry side, 'buy' (long) or 'sell' (short).
+        """
+        if position_id in self._entries:
+            self.remove(position_id)
+        for levels, ids, level, key in self._levels(position_id, stop_loss, take_profit, side):
+            self._insert(levels, ids, level, key)
+        if trailing_pct:
+            if peak is None:
+                raise ValueError("A trailing stop needs a starting peak price")
+            group = self._groups.get((trailing_pct, side))
+            if group is None:
+                group = self._groups[(trailing_pct, side)] = _TrailGroup(trailing_pct, short=side != "buy")
+            self._buckets[position_id] = group.add(position_id, peak if side == "buy" else -peak)
+        self._entries[position_id] = (stop_loss, take_profit, trailing_pct, side)
+
+    def remove(self, position_id: str) -> bool:
+        """Drop a position's levels; returns False if it was not indexed."""
+        entry = self._entries.pop(position_id, None)
+        if entry is None:
+            return False
+        stop_loss, take_profit, trailing_pct, side = entry
+        for levels, ids, level, key in self._levels(position_id, stop_loss, take_profit, side):
+            self._remove(levels, ids, level, key)
+        bucket = self._buckets.pop(position_id, None)
+        if bucket is not None:
+            self._groups[(trailing_pct, side)].discard(bucket, position_id)
+        return True
+
+    def on_price(self, price: float) -> List[Tuple[str, str]]:
+        """
+        Remove and return the positions price triggers.
+
+        Returns:
+            List[Tuple[str, str]]: (position_id, reason) pairs, reason being
+                'stop_loss', 'trailing_stop' or 'take_profit'. A position is
+                reported once even if several of its levels were crossed.
+        """
+        fired: List[Tuple[str, str]] = []
+
+        i = bisect_left(self._fall_levels, price)
+        if i < len(self._fall_levels):
+            fired.extend(self._fall_ids[i:])
+            del self._fall_levels[i:], self._fall_ids[i:]
+
+        for (_, side), group in self._groups.items():
+            level = price if side == "buy" else -price
+            group.raise_peaks(level, self._buckets)
+            fired.extend((position_id, "trailing_stop") for position_id in group.crossed(level))
+
+        i = bisect_left(self._rise_levels, -price)
+        if i < len(self._rise_levels):
+            fired.extend(self._rise_ids[i:])
+            del self._rise_levels[i:], self._rise_ids[i:]
+
+        if not fired:
+            return fired
+        # Clear each fired position's other levels; the popped ones are already gone
+        triggered = []
+        for position_id, reason in fired:
+            entry = self._entries.pop(position_id, None)
+            if entry is None:
+                continue
+            stop_loss, take_profit, trailing_pct, side = entry
+            for levels, ids, level, key in self._levels(position_id, stop_loss, take_profit, side):
+                if key[1] != reason:
+                    self._remove(levels, ids, level, key)
+            bucket = self._buckets.pop(position_id, None)
+            if bucket is not None and reason != "trailing_stop":
+                self._groups[(trailing_pct, side)].discard(bucket, position_id)
+            triggered.append((position_id, reason))
+        return triggered
+
+class TriggerBook:
+    def __init__(self):
+        """TriggerIndex per symbol, for positions across many pairs."""
+        self.indexes: Dict[str, TriggerIndex] = {}
+        self._symbols: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def __contains__(self, position_id: str) -> bool:
+        return position_id in self._symbols
+
+    def add(self, symbol: str, position_id: str, **levels):
+        """Index a position's exit levels (see TriggerIndex.add)."""
+        if self._symbols.get(position_id, symbol) != symbol:
+            self.remove(position_id)
+        index = self.indexes.get(symbol)
+        if index is None:
+            index = self.indexes[symbol] = TriggerIndex()
+        index.add(position_id, **levels)
+        self._symbols[position_id] = symbol
+
+    def remove(self, position_id: str) -> bool:
+        symbol = self._symbols.pop(position_id, None)
+        return symbol is not None and self.indexes[symbol].remove(position_id)
+
+    def on_prices(self, prices: Dict[str, float]) -> List[Tuple[str, str]]:
+        """Remove and return the (position_id, reason) pairs triggered by the latest price per symbol."""
+        fired = []
+        for symbol, price in prices.items():
+            index = self.indexes.get(symbol)
+            if index is None or not len(index):
+                continue
+            for position_id, reason in index.on_price(price):
+                del self._symbols[position_id]
+                fired.append((position_id, reason))
+        return fired
+
+    def symbols(self) -> Iterable[str]:
+        """Symbols with at least one indexed position."""
+        return [symbol for symbol, index in self.indexes.items() if len(index)]
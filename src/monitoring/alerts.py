@@ -1,46 +1,307 @@
 # src/monitoring/alerts.py
+import queue
 import smtplib
+import socket
+import threading
+import time
+from collections import deque
 from email.mime.text import MIMEText
-from src.monitoring.logger import logger
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
 import requests # Telegram notifier
+from src.execution.throttling import TokenBucket
+from src.monitoring.logger import logger
 
 class EmailNotifier:
     def __init__(self, config: dict):
+        """
+        Email alerts over one persistent SMTP connection.
+
+        The connection (STARTTLS and login included) is opened by the first
+        alert and reused by the ones after it; a connection the server has
+        dropped is reopened once per send.
+
+        Args:
+            config (dict): smtp_server, smtp_port, email and password; optionally
+                use_tls (default True), timeout (seconds) and recipient (default: email).
+        """
         self.smtp_server = config["smtp_server"]
         self.smtp_port = config["smtp_port"]
         self.email = config["email"]
         self.password = config["password"]
+        self.use_tls = config.get("use_tls", True)
+        self.timeout = config.get("timeout", 10.0)
+        self.recipient = config.get("recipient", self.email)
+        self._server: Optional[smtplib.SMTP] = None
+        self._lock = threading.Lock()
 
-    def send_alert(self, subject: str, message: str, recipient: str):
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.password:
+                server.login(self.email, self.password)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def send_alert(self, subject: str, message: str, recipient: Optional[str] = None) -> bool:
+        recipient = recipient or self.recipient
         msg = MIMEText(message)
         msg["Subject"] = subject
         msg["From"] = self.email
         msg["To"] = recipient
 
-        try:
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.email, self.password)
-                server.sendmail(self.email, recipient, msg.as_string())
-            logger.info(f"Alert email sent to {recipient}")
-        except Exception as e:
-            logger.error(f"Failed to send email: {e}")
-      
-      
-      
-         
-# src/monitoring/alerts.py
+        with self._lock:
+            for attempt in range(2):
+                reused = self._server is not None
+                try:
+                    if self._server is None:
+                        self._server = self._connect()
+                    self._server.sendmail(self.email, recipient, msg.as_string())
+                    logger.info(f"Alert email sent to {recipient}")
+                    return True
+                except (smtplib.SMTPServerDisconnected, ConnectionError, socket.timeout) as e:
+                    self._drop()
+                    if not reused or attempt:
+                        logger.error(f"Failed to send email: {e}")
+                        return False
+                except Exception as e:
+                    logger.error(f"Failed to send email: {e}")
+                    return False
+        return False
+
+    def notify(self, subject: str, message: str) -> bool:
+        return self.send_alert(subject, message)
+
+    def _drop(self):
+        if self._server is not None:
+            try:
+                self._server.close()
+            finally:
+                self._server = None
+
+    def close(self):
+        with self._lock:
+            if self._server is not None:
+                try:
+                    self._server.quit()
+                except (smtplib.SMTPException, OSError):
+                    pass
+                self._drop()
+
 class TelegramNotifier:
-    def __init__(self, bot_token: str, chat_id: str):
+    def __init__(self, bot_token: str, chat_id: str, base_url: str = "https://api.telegram.org",
+                 timeout: float = 10.0):
+        """
+        Telegram alerts through one keep-alive HTTP session.
+
+        Args:
+            bot_token (str): Bot API token.
+            chat_id (str): Chat to post to.
+            base_url (str): Bot API root (a local stand-in in tests).
+            timeout (float): Per-request timeout, seconds.
+        """
         self.bot_token = bot_token
         self.chat_id = chat_id
+        self.timeout = timeout
+        self.url = f"{base_url.rstrip('/')}/bot{bot_token}/sendMessage"
+        self.session = requests.Session()
 
-    def send_alert(self, message: str):
-        url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
+    def send_alert(self, message: str) -> bool:
         payload = {
             "chat_id": self.chat_id,
             "text": message
         }
-        response = requests.post(url, json=payload)
+        try:
+            response = self.session.post(self.url, json=payload, timeout=self.timeout)
+        except requests.RequestException as e:
+            logger.error(f"Telegram alert failed: {e}")
+            return False
         if response.status_code != 200:
-            logger.error(f"Telegram alert failed: {response.text}")            
\ No newline at end of file
+            logger.error(f"Telegram alert failed: {response.text}")
+            return False
+        return True
+
+    def notify(self, subject: str, message: str) -> bool:
+        return self.send_alert(f"{subject}\n{message}" if subject else message)
+
+    def close(self):
+        self.session.close()
+
+class AlertDispatcher:
+    def __init__(self, channels: Dict[str, object], coalesce_seconds: float = 300.0,
+                 rate_limits: Optional[Dict[str, Dict]] = None, max_batch: int = 20, max_queue: int = 10_000):
+        """
+        Deliver alerts from a background thread, so a slow or unreachable
+        channel never stalls the caller.
+
+        alert() only enqueues. The worker drops repeats of an alert sent
+        within the coalescing window (sending one "repeated N times" note when
+        it closes), folds alerts waiting for the same channel into one
+        message, and spends a per-channel token bucket before every send;
+        alerts over the limit wait and go out together once a token frees up.
+
+        Args:
+            channels (Dict[str, object]): Name -> notifier with notify(subject, message).
+            coalesce_seconds (float): Window in which identical alerts are sent once.
+            rate_limits (Optional[Dict[str, Dict]]): Channel -> {'burst', 'per_minute'}.
+            max_batch (int): Most alerts folded into one message.
+            max_queue (int): Alerts queued before new ones are dropped.
+        """
+        self.channels = channels
+        self.coalesce_seconds = coalesce_seconds
+        self.max_batch = max_batch
+        self.buckets: Dict[str, TokenBucket] = {
+            name: TokenBucket(limit.get("burst", 1), limit["per_minute"] / 60)
+            for name, limit in (rate_limits or {}).items()
+        }
+        self.queued = self.coalesced = self.dropped = self.sent = self.failed = 0
+
+        # Worker-only state
+        self._recent: Dict[Tuple, List] = {}  # (subject, message, channels) -> [expires, repeats]
+        self._pending: Dict[str, Deque[Tuple[str, str]]] = {name: deque() for name in channels}
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._worker = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+        self._worker.start()
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "AlertDispatcher":
+        """
+        Build from the monitoring config section: alerts.channels names the
+        notifiers configured next to it (email, telegram).
+        """
+        settings = config.get("alerts", {})
+        channels = {}
+        for name in settings.get("channels", ()):
+            if name == "email":
+                channels[name] = EmailNotifier(config["email"])
+            elif name == "telegram":
+                channels[name] = TelegramNotifier(**config["telegram"])
+            else:
+                raise ValueError(f"Unknown alert channel: {name}")
+        return cls(
+            channels,
+            coalesce_seconds=settings.get("coalesce_seconds", 300.0),
+            rate_limits=settings.get("rate_limits"),
+            max_batch=settings.get("max_batch", 20),
+        )
+
+    def alert(self, subject: str, message: str, channels: Optional[Sequence[str]] = None) -> bool:
+        """
+        Queue an alert for every channel (or just `channels`); never blocks.
+
+        Returns:
+            bool: False if the queue was full and the alert was dropped.
+        """
+        try:
+            self._queue.put_nowait((subject, message, tuple(channels or self.channels)))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.queued += 1
+        return True
+
+    # -- background worker -----------------------------------------------
+
+    def _run(self):
+        while True:
+            try:
+                items = [self._queue.get(timeout=self._wait())]
+            except queue.Empty:
+                items = []
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(item is None for item in items)
+            now = time.monotonic()
+            for item in items:
+                if item is not None:
+                    self._accept(item, now)
+            self._expire(now, force=stop)
+            self._deliver(force=stop)
+            for _ in items:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _wait(self) -> Optional[float]:
+        """Seconds until the worker has something to do without new alerts."""
+        if any(self._pending.values()):
+            return 0.1  # held back by a rate limit
+        expiries = [expires for expires, repeats in self._recent.values() if repeats]
+        if expiries:
+            return max(min(expiries) - time.monotonic(), 0.0)
+        return None
+
+    def _accept(self, item: Tuple[str, str, Tuple[str, ...]], now: float):
+        subject, message, channels = item
+        recent = self._recent.get(item)
+        if recent is not None and now < recent[0]:
+            recent[1] += 1
+            self.coalesced += 1
+            return
+        self._recent[item] = [now + self.coalesce_seconds, 0]
+        self._route(subject, message, channels)
+
+    def _route(self, subject: str, message: str, channels: Tuple[str, ...]):
+        for name in channels:
+            pending = self._pending.get(name)
+            if pending is None:
+                logger.warning(f"Alert for unknown channel {name} dropped")
+                continue
+            pending.append((subject, message))
+
+    def _expire(self, now: float, force: bool = False):
+        """Close finished coalescing windows, reporting the repeats they absorbed."""
+        for key, (expires, repeats) in list(self._recent.items()):
+            if now < expires and not force:
+                continue
+            del self._recent[key]
+            if repeats:
+                subject, message, channels = key
+                note = f"(repeated {repeats} more times within {self.coalesce_seconds:g}s)"
+                self._route(subject, f"{message}\n{note}", channels)
+
+    def _deliver(self, force: bool = False):
+        for name, pending in self._pending.items():
+            bucket = self.buckets.get(name)
+            while pending:
+                if bucket is not None and not bucket.try_acquire() and not force:
+                    break
+                batch = [pending.popleft() for _ in range(min(len(pending), self.max_batch))]
+                if len(batch) == 1:
+                    subject, message = batch[0]
+                else:
+                    subject = f"{len(batch)} alerts"
+                    message = "\n\n".join(f"{title}\n{text}" for title, text in batch)
+                try:
+                    delivered = self.channels[name].notify(subject, message)
+                except Exception as e:
+                    logger.error(f"Alert channel {name} failed: {e}")
+                    delivered = False
+                if delivered is False:
+                    self.failed += len(batch)
+                else:
+                    self.sent += len(batch)
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def flush(self):
+        """Block until every queued alert is processed (sent, coalesced or held by a rate limit)."""
+        self._queue.join()
+
+    def close(self):
+        """Send everything still held back, ignoring rate limits, and close the channels."""
+        if self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join()
+        for channel in self.channels.values():
+            close = getattr(channel, "close", None)
+            if close is not None:
+                close()
@@ -1,35 +1,143 @@
 # src/monitoring/dashboard.py
+from typing import Dict, Optional
 import dash
-from dash import dcc, html
+import pandas as pd
 import plotly.graph_objs as go
-from src.data.storage import DatabaseClient
+from dash import Input, Output, State, dcc, html
+from src.monitoring.dashboard_data import DashboardData
 
 # Initialize Dash app
 app = dash.Dash(__name__)
 
-def serve_dashboard():
-    db = DatabaseClient()
-    data = db.load_ohlcv("BTC/USDT", limit=1000)
-
-    # Price chart
-    price_chart = dcc.Graph(
-        id='price-chart',
-        figure={
-            'data': [go.Scatter(x=data['timestamp'], y=data['close'], name='BTC/USDT')],
-            'layout': go.Layout(title='Price History')
-        }
+def _ms(value) -> int:
+    """Plotly axis value (date string) -> epoch ms (UTC)."""
+    return int(pd.Timestamp(value).value // 1_000_000)
+
+def _dates(timestamps) -> pd.DatetimeIndex:
+    return pd.to_datetime(timestamps, unit="ms")
+
+def _visible_range(relayout: Optional[Dict]):
+    """The x range the user zoomed to, or (None, None) for the full/autoranged view."""
+    if not relayout or relayout.get("xaxis.autorange"):
+        return None, None
+    if "xaxis.range[0]" in relayout:
+        return _ms(relayout["xaxis.range[0]"]), _ms(relayout["xaxis.range[1]"])
+    if "xaxis.range" in relayout:
+        low, high = relayout["xaxis.range"]
+        return _ms(low), _ms(high)
+    return None, None
+
+def _positions_table(positions):
+    columns = ["id", "symbol", "amount", "entry_price", "stop_loss", "take_profit"]
+    header = html.Tr([html.Th(column) for column in columns])
+    rows = [
+        html.Tr([html.Td(f"{p[c]:.6g}" if isinstance(p[c], float) else p[c]) for c in columns])
+        for p in positions
+    ]
+    return html.Table([header] + rows) if rows else html.P("No open positions")
+
+def serve_dashboard(config: Optional[Dict] = None):
+    """
+    Build the dashboard: price, equity, open positions and stage latency.
+
+    The price chart asks the server for its visible time range only, already
+    downsampled to a fixed point budget, and re-queries on zoom; between
+    zooms an interval appends just the bars newer than the last one drawn.
+
+    Args:
+        config (Optional[Dict]): Bot configuration; reads the dashboard,
+            database, journal and risk_params sections.
+    """
+    config = config or {}
+    settings = config.get("dashboard", {})
+    symbol = settings.get("symbol", config.get("trading_pair", "BTC/USDT"))
+    timeframe = settings.get("timeframe", "1m")
+    points = settings.get("points", 2000)
+    initial_balance = config.get("risk_params", {}).get("initial_balance", 10000.0)
+    data = DashboardData(
+        db_path=config.get("database", {}).get("path", "data/crypto_data.db"),
+        journal_path=config.get("journal", {}).get("path", "data/orders.db"),
+        columnar_path=settings.get("columnar_path"),
+        metrics_url=settings.get("metrics_url"),
+        points=points,
     )
 
-    # Portfolio metrics
-    metrics = html.Div([
-        html.H3("Portfolio Performance"),
-        html.P(f"Total Trades: {len(data)}"),
-        html.P(f"Current Balance: $10,000")  # Example
+    app.layout = html.Div([
+        html.H3(f"{symbol} ({timeframe})"),
+        dcc.Graph(id="price-chart"),
+        dcc.Store(id="price-last"),
+        html.Div([
+            dcc.Graph(id="equity-chart", style={"width": "50%", "display": "inline-block"}),
+            dcc.Graph(id="latency-chart", style={"width": "50%", "display": "inline-block"}),
+        ]),
+        html.H3("Open Positions"),
+        html.Div(id="positions"),
+        dcc.Interval(id="refresh", interval=int(settings.get("refresh_seconds", 5) * 1000)),
     ])
 
-    app.layout = html.Div([price_chart, metrics])
+    @app.callback(
+        Output("price-chart", "figure"),
+        Output("price-last", "data"),
+        Input("price-chart", "relayoutData"),
+    )
+    def load_price(relayout):
+        start, end = _visible_range(relayout)
+        series = data.price(symbol, timeframe, start, end)
+        figure = go.Figure(
+            go.Scattergl(x=_dates(series["timestamp"]), y=series["close"], name=symbol, mode="lines"),
+            layout=go.Layout(title="Price History", uirevision=symbol),
+        )
+        if start is not None:
+            figure.update_xaxes(range=[_dates([start])[0], _dates([end])[0]])
+        last = data.last_timestamp(symbol, timeframe)
+        # Only a view reaching the newest bar follows the live edge
+        live = end is None or (last is not None and end >= last)
+        return figure, {"last": last, "live": live}
+
+    @app.callback(
+        Output("price-chart", "extendData"),
+        Output("price-last", "data", allow_duplicate=True),
+        Input("refresh", "n_intervals"),
+        State("price-last", "data"),
+        prevent_initial_call=True,
+    )
+    def extend_price(_, state):
+        if not state or not state.get("live") or state.get("last") is None:
+            return dash.no_update, dash.no_update
+        new = data.price_since(symbol, timeframe, state["last"])
+        if not len(new["timestamp"]):
+            return dash.no_update, dash.no_update
+        update = {"x": [_dates(new["timestamp"]).astype(str).tolist()], "y": [new["close"].tolist()]}
+        # Cap the trace so a long-lived page stays within the point budget
+        return (update, [0], points), dict(state, last=int(new["timestamp"][-1]))
+
+    @app.callback(
+        Output("equity-chart", "figure"),
+        Output("latency-chart", "figure"),
+        Output("positions", "children"),
+        Input("refresh", "n_intervals"),
+    )
+    def refresh_panels(_):
+        equity = data.equity(initial_balance)
+        equity_figure = go.Figure(
+            go.Scatter(x=_dates(equity["timestamp"]), y=equity["equity"], name="Equity", mode="lines"),
+            layout=go.Layout(title="Equity (closed positions)", uirevision="equity"),
+        )
+
+        stages = data.latency()
+        names = sorted(stages)
+        latency_figure = go.Figure(
+            [
+                go.Bar(x=names, y=[stages[name].get(stat, 0) * 1000 for name in names], name=stat)
+                for stat in ("p50", "p99", "max")
+            ],
+            layout=go.Layout(title="Stage latency (ms)", barmode="group", uirevision="latency"),
+        )
+        return equity_figure, latency_figure, _positions_table(data.open_positions())
+
     return app
 
 if __name__ == "__main__":
-    app = serve_dashboard()
-    app.run_server(debug=True)
\ No newline at end of file
+    from src.config import load_config
+    app = serve_dashboard(load_config())
+    app.run_server(debug=True)
@@ -0,0 +1,170 @@
+# src/monitoring/dashboard_data.py
+import sqlite3
+import threading
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+from src.core.utils import timeframe_to_seconds
+from src.data.columnar import ColumnarStore
+from src.data.downsample import lttb_indices, minmax_indices
+from src.data.storage import DatabaseClient
+from src.monitoring.logger import logger
+from src.monitoring.metrics import parse_metrics
+
+class DashboardData:
+    def __init__(self, db_path: str = "data/crypto_data.db", journal_path: str = "data/orders.db",
+                 columnar_path: Optional[str] = None, metrics_url: Optional[str] = None, points: int = 2000):
+        """
+        Queries behind the dashboard, sized for a browser.
+
+        Price queries read only the requested time range and come back
+        downsampled to `points` on the server: min/max buckets from the
+        memory-mapped columnar store when it holds the series, otherwise
+        aggregated inside SQLite. Live updates fetch only bars newer than the
+        last one the client has.
+
+        Args:
+            db_path (str): DatabaseClient OHLCV database.
+            journal_path (str): OrderJournal database (positions and PnL).
+            columnar_path (Optional[str]): ColumnarStore root, preferred for long histories.
+            metrics_url (Optional[str]): The bot's /metrics endpoint, for latency panels.
+            points (int): Point budget per chart.
+        """
+        self.db_path = db_path
+        self._local = threading.local()
+        self.journal_path = journal_path
+        self.store = ColumnarStore(columnar_path) if columnar_path else None
+        self.metrics_url = metrics_url
+        self.points = points
+
+    @property
+    def db(self) -> DatabaseClient:
+        """This thread's database connection (the web server answers callbacks from several threads)."""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = DatabaseClient(self.db_path)
+        return db
+
+    # -- prices ------------------------------------------------------------
+
+    def price(self, symbol: str, timeframe: str = "1m", start: Optional[int] = None,
+              end: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Close prices in [start, end), at most about `points` of them.
+
+        Returns:
+            Dict[str, np.ndarray]: 'timestamp' (ms) and 'close'.
+        """
+        if self.store is not None and self.store.partitions(symbol, timeframe):
+            chunks = list(self.store.iter_partitions(symbol, timeframe, start, end))
+            if chunks:
+                timestamps = np.concatenate([chunk["timestamp"] for chunk in chunks])
+                closes = np.concatenate([chunk["close"] for chunk in chunks])
+                indices = minmax_indices(closes, self.points)
+                return {"timestamp": timestamps[indices], "close": closes[indices]}
+
+        bounds = self.db.span(symbol, timeframe, start, end)
+        if bounds is None or (bounds[1] - bounds[0]) // (timeframe_to_seconds(timeframe) * 1000) < self.points:
+            # Few enough bars (judged from the span, which costs two index seeks) to send as-is
+            bars = self.db.load_range(symbol, timeframe, start, end)
+            return {"timestamp": bars["timestamp"].to_numpy(), "close": bars["close"].to_numpy()}
+
+        buckets = self.db.load_minmax(symbol, timeframe, start, end, buckets=self.points // 2)
+        # The min is drawn at the bucket's first bar and the max at its last; within one
+        # bucket (a pixel or two) the order does not show
+        timestamps = np.column_stack((buckets["first"], buckets["last"])).ravel()
+        closes = np.column_stack((buckets["min"], buckets["max"])).ravel()
+        return {"timestamp": timestamps.astype(np.int64), "close": closes.astype(float)}
+
+    def price_since(self, symbol: str, timeframe: str, since: int) -> Dict[str, np.ndarray]:
+        """Bars after `since` for live updates (raw; a refresh interval only adds a few)."""
+        bars = self.db.load_ohlcv(symbol, limit=self.points, timeframe=timeframe, start=since + 1)
+        return {"timestamp": bars["timestamp"].to_numpy(), "close": bars["close"].to_numpy()}
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        return self.db.last_timestamp(symbol, timeframe)
+
+    # -- journal -----------------------------------------------------------
+
+    def _journal(self) -> Optional[sqlite3.Connection]:
+        if not Path(self.journal_path).exists():
+            return None
+        # Read-only, so the dashboard can never block or alter the bot's writes
+        return sqlite3.connect(f"file:{self.journal_path}?mode=ro", uri=True)
+
+    def equity(self, initial_balance: float) -> Dict[str, np.ndarray]:
+        """
+        Equity after each closed position, compounded as RiskManager books PnL.
+
+        Returns:
+            Dict[str, np.ndarray]: 'timestamp' (ms) and 'equity', LTTB-downsampled.
+        """
+        conn = self._journal()
+        if conn is None:
+            return {"timestamp": np.empty(0, dtype=np.int64), "equity": np.empty(0)}
+        try:
+            rows = conn.execute("""
+                SELECT closed_at, pnl FROM journal_positions
+                WHERE status = 'closed' AND pnl IS NOT NULL ORDER BY closed_at
+            """).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read equity from the journal: {e}")
+            rows = []
+        finally:
+            conn.close()
+        closed_at = np.array([row[0] for row in rows], dtype=float)
+        pnl = np.array([row[1] for row in rows], dtype=float)
+        timestamps = (closed_at * 1000).astype(np.int64)
+        equity = initial_balance * np.cumprod(1 + pnl / 100)
+        indices = lttb_indices(timestamps, equity, self.points)
+        return {"timestamp": timestamps[indices], "equity": equity[indices]}
+
+    def open_positions(self) -> List[Dict]:
+        """Open positions recorded in the journal, oldest first."""
+        conn = self._journal()
+        if conn is None:
+            return []
+        try:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("""
+                SELECT id, symbol, amount, entry_price, stop_loss, take_profit, opened_at
+                FROM journal_positions WHERE status = 'open' ORDER BY opened_at
+            """).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read positions from the journal: {e}")
+            rows = []
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
+
+    # -- latency -----------------------------------------------------------
+
+    def latency(self, metric: str = "bot_stage_seconds") -> Dict[str, Dict[str, float]]:
+        """
+        Scrape per-stage latency (p50/p99/max, seconds) from the bot's metrics endpoint.
+
+        Returns:
+            Dict[str, Dict[str, float]]: stage -> {'p50', 'p99', 'max', 'count'}.
+        """
+        if not self.metrics_url:
+            return {}
+        try:
+            with urllib.request.urlopen(self.metrics_url, timeout=2) as response:
+                text = response.read().decode()
+        except OSError as e:
+            logger.debug(f"Metrics endpoint unavailable: {e}")
+            return {}
+
+        stages: Dict[str, Dict[str, float]] = {}
+        for name, labels, value in parse_metrics(text):
+            stage = labels.get("stage")
+            if stage is None:
+                continue
+            if name == metric and "quantile" in labels:
+                stages.setdefault(stage, {})[f"p{float(labels['quantile']) * 100:g}"] = value
+            elif name == f"{metric}_max":
+                stages.setdefault(stage, {})["max"] = value
+            elif name == f"{metric}_count":
+                stages.setdefault(stage, {})["count"] = value
+        return stages
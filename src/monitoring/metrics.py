@@ -0,0 +1,325 @@
+# src/monitoring/metrics.py
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+from src.monitoring.logger import logger
+
+# Log-linear buckets: 16 per power of two, so a quantile is off by at most ~6%
+_SUB_BITS = 4
+_SUB = 1 << _SUB_BITS
+_BUCKETS = 64 * _SUB
+QUANTILES = (0.5, 0.99)
+
+def _bucket(ns: int) -> int:
+    if ns < 2 * _SUB:
+        return max(ns, 0)
+    shift = ns.bit_length() - _SUB_BITS - 1
+    return (shift + 1) * _SUB + (ns >> shift) - _SUB
+
+def _bucket_mid(index: int) -> float:
+    """Midpoint of a bucket's value range, in ns."""
+    if index < 2 * _SUB:
+        return float(index)
+    shift = index // _SUB - 1
+    low = (index % _SUB + _SUB) << shift
+    return low + ((1 << shift) - 1) / 2
+
+class _Shard:
+    """One thread's share of a histogram; only that thread writes it."""
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: "Histogram"):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe_ns(time.perf_counter_ns() - self.start)
+
+class Histogram:
+    def __init__(self):
+        """
+        Latency histogram with per-thread shards.
+
+        Each thread records into its own bucket array, so observing takes no
+        lock; readers merge the shards, accepting counts a few observations
+        stale while writers run.
+        """
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._shards_lock = threading.Lock()  # taken once per thread, on its first observation
+
+    def _shard(self) -> _Shard:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+            return shard
+
+    def observe_ns(self, ns: int):
+        shard = self._shard()
+        shard.counts[_bucket(ns)] += 1
+        shard.count += 1
+        shard.total += ns
+        if ns > shard.max:
+            shard.max = ns
+
+    def observe(self, seconds: float):
+        self.observe_ns(int(seconds * 1e9))
+
+    def time(self) -> _Timer:
+        """Context manager recording the time its block takes (monotonic clock)."""
+        return _Timer(self)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Merged count, sum, max and QUANTILES, in seconds."""
+        with self._shards_lock:
+            shards = list(self._shards)
+        counts = [0] * _BUCKETS
+        count = total = peak = 0
+        for shard in shards:
+            for i, n in enumerate(shard.counts):
+                if n:
+                    counts[i] += n
+            count += shard.count
+            total += shard.total
+            peak = max(peak, shard.max)
+
+        summary = {"count": count, "sum": total / 1e9, "max": peak / 1e9}
+        for q in QUANTILES:
+            summary[f"p{q * 100:g}"] = self._quantile(counts, sum(counts), q, peak) / 1e9
+        return summary
+
+    @staticmethod
+    def _quantile(counts: List[int], count: int, q: float, peak: int) -> float:
+        if not count:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for i, n in enumerate(counts):
+            seen += n
+            if seen >= rank:
+                return min(_bucket_mid(i), peak)
+        return float(peak)
+
+class Counter:
+    def __init__(self):
+        """Monotonic counter with per-thread cells, so increments take no lock."""
+        self._local = threading.local()
+        self._cells: List[List[float]] = []
+        self._cells_lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        try:
+            cell = self._local.cell
+        except AttributeError:
+            cell = self._local.cell = [0]
+            with self._cells_lock:
+                self._cells.append(cell)
+        cell[0] += amount
+
+    @property
+    def value(self) -> float:
+        with self._cells_lock:
+            return sum(cell[0] for cell in self._cells)
+
+class MetricFamily:
+    def __init__(self, name: str, help: str, kind: str, labels: Sequence[str] = ()):
+        """
+        A named metric, split into one child per label combination.
+
+        Args:
+            name (str): Prometheus metric name.
+            help (str): One-line description.
+            kind (str): 'histogram' or 'counter'.
+            labels (Sequence[str]): Label names; children are keyed by their values.
+        """
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.label_names = tuple(labels)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        """The child for these label values, created on first use."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} takes labels {self.label_names}, got {values}")
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = Histogram() if self.kind == "histogram" else Counter()
+        return child
+
+    # Unlabelled families proxy their single child
+    def time(self) -> _Timer:
+        return self.labels().time()
+
+    def observe(self, seconds: float):
+        self.labels().observe(seconds)
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+    def children(self) -> List[Tuple[Dict[str, str], object]]:
+        with self._lock:
+            items = list(self._children.items())
+        return [(dict(zip(self.label_names, values)), child) for values, child in items]
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               for value in labels.values())
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + "}"
+
+class MetricsRegistry:
+    def __init__(self):
+        """Process-wide set of metric families, rendered in the Prometheus text format."""
+        self._families: Dict[str, MetricFamily] = {}
+        self._lock = threading.Lock()
+
+    def _family(self, name: str, help: str, kind: str, labels: Sequence[str]) -> MetricFamily:
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = MetricFamily(name, help, kind, labels)
+            elif family.kind != kind or family.label_names != tuple(labels):
+                raise ValueError(f"Metric {name} already registered as a {family.kind} {family.label_names}")
+            return family
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = ()) -> MetricFamily:
+        return self._family(name, help, "histogram", labels)
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> MetricFamily:
+        return self._family(name, help, "counter", labels)
+
+    def snapshot(self) -> Dict[str, List[Tuple[Dict[str, str], object]]]:
+        """Current values: name -> [(labels, histogram summary or counter value)]."""
+        with self._lock:
+            families = list(self._families.values())
+        return {
+            family.name: [
+                (labels, child.snapshot() if family.kind == "histogram" else child.value)
+                for labels, child in family.children()
+            ]
+            for family in families
+        }
+
+    def render(self) -> str:
+        """Prometheus text exposition: histograms as summaries plus a _max gauge."""
+        with self._lock:
+            families = list(self._families.values())
+        lines = []
+        for family in families:
+            children = family.children()
+            if not children:
+                continue
+            lines.append(f"# HELP {family.name} {family.help}")
+            if family.kind == "counter":
+                lines.append(f"# TYPE {family.name} counter")
+                lines.extend(f"{family.name}{_format_labels(labels)} {child.value:g}" for labels, child in children)
+                continue
+
+            lines.append(f"# TYPE {family.name} summary")
+            maxima = []
+            for labels, child in children:
+                summary = child.snapshot()
+                for q in QUANTILES:
+                    quantile = _format_labels(dict(labels, quantile=f"{q:g}"))
+                    lines.append(f"{family.name}{quantile} {summary[f'p{q * 100:g}']:.9g}")
+                lines.append(f"{family.name}_sum{_format_labels(labels)} {summary['sum']:.9g}")
+                lines.append(f"{family.name}_count{_format_labels(labels)} {summary['count']}")
+                maxima.append(f"{family.name}_max{_format_labels(labels)} {summary['max']:.9g}")
+            lines.append(f"# TYPE {family.name}_max gauge")
+            lines.extend(maxima)
+        return "\n".join(lines) + "\n"
+
+def parse_metrics(text: str) -> List[Tuple[str, Dict[str, str], float]]:
+    """Parse Prometheus text exposition (as render() writes it) into (name, labels, value) samples."""
+    samples = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if "{" in line:
+            name, _, rest = line.partition("{")
+            body, _, value = rest.rpartition("}")
+            labels = {}
+            for pair in body.split('",'):
+                if pair:
+                    key, _, raw = pair.partition("=")
+                    labels[key.strip()] = raw.strip().strip('"').replace('\\"', '"').replace("\\\\", "\\")
+        else:
+            name, _, value = line.partition(" ")
+            labels = {}
+        samples.append((name, labels, float(value.split()[0])))
+    return samples
+
+METRICS = MetricsRegistry()
+
+# Shared families; modules time their own stages under these
+STAGE_SECONDS = METRICS.histogram("bot_stage_seconds", "Time spent in each trading-cycle stage", ("stage",))
+RETRIES = METRICS.counter("retries_total", "Retries made by tenacity-decorated calls", ("function",))
+
+def record_retry(retry_state) -> None:
+    """tenacity before_sleep hook counting each retry under the retried function's name."""
+    RETRIES.labels(getattr(retry_state.fn, "__qualname__", "unknown")).inc()
+
+class MetricsServer:
+    def __init__(self, port: int = 9100, host: str = "127.0.0.1", registry: Optional[MetricsRegistry] = None):
+        """
+        Serve the registry at /metrics for Prometheus to scrape.
+
+        Args:
+            port (int): Listen port (0 picks a free one).
+            host (str): Listen address; loopback only unless set wider (e.g. 0.0.0.0).
+            registry (Optional[MetricsRegistry]): Defaults to the process-wide METRICS.
+        """
+        registry = registry or METRICS
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes every few seconds would flood the log
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "MetricsServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="metrics", daemon=True)
+        self._thread.start()
+        logger.info(f"Serving metrics on :{self.port}/metrics")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
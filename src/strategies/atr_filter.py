@@ -20,8 +20,8 @@ class ATRFilter(BaseStrategy):
         tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
         atr = tr.rolling(window=window).mean()
         
-        data['atr_upper'] = data['close'] + (atr * multiplier)
-        data['atr_lower'] = data['close'] - (atr * multiplier)
+        atr_upper = data['close'] + (atr * multiplier)
+        atr_lower = data['close'] - (atr * multiplier)
         
         # Implement your specific ATR-based logic here
         return None  # Replace with actual signal logic
\ No newline at end of file
@@ -1,25 +1,111 @@
 # src/strategies/base_strategy.py
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
+import numpy as np
 import pandas as pd
+from .indicator_cache import IndicatorCache
+from .streaming_indicators import SignalStream
+
+# Computes without storing, for strategies not built by StrategyFactory
+_UNCACHED = IndicatorCache(maxsize=0)
+
+def signals_from_masks(buy: pd.Series, sell: pd.Series, default: Optional[str] = None) -> pd.Series:
+    """
+    Build a signal series from boolean buy/sell conditions
+
+    Args:
+        buy: Boolean series, True where the strategy would buy
+        sell: Boolean series, True where the strategy would sell
+        default: Value used where neither condition holds ('hold' or None)
+
+    Returns:
+        pd.Series: Object series of 'buy', 'sell' or the default value
+    """
+    values = np.select(
+        [buy.to_numpy(dtype=bool), sell.to_numpy(dtype=bool)],
+        np.array(["buy", "sell"], dtype=object),
+        default=default,
+    )
+    return pd.Series(values, index=buy.index, dtype=object)
 
 class BaseStrategy(ABC):
+    # Shared indicator cache, assigned by StrategyFactory
+    indicator_cache: Optional[IndicatorCache] = None
+
+    @property
+    def indicators(self) -> IndicatorCache:
+        """Indicator cache to compute through; strategies must not write into the input frame"""
+        return self.indicator_cache if self.indicator_cache is not None else _UNCACHED
+
     @abstractmethod
     def generate_signal(self, data: pd.DataFrame, params: Dict[str, Any]) -> Optional[str]:
         """
         Generate trading signal (buy, sell, hold)
-        
+
         Args:
             data: DataFrame containing OHLCV data
             params: Strategy-specific parameters
-            
+
         Returns:
             str: 'buy', 'sell', or None for hold
         """
         pass
 
+    def generate_signals(self, data: pd.DataFrame, params: Dict[str, Any]) -> pd.Series:
+        """
+        Generate the signal for every bar in one vectorized pass
+
+        Row i holds the value generate_signal would return for data.iloc[:i + 1].
+        Strategies that only implement generate_signal keep raising
+        NotImplementedError, and callers fall back to per-bar evaluation.
+
+        Args:
+            data: DataFrame containing OHLCV data
+            params: Strategy-specific parameters
+
+        Returns:
+            pd.Series: Signals aligned with data.index
+        """
+        raise NotImplementedError(f"{type(self).__name__} has no vectorized signal path")
+
+    def stream(self, params: Dict[str, Any]) -> SignalStream:
+        """
+        Create incremental signal state for one symbol
+
+        The returned stream updates the strategy's indicators in O(1) per closed
+        bar and yields the same signal generate_signal would return on the full
+        history up to that bar.
+
+        Args:
+            params: Strategy-specific parameters
+
+        Returns:
+            SignalStream: Fresh per-symbol state
+        """
+        raise NotImplementedError(f"{type(self).__name__} has no streaming signal path")
+
+    def evaluate_grid(self, data: pd.DataFrame, param_sets: List[Dict[str, Any]],
+                      initial_balance: float = 10000.0) -> List[Dict]:
+        """
+        Backtest many parameter sets in one batch
+
+        Strategies whose indicators come in parameter families (see
+        indicator_kernels) return the reports Backtester.run would give for
+        each set, for about the cost of one run. The rest raise
+        NotImplementedError, and callers backtest each set separately.
+
+        Args:
+            data: DataFrame containing OHLCV data
+            param_sets: Parameter sets to evaluate
+            initial_balance: Starting balance of every backtest
+
+        Returns:
+            List[Dict]: One performance report per parameter set, in order
+        """
+        raise NotImplementedError(f"{type(self).__name__} has no batched grid evaluation")
+
     @property
     @abstractmethod
     def name(self) -> str:
         """Unique strategy identifier"""
-        pass
\ No newline at end of file
+        pass
@@ -1,21 +1,36 @@
 # src/strategies/bollinger_bands.py
 import pandas as pd
-from src.strategies.base_strategy import BaseStrategy
+from src.strategies.base_strategy import BaseStrategy, signals_from_masks
+from src.strategies.streaming_indicators import BollingerBands, SignalStream
 # Add this to all strategy files
 from typing import Dict, Optional, Any
 
 class BollingerBandsStrategy(BaseStrategy):
+    @property
+    def name(self):
+        return "bollinger_bands"
+
     def generate_signal(self, data: pd.DataFrame, params: Dict[str, Any]) -> str:
+        return self.generate_signals(data, params).iloc[-1]
+
+    def generate_signals(self, data: pd.DataFrame, params: Dict[str, Any]) -> pd.Series:
         window = params.get("window", 20)
         num_std = params.get("num_std", 2)
 
-        data["ma"] = data["close"].rolling(window=window).mean()
-        data["std"] = data["close"].rolling(window=window).std()
-        data["upper_band"] = data["ma"] + (data["std"] * num_std)
-        data["lower_band"] = data["ma"] - (data["std"] * num_std)
+        ma = self.indicators.rolling_mean(data, "close", window)
+        std = self.indicators.rolling_std(data, "close", window)
+        upper_band = ma + (std * num_std)
+        lower_band = ma - (std * num_std)
+        return signals_from_masks(data["close"] < lower_band, data["close"] > upper_band, default="hold")
+
+    def stream(self, params: Dict[str, Any]) -> SignalStream:
+        bands = BollingerBands(params.get("window", 20), params.get("num_std", 2))
 
-        if data["close"].iloc[-1] < data["lower_band"].iloc[-1]:
-            return "buy"
-        elif data["close"].iloc[-1] > data["upper_band"].iloc[-1]:
-            return "sell"
-        return "hold"
\ No newline at end of file
+        def evaluate(bar):
+            bands.update(bar.close)
+            if bar.close < bands.lower:
+                return "buy"
+            elif bar.close > bands.upper:
+                return "sell"
+            return "hold"
+        return SignalStream(evaluate)
@@ -1,7 +1,9 @@
 # src/strategies/combined_signals.py
 from typing import List, Dict
+import numpy as np
 import pandas as pd
 from .base_strategy import BaseStrategy
+from .streaming_indicators import SignalStream
 # Add this to all strategy files
 from typing import Dict, Optional
 
@@ -26,4 +28,32 @@ class CombinedStrategy(BaseStrategy):
             return 'buy'
         elif sell_signals >= params.get('consensus_threshold', 2):
             return 'sell'
-        return None
\ No newline at end of file
+        return None
+
+    def generate_signals(self, data: pd.DataFrame, params: Dict) -> pd.Series:
+        signals = [strategy.generate_signals(data, params).to_numpy() for strategy in self.strategies]
+        stacked = np.array(signals, dtype=object).reshape(len(signals), len(data))
+
+        buy_signals = (stacked == 'buy').sum(axis=0)
+        sell_signals = (stacked == 'sell').sum(axis=0)
+
+        threshold = params.get('consensus_threshold', 2)
+        values = np.select(
+            [buy_signals >= threshold, sell_signals >= threshold],
+            np.array(['buy', 'sell'], dtype=object),
+            default=None,
+        )
+        return pd.Series(values, index=data.index, dtype=object)
+
+    def stream(self, params: Dict) -> SignalStream:
+        streams = [strategy.stream(params) for strategy in self.strategies]
+        threshold = params.get('consensus_threshold', 2)
+
+        def evaluate(bar):
+            signals = [stream.update(bar) for stream in streams]
+            if signals.count('buy') >= threshold:
+                return 'buy'
+            elif signals.count('sell') >= threshold:
+                return 'sell'
+            return None
+        return SignalStream(evaluate)
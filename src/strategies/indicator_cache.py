@@ -0,0 +1,114 @@
+# src/strategies/indicator_cache.py
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+
+Columns = Union[str, Sequence[str]]
+
+class IndicatorCache:
+    def __init__(self, maxsize: int = 512):
+        """
+        Bounded LRU cache of indicator results shared between strategies.
+
+        Entries are keyed by (series, indicator, parameters), where the series
+        is identified by the frame's symbol/timeframe attrs, its length, first
+        and last index and timestamp, and a hash of each source column's
+        values, so a bar revised in the middle of a window is a miss. Returned
+        objects are shared: callers must treat them as read-only.
+
+        Args:
+            maxsize (int): Maximum number of cached results; 0 disables storage.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _digest(values: pd.Series) -> int:
+        array = values.to_numpy()
+        if array.dtype.kind in "biuf":
+            return hash(np.ascontiguousarray(array).tobytes())  # microseconds for a few thousand bars
+        return int(pd.util.hash_pandas_object(values, index=False).sum())
+
+    @classmethod
+    def series_key(cls, data: pd.DataFrame, columns: Columns) -> Tuple:
+        """Identity of one or more columns of an OHLCV frame."""
+        columns = (columns,) if isinstance(columns, str) else tuple(columns)
+        if data.empty:
+            return (columns, 0)
+        last_timestamp = data["timestamp"].iloc[-1] if "timestamp" in data.columns else None
+        return (
+            data.attrs.get("symbol"),
+            data.attrs.get("timeframe"),
+            columns,
+            len(data),
+            data.index[0],
+            data.index[-1],
+            last_timestamp,
+            tuple(cls._digest(data[column]) for column in columns),
+        )
+
+    def get(self, data: pd.DataFrame, column: Columns, indicator: str, params: Hashable,
+            compute: Callable[[], Any]) -> Any:
+        """
+        Return a cached indicator, computing and storing it on a miss.
+
+        Args:
+            data (pd.DataFrame): OHLCV frame the indicator is computed on.
+            column (Columns): Source column (e.g. 'close'), or every column
+                the indicator reads (e.g. ('high', 'low', 'close')).
+            indicator (str): Indicator name (e.g. 'rolling_mean').
+            params (Hashable): Indicator parameters.
+            compute (Callable): Produces the indicator on a miss.
+        """
+        if self.maxsize <= 0:
+            return compute()
+
+        key = (self.series_key(data, column), indicator, params)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def rolling_mean(self, data: pd.DataFrame, column: str, window: int) -> pd.Series:
+        return self.get(data, column, "rolling_mean", (window,),
+                        lambda: data[column].rolling(window=window).mean())
+
+    def rolling_std(self, data: pd.DataFrame, column: str, window: int) -> pd.Series:
+        return self.get(data, column, "rolling_std", (window,),
+                        lambda: data[column].rolling(window=window).std())
+
+    def rolling_min(self, data: pd.DataFrame, column: str, window: int) -> pd.Series:
+        return self.get(data, column, "rolling_min", (window,),
+                        lambda: data[column].rolling(window=window).min())
+
+    def rolling_max(self, data: pd.DataFrame, column: str, window: int) -> pd.Series:
+        return self.get(data, column, "rolling_max", (window,),
+                        lambda: data[column].rolling(window=window).max())
+
+    def ewm_mean(self, data: pd.DataFrame, column: str, span: int) -> pd.Series:
+        return self.get(data, column, "ewm_mean", (span,),
+                        lambda: data[column].ewm(span=span, adjust=False).mean())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
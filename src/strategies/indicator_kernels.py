@@ -0,0 +1,269 @@
+# src/strategies/indicator_kernels.py
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Weights below this no longer change a float64 EMA
+_EMA_TOLERANCE = 1e-17
+
+def _buffer(out: Optional[np.ndarray], shape: Tuple[int, ...]) -> np.ndarray:
+    if out is None:
+        return np.empty(shape)
+    if out.shape != shape or out.dtype != np.float64:
+        raise ValueError(f"Output buffer must be float64 {shape}, got {out.dtype} {out.shape}")
+    return out
+
+def _windows(windows: Sequence[int]) -> np.ndarray:
+    windows = np.asarray(windows, dtype=np.int64)
+    if windows.ndim != 1 or (windows < 1).any():
+        raise ValueError("Windows must be a sequence of positive integers")
+    return windows
+
+def sma_family(values: np.ndarray, windows: Sequence[int], out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Simple moving averages for many windows from one cumulative sum.
+
+    Matches pandas rolling(window).mean(): a window containing NaN is NaN.
+    Values are shifted by the first finite sample before summing, which keeps
+    the prefix sums small at price scale.
+
+    Args:
+        values (np.ndarray): 1D input series.
+        windows (Sequence[int]): Window lengths.
+        out (Optional[np.ndarray]): float64 (len(windows), len(values)) buffer to fill.
+
+    Returns:
+        np.ndarray: Row i is the SMA for windows[i].
+    """
+    values = np.asarray(values, dtype=float)
+    windows = _windows(windows)
+    n = len(values)
+    out = _buffer(out, (len(windows), n))
+
+    missing = np.isnan(values)
+    finite = values[~missing]
+    shift = finite[0] if len(finite) else 0.0
+    sums = np.zeros(n + 1)
+    np.cumsum(np.where(missing, 0.0, values - shift), out=sums[1:])
+    gaps = None
+    if missing.any():
+        gaps = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(missing, out=gaps[1:])
+
+    for row, window in zip(out, windows):
+        row[:window - 1] = np.nan
+        if window > n:
+            continue
+        window_sums = row[window - 1:]
+        np.subtract(sums[window:], sums[:-window], out=window_sums)
+        window_sums /= window
+        window_sums += shift
+        if gaps is not None:
+            window_sums[gaps[window:] - gaps[:-window] > 0] = np.nan
+    return out
+
+def ema_family(values: np.ndarray, spans: Sequence[int], out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Exponential moving averages for many spans in one stacked pass.
+
+    Matches pandas ewm(span, adjust=False).mean() on finite input. The
+    recurrence y[t] = d * y[t-1] + a * x[t] is solved as a parallel prefix
+    scan over all spans at once: pass k folds in the value 2**k bars back, so
+    the scan stops after log2 of the longest span's memory rather than
+    looping over bars in Python.
+
+    Args:
+        values (np.ndarray): 1D input series.
+        spans (Sequence[int]): EMA spans.
+        out (Optional[np.ndarray]): float64 (len(spans), len(values)) buffer to fill.
+
+    Returns:
+        np.ndarray: Row i is the EMA for spans[i].
+    """
+    values = np.asarray(values, dtype=float)
+    spans = _windows(spans)
+    n = len(values)
+    out = _buffer(out, (len(spans), n))
+    if not n:
+        return out
+
+    alpha = 2.0 / (spans + 1.0)
+    decay = (1.0 - alpha)[:, None]
+    np.multiply(alpha[:, None], values, out=out)
+    out[:, 0] = values[0]
+
+    scratch = np.empty_like(out)
+    step = 1
+    while step < n and decay.max() > _EMA_TOLERANCE:
+        np.multiply(out[:, :-step], decay, out=scratch[:, step:])
+        out[:, step:] += scratch[:, step:]
+        decay = decay * decay
+        step *= 2
+    return out
+
+def rolling_extreme_family(values: np.ndarray, windows: Sequence[int], kind: str = "min",
+                           out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Rolling minimum or maximum for many windows from one sparse table.
+
+    Level j of the table holds the extreme of each run of 2**j values, built
+    from level j - 1 in one vectorized step; any window is then the extreme
+    of two overlapping runs. Building costs O(n log W) once, and each window
+    O(n) after that, instead of one rolling pass per window.
+
+    Args:
+        values (np.ndarray): 1D input series (finite).
+        windows (Sequence[int]): Window lengths.
+        kind (str): 'min' or 'max'.
+        out (Optional[np.ndarray]): float64 (len(windows), len(values)) buffer to fill.
+
+    Returns:
+        np.ndarray: Row i is the rolling extreme over windows[i] (NaN before the first full window).
+    """
+    if kind not in ("min", "max"):
+        raise ValueError(f"Unknown extreme: {kind}")
+    reduce = np.minimum if kind == "min" else np.maximum
+    values = np.asarray(values, dtype=float)
+    windows = _windows(windows)
+    n = len(values)
+    out = _buffer(out, (len(windows), n))
+
+    # table[j][i] = extreme of values[i:i + 2**j]
+    table = [values]
+    while 2 ** len(table) <= min(windows.max(initial=1), n):
+        previous, half = table[-1], 2 ** (len(table) - 1)
+        table.append(reduce(previous[:-half], previous[half:]))
+
+    for row, window in zip(out, windows):
+        row[:window - 1] = np.nan
+        if window > n:
+            continue
+        level = int(window).bit_length() - 1
+        runs, size = table[level], 2 ** level
+        # Window ending at i: the run starting at i - window + 1 and the one ending at i
+        reduce(runs[:n - window + 1], runs[window - size:n - size + 1], out=row[window - 1:])
+    return out
+
+def rsi_family(close: np.ndarray, windows: Sequence[int], out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    RSI with simple-moving-average smoothing (as RSIStrategy computes it) for many windows.
+
+    Returns:
+        np.ndarray: Row i is the RSI for windows[i].
+    """
+    close = np.asarray(close, dtype=float)
+    delta = np.diff(close, prepend=np.nan)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    out = sma_family(gain, windows, out=out)
+    losses = sma_family(loss, windows)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(out, losses, out=out)
+        out += 1.0
+        np.divide(100.0, out, out=out)
+        np.subtract(100.0, out, out=out)
+    return out
+
+def stochastic_family(high: np.ndarray, low: np.ndarray, close: np.ndarray, k_periods: Sequence[int],
+                      d_period: int = 3, out_k: Optional[np.ndarray] = None,
+                      out_d: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stochastic %K and %D for many %K periods (as StochasticOscillator computes them).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: %K and %D, one row per k_periods entry.
+    """
+    close = np.asarray(close, dtype=float)
+    k = rolling_extreme_family(low, k_periods, "min", out=out_k)
+    highs = rolling_extreme_family(high, k_periods, "max")
+    highs -= k
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.subtract(close, k, out=k)
+        k /= highs
+    k *= 100.0
+    d = _buffer(out_d, k.shape)
+    for k_row, d_row in zip(k, d):
+        sma_family(k_row, [d_period], out=d_row[None, :])
+    return k, d
+
+def crossover_positions(fast: np.ndarray, slow: np.ndarray) -> np.ndarray:
+    """
+    Held position (True long, False flat) of a crossover for each row pair, starting flat.
+
+    A bar where fast > slow goes long and fast < slow goes flat; ties and
+    warm-up NaNs keep the previous position, as Backtester carries signals.
+    Apart from the warm-up those are rare, so only rows that have them pay
+    for the forward fill.
+
+    Args:
+        fast (np.ndarray): (pairs, n) fast averages.
+        slow (np.ndarray): (pairs, n) slow averages.
+
+    Returns:
+        np.ndarray: (pairs, n) bool positions.
+    """
+    with np.errstate(invalid="ignore"):
+        held = fast > slow
+        flat = fast < slow
+    undecided = ~(held | flat)
+    first_decided = np.argmax(~undecided, axis=-1)
+    carried = np.flatnonzero(np.count_nonzero(undecided, axis=-1) > first_decided)
+    if len(carried):
+        columns = np.arange(held.shape[-1])
+        last_long = np.where(held[carried], columns, -1)
+        last_flat = np.where(flat[carried], columns, -1)
+        np.maximum.accumulate(last_long, axis=-1, out=last_long)
+        np.maximum.accumulate(last_flat, axis=-1, out=last_flat)
+        held[carried] = last_long > last_flat
+    return held
+
+def crossover_grid(close: np.ndarray, pairs: Sequence[Tuple[int, int]], initial_balance: float = 10000.0,
+                   chunk_bars: int = 4_000_000) -> List[Dict]:
+    """
+    Backtest SMA crossovers for many (short_window, long_window) pairs at once.
+
+    Every distinct window is averaged once (sma_family), positions for a chunk
+    of pairs come from one vectorized comparison, and each pair's compounded
+    return is a dot product of its positions with the bar log returns. The
+    figures are those Backtester.run reports for MovingAverageCrossover /
+    SMACrossover: all-in at the bar's close, marked to the last close.
+
+    Args:
+        close (np.ndarray): Close prices.
+        pairs (Sequence[Tuple[int, int]]): (short_window, long_window) pairs.
+        initial_balance (float): Starting balance of every backtest.
+        chunk_bars (int): Pairs * bars evaluated per chunk, bounding memory.
+
+    Returns:
+        List[Dict]: One Backtester-style report per pair, in order.
+    """
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+    windows = sorted({window for pair in pairs for window in pair})
+    if n < 2 or not pairs:
+        return [dict(initial_balance=initial_balance, final_balance=initial_balance, return_pct=0.0,
+                     num_trades=0, buy_and_hold_return=0.0) for _ in pairs]
+    row_of = {window: row for row, window in enumerate(windows)}
+    # The bar loop trades on bars 0..n-2 (a signal on bar i fills at its close)
+    averages = sma_family(close[:-1], windows)
+    log_returns = np.diff(np.log(close))
+    buy_and_hold = (close[-1] - close[0]) / close[0] * 100
+
+    reports = []
+    step = max(1, chunk_bars // max(n, 1))
+    for first in range(0, len(pairs), step):
+        chunk = pairs[first:first + step]
+        fast = averages[[row_of[short] for short, _ in chunk]]
+        slow = averages[[row_of[long] for _, long in chunk]]
+        held = crossover_positions(fast, slow)
+        # Position held over bar t earns bar t + 1's return, up to the final mark
+        growth = np.exp(held.astype(float) @ log_returns)
+        trades = np.count_nonzero(held[:, 1:] != held[:, :-1], axis=1) + held[:, 0]
+        for value, count in zip(growth * initial_balance, trades):
+            reports.append({
+                "initial_balance": initial_balance,
+                "final_balance": float(value),
+                "return_pct": float((value - initial_balance) / initial_balance * 100),
+                "num_trades": int(count),
+                "buy_and_hold_return": float(buy_and_hold),
+            })
+    return reports
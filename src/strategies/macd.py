@@ -1,22 +1,46 @@
 # src/strategies/macd.py
 import pandas as pd
-from src.strategies.base_strategy import BaseStrategy
+from src.strategies.base_strategy import BaseStrategy, signals_from_masks
+from src.strategies.streaming_indicators import MACD, SignalStream
 # Add this to all strategy files
-from typing import Dict, Optional
+from typing import Dict, Optional, Any
 
 class MACDStrategy(BaseStrategy):
+    @property
+    def name(self):
+        return "macd"
+
     def generate_signal(self, data: pd.DataFrame, params: Dict[str, Any]) -> str:
+        return self.generate_signals(data, params).iloc[-1]
+
+    def generate_signals(self, data: pd.DataFrame, params: Dict[str, Any]) -> pd.Series:
         fast_window = params.get("fast_window", 12)
         slow_window = params.get("slow_window", 26)
         signal_window = params.get("signal_window", 9)
 
-        data["ema_fast"] = data["close"].ewm(span=fast_window, adjust=False).mean()
-        data["ema_slow"] = data["close"].ewm(span=slow_window, adjust=False).mean()
-        data["macd"] = data["ema_fast"] - data["ema_slow"]
-        data["signal"] = data["macd"].ewm(span=signal_window, adjust=False).mean()
+        def compute():
+            ema_fast = self.indicators.ewm_mean(data, "close", fast_window)
+            ema_slow = self.indicators.ewm_mean(data, "close", slow_window)
+            macd = ema_fast - ema_slow
+            return macd, macd.ewm(span=signal_window, adjust=False).mean()
+
+        macd, signal = self.indicators.get(
+            data, "close", "macd", (fast_window, slow_window, signal_window), compute
+        )
+        return signals_from_masks(macd > signal, macd < signal, default="hold")
+
+    def stream(self, params: Dict[str, Any]) -> SignalStream:
+        macd = MACD(
+            params.get("fast_window", 12),
+            params.get("slow_window", 26),
+            params.get("signal_window", 9),
+        )
 
-        if data["macd"].iloc[-1] > data["signal"].iloc[-1]:
-            return "buy"
-        elif data["macd"].iloc[-1] < data["signal"].iloc[-1]:
-            return "sell"
-        return "hold"
\ No newline at end of file
+        def evaluate(bar):
+            macd.update(bar.close)
+            if macd.macd > macd.signal:
+                return "buy"
+            elif macd.macd < macd.signal:
+                return "sell"
+            return "hold"
+        return SignalStream(evaluate)
@@ -1,19 +1,41 @@
 # src/strategies/moving_average.py
 import pandas as pd
-from src.strategies.base_strategy import BaseStrategy
+from src.strategies.base_strategy import BaseStrategy, signals_from_masks
+from src.strategies.indicator_kernels import crossover_grid
+from src.strategies.streaming_indicators import SMA, SignalStream
 # Add this to all strategy files
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any
 
 class MovingAverageCrossover(BaseStrategy):
+    @property
+    def name(self):
+        return "moving_average"
+
     def generate_signal(self, data: pd.DataFrame, params: Dict[str, Any]) -> str:
+        return self.generate_signals(data, params).iloc[-1]
+
+    def generate_signals(self, data: pd.DataFrame, params: Dict[str, Any]) -> pd.Series:
         short_window = params.get("short_window", 10)
         long_window = params.get("long_window", 50)
 
-        data["short_ma"] = data["close"].rolling(window=short_window).mean()
-        data["long_ma"] = data["close"].rolling(window=long_window).mean()
+        short_ma = self.indicators.rolling_mean(data, "close", short_window)
+        long_ma = self.indicators.rolling_mean(data, "close", long_window)
+        return signals_from_masks(short_ma > long_ma, short_ma < long_ma, default="hold")
+
+    def evaluate_grid(self, data: pd.DataFrame, param_sets: List[Dict[str, Any]],
+                      initial_balance: float = 10000.0) -> List[Dict]:
+        pairs = [(params.get("short_window", 10), params.get("long_window", 50)) for params in param_sets]
+        return crossover_grid(data["close"].to_numpy(), pairs, initial_balance)
+
+    def stream(self, params: Dict[str, Any]) -> SignalStream:
+        short_ma = SMA(params.get("short_window", 10))
+        long_ma = SMA(params.get("long_window", 50))
 
-        if data["short_ma"].iloc[-1] > data["long_ma"].iloc[-1]:
-            return "buy"
-        elif data["short_ma"].iloc[-1] < data["long_ma"].iloc[-1]:
-            return "sell"
-        return "hold"
\ No newline at end of file
+        def evaluate(bar):
+            short, long = short_ma.update(bar.close), long_ma.update(bar.close)
+            if short > long:
+                return "buy"
+            elif short < long:
+                return "sell"
+            return "hold"
+        return SignalStream(evaluate)
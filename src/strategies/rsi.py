@@ -1,26 +1,44 @@
 # src/strategies/rsi.py
 import pandas as pd
 import numpy as np
-from src.strategies.base_strategy import BaseStrategy
+from src.strategies.base_strategy import BaseStrategy, signals_from_masks
+from src.strategies.streaming_indicators import RSI, SignalStream
 # Add this to all strategy files
-from typing import Dict, Optional
+from typing import Dict, Optional, Any
 
 class RSIStrategy(BaseStrategy):
+    @property
+    def name(self):
+        return "rsi"
+
     def generate_signal(self, data: pd.DataFrame, params: Dict[str, Any]) -> str:
+        return self.generate_signals(data, params).iloc[-1]
+
+    def generate_signals(self, data: pd.DataFrame, params: Dict[str, Any]) -> pd.Series:
         window = params.get("window", 14)
         overbought = params.get("overbought", 70)
         oversold = params.get("oversold", 30)
 
-        delta = data["close"].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
+        def compute():
+            delta = data["close"].diff()
+            gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
+            loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
+            return 100 - (100 / (1 + gain / loss))
+
+        rsi = self.indicators.get(data, "close", "rsi", (window,), compute)
+        return signals_from_masks(rsi < oversold, rsi > overbought, default="hold")
 
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        data["rsi"] = rsi
+    def stream(self, params: Dict[str, Any]) -> SignalStream:
+        # Rolling-mean smoothing keeps live signals identical to generate_signal
+        rsi = RSI(params.get("window", 14), smoothing="sma")
+        overbought = params.get("overbought", 70)
+        oversold = params.get("oversold", 30)
 
-        if rsi.iloc[-1] < oversold:
-            return "buy"
-        elif rsi.iloc[-1] > overbought:
-            return "sell"
-        return "hold"
\ No newline at end of file
+        def evaluate(bar):
+            value = rsi.update(bar.close)
+            if value < oversold:
+                return "buy"
+            elif value > overbought:
+                return "sell"
+            return "hold"
+        return SignalStream(evaluate)
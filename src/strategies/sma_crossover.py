@@ -1,7 +1,9 @@
 # src/strategies/sma_crossover.py
 import pandas as pd
-from .base_strategy import BaseStrategy
-from typing import Dict, Optional
+from .base_strategy import BaseStrategy, signals_from_masks
+from .indicator_kernels import crossover_grid
+from .streaming_indicators import SMA, SignalStream
+from typing import Dict, List, Optional
 
 class SMACrossover(BaseStrategy):
     @property
@@ -9,14 +11,30 @@ class SMACrossover(BaseStrategy):
         return "sma_crossover"
 
     def generate_signal(self, data: pd.DataFrame, params: Dict) -> Optional[str]:
+        return self.generate_signals(data, params).iloc[-1]
+
+    def generate_signals(self, data: pd.DataFrame, params: Dict) -> pd.Series:
         short_window = params.get('short_window', 50)
         long_window = params.get('long_window', 200)
-        
-        data['sma_short'] = data['close'].rolling(window=short_window).mean()
-        data['sma_long'] = data['close'].rolling(window=long_window).mean()
-        
-        if data['sma_short'].iloc[-1] > data['sma_long'].iloc[-1]:
-            return 'buy'
-        elif data['sma_short'].iloc[-1] < data['sma_long'].iloc[-1]:
-            return 'sell'
-        return None
\ No newline at end of file
+
+        sma_short = self.indicators.rolling_mean(data, 'close', short_window)
+        sma_long = self.indicators.rolling_mean(data, 'close', long_window)
+        return signals_from_masks(sma_short > sma_long, sma_short < sma_long)
+
+    def evaluate_grid(self, data: pd.DataFrame, param_sets: List[Dict],
+                      initial_balance: float = 10000.0) -> List[Dict]:
+        pairs = [(params.get('short_window', 50), params.get('long_window', 200)) for params in param_sets]
+        return crossover_grid(data['close'].to_numpy(), pairs, initial_balance)
+
+    def stream(self, params: Dict) -> SignalStream:
+        sma_short = SMA(params.get('short_window', 50))
+        sma_long = SMA(params.get('long_window', 200))
+
+        def evaluate(bar):
+            short, long = sma_short.update(bar.close), sma_long.update(bar.close)
+            if short > long:
+                return 'buy'
+            elif short < long:
+                return 'sell'
+            return None
+        return SignalStream(evaluate)
@@ -1,6 +1,7 @@
 # src/strategies/stochastic_oscillator.py
 import pandas as pd
-from .base_strategy import BaseStrategy
+from .base_strategy import BaseStrategy, signals_from_masks
+from .streaming_indicators import SignalStream, Stochastic
 # Add this to all strategy files
 from typing import Dict, Optional
 
@@ -10,19 +11,37 @@ class StochasticOscillator(BaseStrategy):
         return "stochastic_oscillator"
 
     def generate_signal(self, data: pd.DataFrame, params: Dict) -> Optional[str]:
+        return self.generate_signals(data, params).iloc[-1]
+
+    def generate_signals(self, data: pd.DataFrame, params: Dict) -> pd.Series:
         k_period = params.get('k_period', 14)
         d_period = params.get('d_period', 3)
         overbought = params.get('overbought', 80)
         oversold = params.get('oversold', 20)
-        
-        low_min = data['low'].rolling(window=k_period).min()
-        high_max = data['high'].rolling(window=k_period).max()
-        
-        data['%K'] = 100 * ((data['close'] - low_min) / (high_max - low_min))
-        data['%D'] = data['%K'].rolling(window=d_period).mean()
-        
-        if data['%K'].iloc[-1] < oversold and data['%D'].iloc[-1] < oversold:
-            return 'buy'
-        elif data['%K'].iloc[-1] > overbought and data['%D'].iloc[-1] > overbought:
-            return 'sell'
-        return None
\ No newline at end of file
+
+        def compute():
+            low_min = self.indicators.rolling_min(data, 'low', k_period)
+            high_max = self.indicators.rolling_max(data, 'high', k_period)
+            k = 100 * ((data['close'] - low_min) / (high_max - low_min))
+            return k, k.rolling(window=d_period).mean()
+
+        k, d = self.indicators.get(data, ('high', 'low', 'close'), 'stochastic', (k_period, d_period),
+                                   compute)
+        return signals_from_masks(
+            (k < oversold) & (d < oversold),
+            (k > overbought) & (d > overbought),
+        )
+
+    def stream(self, params: Dict) -> SignalStream:
+        stochastic = Stochastic(params.get('k_period', 14), params.get('d_period', 3))
+        overbought = params.get('overbought', 80)
+        oversold = params.get('oversold', 20)
+
+        def evaluate(bar):
+            stochastic.update(bar.high, bar.low, bar.close)
+            if stochastic.k < oversold and stochastic.d < oversold:
+                return 'buy'
+            elif stochastic.k > overbought and stochastic.d > overbought:
+                return 'sell'
+            return None
+        return SignalStream(evaluate)
@@ -1,31 +1,43 @@
 # src/strategies/strategy_factory.py
 from typing import Dict, Any, List, Type
+from importlib import import_module
 from .base_strategy import BaseStrategy
-from .sma_crossover import SMACrossover
-from .atr_filter import ATRFilter
-from .stochastic_oscillator import StochasticOscillator
-from .moving_average import MovingAverageCrossover
-from .combined_signals import CombinedStrategy
-from .weighted_strategy import WeightedStrategy
+from .indicator_cache import IndicatorCache
 
 class StrategyFactory:
+    # Type -> (module, class); a module is imported the first time its strategy is built
     _registry = {
-        'sma_crossover': SMACrossover,
-        'atr_filter': ATRFilter,
-        'stochastic': StochasticOscillator,
-        'moving_average': MovingAverageCrossover,
-        'combined': CombinedStrategy,
-        'weighted': WeightedStrategy
+        'sma_crossover': ('.sma_crossover', 'SMACrossover'),
+        'atr_filter': ('.atr_filter', 'ATRFilter'),
+        'stochastic': ('.stochastic_oscillator', 'StochasticOscillator'),
+        'moving_average': ('.moving_average', 'MovingAverageCrossover'),
+        'bollinger_bands': ('.bollinger_bands', 'BollingerBandsStrategy'),
+        'macd': ('.macd', 'MACDStrategy'),
+        'rsi': ('.rsi', 'RSIStrategy'),
+        'combined': ('.combined_signals', 'CombinedStrategy'),
+        'weighted': ('.weighted_strategy', 'WeightedStrategy')
     }
 
+    # Shared by every strategy the factory builds, within and across cycles
+    indicator_cache = IndicatorCache(maxsize=512)
+
     @classmethod
-    def create_strategy(cls, strategy_config: Dict[str, Any]) -> BaseStrategy:
-        strategy_type = strategy_config['type']
-        
+    def strategy_types(cls) -> List[str]:
+        """Registered strategy type names"""
+        return list(cls._registry)
+
+    @classmethod
+    def strategy_class(cls, strategy_type: str) -> Type[BaseStrategy]:
+        """The class registered for a strategy type, importing its module on first use"""
         if strategy_type not in cls._registry:
             raise ValueError(f"Unknown strategy type: {strategy_type}")
-            
-        strategy_class = cls._registry[strategy_type]
+        module, name = cls._registry[strategy_type]
+        return getattr(import_module(module, __package__), name)
+
+    @classmethod
+    def create_strategy(cls, strategy_config: Dict[str, Any]) -> BaseStrategy:
+        strategy_type = strategy_config['type']
+        strategy_class = cls.strategy_class(strategy_type)
         
         # Handle composite strategies
         if strategy_type in ['combined', 'weighted']:
@@ -34,10 +46,14 @@ class StrategyFactory:
                 for sub_config in strategy_config.get('strategies', [])
             ]
             if strategy_type == 'weighted':
-                return strategy_class(
+                strategy = strategy_class(
                     strategies=sub_strategies,
                     weights=strategy_config.get('weights', [])
                 )
-            return strategy_class(sub_strategies)
-            
-        return strategy_class()
\ No newline at end of file
+            else:
+                strategy = strategy_class(sub_strategies)
+        else:
+            strategy = strategy_class()
+
+        strategy.indicator_cache = cls.indicator_cache
+        return strategy
@@ -0,0 +1,343 @@
+# src/strategies/streaming_indicators.py
+import math
+from collections import deque
+from typing import Callable, Dict, NamedTuple, Optional
+import pandas as pd
+
+NAN = float("nan")
+
+class Bar(NamedTuple):
+    timestamp: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+class RollingWindow:
+    def __init__(self, window: int, resync_every: int = 10_000):
+        """
+        Fixed-size window with O(1) running sum and sum of squares.
+
+        Values are shifted by the first finite sample before accumulating, which
+        keeps the variance free of catastrophic cancellation at price scale. The
+        sums are rebuilt from the window every `resync_every` updates so float
+        drift cannot accumulate on long-running streams.
+
+        Args:
+            window (int): Number of samples in the window.
+            resync_every (int): Updates between exact recomputations.
+        """
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.window = window
+        self.resync_every = max(resync_every, window)
+        self.values = deque()
+        self.nan_count = 0
+        self.shift = None
+        self.sum = 0.0
+        self.sum_sq = 0.0
+        self._updates = 0
+
+    def push(self, value: float):
+        """Add a sample, evicting the oldest once the window is full."""
+        if math.isnan(value):
+            self.nan_count += 1
+        else:
+            if self.shift is None:
+                self.shift = value
+            shifted = value - self.shift
+            self.sum += shifted
+            self.sum_sq += shifted * shifted
+        self.values.append(value)
+
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if math.isnan(old):
+                self.nan_count -= 1
+            else:
+                shifted = old - self.shift
+                self.sum -= shifted
+                self.sum_sq -= shifted * shifted
+
+        self._updates += 1
+        if self._updates >= self.resync_every:
+            self._resync()
+
+    def _resync(self):
+        finite = [v for v in self.values if not math.isnan(v)]
+        if finite:
+            self.shift = finite[0]
+            finite = [v - self.shift for v in finite]
+        self.sum = math.fsum(finite)
+        self.sum_sq = math.fsum(v * v for v in finite)
+        self._updates = 0
+
+    @property
+    def ready(self) -> bool:
+        """True once the window is full and holds no NaN (pandas min_periods semantics)."""
+        return len(self.values) == self.window and self.nan_count == 0
+
+    @property
+    def mean(self) -> float:
+        if not self.ready:
+            return NAN
+        return self.shift + self.sum / self.window
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1), matching pandas rolling().std()."""
+        if not self.ready or self.window < 2:
+            return NAN
+        var = (self.sum_sq - self.sum * self.sum / self.window) / (self.window - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+class SMA:
+    def __init__(self, window: int):
+        self._window = RollingWindow(window)
+        self.value = NAN
+
+    def update(self, value: float) -> float:
+        self._window.push(value)
+        self.value = self._window.mean
+        return self.value
+
+class BollingerBands:
+    def __init__(self, window: int = 20, num_std: float = 2):
+        self._window = RollingWindow(window)
+        self.num_std = num_std
+        self.middle = self.upper = self.lower = NAN
+
+    def update(self, value: float) -> float:
+        self._window.push(value)
+        self.middle = self._window.mean
+        band = self._window.std * self.num_std
+        self.upper = self.middle + band
+        self.lower = self.middle - band
+        return self.middle
+
+class EMA:
+    def __init__(self, span: int):
+        """Recursive EMA seeded with the first sample, as ewm(span, adjust=False)."""
+        self.alpha = 2.0 / (span + 1)
+        self.value = NAN
+
+    def update(self, value: float) -> float:
+        if math.isnan(self.value):
+            self.value = value
+        else:
+            self.value = (1 - self.alpha) * self.value + self.alpha * value
+        return self.value
+
+class MACD:
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self._fast = EMA(fast)
+        self._slow = EMA(slow)
+        self._signal = EMA(signal)
+        self.macd = self.signal = NAN
+
+    def update(self, value: float) -> float:
+        self.macd = self._fast.update(value) - self._slow.update(value)
+        self.signal = self._signal.update(self.macd)
+        return self.macd
+
+class _Smoother:
+    def __init__(self, window: int, smoothing: str):
+        """
+        Average of a stream using Wilder smoothing or a plain rolling mean.
+
+        Wilder's average is seeded with the simple mean of the first `window`
+        samples and then follows avg = (avg * (window - 1) + x) / window.
+        """
+        if smoothing not in ("wilder", "sma"):
+            raise ValueError(f"Unknown smoothing: {smoothing}")
+        self.window = window
+        self.wilder = smoothing == "wilder"
+        self._sma = RollingWindow(window)
+        self._count = 0
+        self.value = NAN
+
+    def update(self, value: float) -> float:
+        if not self.wilder:
+            self._sma.push(value)
+            self.value = self._sma.mean
+            return self.value
+
+        self._count += 1
+        if self._count <= self.window:
+            self._sma.push(value)
+            if self._count == self.window:
+                self.value = self._sma.mean
+        else:
+            self.value = (self.value * (self.window - 1) + value) / self.window
+        return self.value
+
+class RSI:
+    def __init__(self, window: int = 14, smoothing: str = "wilder"):
+        """
+        Relative Strength Index.
+
+        Args:
+            window (int): Lookback period.
+            smoothing (str): 'wilder' for Wilder's RSI, or 'sma' for the rolling
+                mean of gains/losses that RSIStrategy.generate_signal uses.
+        """
+        self._gain = _Smoother(window, smoothing)
+        self._loss = _Smoother(window, smoothing)
+        self._prev = None
+        self.value = NAN
+
+    def update(self, value: float) -> float:
+        if self._prev is None:
+            self._prev = value
+            if self._gain.wilder:
+                return self.value  # Wilder seeds from the first `window` deltas
+            delta = 0.0  # diff() NaN becomes a zero gain/loss in the rolling-mean form
+        else:
+            delta = value - self._prev
+            self._prev = value
+        gain = self._gain.update(delta if delta > 0 else 0.0)
+        loss = self._loss.update(-delta if delta < 0 else 0.0)
+
+        if math.isnan(gain) or math.isnan(loss) or (gain == 0 and loss == 0):
+            self.value = NAN
+        elif loss == 0:
+            self.value = 100.0
+        else:
+            self.value = 100 - (100 / (1 + gain / loss))
+        return self.value
+
+class ATR:
+    def __init__(self, window: int = 14, smoothing: str = "wilder"):
+        self._avg = _Smoother(window, smoothing)
+        self._prev_close = None
+        self.value = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        true_range = high - low
+        if self._prev_close is not None:
+            true_range = max(true_range, abs(high - self._prev_close), abs(low - self._prev_close))
+        self._prev_close = close
+        self.value = self._avg.update(true_range)
+        return self.value
+
+class RollingExtreme:
+    def __init__(self, window: int, mode: str = "min"):
+        """
+        Rolling min or max over a monotonic deque, amortized O(1) per update.
+
+        Args:
+            window (int): Number of samples in the window.
+            mode (str): 'min' or 'max'.
+        """
+        if mode not in ("min", "max"):
+            raise ValueError(f"Unknown mode: {mode}")
+        self.window = window
+        self._is_min = mode == "min"
+        self._deque = deque()  # (index, value), monotonic in value
+        self._index = -1
+        self.value = NAN
+
+    def update(self, value: float) -> float:
+        self._index += 1
+        dq = self._deque
+        if self._is_min:
+            while dq and dq[-1][1] >= value:
+                dq.pop()
+        else:
+            while dq and dq[-1][1] <= value:
+                dq.pop()
+        dq.append((self._index, value))
+        if dq[0][0] <= self._index - self.window:
+            dq.popleft()
+        self.value = dq[0][1] if self._index >= self.window - 1 else NAN
+        return self.value
+
+class Stochastic:
+    def __init__(self, k_period: int = 14, d_period: int = 3):
+        self._low = RollingExtreme(k_period, "min")
+        self._high = RollingExtreme(k_period, "max")
+        self._d = RollingWindow(d_period)
+        self.k = self.d = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        low_min = self._low.update(low)
+        high_max = self._high.update(high)
+        span = high_max - low_min
+        self.k = 100 * (close - low_min) / span if span else NAN
+        self._d.push(self.k)
+        self.d = self._d.mean
+        return self.k
+
+class SignalStream:
+    def __init__(self, evaluate: Callable[[Bar], Optional[str]]):
+        """
+        Incremental signal state of one strategy for one symbol.
+
+        Args:
+            evaluate: Called once per closed bar; updates the strategy's
+                indicators and returns the signal for that bar.
+        """
+        self._evaluate = evaluate
+        self.last_timestamp = None
+        self.signal = None
+
+    def update(self, bar: Bar) -> Optional[str]:
+        """Feed a closed bar. Bars at or before the last seen timestamp are ignored."""
+        if self.last_timestamp is not None and bar.timestamp <= self.last_timestamp:
+            return self.signal
+        self.last_timestamp = bar.timestamp
+        self.signal = self._evaluate(bar)
+        return self.signal
+
+    def warmup(self, data: pd.DataFrame) -> Optional[str]:
+        """Feed historical OHLCV rows in order and return the latest signal."""
+        columns = data[list(Bar._fields)].itertuples(index=False, name=None)
+        for row in columns:
+            self.update(Bar(*row))
+        return self.signal
+
+class StreamingSignalEngine:
+    def __init__(self, strategy, params: Dict):
+        """
+        Per-symbol incremental signals for a strategy.
+
+        Each symbol gets its own SignalStream, so following many symbols costs
+        O(1) per closed bar per symbol regardless of the strategies' lookbacks.
+
+        Args:
+            strategy (BaseStrategy): Strategy implementing stream().
+            params (Dict): Strategy parameters.
+        """
+        self.strategy = strategy
+        self.params = params
+        self.streams: Dict[str, SignalStream] = {}
+
+    def _stream(self, symbol: str) -> SignalStream:
+        stream = self.streams.get(symbol)
+        if stream is None:
+            stream = self.streams[symbol] = self.strategy.stream(self.params)
+        return stream
+
+    def on_bar(self, symbol: str, bar: Bar) -> Optional[str]:
+        """Update a symbol with one closed bar and return its signal."""
+        return self._stream(symbol).update(bar)
+
+    def on_bars(self, symbol: str, data: pd.DataFrame) -> Optional[str]:
+        """
+        Update a symbol from an OHLCV frame whose last row is the forming bar.
+
+        Only closed bars newer than the last one seen are fed, so polling the
+        same window every cycle costs O(new bars).
+
+        Returns:
+            Optional[str]: Signal of the newest closed bar, or None if no new
+                bar closed since the previous call.
+        """
+        stream = self._stream(symbol)
+        closed = data.iloc[:-1]
+        if stream.last_timestamp is not None:
+            closed = closed[closed["timestamp"] > stream.last_timestamp]
+        if closed.empty:
+            return None
+        return stream.warmup(closed)
@@ -1,7 +1,9 @@
 # src/strategies/weighted_strategy.py
 from typing import List, Dict
+import numpy as np
 import pandas as pd
 from .base_strategy import BaseStrategy
+from .streaming_indicators import SignalStream
 # Add this to all strategy files
 from typing import Dict, Optional
 
@@ -26,4 +28,34 @@ class WeightedStrategy(BaseStrategy):
             return 'buy'
         elif weighted_sum <= params.get('sell_threshold', -0.7):
             return 'sell'
-        return None
\ No newline at end of file
+        return None
+
+    def generate_signals(self, data: pd.DataFrame, params: Dict) -> pd.Series:
+        weighted_sum = np.zeros(len(data))
+        for strategy, weight in zip(self.strategies, self.weights):
+            signals = strategy.generate_signals(data, params).to_numpy()
+            weighted_sum += weight * ((signals == 'buy').astype(float) - (signals == 'sell'))
+
+        values = np.select(
+            [weighted_sum >= params.get('buy_threshold', 0.7),
+             weighted_sum <= params.get('sell_threshold', -0.7)],
+            np.array(['buy', 'sell'], dtype=object),
+            default=None,
+        )
+        return pd.Series(values, index=data.index, dtype=object)
+
+    def stream(self, params: Dict) -> SignalStream:
+        streams = [strategy.stream(params) for strategy in self.strategies]
+
+        def evaluate(bar):
+            signals = [stream.update(bar) for stream in streams]
+            weighted_sum = sum(
+                (1 if s == 'buy' else -1 if s == 'sell' else 0) * w
+                for s, w in zip(signals, self.weights)
+            )
+            if weighted_sum >= params.get('buy_threshold', 0.7):
+                return 'buy'
+            elif weighted_sum <= params.get('sell_threshold', -0.7):
+                return 'sell'
+            return None
+        return SignalStream(evaluate)
@@ -0,0 +1,529 @@
+# src/tests/test_data.py
+import asyncio
+import sqlite3
+import time
+from unittest.mock import Mock
+import numpy as np
+import pandas as pd
+import pytest
+import websockets
+from src.cli import parse_grid
+from src.data.backtester import Backtester
+from src.data.columnar import ColumnarStore
+from src.data.downsample import lttb_indices, minmax_indices
+from src.data.fetcher import DataFetcher
+from src.data.order_book import ConsolidatedBook, L2OrderBook, OrderBook
+from src.data.processor import MultiTimeframeResampler, resample_ohlcv
+from src.data.replay import ReplayBacktester, TRADE_DTYPE, import_trades_csv, open_trades, write_trades
+from src.data.storage import DatabaseClient
+from src.data.streamer import CandleAggregator, LiveBarFeed, OrderBookFeed, StreamQueue, WebSocketStreamer, dumps
+from src.data.sweep import ParameterSweep, SharedOHLCV
+from src.data.synthetic import generate_ohlcv
+from src.execution.paper_exchange import PaperExchange
+from src.strategies.atr_filter import ATRFilter
+from src.strategies.base_strategy import BaseStrategy
+from src.strategies.combined_signals import CombinedStrategy
+from src.strategies.macd import MACDStrategy
+from src.strategies.moving_average import MovingAverageCrossover
+from src.strategies.rsi import RSIStrategy
+from src.strategies.sma_crossover import SMACrossover
+from src.strategies.stochastic_oscillator import StochasticOscillator
+from src.strategies.streaming_indicators import Bar
+from src.strategies.weighted_strategy import WeightedStrategy
+
+@pytest.fixture
+def ohlcv():
+    rng = np.random.default_rng(7)
+    close = 100 + np.cumsum(rng.normal(0, 1, 400))
+    return pd.DataFrame({
+        "timestamp": np.arange(400) * 60_000,
+        "open": close,
+        "high": close + 1,
+        "low": close - 1,
+        "close": close,
+        "volume": 1.0,
+    })
+
+@pytest.mark.parametrize("strategy", [
+    MovingAverageCrossover(),
+    MACDStrategy(),
+    RSIStrategy(),
+    StochasticOscillator(),
+    CombinedStrategy([MACDStrategy(), RSIStrategy(), StochasticOscillator()]),
+    WeightedStrategy([MovingAverageCrossover(), MACDStrategy()], [0.5, 0.5]),
+])
+def test_vectorized_backtest_matches_bar_loop(strategy, ohlcv):
+    params = {"short_window": 5, "long_window": 20, "consensus_threshold": 1, "buy_threshold": 0.5}
+    vectorized = Backtester(strategy).run(ohlcv.copy(), params)
+    looped = Backtester(strategy).run(ohlcv.copy(), params, vectorized=False)
+    assert vectorized == looped
+    assert vectorized["num_trades"] > 0
+
+def test_backtest_falls_back_to_bar_loop(ohlcv):
+    report = Backtester(ATRFilter()).run(ohlcv.iloc[:50].copy(), {})
+    assert report["num_trades"] == 0
+    assert report["final_balance"] == report["initial_balance"]
+
+def test_shared_ohlcv_round_trip(ohlcv):
+    with SharedOHLCV(ohlcv) as shared:
+        shm, frame = SharedOHLCV.attach(shared.spec)
+        try:
+            pd.testing.assert_frame_equal(frame, ohlcv[frame.columns], check_dtype=False)
+            assert frame["timestamp"].dtype == np.int64
+        finally:
+            del frame
+            shm.close()
+
+def test_parameter_sweep_ranks_grid(ohlcv):
+    grid = {"short_window": [5, 10], "long_window": [20, 40]}
+    parallel = ParameterSweep("sma_crossover", processes=2).run(ohlcv, grid)
+    serial = ParameterSweep("sma_crossover", processes=1).run(ohlcv, grid)
+
+    assert len(parallel) == 4
+    assert parallel["return_pct"].is_monotonic_decreasing
+    pd.testing.assert_frame_equal(parallel, serial)
+    best = parallel.iloc[0]
+    params = {"short_window": int(best.short_window), "long_window": int(best.long_window)}
+    assert Backtester(SMACrossover()).run(ohlcv, params)["return_pct"] == pytest.approx(best.return_pct)
+
+def test_grid_ranges_step_ints_and_floats():
+    grid = parse_grid(["long_window=50:200:50", "std_dev=1.5:3:0.5", "k=0.1:0.3:0.1", "period=7,14"])
+    assert grid == {"long_window": [50, 100, 150, 200], "std_dev": [1.5, 2.0, 2.5, 3.0],
+                    "k": [0.1, 0.2, 0.3], "period": [7, 14]}
+
+def test_database_keys_bars_by_symbol_and_timeframe(tmp_path, ohlcv):
+    db = DatabaseClient(str(tmp_path / "ohlcv.db"))
+    db.save_ohlcv("BTC/USDT", ohlcv)
+    db.save_ohlcv("ETH/USDT", ohlcv.iloc[:10])
+    db.save_ohlcv("BTC/USDT", ohlcv.iloc[:5], timeframe="5m")
+
+    updated = ohlcv.iloc[:3].assign(close=1.0)
+    assert db.save_ohlcv("BTC/USDT", updated) == 3
+
+    btc = db.load_ohlcv("BTC/USDT", limit=None)
+    assert len(btc) == len(ohlcv)
+    assert btc["close"].iloc[:3].tolist() == [1.0] * 3
+    assert len(db.load_ohlcv("ETH/USDT")) == 10
+    assert len(db.load_ohlcv("BTC/USDT", timeframe="5m")) == 5
+    assert "symbol" not in ohlcv.columns
+
+    start, end = ohlcv["timestamp"].iloc[10], ohlcv["timestamp"].iloc[20]
+    window = db.load_range("BTC/USDT", "1m", start, end)
+    assert window["timestamp"].tolist() == ohlcv["timestamp"].iloc[10:20].tolist()
+    latest = db.load_ohlcv("BTC/USDT", limit=5)
+    assert latest["timestamp"].tolist() == ohlcv["timestamp"].iloc[-5:].tolist()
+    assert db.last_timestamp("BTC/USDT") == ohlcv["timestamp"].iloc[-1]
+    assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+def test_database_migrates_legacy_table(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE ohlcv (timestamp INTEGER PRIMARY KEY, symbol TEXT, open REAL, "
+                 "high REAL, low REAL, close REAL, volume REAL)")
+    conn.execute("INSERT INTO ohlcv VALUES (60000, 'BTC/USDT', 1, 2, 0.5, 1.5, 10)")
+    conn.commit()
+    conn.close()
+
+    bars = DatabaseClient(path).load_ohlcv("BTC/USDT")
+    assert bars.to_dict("records") == [
+        {"timestamp": 60000, "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5, "volume": 10.0}
+    ]
+
+def test_columnar_store_partitions_by_month(tmp_path):
+    start = 1_672_531_200_000  # 2023-01-01
+    bars = pd.DataFrame({
+        "timestamp": start + np.arange(50_000) * 60_000,
+        "open": 1.0, "high": 2.0, "low": 0.5,
+        "close": np.arange(50_000, dtype=float),
+        "volume": 3.0,
+    })
+    store = ColumnarStore(str(tmp_path))
+    assert store.append("BTC/USDT", "1m", bars.iloc[:30_000]) == 30_000
+    assert store.append("BTC/USDT", "1m", bars.iloc[29_000:]) == 20_000  # overlap skipped
+    assert [p.name for p in store.partitions("BTC/USDT", "1m")] == ["2023-01.ohlcv", "2023-02.ohlcv"]
+
+    loaded = store.load("BTC/USDT", "1m")
+    pd.testing.assert_frame_equal(loaded, bars, check_dtype=False)
+
+    window = store.load("BTC/USDT", "1m", start + 100 * 60_000, start + 110 * 60_000)
+    assert window["close"].tolist() == list(np.arange(100.0, 110.0))
+    assert isinstance(window["close"].values, np.memmap)
+
+def test_columnar_store_imports_sqlite(tmp_path, ohlcv):
+    db = DatabaseClient(str(tmp_path / "ohlcv.db"))
+    db.save_ohlcv("ETH/USDT", ohlcv)
+    store = ColumnarStore(str(tmp_path / "columnar"))
+    assert store.import_sqlite(db) == len(ohlcv)
+    assert store.import_sqlite(db) == 0
+    loaded = store.load("ETH/USDT", "1m")
+    stored = db.load_ohlcv("ETH/USDT", limit=None)
+    assert list(loaded.columns) == list(stored.columns)
+    np.testing.assert_array_equal(loaded.to_numpy(), stored.to_numpy())
+
+def test_candle_aggregator_builds_bars_and_fills_gaps():
+    agg = CandleAggregator("1m")
+    assert agg.add_trade("BTC/USDT", 0, 100.0, 1.0) == []
+    agg.add_trade("BTC/USDT", 10_000, 105.0, 2.0)
+    agg.add_trade("BTC/USDT", 20_000, 95.0, 1.0)
+    closed = agg.add_trade("BTC/USDT", 3 * 60_000 + 5, 101.0, 1.0)
+    assert [tuple(bar) for bar in closed] == [
+        (0, 100.0, 105.0, 95.0, 95.0, 4.0),
+        (60_000, 95.0, 95.0, 95.0, 95.0, 0.0),
+        (120_000, 95.0, 95.0, 95.0, 95.0, 0.0),
+    ]
+    assert agg.add_trade("BTC/USDT", 30_000, 90.0, 1.0) == []  # late trade for a closed bar
+    assert [bar.timestamp for bar in agg.flush(4 * 60_000)["BTC/USDT"]] == [180_000]
+    assert agg.frame("BTC/USDT")["close"].tolist() == [95.0, 95.0, 95.0, 101.0]
+
+def test_stream_queue_drop_policies():
+    async def fill(policy):
+        queue = StreamQueue(maxsize=2, policy=policy)
+        for i in range(4):
+            await queue.put(i)
+        return [queue.get_nowait() for _ in range(queue.qsize())], queue.dropped
+
+    assert asyncio.run(fill("drop_oldest")) == ([2, 3], 2)
+    assert asyncio.run(fill("drop_newest")) == ([0, 1], 2)
+
+class FakeSocket:
+    def __init__(self, messages, on_end=None):
+        self.messages = messages
+        self.on_end = on_end
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(message)
+
+    async def close(self):
+        pass
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for message in self.messages:
+            yield message
+        if self.on_end is None:
+            raise OSError("connection reset")
+        await self.on_end()
+
+def test_streamer_resubscribes_after_reconnect_and_routes_messages():
+    trade = {"e": "trade", "s": "BTCUSDT", "T": 1, "p": "100.0", "q": "1.0"}
+
+    async def scenario():
+        streamer = WebSocketStreamer("wss://test", min_backoff=0.01, connect=lambda url: connect())
+        sockets = [
+            FakeSocket([dumps({"result": None, "id": 1}), dumps(trade), b"not json"]),
+            FakeSocket([dumps({"stream": "ethusdt@ticker", "data": {"c": "10"}})], on_end=streamer.close),
+        ]
+
+        async def connect():
+            return sockets[streamer.reconnects]
+
+        trades = await streamer.subscribe("BTC/USDT", "trade")
+        tickers = await streamer.subscribe("ETH/USDT", "ticker")
+        await asyncio.wait_for(streamer.run(), timeout=5)
+        return streamer, sockets, trades.get_nowait(), tickers.get_nowait()
+
+    streamer, sockets, trade_payload, ticker_payload = asyncio.run(scenario())
+    assert trade_payload == trade
+    assert ticker_payload == {"c": "10"}
+    assert streamer.parse_errors == 1
+    assert streamer.reconnects == 1
+    for socket in sockets:
+        assert "btcusdt@trade" in socket.sent[0] and "ethusdt@ticker" in socket.sent[0]
+
+def test_streams_survive_bad_payloads_and_failed_handshakes():
+    trades = [{"e": "trade", "s": "BTCUSDT", "T": 1, "q": "1.0"},  # no price
+              {"e": "trade", "s": "BTCUSDT", "T": 2, "p": "100.0", "q": "1.0"}]
+
+    async def scenario():
+        streamer = WebSocketStreamer("wss://test", min_backoff=0.01, connect=lambda url: connect())
+        feed = LiveBarFeed(streamer, ["BTC/USDT"], "1m")
+
+        async def connect():
+            if streamer.reconnects == 0:
+                raise websockets.InvalidHandshake("server rejected WebSocket connection: HTTP 503")
+            return FakeSocket([dumps(trade) for trade in trades], on_end=finish)
+
+        async def finish():
+            while feed.aggregator.forming("BTC/USDT") is None:
+                await asyncio.sleep(0.01)
+            await streamer.close()
+
+        await asyncio.wait_for(feed.run(), timeout=5)
+        return streamer, feed
+
+    streamer, feed = asyncio.run(scenario())
+    assert streamer.reconnects == 1
+    assert feed.aggregator.forming("BTC/USDT").close == 100.0
+
+class BuyFirstBar(BaseStrategy):
+    name = "buy_first_bar"
+
+    def generate_signal(self, data, params):
+        return "buy" if len(data) == 1 else None
+
+def test_replay_fills_intrabar_stop_loss(tmp_path):
+    # Bar 0 closes at 100; bar 1 dips to 97 (below the 2% stop) and closes back at 101
+    prices = [100.0, 100.0, 99.0, 97.0, 98.5, 101.0, 101.0]
+    timestamps = [0, 30_000, 60_000, 70_000, 80_000, 110_000, 120_000]
+    path = str(tmp_path / "trades.npy")
+    write_trades(path, timestamps, prices, np.ones(len(prices)))
+    trades = open_trades(path)
+    assert trades.dtype == TRADE_DTYPE and trades.dtype.itemsize == 21
+
+    replay = ReplayBacktester(BuyFirstBar(), {}, risk_params={"stop_loss_pct": 2.0, "max_position_size": 0.5},
+                              exchange=PaperExchange({"USDT": 10_000.0}, taker_fee=0.0), batch_size=3)
+    report = replay.run(trades)
+
+    assert [(t["side"], t["price"], t["reason"]) for t in replay.trades] == [
+        ("buy", 100.0, "signal"), ("sell", 97.0, "stop_loss")]
+    assert report["stop_loss_exits"] == 1
+    assert report["bars"] == 3
+    assert report["events"] == len(prices)
+    assert report["final_balance"] < 10_000.0
+
+    empty = ReplayBacktester(BuyFirstBar(), {}).run(trades[:0])
+    assert empty["events"] == 0 and empty["events_per_sec"] == 0.0 and "seconds" in empty
+
+def test_import_trades_csv(tmp_path):
+    csv = tmp_path / "trades.csv"
+    csv.write_text("id,price,qty,time,is_buyer_maker\n1,100.5,0.25,1000,True\n2,100.75,1.5,2000,False\n")
+    assert import_trades_csv(str(csv), str(tmp_path / "t.npy"), timestamp="time", amount="qty",
+                             buyer_maker="is_buyer_maker", chunksize=1) == 2
+    trades = open_trades(str(tmp_path / "t.npy"))
+    assert trades["timestamp"].tolist() == [1000, 2000]
+    assert trades["price"].tolist() == [100.5, 100.75]
+    assert trades["side"].tolist() == [-1, 1]
+
+def test_synthetic_ohlcv_is_seeded_and_consistent():
+    data = generate_ohlcv(5000, seed=3, mean_regime_bars=500, gap_prob=0.01, missing_prob=0.01, with_regime=True)
+    assert data.equals(generate_ohlcv(5000, seed=3, mean_regime_bars=500, gap_prob=0.01, missing_prob=0.01,
+                                      with_regime=True))
+    assert not data.equals(generate_ohlcv(5000, seed=4, mean_regime_bars=500, gap_prob=0.01,
+                                          missing_prob=0.01, with_regime=True))
+    assert (data["high"] >= data[["open", "close"]].max(axis=1)).all()
+    assert (data["low"] <= data[["open", "close"]].min(axis=1)).all()
+    assert data["regime"].nunique() > 1
+    assert 4900 < len(data) < 5000  # missing bars leave holes in the timestamps
+    assert (data["timestamp"].diff().dropna() > 60_000).any()
+    # Price gaps: some bars open away from the previous close
+    assert ((data["open"] / data["close"].shift() - 1).abs() > 0.01).any()
+
+def test_downsampling_keeps_extremes_and_shape():
+    data = generate_ohlcv(100_000, seed=5)
+    x, y = data["timestamp"].to_numpy(), data["close"].to_numpy()
+
+    indices = minmax_indices(y, 1000)
+    assert len(indices) <= 1002 and (np.diff(indices) > 0).all()
+    assert y[indices].max() == y.max() and y[indices].min() == y.min()
+    assert indices[0] == 0 and indices[-1] == len(y) - 1
+
+    indices = lttb_indices(x, y, 500)
+    assert len(indices) == 500 and (np.diff(indices) > 0).all()
+    assert indices[0] == 0 and indices[-1] == len(y) - 1
+    assert np.array_equal(lttb_indices(x[:100], y[:100], 500), np.arange(100))
+    # A lone spike is the largest triangle in its bucket
+    spiked = np.ones(10_000)
+    spiked[4321] = 50.0
+    assert 4321 in lttb_indices(np.arange(10_000), spiked, 100)
+
+def test_database_minmax_buckets_match_raw_bars():
+    db = DatabaseClient(":memory:")
+    data = generate_ohlcv(10_000, seed=6)
+    db.save_ohlcv("BTC/USDT", data)
+    start, end = int(data["timestamp"][1000]), int(data["timestamp"][9000])
+    assert db.span("BTC/USDT", start=start, end=end) == (start, int(data["timestamp"][8999]))
+    assert db.span("ETH/USDT") is None
+
+    buckets = db.load_minmax("BTC/USDT", start=start, end=end, buckets=100)
+    assert 95 <= len(buckets) <= 100
+    window = data.iloc[1000:9000]
+    assert buckets["max"].max() == window["close"].max()
+    assert buckets["min"].min() == window["close"].min()
+    assert buckets["first"].iloc[0] == start
+
+def _pandas_resample(data, rule):
+    frame = data.set_index(pd.to_datetime(data["timestamp"], unit="ms"))
+    out = frame.resample(rule).agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    ).dropna()
+    out.insert(0, "timestamp", out.index.as_unit("ms").asi8)
+    return out.reset_index(drop=True)
+
+def test_resampler_matches_pandas_incrementally_and_from_seed():
+    data = generate_ohlcv(3 * 1440 + 37, seed=3, missing_prob=0.01)
+    timeframes = {"5m": "5min", "15m": "15min", "1h": "1h", "4h": "4h", "1d": "1D"}
+    incremental = MultiTimeframeResampler("1m", list(timeframes), history=10_000)
+    closed = {timeframe: [] for timeframe in timeframes}
+    for row in data.itertuples(index=False, name=None):
+        for timeframe, bars in incremental.update("BTC/USDT", Bar(*row)).items():
+            closed[timeframe].extend(bars)
+    seeded = MultiTimeframeResampler("1m", list(timeframes), history=10_000)
+    seeded.seed("BTC/USDT", data)
+
+    for timeframe, rule in timeframes.items():
+        expected = _pandas_resample(data, rule)
+        for resampler in (incremental, seeded):
+            frame = resampler.frame("BTC/USDT", timeframe)
+            np.testing.assert_allclose(frame.to_numpy(), expected[frame.columns].to_numpy())
+        # The last period is unfinished, so only the partial frame has it
+        assert len(incremental.frame("BTC/USDT", timeframe, include_partial=False)) == len(expected) - 1
+        assert [bar.timestamp for bar in closed[timeframe]] == expected["timestamp"].tolist()[:-1]
+
+def test_resampler_partial_base_bar_is_not_double_counted():
+    resampler = MultiTimeframeResampler("1m", ["5m"])
+    for minute in range(3):
+        resampler.update("BTC/USDT", Bar(minute * 60_000, 100.0, 101.0, 99.0, 100.0, 1.0))
+    resampler.update("BTC/USDT", Bar(180_000, 100.0, 104.0, 99.0, 103.0, 0.5), closed=False)
+    resampler.update("BTC/USDT", Bar(180_000, 100.0, 105.0, 99.0, 102.0, 0.8), closed=False)
+    assert tuple(resampler.partial("BTC/USDT", "5m")) == (0, 100.0, 105.0, 99.0, 102.0, 3.8)
+
+    # The closed version replaces the forming one; the period's last bar closes the 5m bar
+    resampler.update("BTC/USDT", Bar(180_000, 100.0, 105.0, 98.0, 101.0, 1.0))
+    assert resampler.update("BTC/USDT", Bar(240_000, 101.0, 102.0, 100.0, 101.5, 1.0)) == {
+        "5m": [Bar(0, 100.0, 105.0, 98.0, 101.5, 5.0)]
+    }
+    assert resampler.update("BTC/USDT", Bar(60_000, 1.0, 1.0, 1.0, 1.0, 1.0)) == {}
+    assert resampler.late_bars == 1
+
+    # A forming bar from the next period shows up as that period's partial bar
+    resampler.update("BTC/USDT", Bar(300_000, 101.5, 102.0, 101.0, 101.0, 0.2), closed=False)
+    assert resampler.frame("BTC/USDT", "5m")["timestamp"].tolist() == [0, 300_000]
+    with pytest.raises(ValueError):
+        MultiTimeframeResampler("5m", ["7m"])
+
+def test_fetcher_serves_resampled_timeframes_from_the_feed():
+    now = int(time.time() * 1000) // 60_000 * 60_000
+    history = generate_ohlcv(2 * 1440, seed=5, start=now - (2 * 1440 - 1) * 60_000)
+    exchange = Mock()
+
+    def fetch_ohlcv(symbol, timeframe="1m", limit=100, since=None):
+        bars = history if timeframe == "1m" else resample_ohlcv(history, timeframe)
+        if since is not None:
+            bars = bars[bars["timestamp"] >= since]
+        return bars.head(limit).values.tolist() if since is not None else bars.tail(limit).values.tolist()
+
+    exchange.fetch_ohlcv.side_effect = fetch_ohlcv
+    feed = LiveBarFeed(WebSocketStreamer("wss://test"), ["BTC/USDT"], "1m", timeframes=["15m", "1h", "4h"])
+    fetcher = DataFetcher(exchange, feed=feed)
+
+    frames = fetcher.fetch_frames("BTC/USDT", ["1m", "15m", "1h", "4h"], limit=20)
+    for timeframe, frame in frames.items():
+        expected = resample_ohlcv(history, timeframe).tail(20) if timeframe != "1m" else history.tail(20)
+        np.testing.assert_allclose(frame.to_numpy(), expected.to_numpy())
+        assert frame.attrs["timeframe"] == timeframe
+    calls = exchange.fetch_ohlcv.call_count
+
+    # Later cycles, and the bars the stream adds, cost no exchange calls
+    fetcher.fetch_frames("BTC/USDT", ["15m", "1h", "4h"], limit=20)
+    last = history["timestamp"].iloc[-1]
+    feed.on_trade("BTC/USDT", {"p": "123.0", "q": "2.0", "T": last + 60_000})
+    assert fetcher.fetch_data("BTC/USDT", "4h", limit=20)["close"].iloc[-1] == 123.0
+    assert exchange.fetch_ohlcv.call_count == calls
+
+@pytest.mark.parametrize("strategy", [MovingAverageCrossover(), SMACrossover()])
+def test_batched_crossover_grid_matches_backtests(strategy):
+    data = generate_ohlcv(5000, seed=9)
+    grid = {"short_window": [3, 5, 8, 13], "long_window": [20, 40, 80]}
+    combos = ParameterSweep.expand_grid(grid)
+    for params, report in zip(combos, strategy.evaluate_grid(data, combos)):
+        expected = Backtester(type(strategy)()).run(data, params)
+        assert report["num_trades"] == expected["num_trades"]
+        for key in ("final_balance", "return_pct", "buy_and_hold_return"):
+            assert report[key] == pytest.approx(expected[key], rel=1e-9)
+
+    batched = ParameterSweep(strategy.name, processes=1).run(data, grid)
+    unbatched = ParameterSweep(strategy.name, processes=1, batched=False).run(data, grid)
+    pd.testing.assert_frame_equal(batched, unbatched, check_exact=False, rtol=1e-9)
+
+def test_order_book_levels_stay_sorted_through_updates():
+    book = OrderBook("BTC/USDT")
+    book.apply_snapshot([[99.0, 1.0], [98.0, 2.0]], [[101.0, 1.0], [102.0, 3.0]])
+    book.apply_update([[99.5, 0.5], [98.0, 0.0]], [[100.5, 2.0], [101.0, 0.0], [103.0, 1.0]])
+    assert book.to_dict() == {"symbol": "BTC/USDT", "timestamp": None,
+                              "bids": [[99.5, 0.5], [99.0, 1.0]],
+                              "asks": [[100.5, 2.0], [102.0, 3.0], [103.0, 1.0]]}
+    assert book.best_bid() == (99.5, 0.5) and book.best_ask() == (100.5, 2.0)
+    assert book.spread() == 1.0
+    assert book.cost_to_fill("buy", 3.0) == (3.0, 100.5 * 2 + 102.0)
+    assert book.cost_to_fill("sell", 5.0) == (1.5, 99.5 * 0.5 + 99.0)
+
+def test_consolidated_book_merges_venues_by_price_after_fees():
+    book = ConsolidatedBook("BTC/USDT", {"a": 0.002, "b": 0.0})
+    book.apply_snapshot("a", [[99.8, 1.0]], [[100.0, 1.0], [100.1, 1.0]])
+    book.apply_snapshot("b", [[99.9, 1.0]], [[100.1, 1.0], [100.4, 1.0]])
+    assert book.best_ask() == (100.0, 1.0, "a")
+    assert book.best_ask(net_of_fees=True) == (100.1, 1.0, "b")
+    assert book.best_bid() == (99.9, 1.0, "b")
+    assert book.depth("buy", 2.5) == [(100.1, 1.0, "b"), (100.0, 1.0, "a"), (100.1, 0.5, "a")]
+    assert book.depth("buy", 2.5, net_of_fees=False) == [(100.0, 1.0, "a"), (100.1, 1.0, "a"), (100.1, 0.5, "b")]
+
+    book.apply_update("b", [], [[100.1, 0.0]])
+    assert book.depth("buy", 1.0, venues=["b"]) == [(100.4, 1.0, "b")]
+    book.remove("a")
+    assert book.best_bid() == (99.9, 1.0, "b")
+
+def _diff(first, last, bids=(), asks=()):
+    return {"e": "depthUpdate", "s": "BTCUSDT", "U": first, "u": last, "b": list(bids), "a": list(asks)}
+
+def test_l2_book_buffers_until_snapshot_and_resyncs_after_a_gap():
+    book = L2OrderBook("BTC/USDT")
+    assert not book.on_diff(_diff(1, 5, bids=[["99", "5"]]))
+    book.on_diff(_diff(6, 9, bids=[["100.5", "2"]]))
+    assert book.needs_snapshot
+    book.on_snapshot({"lastUpdateId": 7, "bids": [["100", "1"], ["99", "1"]], "asks": [["101", "1"], ["102", "3"]]})
+    assert not book.needs_snapshot and book.last_update_id == 9
+    assert book.best_bid() == (100.5, 2.0) and book.best_ask() == (101.0, 1.0)
+    assert not book.on_diff(_diff(8, 9, asks=[["101", "0"]]))  # already applied
+
+    assert book.vwap("buy", 2.0) == 101.5
+    assert book.vwap("buy", 5.0) is None
+    assert book.slippage_bps("buy", 2.0) == pytest.approx((101.5 - 100.75) / 100.75 * 10_000)
+    assert book.imbalance(1) == pytest.approx((2 - 1) / 3)
+    assert book.imbalance(2) == pytest.approx((3 - 4) / 7)
+
+    assert not book.on_diff(_diff(12, 13, asks=[["101", "0"]]))
+    assert book.needs_snapshot and book.gaps == 1 and book.best_ask() is None
+    book.on_snapshot({"nonce": 11, "bids": [["100", "3"]], "asks": [["101", "1"]]})
+    assert book.to_dict()["asks"] == [] and book.last_update_id == 13
+    assert not book.on_diff(_diff(14, 14, bids=[["bad", "1"]]))
+    assert book.needs_snapshot and book.gaps == 2
+
+def test_order_book_feed_keeps_books_in_sync_from_the_depth_stream():
+    diffs = [_diff(1, 5, bids=[["99", "5"]]), _diff(6, 9, bids=[["100.5", "2"]]), _diff(10, 10, asks=[["101", "0"]]),
+             {"e": "depthUpdate", "s": "BTCUSDT", "U": 11},  # malformed
+             _diff(15, 16, bids=[["98", "1"]]), _diff(17, 18, asks=[["102.5", "1"]]),
+             _diff(19, 19, bids=[["100", "0"], ["99.5", "2"]])]
+    snapshots = [{"bids": [], "asks": []},  # no update id: retried
+                 {"lastUpdateId": 7, "bids": [["100", "1"], ["99", "1"]], "asks": [["101", "1"], ["102", "1"]]},
+                 {"lastUpdateId": 17, "bids": [["100", "3"]], "asks": [["103", "1"]]}]
+
+    async def scenario():
+        streamer = WebSocketStreamer("wss://test", connect=lambda url: connect())
+        feed = OrderBookFeed(streamer, ["BTC/USDT"], lambda symbol: snapshots.pop(0), retry_delay=0.01)
+
+        def on_book(symbol, book):
+            raise RuntimeError("callback bug")
+
+        feed.on_book = on_book
+
+        async def connect():
+            return FakeSocket([dumps({"result": None, "id": 1})] + [dumps(diff) for diff in diffs], on_end=finish)
+
+        async def finish():
+            while not feed.ready("BTC/USDT") or feed.books["BTC/USDT"].last_update_id < 19:
+                await asyncio.sleep(0.01)
+            await streamer.close()
+
+        await asyncio.wait_for(feed.run(), timeout=5)
+        return streamer, feed
+
+    streamer, feed = asyncio.run(scenario())
+    assert "btcusdt@depth@100ms" in streamer.queues
+    assert feed.snapshot("BTC/USDT") == {"symbol": "BTC/USDT", "timestamp": None,
+                                         "bids": [[99.5, 2.0]], "asks": [[102.5, 1.0], [103.0, 1.0]]}
+    assert feed.books["BTC/USDT"].gaps >= 1 and feed.books["BTC/USDT"].snapshots == 2 and not snapshots
+    assert feed.best("BTC/USDT") == ((99.5, 2.0), (102.5, 1.0))
+
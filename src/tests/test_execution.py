@@ -0,0 +1,422 @@
+# src/tests/test_execution.py
+import asyncio
+import sqlite3
+import threading
+import time
+import ccxt
+import numpy as np
+import pytest
+from unittest.mock import Mock
+from src.execution.async_exchange import AsyncExchange
+from src.execution.exchange import Exchange
+from src.execution.order_journal import OrderJournal
+from src.execution.order_manager import OrderManager
+from src.execution.paper_exchange import PaperExchange
+from src.execution.portfolio_risk import PortfolioRisk
+from src.execution.risk_manager import RiskManager
+from src.execution.router import OrderRouter
+from src.execution.throttling import TokenBucket
+from src.execution.trigger_index import TriggerBook, TriggerIndex
+
+class FakeClient:
+    """Counts REST calls the way a ccxt client would receive them."""
+    has = {"fetchTickers": True}
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def _count(self, method):
+        with self.lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+        time.sleep(self.delay)
+
+    def load_markets(self, reload=False):
+        self._count("load_markets")
+        return {"BTC/USDT": {}, "ETH/USDT": {}}
+
+    def set_markets(self, markets):
+        self.markets = markets
+
+    def fetch_balance(self):
+        self._count("fetch_balance")
+        return {"total": {"USDT": 1000.0}}
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", limit=100):
+        self._count("fetch_ohlcv")
+        return []
+
+    def fetch_ticker(self, symbol):
+        self._count("fetch_ticker")
+        return {"symbol": symbol, "last": 100.0}
+
+    def fetch_tickers(self, symbols):
+        self._count("fetch_tickers")
+        return {symbol: {"symbol": symbol, "last": 100.0 + i} for i, symbol in enumerate(symbols)}
+
+    def create_order(self, symbol, order_type, side, amount, price=None):
+        self._count("create_order")
+        return {"id": str(sum(self.calls.values())), "symbol": symbol}
+
+@pytest.fixture
+def client():
+    return FakeClient()
+
+@pytest.fixture
+def exchange(client):
+    Exchange._markets.clear()
+    return Exchange("fake", "", "", client=client)
+
+def test_balance_is_cached_until_an_order_fills(exchange, client):
+    assert exchange.get_balance("USDT") == 1000.0
+    assert exchange.get_balance("USDT") == 1000.0
+    assert client.calls["fetch_balance"] == 1
+
+    exchange.place_order("BTC/USDT", "buy", 0.1, "limit", 100.0)
+    exchange.get_balance("USDT")
+    assert client.calls["fetch_balance"] == 2
+
+def test_prices_for_many_symbols_use_one_tickers_call(exchange, client):
+    prices = exchange.get_last_prices(["BTC/USDT", "ETH/USDT", "BTC/USDT"])
+    assert set(prices) == {"BTC/USDT", "ETH/USDT"}
+    assert exchange.get_last_price("ETH/USDT") == prices["ETH/USDT"]
+    assert client.calls == {"fetch_tickers": 1}
+
+def test_symbols_without_a_price_do_not_fail_the_others(exchange, client):
+    client.fetch_tickers = lambda symbols: {"BTC/USDT": {"symbol": "BTC/USDT", "last": 100.0}}
+
+    def fetch_ticker(symbol):
+        if symbol == "DEAD/USDT":
+            raise ccxt.BadSymbol(f"binance does not have market symbol {symbol}")
+        return {"symbol": symbol, "last": None if symbol == "HALT/USDT" else 2.0}
+
+    client.fetch_ticker = fetch_ticker
+    prices = exchange.get_last_prices(["BTC/USDT", "ETH/USDT", "DEAD/USDT", "HALT/USDT"])
+    assert prices == {"BTC/USDT": 100.0, "ETH/USDT": 2.0}
+    with pytest.raises(KeyError):
+        exchange.get_last_price("DEAD/USDT")
+
+def test_concurrent_identical_requests_are_coalesced():
+    client = FakeClient(delay=0.2)
+    exchange = Exchange("fake", "", "", client=client)
+    threads = [threading.Thread(target=exchange.fetch_ohlcv, args=("BTC/USDT",)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert client.calls["fetch_ohlcv"] == 1
+
+def test_async_exchange_built_outside_the_loop_bounds_requests_inside_it():
+    exchange = AsyncExchange("binance", "", "", max_concurrency=1)  # no loop running yet
+    in_flight, peak = [0], [0]
+
+    class SlowClient:
+        async def fetch_balance(self):
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+            await asyncio.sleep(0.01)
+            in_flight[0] -= 1
+            return {"total": {"USDT": 1.0}}
+
+    async def main():
+        exchange.exchange = SlowClient()
+        return await asyncio.gather(*(exchange.get_balance("USDT") for _ in range(3)))
+
+    assert asyncio.run(main()) == [1.0, 1.0, 1.0]
+    assert peak[0] == 1
+
+def test_markets_are_loaded_once_per_process(client):
+    Exchange._markets.clear()
+    Exchange("fake", "", "", client=client).load_markets()
+    other = FakeClient()
+    Exchange("fake", "", "", client=other).load_markets()
+    assert client.calls["load_markets"] == 1
+    assert "load_markets" not in other.calls
+    assert set(other.markets) == {"BTC/USDT", "ETH/USDT"}
+
+def test_markets_cache_serves_restarts_and_refreshes_when_stale(tmp_path):
+    Exchange._markets.clear()
+    first = FakeClient()
+    Exchange("fake", "", "", client=first, markets_cache=str(tmp_path)).load_markets()
+    assert first.calls["load_markets"] == 1
+    assert (tmp_path / "fake.json").exists()
+
+    Exchange._markets.clear()  # a restart
+    fresh = FakeClient()
+    Exchange("fake", "", "", client=fresh, markets_cache=str(tmp_path)).load_markets()
+    assert "load_markets" not in fresh.calls
+    assert set(fresh.markets) == {"BTC/USDT", "ETH/USDT"}
+
+    Exchange._markets.clear()
+    stale = FakeClient()
+    exchange = Exchange("fake", "", "", client=stale, markets_cache=str(tmp_path), markets_ttl=0)
+    assert set(exchange.load_markets()) == {"BTC/USDT", "ETH/USDT"}
+    exchange.markets_refresh.join()
+    assert stale.calls["load_markets"] == 1
+
+def test_token_bucket_throttles_by_weight():
+    bucket = TokenBucket(capacity=10, refill_per_second=100)
+    assert bucket.acquire(10) == 0
+    assert not bucket.try_acquire(5)
+    assert bucket.acquire(5) == pytest.approx(0.05, abs=0.02)
+
+def test_paper_limit_orders_fill_partially_in_price_time_priority():
+    paper = PaperExchange({"USDT": 10_000.0}, maker_fee=0.001, taker_fee=0.002)
+    paper.on_trade("BTC/USDT", 0, 100.0)
+    first = paper.create_order("BTC/USDT", "limit", "buy", 2.0, 99.0)
+    second = paper.create_order("BTC/USDT", "limit", "buy", 1.0, 99.0)
+    better = paper.create_order("BTC/USDT", "limit", "buy", 1.0, 99.5)
+    assert paper.fetch_balance()["used"]["USDT"] > 0
+    assert paper.fetch_order_book("BTC/USDT")["bids"] == [[99.5, 1.0], [99.0, 3.0]]
+
+    paper.on_trade("BTC/USDT", 1, 98.9, 2.5)
+    assert paper.fetch_order(better["id"])["status"] == "closed"
+    assert paper.fetch_order(first["id"])["filled"] == 1.5
+    assert paper.fetch_order(second["id"])["filled"] == 0.0
+
+    paper.cancel_order(first["id"])
+    balance = paper.fetch_balance()
+    assert balance["total"]["BTC"] == 2.5
+    assert balance["used"]["USDT"] == pytest.approx(1.0 * 99.0 * 1.002)
+    assert balance["total"]["USDT"] == pytest.approx(10_000 - (99.5 + 1.5 * 99.0) * 1.001)
+
+def test_paper_market_orders_pay_taker_fee_and_slippage():
+    paper = PaperExchange({"USDT": 1_000.0}, taker_fee=0.001, slippage_bps=10)
+    paper.on_trade("BTC/USDT", 0, 100.0)
+    order = paper.create_order("BTC/USDT", "market", "buy", 5.0)
+    assert order["status"] == "closed"
+    assert order["average"] == pytest.approx(100.1)
+    assert order["fee"]["cost"] == pytest.approx(5 * 100.1 * 0.001)
+    with pytest.raises(ccxt.InsufficientFunds):
+        paper.create_order("BTC/USDT", "market", "buy", 5.0)
+
+def test_paper_stop_loss_and_take_profit_trigger_in_batches():
+    paper = PaperExchange({"USDT": 0.0, "BTC": 2.0}, taker_fee=0.0)
+    paper.on_trade("BTC/USDT", 0, 100.0)
+    stop = paper.create_order("BTC/USDT", "market", "sell", 1.0, params={"stopLossPrice": 95.0})
+    take = paper.create_order("BTC/USDT", "market", "sell", 1.0, params={"takeProfitPrice": 110.0})
+
+    prices = np.concatenate([np.linspace(100, 96, 50_000), [94.0], np.linspace(95, 109, 50_000), [111.0]])
+    paper.process_trades("BTC/USDT", np.arange(len(prices)), prices)
+
+    assert paper.fetch_order(stop["id"])["average"] == 94.0
+    assert paper.fetch_order(take["id"])["average"] == 111.0
+    assert paper.fetch_balance()["total"]["USDT"] == pytest.approx(205.0)
+    assert paper.events == 1 + len(prices)
+
+def test_paper_exchange_backs_the_exchange_wrapper():
+    paper = PaperExchange({"USDT": 1_000.0})
+    paper.load_ohlcv("BTC/USDT", [[i * 60_000, 100, 101, 99, 100, 1] for i in range(10)])
+    paper.on_trade("BTC/USDT", 5 * 60_000, 100.0)
+    exchange = Exchange("paper", "", "", client=paper)
+    assert len(exchange.fetch_ohlcv("BTC/USDT", limit=100)) == 6
+    assert exchange.get_last_price("BTC/USDT") == 100.0
+    assert exchange.place_order("BTC/USDT", "buy", 1.0, "limit", 99.0)["status"] == "open"
+    assert exchange.place_order("BTC/USDT", "buy", 100.0, "market") is None
+
+def test_order_journal_enforces_state_machine(tmp_path):
+    journal = OrderJournal(str(tmp_path / "orders.db"))
+    order = {"id": "1", "symbol": "BTC/USDT", "side": "buy", "type": "limit", "amount": 2.0, "price": 100.0}
+    assert journal.record_order(dict(order, status="open", filled=0.0)) == "open"
+    assert journal.record_order(dict(order, status="open", filled=1.0)) == "partially_filled"
+    assert journal.record_order(dict(order, status="closed", filled=2.0)) == "filled"
+    with pytest.raises(ValueError):
+        journal.record_order(dict(order, status="canceled", filled=2.0))
+    journal.flush()
+    events = journal.conn.execute("SELECT status FROM journal_events WHERE order_id = '1' ORDER BY seq").fetchall()
+    assert [e[0] for e in events] == ["open", "partially_filled", "filled"]
+    journal.close()
+
+def test_positions_survive_restart_and_orders_sync(tmp_path):
+    db_path = str(tmp_path / "orders.db")
+    paper = PaperExchange({"USDT": 10_000.0})
+    paper.on_trade("BTC/USDT", 0, 100.0)
+    exchange = Exchange("paper", "", "", client=paper)
+
+    manager = OrderManager(exchange, db_path=db_path)
+    entry = manager.place_order("BTC/USDT", "buy", 1.0, "limit", 99.0)
+    position = {"symbol": "BTC/USDT", "side": "buy", "amount": 1.0, "entry_price": 99.0, "stop_loss": 97.0,
+                "take_profit": 102.0}
+    manager.journal.open_position(entry["id"], position)
+    closed = manager.place_order("BTC/USDT", "buy", 0.5, "limit", 98.0)
+    manager.journal.open_position(closed["id"], dict(position, amount=0.5))
+    manager.journal.close_position(closed["id"], 98.5, 0.5, "take_profit")
+    manager.journal.close()  # as if the process stopped here
+
+    paper.on_trade("BTC/USDT", 1, 98.9)  # the entry fills while the bot is down
+    restarted = OrderManager(exchange, db_path=db_path)
+    assert [o["id"] for o in restarted.journal.live_orders()] == [entry["id"], closed["id"]]
+    assert restarted.sync_orders() == 1
+    assert [o["id"] for o in restarted.journal.live_orders()] == [closed["id"]]
+    assert restarted.journal.open_positions() == {entry["id"]: position}
+    restarted.journal.close()
+
+def test_placed_order_is_returned_when_journaling_fails(tmp_path):
+    paper = PaperExchange({"USDT": 10_000.0})
+    paper.on_trade("BTC/USDT", 0, 100.0)
+    alerts = []
+    manager = OrderManager(Exchange("paper", "", "", client=paper), db_path=str(tmp_path / "orders.db"),
+                           alert=lambda subject, message: alerts.append(subject))
+    manager.journal.close()
+
+    def fail(order, position_id=None):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    manager.journal.record_order = fail
+    order = manager.place_order("BTC/USDT", "buy", 1.0)
+    assert order is not None and paper.orders[order["id"]]["status"] == "closed"
+    assert alerts == ["Order not journaled"]
+
+def test_inconsistent_exchange_orders_do_not_stop_sync_or_cancel(tmp_path):
+    order = {"id": "1", "symbol": "BTC/USDT", "side": "buy", "type": "limit", "amount": 1.0, "price": 100.0}
+    second = dict(order, id="2")
+    exchange = Mock(spec=Exchange)
+    # The venue reports order 1 as open and unfilled after the journal saw it half filled
+    exchange.fetch_order.side_effect = lambda order_id, symbol: {
+        "1": dict(order, status="open", filled=0.0), "2": dict(second, status="closed", filled=1.0)}[order_id]
+    exchange.cancel_order.return_value = dict(order, status="open", filled=0.0)
+    alerts = []
+    manager = OrderManager(exchange, db_path=str(tmp_path / "orders.db"),
+                           alert=lambda subject, message: alerts.append(message))
+    manager.journal.record_order(dict(order, status="open", filled=0.5))
+    manager.journal.record_order(dict(second, status="open", filled=0.0))
+
+    assert manager.sync_orders() == 1
+    assert manager.journal.orders["1"]["status"] == "partially_filled"
+    assert "2" not in manager.journal.orders
+    assert manager.cancel_order("1", "BTC/USDT")["id"] == "1"
+    assert len(alerts) == 2 and "partially_filled -> open" in alerts[0]
+    manager.journal.close()
+
+def test_trigger_index_returns_only_crossed_levels():
+    index = TriggerIndex()
+    index.add("a", stop_loss=98.0, take_profit=103.0)
+    index.add("b", stop_loss=95.0, take_profit=110.0)
+    index.add("c", stop_loss=97.0, take_profit=103.0)
+    assert index.on_price(100.0) == []
+    assert sorted(index.on_price(97.0)) == [("a", "stop_loss"), ("c", "stop_loss")]
+    assert len(index) == 1
+    assert index.on_price(103.0) == []  # c's take profit went with its stop
+    assert index.remove("b") and not index.remove("b")
+    assert index.on_price(50.0) == [] and index.on_price(500.0) == []
+
+def test_trailing_stops_follow_the_high_since_entry():
+    index = TriggerIndex()
+    index.add("early", trailing_pct=2.0, peak=100.0)
+    index.add("wide", trailing_pct=5.0, peak=100.0)
+    assert index.on_price(104.0) == []
+    assert index.on_price(101.9) == [("early", "trailing_stop")]  # 104 * 0.98 = 101.92
+    index.add("late", trailing_pct=2.0, peak=101.9, stop_loss=90.0)
+    assert index.on_price(108.0) == []
+    assert sorted(index.on_price(105.5)) == [("late", "trailing_stop")]
+    assert index.on_price(102.0) == [("wide", "trailing_stop")]  # 108 * 0.95 = 102.6
+    assert not len(index) and index.on_price(80.0) == []
+
+def test_short_levels_and_trails_mirror_longs():
+    index = TriggerIndex()
+    index.add("stop", stop_loss=102.0, take_profit=97.0, side="sell")
+    index.add("take", stop_loss=105.0, take_profit=98.0, side="sell")
+    index.add("trail", trailing_pct=2.0, peak=100.0, side="sell")
+    index.add("long", stop_loss=90.0, take_profit=103.0)
+    assert index.on_price(99.0) == []
+    assert sorted(index.on_price(97.5)) == [("take", "take_profit")]
+    assert index.on_price(99.0) == []  # 97.5 * 1.02 = 99.45
+    assert sorted(index.on_price(99.5)) == [("trail", "trailing_stop")]
+    assert sorted(index.on_price(102.0)) == [("stop", "stop_loss")]
+    assert index.on_price(96.0) == [] and index.on_price(103.0) == [("long", "take_profit")]
+    assert not len(index)
+
+def test_trigger_book_routes_prices_by_symbol():
+    book = TriggerBook()
+    book.add("BTC/USDT", "1", stop_loss=98.0, take_profit=103.0)
+    book.add("ETH/USDT", "2", stop_loss=9.8, take_profit=10.3)
+    assert book.on_prices({"BTC/USDT": 9.0}) == [("1", "stop_loss")]
+    assert book.symbols() == ["ETH/USDT"]
+    assert book.on_prices({"ETH/USDT": 10.5}) == [("2", "take_profit")]
+    assert not len(book)
+
+def test_portfolio_covariance_and_variance_update_incrementally():
+    rng = np.random.default_rng(4)
+    portfolio = PortfolioRisk(["A/USDT", "B/USDT"], window=50, resync_every=60)
+    symbols = ["A/USDT", "B/USDT", "C/USDT"]
+    history = []
+    prices = np.full(3, 100.0)
+    for bar in range(200):
+        prices = prices * (1 + rng.normal(0, 0.01, 3) + [0, 0, 0.005 * rng.normal()])
+        live = symbols if bar >= 120 else symbols[:2]  # C joins late, growing the matrix
+        portfolio.close_bar(dict(zip(live, prices)))
+        history.append(prices.copy())
+        if bar in (10, 130, 170):
+            portfolio.apply_fill(symbols[bar % 3], "buy", 2.0, prices[bar % 3])
+
+    returns = np.diff(np.array(history), axis=0)[-50:] / np.array(history)[-51:-1]
+    np.testing.assert_allclose(portfolio.covariance(), np.cov(returns.T), rtol=1e-9, atol=1e-15)
+    exposure = portfolio.exposure[:3]
+    np.testing.assert_allclose(exposure, portfolio.quantity[:3] * prices)
+    assert portfolio.variance == pytest.approx(exposure @ np.cov(returns.T) @ exposure, rel=1e-9)
+
+    # A hypothetical trade's VaR is the full recomputation's, from cached terms
+    portfolio.max_var_pct = 0.0
+    portfolio.apply_fill("B/USDT", "buy", 1.0, prices[1])
+    after = portfolio.exposure[:3].copy()
+    assert portfolio.variance == pytest.approx(after @ np.cov(returns.T) @ after, rel=1e-9)
+
+def test_portfolio_limits_block_only_risk_increasing_orders():
+    portfolio = PortfolioRisk(["A/USDT", "B/USDT"], window=20, min_history=10, max_gross_exposure=0.85,
+                              max_net_exposure=0.5, max_concentration=0.5, max_var_pct=2.0)
+    rng = np.random.default_rng(1)
+    prices = np.array([100.0, 50.0])
+    for _ in range(30):
+        prices = prices * (1 + rng.normal(0, 0.01, 2))
+        portfolio.close_bar({"A/USDT": prices[0], "B/USDT": prices[1]})
+
+    equity = 10_000.0
+    assert portfolio.check_order("A/USDT", "buy", 4000 / prices[0], prices[0], equity) is None
+    assert "A/USDT exposure" in portfolio.check_order("A/USDT", "buy", 6000 / prices[0], prices[0], equity)
+    portfolio.apply_fill("A/USDT", "buy", 4000 / prices[0], prices[0])
+    assert "net exposure" in portfolio.check_order("B/USDT", "buy", 1500 / prices[1], prices[1], equity)
+    portfolio.apply_fill("B/USDT", "sell", 4000 / prices[1], prices[1])  # a hedge: gross 0.8x, net 0
+    assert "gross exposure" in portfolio.check_order("B/USDT", "sell", 600 / prices[1], prices[1], equity)
+    assert portfolio.check_order("B/USDT", "buy", 1000 / prices[1], prices[1], equity) is None
+
+    portfolio.max_var_pct = portfolio.value_at_risk() / equity * 100 * 0.9
+    assert "VaR" in portfolio.check_order("A/USDT", "buy", 1 / prices[0], prices[0], equity)
+    assert portfolio.check_order("A/USDT", "sell", 1 / prices[0], prices[0], equity) is None
+
+    risk_manager = RiskManager({"max_position_size": 1.0, "portfolio": {"max_concentration": 0.1}})
+    assert risk_manager.validate_order("A/USDT", "buy", 5.0, 100.0)
+    risk_manager.record_fill("A/USDT", "buy", 5.0, 100.0)
+    assert not risk_manager.validate_order("A/USDT", "buy", 6.0, 100.0)
+
+def test_router_splits_orders_across_venues_by_price_after_fees():
+    venues = {}
+    for name, asks in (("fees", [(99.9, 1.0), (100.5, 5.0)]), ("free", [(100.0, 2.0), (100.2, 2.0)])):
+        paper = PaperExchange({"USDT": 10_000.0, "BTC": 10.0})
+        paper.on_trade("BTC/USDT", 0, 99.0)
+        for price, amount in asks:
+            paper.create_order("BTC/USDT", "limit", "sell", amount, price)
+        venues[name] = Exchange(f"router-{name}", "", "", client=paper)
+    router = OrderRouter(venues, {"fees": 0.002, "free": 0.0}, symbols=["BTC/USDT"])
+    assert router.refresh() == 2
+    book = router.book("BTC/USDT")
+    assert book.best_ask() == (99.9, 1.0, "fees")
+    assert book.best_ask(net_of_fees=True) == (100.0, 2.0, "free")  # 99.9 after a 0.2% fee is 100.0998
+
+    plan = router.plan("BTC/USDT", "buy", 4.0)
+    assert [(c["venue"], c["amount"], c["price"]) for c in plan] == [("free", 3.0, 100.2), ("fees", 1.0, 99.9)]
+    assert plan[1]["fee"] == pytest.approx(99.9 * 0.002)
+    assert sum(c["amount"] for c in router.plan("BTC/USDT", "buy", 100.0)) == 10.0  # all the books hold
+
+    children = router.route("BTC/USDT", "buy", 4.0)
+    assert [(c["order"]["status"], c["order"]["filled"]) for c in children] == [("closed", 3.0), ("closed", 1.0)]
+    router.close()
+
+def test_router_from_config_caches_markets_only_when_asked(tmp_path):
+    router = OrderRouter.from_config([{"id": "binance"}, {"id": "kraken", "markets_cache": str(tmp_path)},
+                                      {"id": "bybit", "enabled": False}], symbols=["BTC/USDT"])
+    assert list(router.venues) == ["binance", "kraken"]
+    assert router.venues["binance"].markets_path is None
+    assert router.venues["kraken"].markets_path == tmp_path / "kraken.json"
+    router.close()
+
@@ -0,0 +1,159 @@
+# src/tests/test_indicators.py
+import numpy as np
+import pandas as pd
+import pytest
+from src.strategies.bollinger_bands import BollingerBandsStrategy
+from src.strategies.combined_signals import CombinedStrategy
+from src.strategies.indicator_cache import IndicatorCache
+from src.strategies.indicator_kernels import (
+    ema_family, rolling_extreme_family, rsi_family, sma_family, stochastic_family,
+)
+from src.strategies.macd import MACDStrategy
+from src.strategies.moving_average import MovingAverageCrossover
+from src.strategies.rsi import RSIStrategy
+from src.strategies.stochastic_oscillator import StochasticOscillator
+from src.strategies.strategy_factory import StrategyFactory
+from src.strategies.streaming_indicators import (
+    ATR, Bar, RollingExtreme, RollingWindow, StreamingSignalEngine,
+)
+
+@pytest.fixture
+def ohlcv():
+    rng = np.random.default_rng(11)
+    close = 100 + np.cumsum(rng.normal(0, 1, 500))
+    return pd.DataFrame({
+        "timestamp": np.arange(500) * 60_000,
+        "open": close,
+        "high": close + rng.random(500),
+        "low": close - rng.random(500),
+        "close": close,
+        "volume": 1.0,
+    })
+
+def test_rolling_window_matches_pandas(ohlcv):
+    window = RollingWindow(20, resync_every=50)
+    means, stds = [], []
+    for value in ohlcv["close"]:
+        window.push(value)
+        means.append(window.mean)
+        stds.append(window.std)
+    rolling = ohlcv["close"].rolling(20)
+    np.testing.assert_allclose(means, rolling.mean(), rtol=1e-9)
+    np.testing.assert_allclose(stds, rolling.std(), rtol=1e-6)
+
+def test_rolling_extreme_matches_pandas(ohlcv):
+    low_min = RollingExtreme(14, "min")
+    high_max = RollingExtreme(14, "max")
+    lows = [low_min.update(v) for v in ohlcv["low"]]
+    highs = [high_max.update(v) for v in ohlcv["high"]]
+    np.testing.assert_array_equal(lows, ohlcv["low"].rolling(14).min())
+    np.testing.assert_array_equal(highs, ohlcv["high"].rolling(14).max())
+
+def test_atr_sma_smoothing_matches_rolling_true_range(ohlcv):
+    atr = ATR(14, smoothing="sma")
+    values = [atr.update(h, l, c) for h, l, c in zip(ohlcv["high"], ohlcv["low"], ohlcv["close"])]
+    prev_close = ohlcv["close"].shift()
+    tr = pd.concat([
+        ohlcv["high"] - ohlcv["low"],
+        (ohlcv["high"] - prev_close).abs(),
+        (ohlcv["low"] - prev_close).abs(),
+    ], axis=1).max(axis=1)
+    np.testing.assert_allclose(values, tr.rolling(14).mean(), rtol=1e-9)
+
+@pytest.mark.parametrize("strategy", [
+    MovingAverageCrossover(),
+    BollingerBandsStrategy(),
+    MACDStrategy(),
+    RSIStrategy(),
+    StochasticOscillator(),
+    CombinedStrategy([MACDStrategy(), RSIStrategy(), StochasticOscillator()]),
+])
+def test_stream_matches_batch_signals(strategy, ohlcv):
+    params = {"short_window": 5, "long_window": 20, "consensus_threshold": 1}
+    stream = strategy.stream(params)
+    streamed = [stream.update(Bar(*row)) for row in ohlcv[list(Bar._fields)].itertuples(index=False)]
+    assert streamed == strategy.generate_signals(ohlcv, params).tolist()
+
+def test_engine_feeds_only_new_closed_bars(ohlcv):
+    engine = StreamingSignalEngine(MACDStrategy(), {})
+    assert engine.on_bars("BTC/USDT", ohlcv.iloc[:100]) is not None
+    assert engine.streams["BTC/USDT"].last_timestamp == ohlcv["timestamp"].iloc[98]
+    assert engine.on_bars("BTC/USDT", ohlcv.iloc[:100]) is None
+
+    expected = MACDStrategy().generate_signal(ohlcv.iloc[:101].copy(), {})
+    assert engine.on_bars("BTC/USDT", ohlcv.iloc[1:102]) == expected
+    assert "ETH/USDT" not in engine.streams
+
+def test_indicator_cache_is_lru_bounded(ohlcv):
+    cache = IndicatorCache(maxsize=2)
+    first = cache.rolling_mean(ohlcv, "close", 5)
+    cache.rolling_mean(ohlcv, "close", 10)
+    assert cache.rolling_mean(ohlcv, "close", 5) is first
+    cache.rolling_mean(ohlcv, "close", 20)  # evicts window=10
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (1, 3)
+    cache.rolling_mean(ohlcv, "close", 10)
+    assert cache.misses == 4
+
+def test_indicator_cache_keys_on_every_value_of_every_source_column(ohlcv):
+    cache = IndicatorCache()
+    first = cache.rolling_mean(ohlcv, "close", 5)
+    revised = ohlcv.copy()
+    revised.loc[50, "close"] += 1.0  # same length, ends and timestamps
+    assert cache.rolling_mean(revised, "close", 5) is not first
+
+    StrategyFactory.indicator_cache.clear()
+    stochastic = StrategyFactory.create_strategy({"type": "stochastic"})
+    stochastic.generate_signals(ohlcv, {})
+    higher = ohlcv.copy()
+    higher["high"] *= 1.5  # moves %K without touching close
+    stochastic.generate_signals(higher, {})
+    assert StrategyFactory.indicator_cache.hits == 1  # only the rolling min of the unchanged lows
+
+def test_factory_strategies_share_cache_without_mutating_input(ohlcv):
+    StrategyFactory.indicator_cache.clear()
+    strategy = StrategyFactory.create_strategy({
+        "type": "combined",
+        "strategies": [{"type": "moving_average"}, {"type": "sma_crossover"}, {"type": "stochastic"}],
+    })
+    columns = list(ohlcv.columns)
+    params = {"short_window": 10, "long_window": 50}
+    signal = strategy.generate_signal(ohlcv, params)
+
+    assert list(ohlcv.columns) == columns
+    assert StrategyFactory.indicator_cache.hits >= 2  # both crossovers use the same MAs
+    assert strategy.generate_signal(ohlcv, params) == signal
+    shifted = ohlcv.iloc[1:]
+    strategy.generate_signal(shifted, params)
+    assert strategy.strategies[0].indicators.rolling_mean(shifted, "close", 10).index[0] == 1
+
+def test_indicator_kernels_match_pandas(ohlcv):
+    close = ohlcv["close"]
+    windows = [1, 5, 14, 50, 600]
+    buffer = np.empty((len(windows), len(ohlcv)))
+    sma = sma_family(close.to_numpy(), windows, out=buffer)
+    assert sma is buffer
+    for row, window in zip(sma, windows):
+        np.testing.assert_allclose(row, close.rolling(window).mean(), rtol=1e-10)
+    gappy = close.where(close.index % 97 != 0)
+    np.testing.assert_allclose(sma_family(gappy.to_numpy(), [10])[0], gappy.rolling(10).mean(), rtol=1e-10)
+
+    for row, span in zip(ema_family(close.to_numpy(), windows), windows):
+        np.testing.assert_allclose(row, close.ewm(span=span, adjust=False).mean(), rtol=1e-10)
+    for row, window in zip(rolling_extreme_family(ohlcv["high"].to_numpy(), windows, "max"), windows):
+        np.testing.assert_array_equal(row, ohlcv["high"].rolling(window).max())
+
+    for row, window in zip(rsi_family(close.to_numpy(), [2, 14]), [2, 14]):
+        expected = RSIStrategy().generate_signals(ohlcv, {"window": window})
+        signals = np.where(row < 30, "buy", np.where(row > 70, "sell", "hold"))
+        assert list(signals) == list(expected)
+
+    k, d = stochastic_family(ohlcv["high"], ohlcv["low"], close, [5, 14], d_period=3)
+    for k_row, d_row, period in zip(k, d, [5, 14]):
+        low, high = ohlcv["low"].rolling(period).min(), ohlcv["high"].rolling(period).max()
+        expected_k = 100 * (close - low) / (high - low)
+        np.testing.assert_allclose(k_row, expected_k, rtol=1e-10)
+        np.testing.assert_allclose(d_row, expected_k.rolling(3).mean(), rtol=1e-10)
+
+    with pytest.raises(ValueError):
+        sma_family(close.to_numpy(), [5], out=np.empty((2, len(close))))
@@ -1,16 +1,442 @@
 # src/tests/test_integration.py
+import asyncio
+import json
+import socketserver
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import ccxt
+import numpy as np
 import pytest
 from unittest.mock import Mock
+from tenacity import wait_none
+from src.core.async_engine import AsyncTradingEngine
+from src.core.benchmark import BenchmarkSuite, compare, load_results, save_results
 from src.core.bot import CryptoBot
-from src.execution.exchange import Exchange
+from src.core.recorder import SessionRecorder, read_session, session_files
+from src.core.session_replay import SessionReplay
+from src.data.columnar import ColumnarStore
+from src.data.storage import DatabaseClient
+from src.data.streamer import LiveBarFeed, WebSocketStreamer
+from src.data.synthetic import generate_ohlcv
+from src.execution.exchange import REST_CALLS, Exchange
+from src.execution.order_journal import OrderJournal
+from src.monitoring.alerts import AlertDispatcher, EmailNotifier, TelegramNotifier
+from src.monitoring.dashboard_data import DashboardData
+from src.monitoring.metrics import RETRIES, MetricsRegistry, MetricsServer
+from src.strategies.streaming_indicators import Bar
+from src.tests.test_execution import FakeClient
 
 @pytest.fixture
 def mock_exchange():
     exchange = Mock(spec=Exchange)
-    exchange.fetch_ohlcv.return_value = [[1609459200000, 29000, 29500, 28500, 29000, 1000]] * 100
+    exchange.fetch_ohlcv.return_value = generate_ohlcv(100, seed=7).to_numpy().tolist()
+    exchange.get_balance.return_value = 10000.0
     return exchange
 
 def test_bot_integration(mock_exchange):
-    bot = CryptoBot(config={"strategy": "moving_average"}, exchange=mock_exchange)
-    bot.run()
-    assert mock_exchange.fetch_ohlcv.call_count > 0
\ No newline at end of file
+    config = {
+        "trading_pair": "BTC/USDT",
+        "quote_currency": "USDT",
+        "exchange": {"id": "fake"},
+        "strategy": {"type": "moving_average", "params": {"short_window": 5, "long_window": 20}},
+        "risk_params": {"max_position_size": 0.1},
+        "scheduler": {"interval": "1m"},
+        "journal": {"path": ":memory:"},
+    }
+    bot = CryptoBot(config=config, exchange=mock_exchange)
+    bot.execute_strategy()
+    assert mock_exchange.fetch_ohlcv.call_count > 0
+    bot.order_manager.journal.close()
+
+def test_short_positions_keep_their_side_through_restart_and_cancel(mock_exchange, tmp_path):
+    config = {
+        "trading_pair": "BTC/USDT", "quote_currency": "USDT", "exchange": {"id": "fake"},
+        "strategy": {"type": "moving_average", "params": {}}, "scheduler": {"interval": "1m"},
+        "risk_params": {"max_position_size": 0.1, "portfolio": {"symbols": ["BTC/USDT"]}},
+        "journal": {"path": str(tmp_path / "orders.db")},
+    }
+    entry = {"id": "e1", "symbol": "BTC/USDT", "side": "sell", "type": "limit", "amount": 1.0, "price": 100.0,
+             "filled": 0.0, "status": "open"}
+    mock_exchange.place_order.return_value = mock_exchange.fetch_order.return_value = entry
+    mock_exchange.cancel_order.return_value = dict(entry, status="canceled")
+
+    bot = CryptoBot(config=config, exchange=mock_exchange)
+    assert bot._execute_signal("sell", 100.0) == entry
+    amount = bot.active_positions["e1"]["amount"]
+    assert bot.risk_manager.portfolio.net == pytest.approx(-amount * 100.0)
+    bot.order_manager.journal.close()
+
+    restarted = CryptoBot(config=config, exchange=mock_exchange)
+    assert restarted.active_positions["e1"]["side"] == "sell"
+    assert restarted.risk_manager.portfolio.net == pytest.approx(-amount * 100.0)
+    restarted._close_all_positions()
+    assert restarted.risk_manager.portfolio.net == pytest.approx(0.0)
+    restarted.order_manager.journal.close()
+
+def test_short_positions_exit_on_their_mirrored_levels(mock_exchange):
+    config = {
+        "trading_pair": "BTC/USDT", "quote_currency": "USDT", "exchange": {"id": "fake"},
+        "strategy": {"type": "moving_average", "params": {}}, "scheduler": {"interval": "1m"},
+        "risk_params": {"max_position_size": 0.1, "stop_loss_pct": 2.0, "take_profit_pct": 3.0},
+        "journal": {"path": ":memory:"},
+    }
+    mock_exchange.place_order.side_effect = lambda symbol, side, amount, order_type, price=None: {
+        "id": f"o{mock_exchange.place_order.call_count}", "symbol": symbol, "side": side, "type": order_type,
+        "amount": amount, "price": price, "filled": amount, "status": "closed"}
+    bot = CryptoBot(config=config, exchange=mock_exchange)
+    target = bot._execute_signal("sell", 100.0)["id"]
+    assert bot.active_positions[target]["stop_loss"] == pytest.approx(102.0)
+    assert bot.active_positions[target]["take_profit"] == pytest.approx(97.0)
+    bot._monitor_positions({"BTC/USDT": 101.5})  # a 1.5% loss is no take profit for a short
+    assert target in bot.active_positions
+    bot._monitor_positions({"BTC/USDT": 96.5})
+    assert bot.trade_history[-1]["reason"] == "take_profit" and bot.trade_history[-1]["pnl"] == pytest.approx(3.5)
+
+    stopped = bot._execute_signal("sell", 100.0)["id"]
+    bot._monitor_positions({"BTC/USDT": 97.5})  # nor is a 2.5% gain a stop
+    assert stopped in bot.active_positions
+    bot._monitor_positions({"BTC/USDT": 102.5})
+    assert bot.trade_history[-1]["reason"] == "stop_loss" and bot.trade_history[-1]["pnl"] == pytest.approx(-2.5)
+    assert mock_exchange.place_order.call_args.args[1] == "buy" and not bot.active_positions
+    bot.order_manager.journal.close()
+
+def test_benchmark_compare_flags_regressions(tmp_path):
+    report = BenchmarkSuite(sizes=[2000], repeat=1, window=200).run(["backtester", "risk_manager"])
+    names = {"backtester.run[moving_average,2000]", "risk_manager.validate_order",
+             "risk_manager.validate_order[portfolio,100]", "portfolio_risk.close_bar[100]"}
+    assert set(report["results"]) == names
+    save_results(report, str(tmp_path / "baseline.json"))
+    baseline = load_results(str(tmp_path / "baseline.json"))
+
+    slower = {"results": {name: dict(timing, median_s=timing["median_s"] * 1.5)
+                          for name, timing in baseline["results"].items()}}
+    slower["results"]["new.benchmark"] = {"median_s": 1.0}
+    rows = {row["name"]: row["status"] for row in compare(slower, baseline, threshold=0.2)}
+    assert rows == dict.fromkeys(names, "regression") | {"new.benchmark": "new"}
+    assert all(row["status"] == "ok" for row in compare(baseline, baseline))
+
+def test_startup_benchmark_times_each_phase_in_a_fresh_process():
+    # Raises if the child's evaluation logged an error (e.g. reached a live endpoint)
+    results = BenchmarkSuite(sizes=[200], repeat=1, window=100).run(["startup"])["results"]
+    phases = [results[f"startup.{phase}"]["median_s"] for phase in ("import", "bot_init", "first_evaluation", "process")]
+    assert 0 < phases[0] <= phases[1] <= phases[2] <= phases[3]
+
+class FakeAsyncExchange:
+    def __init__(self, bars, delays):
+        self.bars = bars
+        self.delays = delays
+        self.fetches = {}
+        self.orders = []
+        self.closed = False
+
+    async def load_markets(self):
+        return {}
+
+    async def fetch_ohlcv(self, symbol, timeframe="1m", limit=100):
+        await asyncio.sleep(self.delays.get(symbol, 0))
+        self.fetches[symbol] = self.fetches.get(symbol, 0) + 1
+        return self.bars
+
+    async def get_balance(self, currency):
+        return 10000.0
+
+    async def place_order(self, symbol, side, amount, order_type="market", price=None):
+        self.orders.append((symbol, side, amount))
+        return {"id": f"order-{len(self.orders)}"}
+
+    async def close(self):
+        self.closed = True
+
+def test_recorded_session_replays_to_the_same_decisions(tmp_path):
+    config = {
+        "trading_pair": "BTC/USDT",
+        "quote_currency": "USDT",
+        "exchange": {"id": "fake", "api_secret": "hunter2"},
+        "strategy": {"type": "moving_average", "params": {"short_window": 5, "long_window": 20}},
+        "risk_params": {"max_position_size": 0.1, "stop_loss_pct": 1.0, "take_profit_pct": 1.0},
+        "scheduler": {"interval": "1m"},
+        "journal": {"path": ":memory:"},
+        "recorder": {"path": str(tmp_path)},
+    }
+    bars = generate_ohlcv(400, seed=3).to_numpy().tolist()
+    exchange = Mock(spec=Exchange)
+    exchange.get_balance.return_value = 10000.0
+    exchange.place_order.side_effect = lambda symbol, side, amount, order_type, price=None: {
+        "id": f"order-{exchange.place_order.call_count}", "symbol": symbol, "side": side, "status": "closed",
+        "amount": amount, "filled": amount,
+    }
+    bot = CryptoBot(config, exchange=exchange)
+    for end in range(100, len(bars)):
+        exchange.fetch_ohlcv.return_value = bars[end - 100:end]
+        exchange.get_last_prices.return_value = {"BTC/USDT": bars[end - 1][4]}
+        bot.execute_strategy()
+        bot._monitor_positions()
+    bot.order_manager.journal.close()
+    bot.recorder.close()
+
+    files = session_files(str(tmp_path))
+    assert files == bot.recorder.files
+    text = files[0].read_text()
+    assert "hunter2" not in text
+    report = SessionReplay(files).run()
+    assert report["steps"] >= 300 and report["decisions"] > 0
+    assert report["mismatches"] == [] and report["unrecorded"] == 0 and report["unused"] == 0
+    # After the first cycle, a frame is stored as the bars that changed, not all 100
+    frames = [event for event in map(json.loads, text.splitlines()) if event["kind"] == "frame"]
+    assert len(frames[0]["rows"]) == 100 and max(len(event["rows"]) for event in frames[1:]) == 1
+
+    changed = dict(config["risk_params"], stop_loss_pct=1.5)
+    report = SessionReplay(files, config=dict(config, risk_params=changed)).run()
+    assert report["mismatches"] and report["mismatches"][0]["entry"] == "execute_strategy"
+
+def test_recorder_drops_when_behind_and_survives_write_errors(tmp_path):
+    recorder = SessionRecorder(str(tmp_path), batch_size=1, max_queue=2)
+    release, write = threading.Event(), recorder._write
+
+    def stalled(events):
+        release.wait()
+        if events[0][1] == "bad":
+            raise RuntimeError("unexpected")
+        write(events)
+
+    recorder._write = stalled
+    recorder.record("bad")
+    for i in range(10):
+        recorder.record("tick", i=i)
+    assert recorder.dropped >= 7
+    release.set()
+    recorder.flush()  # returns although a batch failed
+    recorder.record("tick", i=10)
+    recorder.close()
+    ticks = [event["i"] for event in read_session(recorder.files)]
+    assert ticks[-1] == 10 and len(ticks) == 11 - recorder.dropped
+
+def test_async_engine_isolates_slow_symbols():
+    rising = [[i * 60_000, 100 + i, 101 + i, 99 + i, 100 + i, 1.0] for i in range(100)]
+    exchange = FakeAsyncExchange(rising, delays={"SLOW/USDT": 5.0})
+    config = {
+        "trading_pairs": ["BTC/USDT", "ETH/USDT", "SLOW/USDT"],
+        "strategy": {"type": "moving_average", "params": {"short_window": 5, "long_window": 20}},
+        "risk_params": {"max_position_size": 0.1},
+        "scheduler": {"interval": "1m"},
+    }
+    engine = AsyncTradingEngine(config, exchange=exchange, interval=0.01, fetch_timeout=0.1)
+
+    started = time.monotonic()
+    asyncio.run(engine.run(cycles=3))
+
+    assert time.monotonic() - started < 2.0
+    assert exchange.fetches == {"BTC/USDT": 3, "ETH/USDT": 3}
+    assert sorted(symbol for symbol, side, _ in exchange.orders) == ["BTC/USDT", "ETH/USDT"]
+    assert engine.states["SLOW/USDT"].cycles == 3
+    assert engine.states["BTC/USDT"].risk_manager is not engine.states["ETH/USDT"].risk_manager
+    assert exchange.closed
+
+def test_async_engine_opens_and_exits_shorts_like_the_bot():
+    exchange = FakeAsyncExchange([[0, 100.0, 100.0, 100.0, 100.0, 1.0]], delays={})
+    config = {
+        "trading_pair": "BTC/USDT",
+        "strategy": {"type": "moving_average", "params": {}},
+        "risk_params": {"max_position_size": 0.1, "stop_loss_pct": 2.0, "take_profit_pct": 3.0},
+        "scheduler": {"interval": "1m"},
+    }
+    engine = AsyncTradingEngine(config, exchange=exchange)
+    engine._signal = lambda symbol, data: "sell"
+    state = engine.states["BTC/USDT"]
+
+    async def trade():
+        await engine.execute_cycle(state)
+        await engine._monitor_positions(state, 98.0)  # a 2% gain stops no short
+        await engine._monitor_positions(state, 96.5)
+
+    asyncio.run(trade())
+    assert [side for _, side, _ in exchange.orders] == ["sell", "buy"]
+    assert not state.active_positions and state.risk_manager.daily_pnl == pytest.approx(3.5)
+
+def test_event_driven_bot_trades_on_candle_close_and_exits_on_price():
+    config = {
+        "trading_pair": "BTC/USDT",
+        "quote_currency": "USDT",
+        "exchange": {"id": "fake"},
+        "strategy": {"type": "moving_average", "params": {"short_window": 5, "long_window": 20}},
+        "risk_params": {"max_position_size": 0.1, "stop_loss_pct": 2.0, "take_profit_pct": 3.0},
+        "scheduler": {"interval": "1m", "mode": "event"},
+        "journal": {"path": ":memory:"},
+    }
+    client = FakeClient()
+    bot = CryptoBot(config, exchange=Exchange("fake", "", "", client=client))
+    bot.data_fetcher.feed = LiveBarFeed(WebSocketStreamer("wss://test"), ["BTC/USDT"], "1m")
+    bot.signal_engine = Mock()
+    bot.signal_engine.on_bar.return_value = "buy"
+
+    bot._on_candle_close("BTC/USDT", Bar(0, 100.0, 101.0, 99.0, 100.0, 5.0))
+    assert len(bot.active_positions) == 1
+    assert bot.latency_stats()["count"] == 1
+
+    bot._monitor_positions({"BTC/USDT": 99.0})
+    assert len(bot.active_positions) == 1
+    bot._monitor_positions({"BTC/USDT": 97.5})
+    assert not bot.active_positions
+    assert bot.trade_history[-1]["reason"] == "stop_loss"
+    assert client.calls["create_order"] == 2
+
+def test_stage_histograms_and_metrics_endpoint():
+    registry = MetricsRegistry()
+    stages = registry.histogram("stage_seconds", "Stage timings", ("stage",))
+    observed = [i * 1e-5 for i in range(1, 1001)]  # 10us .. 10ms
+
+    def record(values):
+        for value in values:
+            stages.labels("signal").observe(value)
+
+    threads = [threading.Thread(target=record, args=(observed[i::4],)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    summary = stages.labels("signal").snapshot()
+    assert summary["count"] == 1000 and summary["max"] == pytest.approx(0.01)
+    assert summary["p50"] == pytest.approx(0.005, rel=0.07)
+    assert summary["p99"] == pytest.approx(0.0099, rel=0.07)
+    registry.counter("calls_total", "Calls", ("method",)).labels("fetch_ohlcv").inc(3)
+
+    server = MetricsServer(port=0, host="127.0.0.1", registry=registry).start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics") as response:
+            body = response.read().decode()
+    finally:
+        server.stop()
+    assert 'stage_seconds_count{stage="signal"} 1000' in body
+    assert 'stage_seconds{stage="signal",quantile="0.99"}' in body
+    assert 'calls_total{method="fetch_ohlcv"} 3' in body
+
+def test_exchange_counts_rest_calls_and_retries():
+    client = FakeClient()
+    failures = iter([ccxt.NetworkError("timeout")])
+
+    def flaky_fetch_ohlcv(symbol, timeframe="1m", limit=100):
+        for error in failures:
+            raise error
+        return [[0, 1, 1, 1, 1, 1]]
+
+    client.fetch_ohlcv = flaky_fetch_ohlcv
+    exchange = Exchange("metrics-test", "", "", client=client)
+    retries = RETRIES.labels("Exchange.fetch_ohlcv").value
+    Exchange.fetch_ohlcv.retry_with(wait=wait_none())(exchange, "BTC/USDT")
+    assert RETRIES.labels("Exchange.fetch_ohlcv").value == retries + 1
+    assert REST_CALLS.labels("metrics-test", "fetch_ohlcv").value == 2
+
+def test_dashboard_queries_are_range_limited_and_downsampled(tmp_path):
+    bars = generate_ohlcv(20_000, seed=9)
+    db = DatabaseClient(str(tmp_path / "prices.db"))
+    db.save_ohlcv("BTC/USDT", bars)
+    db.close()
+    ColumnarStore(str(tmp_path / "columnar")).append("BTC/USDT", "1m", bars)
+
+    journal = OrderJournal(str(tmp_path / "orders.db"))
+    position = {"symbol": "BTC/USDT", "amount": 1.0, "entry_price": 100.0, "stop_loss": 98.0, "take_profit": 103.0}
+    for i, pnl in enumerate([3.0, -2.0, 3.0]):
+        journal.open_position(str(i), position)
+        journal.close_position(str(i), 100.0, pnl, "take_profit")
+    journal.open_position("open", position)
+    journal.close()
+
+    for columnar in (None, str(tmp_path / "columnar")):
+        data = DashboardData(str(tmp_path / "prices.db"), str(tmp_path / "orders.db"), columnar_path=columnar,
+                             points=500)
+        full = data.price("BTC/USDT")
+        assert len(full["close"]) <= 502
+        assert full["close"].max() == bars["close"].max() and full["close"].min() == bars["close"].min()
+
+        start, end = int(bars["timestamp"][5000]), int(bars["timestamp"][5300])
+        zoomed = data.price("BTC/USDT", start=start, end=end)
+        assert np.array_equal(zoomed["close"], bars["close"][5000:5300].to_numpy())
+
+    live = data.price_since("BTC/USDT", "1m", int(bars["timestamp"].iloc[-4]))
+    assert list(live["timestamp"]) == bars["timestamp"].iloc[-3:].tolist()
+    assert data.equity(1000.0)["equity"] == pytest.approx([1030.0, 1030.0 * 0.98, 1030.0 * 0.98 * 1.03])
+    assert [p["id"] for p in data.open_positions()] == ["open"]
+    assert data.latency() == {}
+
+class _SMTPStub(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: records each connection and message body."""
+
+    def handle(self):
+        self.server.connections += 1
+        self.wfile.write(b"220 stub\r\n")
+        for line in iter(self.rfile.readline, b""):
+            command = line.strip().upper()
+            if command == b"DATA":
+                self.wfile.write(b"354 go ahead\r\n")
+                body = []
+                for data in iter(self.rfile.readline, b""):
+                    if data == b".\r\n":
+                        break
+                    body.append(data.decode())
+                self.server.messages.append("".join(body))
+                self.wfile.write(b"250 queued\r\n")
+            elif command == b"QUIT":
+                self.wfile.write(b"221 bye\r\n")
+                return
+            else:
+                self.wfile.write(b"250 ok\r\n")
+
+class _TelegramStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse shows in client ports
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.posts.append((self.path, self.client_address[1], payload))
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def test_alert_dispatcher_coalesces_rate_limits_and_reuses_connections():
+    smtp = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPStub)
+    smtp.daemon_threads = True
+    smtp.connections, smtp.messages = 0, []
+    http = ThreadingHTTPServer(("127.0.0.1", 0), _TelegramStub)
+    http.posts = []
+    for server in (smtp, http):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    email = EmailNotifier({"smtp_server": "127.0.0.1", "smtp_port": smtp.server_address[1],
+                           "email": "bot@example.com", "password": "", "use_tls": False})
+    telegram = TelegramNotifier("TOKEN", "42", base_url=f"http://127.0.0.1:{http.server_address[1]}")
+    # One Telegram message now, the next in ~100s: everything after the first is held back
+    dispatcher = AlertDispatcher({"email": email, "telegram": telegram}, coalesce_seconds=0.2,
+                                 rate_limits={"telegram": {"burst": 1, "per_minute": 0.6}})
+    try:
+        started = time.perf_counter()
+        for _ in range(5):
+            dispatcher.alert("Order failed", "exchange timeout")
+        assert time.perf_counter() - started < 0.05  # callers only enqueue
+        dispatcher.flush()
+        assert dispatcher.coalesced == 4
+        for symbol in ("BTC/USDT", "ETH/USDT", "SOL/USDT"):
+            dispatcher.alert("Position closed", symbol, channels=["telegram"])
+        dispatcher.flush()
+        time.sleep(0.3)  # the coalescing window closes
+        emails = "".join(smtp.messages)
+        assert emails.count("exchange timeout") == 2 and "repeated 4 more times" in emails
+        assert len(http.posts) == 1
+    finally:
+        dispatcher.close()
+        smtp.shutdown()
+        http.shutdown()
+
+    assert smtp.connections == 1
+    texts = "".join(payload["text"] for _, _, payload in http.posts)
+    assert all(symbol in texts for symbol in ("BTC/USDT", "ETH/USDT", "SOL/USDT"))
+    assert "repeated 4 more times" in texts
+    assert len(http.posts) == 2  # the held-back alerts went out as one digest on close
+    assert {path for path, _, _ in http.posts} == {"/botTOKEN/sendMessage"}
+    assert len({port for _, port, _ in http.posts}) == 1
+    assert dispatcher.sent == 2 + 5 and dispatcher.failed == 0
@@ -1,16 +1,35 @@
+# src/tests/test_strategies.py
+import pandas as pd
 import pytest
-from src.strategies.moving_average import MovingAverageStrategy
+from src.core.benchmark import BENCHMARK_STRATEGIES
+from src.data.synthetic import generate_ohlcv
+from src.strategies.moving_average import MovingAverageCrossover
+from src.strategies.rsi import RSIStrategy
+from src.strategies.strategy_factory import StrategyFactory
+
+@pytest.fixture(scope="module")
+def data():
+    return generate_ohlcv(500, seed=11)
 
-def test_moving_average_strategy():
-    strategy = MovingAverageStrategy()
-    data = [[1609459200000, 29000, 29500, 28500, 29000, 1000]] * 100
-    signal = strategy.generate_signal(data)
+def test_moving_average_strategy(data):
+    strategy = MovingAverageCrossover()
+    signal = strategy.generate_signal(data, {"short_window": 10, "long_window": 50})
     assert signal in ["buy", "sell", None]
-    
 
-# src/tests/test_strategies.py
 def test_rsi_strategy():
     data = pd.DataFrame({"close": [100, 101, 102, 101, 100, 99, 98, 97, 96, 95]})
     strategy = RSIStrategy()
     signal = strategy.generate_signal(data, {"window": 14, "oversold": 30, "overbought": 70})
-    assert signal in ["buy", "sell", "hold"]    
\ No newline at end of file
+    assert signal in ["buy", "sell", "hold", None]
+
+@pytest.mark.parametrize("name", sorted(BENCHMARK_STRATEGIES))
+def test_vectorized_signals_match_latest_signal(name, data):
+    strategy = StrategyFactory.create_strategy(BENCHMARK_STRATEGIES[name])
+    signal = strategy.generate_signal(data, {})
+    assert signal in ["buy", "sell", "hold", None]
+    try:
+        signals = strategy.generate_signals(data, {})
+    except NotImplementedError:
+        return
+    assert len(signals) == len(data)
+    assert signals.iloc[-1] == signal